@@ -0,0 +1,43 @@
+"""add notification_campaigns dispatch checkpoint columns
+
+Revision ID: 20261017_add_campaign_dispatch_checkpoint
+Revises: 20261017_add_game_history_aggregates
+Create Date: 2026-10-17
+
+청크 단위 캠페인 발송의 재개 지점(dispatch_cursor = 마지막 처리 user_id)과 누적 발송 수.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_add_campaign_dispatch_checkpoint'
+down_revision: Union[str, None] = '20261017_add_game_history_aggregates'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'notification_campaigns' not in set(insp.get_table_names()):
+        return
+    cols = {c['name'] for c in insp.get_columns('notification_campaigns')}
+    if 'dispatch_cursor' not in cols:
+        op.add_column('notification_campaigns',
+                      sa.Column('dispatch_cursor', sa.Integer, nullable=False, server_default='0'))
+    if 'dispatched_count' not in cols:
+        op.add_column('notification_campaigns',
+                      sa.Column('dispatched_count', sa.Integer, nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'notification_campaigns' not in set(insp.get_table_names()):
+        return
+    cols = {c['name'] for c in insp.get_columns('notification_campaigns')}
+    for name in ('dispatched_count', 'dispatch_cursor'):
+        if name in cols:
+            op.drop_column('notification_campaigns', name)
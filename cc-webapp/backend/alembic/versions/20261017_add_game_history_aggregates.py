@@ -0,0 +1,60 @@
+"""add game_history_aggregates & user_win_streaks (incremental achievement counters)
+
+Revision ID: 20261017_add_game_history_aggregates
+Revises: c6a1b5e2e2b1
+Create Date: 2026-10-17
+
+업적 평가기가 game_history 전체 SUM/최근 100행 스캔 대신 조회하는 증분 집계 테이블.
+기존 데이터 backfill: python -m app.scripts.rebuild_history_aggregates
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_add_game_history_aggregates'
+down_revision: Union[str, None] = 'c6a1b5e2e2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if 'game_history_aggregates' not in tables:
+        op.create_table(
+            'game_history_aggregates',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('game_type', sa.String(50), nullable=False),
+            sa.Column('action_type', sa.String(30), nullable=False),
+            sa.Column('total_count', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('total_delta_coin', sa.BigInteger, nullable=False, server_default='0'),
+            sa.Column('total_delta_gem', sa.BigInteger, nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint('user_id', 'game_type', 'action_type', name='uq_game_history_agg_user_game_action'),
+        )
+        op.create_index('ix_game_history_agg_user_action', 'game_history_aggregates', ['user_id', 'action_type'])
+
+    if 'user_win_streaks' not in tables:
+        op.create_table(
+            'user_win_streaks',
+            sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('win_streak', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('tail_game_type', sa.String(50), nullable=True),
+            sa.Column('tail_game_streak', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    if 'user_win_streaks' in tables:
+        op.drop_table('user_win_streaks')
+    if 'game_history_aggregates' in tables:
+        op.drop_index('ix_game_history_agg_user_action', table_name='game_history_aggregates')
+        op.drop_table('game_history_aggregates')
@@ -0,0 +1,38 @@
+"""add user_recommendations(user_id, status) index
+
+Revision ID: 20261017_add_user_recommendations_user_status_index
+Revises: 20261017_add_campaign_dispatch_checkpoint
+Create Date: 2026-10-17
+
+추천 생성 시 사용자별 pending 추천 조회(동일 추천 재사용 판단)용 인덱스.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_add_user_recommendations_user_status_index'
+down_revision: Union[str, None] = '20261017_add_campaign_dispatch_checkpoint'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_user_recommendations_user_status'
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'user_recommendations' not in set(insp.get_table_names()):
+        return
+    if INDEX_NAME not in {ix['name'] for ix in insp.get_indexes('user_recommendations')}:
+        op.create_index(INDEX_NAME, 'user_recommendations', ['user_id', 'status'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'user_recommendations' not in set(insp.get_table_names()):
+        return
+    if INDEX_NAME in {ix['name'] for ix in insp.get_indexes('user_recommendations')}:
+        op.drop_index(INDEX_NAME, table_name='user_recommendations')
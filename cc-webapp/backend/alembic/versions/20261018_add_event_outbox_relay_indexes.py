@@ -0,0 +1,47 @@
+"""add event_outbox relay indexes
+
+Revision ID: 20261018_add_event_outbox_relay_indexes
+Revises: 20261017_add_user_recommendations_user_status_index
+Create Date: 2026-10-18
+
+outbox relay 용 부분 인덱스.
+- ix_event_outbox_pending_id: 미발행 행 id 순 claim (ORDER BY id LIMIT n FOR UPDATE SKIP LOCKED)
+- ix_event_outbox_published_at: 보존 기간 지난 발행 완료 행 prune
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_add_event_outbox_relay_indexes'
+down_revision: Union[str, None] = '20261017_add_user_recommendations_user_status_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_event_outbox_pending_id': (['id'], 'published_at IS NULL'),
+    'ix_event_outbox_published_at': (['published_at'], 'published_at IS NOT NULL'),
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'event_outbox' not in set(insp.get_table_names()):
+        return
+    existing = {ix['name'] for ix in insp.get_indexes('event_outbox')}
+    for name, (columns, where) in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'event_outbox', columns, postgresql_where=sa.text(where))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if 'event_outbox' not in set(insp.get_table_names()):
+        return
+    existing = {ix['name'] for ix in insp.get_indexes('event_outbox')}
+    for name in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='event_outbox')
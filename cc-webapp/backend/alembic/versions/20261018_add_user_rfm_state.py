@@ -0,0 +1,57 @@
+"""add user_rfm_daily / user_rfm_state (incremental RFM segmentation)
+
+Revision ID: 20261018_add_user_rfm_state
+Revises: 20261018_partition_activity_tables
+Create Date: 2026-10-18
+
+services/rfm_stream 의 증분 세그먼트 상태.
+- user_rfm_daily: (user_id, day) 별 user_actions 건수 / games.bet_amount 합 (증분 upsert)
+- user_rfm_state: 마지막 활동 시각 + 마지막 그룹 + 시간 경과 재평가 시각 (next_rescore_at 인덱스)
+상태는 nightly reconcile 이 원본에서 다시 채우므로 데이터 이관 없음.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_add_user_rfm_state'
+down_revision: Union[str, None] = '20261018_partition_activity_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    if 'user_rfm_daily' not in tables:
+        op.create_table(
+            'user_rfm_daily',
+            sa.Column('user_id', sa.Integer(), primary_key=True),
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('action_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('monetary', sa.BigInteger(), nullable=False, server_default='0'),
+        )
+        op.create_index('ix_user_rfm_daily_day', 'user_rfm_daily', ['day'])
+    if 'user_rfm_state' not in tables:
+        op.create_table(
+            'user_rfm_state',
+            sa.Column('user_id', sa.Integer(), primary_key=True),
+            sa.Column('last_action_at', sa.DateTime(), nullable=True),
+            sa.Column('rfm_group', sa.String(length=50), nullable=True),
+            sa.Column('scored_at', sa.DateTime(), nullable=True),
+            sa.Column('next_rescore_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index('ix_user_rfm_state_next_rescore', 'user_rfm_state', ['next_rescore_at'])
+
+
+def downgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'user_rfm_state' in tables:
+        op.drop_index('ix_user_rfm_state_next_rescore', table_name='user_rfm_state')
+        op.drop_table('user_rfm_state')
+    if 'user_rfm_daily' in tables:
+        op.drop_index('ix_user_rfm_daily_day', table_name='user_rfm_daily')
+        op.drop_table('user_rfm_daily')
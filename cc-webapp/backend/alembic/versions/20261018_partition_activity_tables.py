@@ -0,0 +1,208 @@
+"""partition activity tables + rollups
+
+Revision ID: 20261018_partition_activity_tables
+Revises: 20261018_add_event_outbox_relay_indexes
+Create Date: 2026-10-18
+
+user_actions / game_history 저장 레이아웃.
+- 복합 인덱스 (user_id|action_type|game_type, created_at) + created_at 인덱스 (Postgres 는 BRIN) 보장
+- activity_rollups / activity_daily_users 생성 (services/activity_storage_service)
+- Postgres: 두 테이블을 created_at 월 단위 RANGE 파티션 부모로 전환
+    기존 테이블은 {table}_legacy 로 이름 변경 후 (MINVALUE ~ 다음 달) 파티션으로 ATTACH (행 복사 없음).
+    ATTACH 검증 스캔은 NOT VALID → VALIDATE CHECK 제약으로 대체, 이후 월 파티션 + DEFAULT 파티션 생성.
+    PK 는 파티션 키를 포함해야 하므로 (id, created_at). 두 테이블을 참조하는 FK 는 없다.
+    id 시퀀스 소유(OWNED BY)는 부모 컬럼으로 옮긴다 → 보존 정책이 legacy 파티션을 DROP 해도 부모 기본값 유지.
+- 그 외 dialect: 인덱스/롤업 테이블만 (보존은 chunk 삭제)
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_partition_activity_tables'
+down_revision: Union[str, None] = '20261018_add_event_outbox_relay_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('user_actions', 'game_history')
+INDEXES = {
+    'user_actions': {
+        'ix_user_actions_user_created': ['user_id', 'created_at'],
+        'ix_user_actions_type_created': ['action_type', 'created_at'],
+    },
+    'game_history': {
+        'ix_game_history_user_created': ['user_id', 'created_at'],
+        'ix_game_history_action_created': ['action_type', 'created_at'],
+        'ix_game_history_game_created': ['game_type', 'created_at'],
+    },
+}
+MONTHS_AHEAD = 2
+
+
+def _month(value: datetime, offset: int = 0) -> datetime:
+    idx = value.year * 12 + (value.month - 1) + offset
+    return datetime(idx // 12, idx % 12 + 1, 1)
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :t AND c.relnamespace = to_regnamespace(current_schema())::oid"
+    ), {'t': table}).scalar())
+
+
+def _ensure_indexes(bind, table: str) -> None:
+    insp = sa.inspect(bind)
+    existing = {ix['name'] for ix in insp.get_indexes(table)}
+    for name, columns in INDEXES[table].items():
+        if name not in existing:
+            op.create_index(name, table, columns)
+    brin = f'ix_{table}_created_brin'
+    if table == 'user_actions' and brin not in existing:  # game_history 는 ix_game_history_created_at 존재
+        op.create_index(brin, table, ['created_at'], postgresql_using='brin')
+
+
+def _own_sequence(bind, owner: str, table: str) -> None:
+    """owner.id 가 소유한 시퀀스를 table.id 소유로 이전 (소유 테이블 DROP 시 시퀀스가 함께 삭제되지 않도록)"""
+    seq = bind.execute(sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {'t': owner}).scalar()
+    if seq:
+        op.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.id")
+
+
+def _partition(bind, table: str) -> None:
+    legacy = f'{table}_legacy'
+    boundary = _month(datetime.utcnow(), 1)
+    insp = sa.inspect(bind)
+    fks = insp.get_foreign_keys(table)
+    pk_name = insp.get_pk_constraint(table).get('name')
+    indexes = [ix for ix in insp.get_indexes(table) if not ix.get('unique')]
+    names = {ix['name'] for ix in indexes}
+    indexes += [{'name': n, 'column_names': c} for n, c in INDEXES[table].items() if n not in names]
+    if table == 'user_actions' and 'ix_user_actions_created_brin' not in names:
+        indexes.append({'name': 'ix_user_actions_created_brin', 'column_names': ['created_at'], 'using': 'brin'})
+
+    op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    if pk_name:
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {pk_name} TO {legacy}_pkey")
+    for ix in insp.get_indexes(table):
+        op.execute(f"ALTER INDEX {ix['name']} RENAME TO {ix['name']}_legacy")
+    for fk in fks:
+        if fk.get('name'):
+            op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {fk['name']} TO {fk['name']}_legacy")
+    op.execute(
+        f"ALTER TABLE {legacy} ADD CONSTRAINT ck_{legacy}_created_range "
+        f"CHECK (created_at < '{boundary:%Y-%m-%d}') NOT VALID"
+    )
+    op.execute(f"ALTER TABLE {legacy} VALIDATE CONSTRAINT ck_{legacy}_created_range")
+
+    # 부모: 컬럼/기본값(id 시퀀스 nextval 포함) 복사
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    _own_sequence(bind, legacy, table)
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+    for fk in fks:
+        cols = ', '.join(fk['constrained_columns'])
+        ref_cols = ', '.join(fk['referred_columns'])
+        name = fk.get('name') or f"fk_{table}_{'_'.join(fk['constrained_columns'])}"
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({cols}) "
+                   f"REFERENCES {fk['referred_table']} ({ref_cols})")
+    # 부모 인덱스 (이름 유지) → ATTACH 시 legacy 의 동등 인덱스는 재생성 없이 연결
+    for ix in indexes:
+        using = f" USING {ix['using']}" if ix.get('using') else ''
+        op.execute(f"CREATE INDEX {ix['name']} ON {table}{using} ({', '.join(ix['column_names'])})")
+
+    op.execute(f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')")
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT ck_{legacy}_created_range")
+    for i in range(MONTHS_AHEAD + 1):
+        lo, hi = _month(boundary, i), _month(boundary, i + 1)
+        op.execute(
+            f"CREATE TABLE {table}_y{lo:%Y}m{lo:%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+        )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _flatten(bind, table: str) -> None:
+    legacy = f'{table}_legacy'
+    parts = [r[0] for r in bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :t"
+    ), {'t': table})]
+    op.execute(f"ALTER TABLE {table} DETACH PARTITION {legacy}")
+    _own_sequence(bind, table, legacy)
+    for name in parts:
+        if name == legacy:
+            continue
+        op.execute(f"INSERT INTO {legacy} SELECT * FROM {name}")
+    op.execute(f"DROP TABLE {table} CASCADE")
+    op.execute(f"ALTER TABLE {legacy} RENAME TO {table}")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {legacy}_pkey TO {table}_pkey")
+    for ix in sa.inspect(bind).get_indexes(table):
+        if ix['name'].endswith('_legacy'):
+            op.execute(f"ALTER INDEX {ix['name']} RENAME TO {ix['name'][:-len('_legacy')]}")
+    for fk in sa.inspect(bind).get_foreign_keys(table):
+        if (fk.get('name') or '').endswith('_legacy'):
+            op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {fk['name']} TO {fk['name'][:-len('_legacy')]}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    tables = set(insp.get_table_names())
+
+    if 'activity_rollups' not in tables:
+        op.create_table(
+            'activity_rollups',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('granularity', sa.String(length=8), nullable=False),
+            sa.Column('source', sa.String(length=32), nullable=False),
+            sa.Column('bucket_start', sa.DateTime(), nullable=False),
+            sa.Column('action_type', sa.String(length=50), nullable=False),
+            sa.Column('game_type', sa.String(length=50), nullable=False, server_default=''),
+            sa.Column('event_count', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('user_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('delta_coin', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.UniqueConstraint('granularity', 'source', 'bucket_start', 'action_type', 'game_type',
+                                name='uq_activity_rollups_bucket_key'),
+        )
+        op.create_index('ix_activity_rollups_action_bucket', 'activity_rollups',
+                        ['granularity', 'source', 'action_type', 'bucket_start'])
+    if 'activity_daily_users' not in tables:
+        op.create_table(
+            'activity_daily_users',
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), primary_key=True),
+        )
+
+    for table in TABLES:
+        if table not in tables:
+            continue
+        if bind.dialect.name == 'postgresql':
+            if _is_partitioned(bind, table):
+                continue
+            _partition(bind, table)
+        else:
+            _ensure_indexes(bind, table)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    tables = set(insp.get_table_names())
+    for table in TABLES:
+        if table not in tables:
+            continue
+        if bind.dialect.name == 'postgresql' and _is_partitioned(bind, table):
+            _flatten(bind, table)
+    if 'activity_daily_users' in tables:
+        op.drop_table('activity_daily_users')
+    if 'activity_rollups' in tables:
+        op.drop_index('ix_activity_rollups_action_bucket', table_name='activity_rollups')
+        op.drop_table('activity_rollups')
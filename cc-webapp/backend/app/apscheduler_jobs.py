@@ -3,11 +3,16 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 # from apscheduler.schedulers.background import BackgroundScheduler # if not using asyncio for FastAPI
 from .utils.segment_utils import compute_rfm_and_update_segments
 from .services.campaign_dispatcher import dispatch_due_campaigns
+from .services.ai_recommendation_service import AIRecommendationService
+from .services import activity_storage_service
+from .services import rfm_stream
+from .utils.redis import get_redis_manager
 from . import models
 # Ensure database.py defines SessionLocal. If it's not created yet, this import will fail at runtime.
 # For now, assuming database.py and SessionLocal will be available.
 from .database import SessionLocal
 from datetime import datetime, timedelta
+import asyncio
 import logging # For better logging from scheduler
 
 # Configure logging for APScheduler for better visibility
@@ -17,6 +22,8 @@ logging.getLogger('apscheduler').setLevel(logging.INFO)
 
 # Using AsyncIOScheduler as FastAPI is async
 scheduler = AsyncIOScheduler(timezone="UTC") # Or your preferred timezone
+# 스케줄러 기동 시점의 이벤트 루프 (스레드풀 잡에서 실시간 허브 push 에 사용)
+_event_loop = None
 
 
 def cleanup_stale_pending_transactions(max_age_minutes: int = None):
@@ -104,20 +111,21 @@ def cleanup_stale_pending_transactions(max_age_minutes: int = None):
         if db:
             db.close()
 
+def _rfm_stream_enabled() -> bool:
+    import os
+    return os.getenv("RFM_STREAM_ENABLED", "1") == "1"
+
+
 def job_function():
-    """Wrapper to manage DB session for the scheduled job."""
+    """Wrapper to manage DB session for the scheduled job.
+
+    전체 사용자 RFM 재계산 (RFM_STREAM_ENABLED=0 일 때의 기존 주기 경로). 캠페인 발송은 dispatch_campaigns_job.
+    """
     db = None
     try:
         db = SessionLocal()
         print(f"[{datetime.utcnow()}] APScheduler: Running compute_rfm_and_update_segments job.")
         compute_rfm_and_update_segments(db)
-        # Also dispatch due campaigns
-        try:
-            dispatched = dispatch_due_campaigns(db)
-            if dispatched:
-                print(f"[{datetime.utcnow()}] APScheduler: Dispatched {dispatched} campaigns.")
-        except Exception as e:
-            print(f"[{datetime.utcnow()}] APScheduler: Error dispatching campaigns: {e}")
         print(f"[{datetime.utcnow()}] APScheduler: compute_rfm_and_update_segments job finished.")
     except Exception as e:
         print(f"[{datetime.utcnow()}] APScheduler: Error in job_function: {e}")
@@ -126,24 +134,147 @@ def job_function():
         if db:
             db.close()
 
+def dispatch_campaigns_job():
+    """발송 시각이 도래한 캠페인 발송"""
+    db = None
+    try:
+        db = SessionLocal()
+        dispatched = dispatch_due_campaigns(db, loop=_event_loop)
+        if dispatched:
+            print(f"[{datetime.utcnow()}] APScheduler: Dispatched {dispatched} campaigns.")
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error dispatching campaigns: {e}")
+        logging.exception("APScheduler dispatch_campaigns_job error")
+    finally:
+        if db:
+            db.close()
+
+def rfm_rescore_due_job():
+    """증분 RFM: 시간 경과로 점수가 바뀔 수 있는 사용자(next_rescore_at 도래)만 재평가"""
+    db = None
+    try:
+        db = SessionLocal()
+        stats = rfm_stream.rescore_due(db)
+        if stats.get("changed"):
+            print(f"[{datetime.utcnow()}] APScheduler: RFM aging rescore {stats}.")
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error in RFM aging rescore: {e}")
+        logging.exception("APScheduler rfm_rescore_due_job error")
+    finally:
+        if db:
+            db.close()
+
+def rfm_reconcile_job(only_if_empty: bool = False):
+    """증분 RFM 보정: 전체 재계산과 비교(drift) + 상태 테이블 재구성.
+    only_if_empty=True 는 기동 시 상태가 비어 있을 때만 실행 (최초 도입/복구 bootstrap).
+    """
+    db = None
+    try:
+        db = SessionLocal()
+        # 잠금(advisory / Redis) 안에서 상태 확인 → 동시에 기동한 워커 중 하나만 bootstrap
+        stats = rfm_stream.reconcile(db, only_if_empty=only_if_empty)
+        if stats.get("skipped"):
+            return
+        print(f"[{datetime.utcnow()}] APScheduler: RFM reconcile drift={stats.get('drift')} "
+              f"statements={stats.get('statements')} in {stats.get('db_seconds')}s.")
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error in RFM reconcile: {e}")
+        logging.exception("APScheduler rfm_reconcile_job error")
+    finally:
+        if db:
+            db.close()
+
+def precompute_recommendations_job():
+    """최근 활동 사용자 추천 일괄 생성 (오프라인 배치, 결과는 사용자별 추천 캐시에 적재)"""
+    db = None
+    try:
+        db = SessionLocal()
+        stats = AIRecommendationService(db, get_redis_manager()).generate_batch()
+        print(f"[{datetime.utcnow()}] APScheduler: Precomputed recommendations {stats}.")
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error precomputing recommendations: {e}")
+        logging.exception("APScheduler precompute_recommendations_job error")
+    finally:
+        if db:
+            db.close()
+
+def refresh_activity_rollups_job():
+    """user_actions / game_history 시간 버킷 롤업 + 일별 활성 사용자 갱신"""
+    db = None
+    try:
+        db = SessionLocal()
+        activity_storage_service.refresh_rollups(db)
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error refreshing activity rollups: {e}")
+        logging.exception("APScheduler refresh_activity_rollups_job error")
+    finally:
+        if db:
+            db.close()
+
+def activity_maintenance_job():
+    """월 파티션 사전 생성 + (ACTIVITY_RETENTION_ENABLED=1 일 때) 보존 기간 지난 활동 데이터 정리"""
+    import os
+    db = None
+    try:
+        db = SessionLocal()
+        created = activity_storage_service.ensure_partitions(db)
+        if created:
+            print(f"[{datetime.utcnow()}] APScheduler: Created activity partitions {created}.")
+        if os.getenv("ACTIVITY_RETENTION_ENABLED", "0") == "1":
+            report = activity_storage_service.purge_expired(
+                db, archive_dir=os.getenv("ACTIVITY_ARCHIVE_DIR") or None)
+            print(f"[{datetime.utcnow()}] APScheduler: Activity retention {report}.")
+    except Exception as e:
+        print(f"[{datetime.utcnow()}] APScheduler: Error in activity maintenance: {e}")
+        logging.exception("APScheduler activity_maintenance_job error")
+    finally:
+        if db:
+            db.close()
+
 def start_scheduler():
+    global _event_loop
     if scheduler.running:
         print(f"[{datetime.utcnow()}] APScheduler: Scheduler already running.")
         return
 
-    # Schedule to run daily at 2 AM UTC and also every 5 minutes for campaign dispatch
-    scheduler.add_job(job_function, 'cron', hour=2, minute=0, misfire_grace_time=3600) # Misfire grace time of 1hr
-    scheduler.add_job(job_function, 'interval', minutes=5, misfire_grace_time=300)
+    import os
+    # 캠페인 발송: 5분 주기 (RFM 재계산과 분리)
+    scheduler.add_job(dispatch_campaigns_job, 'interval', minutes=5, misfire_grace_time=300)
+    if _rfm_stream_enabled():
+        # 증분 RFM (이벤트 반영은 services/rfm_stream flush 스레드): 시간 경과 재평가 + 매일 2 AM UTC 전체 보정
+        scheduler.add_job(rfm_rescore_due_job, 'interval',
+                          minutes=int(os.getenv("RFM_RESCORE_INTERVAL_MINUTES", "15")), misfire_grace_time=900)
+        scheduler.add_job(rfm_reconcile_job, 'cron', hour=2, minute=0, misfire_grace_time=3600)
+    else:
+        # Schedule to run daily at 2 AM UTC and also every 5 minutes
+        scheduler.add_job(job_function, 'cron', hour=2, minute=0, misfire_grace_time=3600) # Misfire grace time of 1hr
+        scheduler.add_job(job_function, 'interval', minutes=5, misfire_grace_time=300)
     # Stale pending transaction cleanup: every minute
     scheduler.add_job(cleanup_stale_pending_transactions, 'interval', minutes=1, misfire_grace_time=60)
+    # 추천 오프라인 배치: 매일 3 AM UTC (AI_RECS_BATCH_ENABLED=1 일 때)
+    if os.getenv("AI_RECS_BATCH_ENABLED", "0") == "1":
+        scheduler.add_job(precompute_recommendations_job, 'cron', hour=3, minute=0, misfire_grace_time=3600)
+    # 활동 롤업: 5분 주기 / 파티션 생성 + 보존 정리: 매일 4 AM UTC
+    scheduler.add_job(refresh_activity_rollups_job, 'interval', minutes=5, misfire_grace_time=300)
+    scheduler.add_job(activity_maintenance_job, 'cron', hour=4, minute=0, misfire_grace_time=3600)
 
     # Run once on startup for local testing/verification (5 seconds after app start)
     # This helps confirm the job setup without waiting for 2 AM.
-    scheduler.add_job(job_function, 'date', run_date=datetime.now() + timedelta(seconds=10))
+    # 증분 모드는 상태 테이블이 비어 있을 때만 (bootstrap) 전체 보정 1회
+    if _rfm_stream_enabled():
+        scheduler.add_job(rfm_reconcile_job, 'date', run_date=datetime.now() + timedelta(seconds=10),
+                          kwargs={"only_if_empty": True})
+    else:
+        scheduler.add_job(job_function, 'date', run_date=datetime.now() + timedelta(seconds=10))
+
+    try:
+        _event_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _event_loop = None
 
     try:
         scheduler.start()
-        print(f"[{datetime.utcnow()}] APScheduler: Started successfully. RFM job + stale pending cleanup scheduled.")
+        print(f"[{datetime.utcnow()}] APScheduler: Started successfully. RFM jobs + campaign dispatch + stale pending cleanup scheduled.")
     except Exception as e:
         print(f"[{datetime.utcnow()}] APScheduler: Error starting: {e}")
         logging.exception("APScheduler startup error")
@@ -43,6 +43,7 @@ from sqlalchemy import and_
 
 from ..database import get_db
 from ..models import auth_models, token_blacklist
+from ..services.principal_cache import get_principal_cache
 
 logger = logging.getLogger("unified_auth")
 
@@ -245,6 +246,7 @@ class AuthService:
             if not jti or not exp:
                 logger.warning("Token missing required claims")
                 return False
+            get_principal_cache().invalidate_jti(jti)  # 캐시된 principal 즉시 제거 (저장 경로와 무관)
             
             # Redis에 저장 시도
             if self.redis_client:
@@ -890,6 +892,12 @@ class AuthService:
                 session.logout_reason = reason
             
             db.commit()
+            # 비활성화된 세션 토큰의 캐시된 principal 제거
+            if session_id:
+                for session in sessions:
+                    get_principal_cache().invalidate_jti(getattr(session, "session_token", None))
+            else:
+                get_principal_cache().invalidate_user(user_id)
             
             count = len(sessions)
             logger.info(f"Logged out {count} sessions for user {user_id}")
@@ -930,6 +938,7 @@ class AuthService:
                 token.revoke_reason = reason
             
             db.commit()
+            get_principal_cache().invalidate_user(user_id)
             
             logger.info(f"Logged out all {len(sessions)} sessions and {len(refresh_tokens)} refresh tokens for user {user_id}")
             
@@ -954,6 +963,7 @@ class AuthService:
             except JWTError as e:
                 logger.warning(f"Cannot decode token for blacklisting: {e}")
                 return False
+            get_principal_cache().invalidate_jti(jti)
             
             # Redis에 블랙리스트 저장 (만료 시간까지)
             try:
@@ -23,6 +23,8 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from jose import JWTError
 
+from ..services.principal_cache import get_principal_cache
+
 logger = logging.getLogger("token_manager")
 
 # ===== Environment Settings =====
@@ -352,6 +354,8 @@ class TokenManager:
             if hasattr(rec, 'revoke_reason'):
                 rec.revoke_reason = 'logout'
             db.commit()
+            # 로그아웃: 같은 사용자의 캐시된 access principal 도 제거 (다음 요청은 세션/블랙리스트 재검증)
+            get_principal_cache().invalidate_user(getattr(rec, 'user_id', None))
             return True
         except Exception as e:
             logger.error(f"Failed to revoke refresh token: {e}")
@@ -384,6 +388,7 @@ class TokenManager:
                     count += 1
             if count:
                 db.commit()
+            get_principal_cache().invalidate_user(user_id)
             return count
         except Exception as e:
             logger.error(f"Failed to revoke all refresh tokens: {e}")
@@ -415,6 +420,7 @@ class TokenManager:
             except JWTError as e:
                 logger.warning(f"Cannot decode token for blacklisting: {e}")
                 return False
+            get_principal_cache().invalidate_jti(jti)
             
             # Try Redis first, fall back to memory
             try:
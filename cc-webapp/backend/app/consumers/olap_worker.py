@@ -1,9 +1,49 @@
-import json, time, logging
-from typing import Dict, List
-from kafka import KafkaConsumer
+"""Kafka → ClickHouse OLAP 적재 워커 (at-least-once)
+
+사용:
+  python -m app.consumers.olap_worker            # 적재 워커
+  python -m app.consumers.olap_worker replay     # DLQ 재처리 (--max N, --dry-run)
+
+동작:
+  - 토픽별 스트림(user_actions / rewards / purchases) 버퍼링
+    (outbox relay envelope 는 payload 를 꺼내 매핑, 기존 flat 메시지도 그대로 허용)
+  - 배치 크기(OLAP_BATCH_SIZE) 또는 주기(OLAP_FLUSH_SECONDS) 도달 시 스트림별 sink 쓰기를 스레드 풀에서 동시 실행
+  - 스트림 쓰기 실패 → 지수 백오프 재시도(OLAP_MAX_RETRIES) → 전체 레코드를 DLQ 로 chunk 전송(OLAP_DLQ_CHUNK_SIZE)
+  - 모든 스트림이 sink 또는 DLQ 로 확정된 경우에만 offset commit.
+    DLQ 전송까지 실패하면 파티션을 pause 하고 (그룹 멤버십 유지) 백오프 후 flush 재시도, 성공 시 commit + resume.
+  - 프로세스가 중간에 죽으면 마지막 commit 이후 메시지를 재수신 (중복 가능, 유실 없음)
+
+Sink/DLQ 는 주입 가능: LocalSink / LocalDLQ 로 브로커·ClickHouse 없이 테스트.
+
+메트릭 (prometheus_client 설치 시):
+  olap_ingest_records_total{stream,result=written|dlq}
+  olap_flush_seconds{stream}, olap_flush_retries_total{stream}
+  olap_buffer_records{stream}, olap_consumer_lag{topic,partition}
+  olap_flush_failures_total, olap_dlq_replayed_total{stream}
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
 from app.core.config import settings
-from app.olap.clickhouse_client import ClickHouseClient
-from app.kafka_client import send_kafka_message
+from app.utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _RECORDS = Counter("olap_ingest_records_total", "OLAP records finalised", ["stream", "result"])
+    _FLUSH_SECONDS = Histogram("olap_flush_seconds", "OLAP sink write duration per stream", ["stream"])
+    _RETRIES = Counter("olap_flush_retries_total", "OLAP sink write retries", ["stream"])
+    _BUFFERED = Gauge("olap_buffer_records", "Records buffered awaiting flush", ["stream"])
+    _LAG = Gauge("olap_consumer_lag", "Kafka consumer lag (end offset - position)", ["topic", "partition"])
+    _FLUSH_FAILURES = Counter("olap_flush_failures_total", "Flushes that could not be finalised (offsets not committed)")
+    _REPLAYED = Counter("olap_dlq_replayed_total", "DLQ records replayed into the sink", ["stream"])
+except Exception:  # pragma: no cover
+    _RECORDS = _FLUSH_SECONDS = _RETRIES = _BUFFERED = _LAG = _FLUSH_FAILURES = _REPLAYED = None
 
 log = logging.getLogger("olap_worker")
 # Ensure visible logs when launched as module
@@ -11,127 +51,437 @@ if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 log.setLevel(logging.INFO)
 
+STREAMS = ("user_actions", "rewards", "purchases")
+
+
 def _parse(msg) -> Dict:
     try:
         return json.loads(msg.value.decode("utf-8"))
     except Exception:
         return {}
 
-def run():
-    if not (settings.KAFKA_ENABLED and settings.CLICKHOUSE_ENABLED):
-        log.warning("OLAP worker disabled (KAFKA=%s, CH=%s)", settings.KAFKA_ENABLED, settings.CLICKHOUSE_ENABLED)
-        return
 
-    client = ClickHouseClient()
-    client.init_schema()
+def unwrap_event(value: Dict) -> Dict:
+    """outbox relay envelope({id, event_type, schema_version, dedupe_key, created_at, payload}) → payload.
+    envelope 가 아닌 기존 flat 메시지는 그대로. payload 에 server_ts 가 없으면 envelope created_at 사용."""
+    if not isinstance(value, dict):
+        return {}
+    payload = value.get("payload")
+    if "event_type" not in value or not isinstance(payload, dict):
+        return value
+    if payload.get("server_ts") is None and value.get("created_at"):
+        payload = dict(payload, server_ts=value["created_at"])
+    return payload
+
+
+# ----------------------------- row mapping ----------------------------- #
+def _map_action(payload: Dict) -> Dict:
+    return {
+        "user_id": payload.get("user_id"),
+        "action_type": payload.get("action_type"),
+        "client_ts": payload.get("client_ts"),
+        "server_ts": payload.get("server_ts"),
+        "context_json": json.dumps(payload.get("context") or {}),
+    }
+
+
+def _map_reward(payload: Dict) -> Dict:
+    return {
+        "user_id": payload.get("user_id"),
+        "reward_type": payload.get("reward_type"),
+        "reward_value": payload.get("reward_value"),
+        "source": payload.get("source"),
+        "awarded_at": payload.get("awarded_at"),
+    }
+
+
+def _map_purchase(payload: Dict) -> Dict:
+    return {
+        "user_id": payload.get("user_id"),
+        "code": payload.get("code"),
+        "quantity": payload.get("quantity"),
+        "total_price_cents": payload.get("total_price_cents"),
+        "gems_granted": payload.get("gems_granted", payload.get("gold_granted")),
+        "charge_id": payload.get("charge_id"),
+        "purchased_at": payload.get("server_ts"),
+    }
+
+
+def topic_routes() -> Dict[str, tuple]:
+    """topic → (stream, mapper)"""
+    return {
+        settings.KAFKA_ACTIONS_TOPIC: ("user_actions", _map_action),
+        settings.KAFKA_REWARDS_TOPIC: ("rewards", _map_reward),
+        getattr(settings, "KAFKA_PURCHASES_TOPIC", "buy_package"): ("purchases", _map_purchase),
+    }
+
+
+# ----------------------------- sinks / DLQ ----------------------------- #
+class ClickHouseSink:
+    """ClickHouseClient.insert_* 위임. 실패 시 예외 전파."""
+
+    def __init__(self, client: Any = None) -> None:
+        if client is None:
+            from app.olap.clickhouse_client import ClickHouseClient
+            client = ClickHouseClient()
+        self.client = client
+        self._writers = {
+            "user_actions": client.insert_actions,
+            "rewards": client.insert_rewards,
+            "purchases": client.insert_purchases,
+        }
+
+    def init_schema(self) -> None:
+        self.client.init_schema()
+
+    def write(self, stream: str, rows: List[Dict]) -> None:
+        self._writers[stream](rows)
 
-    topics = [
-        settings.KAFKA_ACTIONS_TOPIC,
-        settings.KAFKA_REWARDS_TOPIC,
-        getattr(settings, "KAFKA_PURCHASES_TOPIC", "buy_package"),
+    def close(self) -> None:
+        self.client.close()
+
+
+class LocalSink:
+    """브로커/ClickHouse 없는 로컬 stand-in. fail_times[stream] 만큼 연속 실패 주입 가능."""
+
+    def __init__(self, fail_times: Optional[Dict[str, int]] = None) -> None:
+        self.rows: Dict[str, List[Dict]] = {s: [] for s in STREAMS}
+        self.fail_times = dict(fail_times or {})
+        self.calls: Dict[str, int] = {s: 0 for s in STREAMS}
+        self._lock = threading.Lock()
+
+    def write(self, stream: str, rows: List[Dict]) -> None:
+        with self._lock:
+            self.calls[stream] = self.calls.get(stream, 0) + 1
+            remaining = self.fail_times.get(stream, 0)
+            if remaining:
+                if remaining > 0:
+                    self.fail_times[stream] = remaining - 1
+                raise RuntimeError(f"local sink failure ({stream})")
+            self.rows.setdefault(stream, []).extend(rows)
+
+
+class KafkaDLQ:
+    """DLQ 토픽 전송. 레코드 전체를 chunk 단위로 보내고 모든 전송 ack 를 확인 (실패 시 예외)."""
+
+    def __init__(self, producer: Any = None, topic: Optional[str] = None, chunk_size: Optional[int] = None) -> None:
+        self._producer = producer
+        self.topic = topic or settings.KAFKA_DLQ_TOPIC
+        self.chunk_size = chunk_size or settings.OLAP_DLQ_CHUNK_SIZE
+
+    def _get_producer(self) -> Any:
+        if self._producer is None:
+            from app.kafka_client import get_kafka_producer
+            self._producer = get_kafka_producer()
+        return self._producer
+
+    def publish(self, stream: str, records: List[Dict], reason: str) -> None:
+        producer = self._get_producer()
+        futures = [producer.send(self.topic, value=msg) for msg in dlq_messages(stream, records, reason, self.chunk_size)]
+        producer.flush()
+        for fut in futures:
+            fut.get(timeout=10)
+
+
+class LocalDLQ:
+    def __init__(self, fail: bool = False) -> None:
+        self.messages: List[Dict] = []
+        self.fail = fail
+
+    def publish(self, stream: str, records: List[Dict], reason: str) -> None:
+        if self.fail:
+            raise RuntimeError("local dlq failure")
+        self.messages.extend(dlq_messages(stream, records, reason, settings.OLAP_DLQ_CHUNK_SIZE))
+
+
+def dlq_messages(stream: str, records: List[Dict], reason: str, chunk_size: int) -> List[Dict]:
+    failed_at = time.time()
+    size = max(1, chunk_size)
+    total = (len(records) + size - 1) // size
+    return [
+        {"stream": stream, "reason": reason, "failed_at": failed_at, "chunk": i // size, "chunks": total,
+         "records": records[i:i + size]}
+        for i in range(0, len(records), size)
     ]
-    consumer = KafkaConsumer(
+
+
+# ----------------------------- ingestor ----------------------------- #
+class OlapIngestor:
+    """스트림별 버퍼 + 동시 flush + 재시도/DLQ. offset commit 은 호출측(run) 책임."""
+
+    def __init__(
+        self,
+        sink: Any,
+        dlq: Any,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        backoff_max_seconds: Optional[float] = None,
+        workers: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.sink = sink
+        self.dlq = dlq
+        self.batch_size = batch_size or settings.OLAP_BATCH_SIZE
+        self.flush_seconds = settings.OLAP_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.max_retries = settings.OLAP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.OLAP_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self.backoff_max = settings.OLAP_RETRY_BACKOFF_MAX_SECONDS if backoff_max_seconds is None else backoff_max_seconds
+        self._sleep = sleep
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers or settings.OLAP_FLUSH_WORKERS),
+                                        thread_name_prefix="olap-flush")
+        self.buffers: Dict[str, List[Dict]] = {s: [] for s in STREAMS}
+        self.routes = topic_routes()
+        self.last_flush = time.time()
+
+    def add(self, topic: str, payload: Dict) -> bool:
+        route = self.routes.get(topic)
+        payload = unwrap_event(payload)
+        if route is None or not payload:
+            return False
+        stream, mapper = route
+        self.buffers[stream].append(mapper(payload))
+        return True
+
+    def buffered(self) -> int:
+        return sum(len(b) for b in self.buffers.values())
+
+    def should_flush(self) -> bool:
+        return self.buffered() >= self.batch_size or (time.time() - self.last_flush >= self.flush_seconds)
+
+    def backoff_delay(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _write_with_retry(self, stream: str, rows: List[Dict]) -> Optional[str]:
+        """성공 시 None, 재시도 소진 시 마지막 오류 문자열."""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metric(_RETRIES, "inc", stream=stream)
+                self._sleep(self.backoff_delay(attempt - 1))
+            started = time.perf_counter()
+            try:
+                self.sink.write(stream, rows)
+                metric(_FLUSH_SECONDS, "observe", time.perf_counter() - started, stream=stream)
+                return None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                log.warning("sink write failed stream=%s rows=%d attempt=%d: %s", stream, len(rows), attempt + 1, error)
+        return error
+
+    def _finalise(self, stream: str, rows: List[Dict]) -> bool:
+        """sink 기록 또는 DLQ 전송으로 확정되면 True."""
+        error = self._write_with_retry(stream, rows)
+        if error is None:
+            metric(_RECORDS, "inc", len(rows), stream=stream, result="written")
+            log.info("flushed %s=%d", stream, len(rows))
+            return True
+        try:
+            self.dlq.publish(stream, rows, error)
+        except Exception as e:
+            log.error("DLQ publish failed stream=%s rows=%d: %s", stream, len(rows), e)
+            return False
+        metric(_RECORDS, "inc", len(rows), stream=stream, result="dlq")
+        log.warning("sent %s=%d to DLQ (%s)", stream, len(rows), error)
+        return True
+
+    def flush(self) -> bool:
+        """모든 버퍼 확정 시 True (→ offset commit 가능). 실패 스트림 버퍼는 유지."""
+        pending = {s: rows for s, rows in self.buffers.items() if rows}
+        ok = True
+        if pending:
+            futures = {s: self._pool.submit(self._finalise, s, rows) for s, rows in pending.items()}
+            for stream, fut in futures.items():
+                if fut.result():
+                    self.buffers[stream] = self.buffers[stream][len(pending[stream]):]
+                else:
+                    ok = False
+        for stream, rows in self.buffers.items():
+            metric(_BUFFERED, "set", len(rows), stream=stream)
+        if not ok:
+            metric(_FLUSH_FAILURES, "inc")
+        self.last_flush = time.time()
+        return ok
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+# ----------------------------- consumer loop ----------------------------- #
+def _make_consumer(topics: List[str], group_id: str = "cc_olap_worker"):
+    from kafka import KafkaConsumer
+    return KafkaConsumer(
         *topics,
         bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
-        group_id="cc_olap_worker",
+        group_id=group_id,
         enable_auto_commit=False,
         # Consume from beginning when no committed offsets exist (useful for dev/smoke)
         auto_offset_reset="earliest",
-        consumer_timeout_ms=1000,
         max_poll_records=1000,
         value_deserializer=lambda v: v,
     )
-    log.warning("OLAP worker started, topics=%s, bootstrap=%s", topics, settings.KAFKA_BOOTSTRAP_SERVERS)
 
-    buf_actions: List[Dict] = []
-    buf_rewards: List[Dict] = []
-    buf_purchases: List[Dict] = []
-    last_flush = time.time()
 
-    def flush():
-        nonlocal buf_actions, buf_rewards, buf_purchases, last_flush
-        try:
-            if buf_actions:
-                client.insert_actions(buf_actions)
-                log.info("flushed actions=%d", len(buf_actions))
-                buf_actions = []
-            if buf_rewards:
-                client.insert_rewards(buf_rewards)
-                log.info("flushed rewards=%d", len(buf_rewards))
-                buf_rewards = []
-            if buf_purchases:
-                client.insert_purchases(buf_purchases)
-                log.info("flushed purchases=%d", len(buf_purchases))
-                buf_purchases = []
-        except Exception as e:
-            # On failure, publish failed buffers to DLQ topic with reason
-            try:
-                if buf_actions:
-                    send_kafka_message(settings.KAFKA_DLQ_TOPIC, {"stream":"user_actions","reason": str(e), "records": buf_actions[:100]})
-                if buf_rewards:
-                    send_kafka_message(settings.KAFKA_DLQ_TOPIC, {"stream":"rewards","reason": str(e), "records": buf_rewards[:100]})
-                if buf_purchases:
-                    send_kafka_message(settings.KAFKA_DLQ_TOPIC, {"stream":"purchases","reason": str(e), "records": buf_purchases[:100]})
-            except Exception:
-                pass
-            finally:
-                # Drop buffers to avoid stuck loop; continue consumption
-                buf_actions = []
-                buf_rewards = []
-                buf_purchases = []
-        finally:
-            last_flush = time.time()
+def report_lag(consumer: Any) -> None:
+    if _LAG is None:
+        return
+    try:
+        assigned = list(consumer.assignment())
+        if not assigned:
+            return
+        ends = consumer.end_offsets(assigned)
+        for tp in assigned:
+            metric(_LAG, "set", max(0, ends.get(tp, 0) - consumer.position(tp)), topic=tp.topic, partition=str(tp.partition))
+    except Exception:
+        pass
+
+
+def _flush_and_commit(consumer: Any, ingestor: OlapIngestor, stop: threading.Event) -> bool:
+    """flush 성공 시에만 commit. 실패하면 pause 후 백오프 재시도 (poll 로 그룹 유지)."""
+    if ingestor.flush():
+        consumer.commit()
+        return True
+    paused = list(consumer.assignment())
+    if paused:
+        consumer.pause(*paused)
+    attempt = 0
+    try:
+        while not stop.is_set():
+            ingestor._sleep(ingestor.backoff_delay(attempt))
+            attempt += 1
+            consumer.poll(timeout_ms=0)  # paused → 레코드 없음, heartbeat/멤버십 유지
+            if ingestor.flush():
+                consumer.commit()
+                return True
+        return False
+    finally:
+        if paused:
+            consumer.resume(*paused)
+
+
+def run(consumer: Any = None, sink: Any = None, dlq: Any = None, stop: Optional[threading.Event] = None,
+        ingestor: Optional[OlapIngestor] = None) -> None:
+    if consumer is None and not (settings.KAFKA_ENABLED and settings.CLICKHOUSE_ENABLED):
+        log.warning("OLAP worker disabled (KAFKA=%s, CH=%s)", settings.KAFKA_ENABLED, settings.CLICKHOUSE_ENABLED)
+        return
+
+    if sink is None:
+        sink = ClickHouseSink()
+        sink.init_schema()
+    ingestor = ingestor or OlapIngestor(sink, dlq or KafkaDLQ())
+    stop = stop or threading.Event()
+    if consumer is None:
+        consumer = _make_consumer(list(ingestor.routes.keys()))
+        log.warning("OLAP worker started, topics=%s, bootstrap=%s", list(ingestor.routes.keys()), settings.KAFKA_BOOTSTRAP_SERVERS)
 
     try:
-        while True:
+        while not stop.is_set():
             polled = consumer.poll(timeout_ms=500, max_records=500)
             for records in polled.values():
                 for m in records:
-                    payload = _parse(m)
-                    if not payload:
-                        continue
-                    if m.topic == settings.KAFKA_ACTIONS_TOPIC:
-                        buf_actions.append({
-                            "user_id": payload.get("user_id"),
-                            "action_type": payload.get("action_type"),
-                            "client_ts": payload.get("client_ts"),
-                            "server_ts": payload.get("server_ts"),
-                            "context_json": json.dumps(payload.get("context") or {}),
-                        })
-                    elif m.topic == settings.KAFKA_REWARDS_TOPIC:
-                        buf_rewards.append({
-                            "user_id": payload.get("user_id"),
-                            "reward_type": payload.get("reward_type"),
-                            "reward_value": payload.get("reward_value"),
-                            "source": payload.get("source"),
-                            "awarded_at": payload.get("awarded_at"),
-                        })
-                    elif m.topic == getattr(settings, "KAFKA_PURCHASES_TOPIC", "buy_package"):
-                        buf_purchases.append({
-                            "user_id": payload.get("user_id"),
-                            "code": payload.get("code"),
-                            "quantity": payload.get("quantity"),
-                            "total_price_cents": payload.get("total_price_cents"),
-                            "gems_granted": payload.get("gems_granted"),
-                            "charge_id": payload.get("charge_id"),
-                            "purchased_at": payload.get("server_ts"),
-                        })
-            if (
-                len(buf_actions) + len(buf_rewards) + len(buf_purchases) >= settings.OLAP_BATCH_SIZE
-            ) or (time.time() - last_flush >= settings.OLAP_FLUSH_SECONDS):
-                flush()
-                consumer.commit()
+                    ingestor.add(m.topic, _parse(m))
+            if ingestor.should_flush():
+                _flush_and_commit(consumer, ingestor, stop)
+                report_lag(consumer)
     except KeyboardInterrupt:
         pass
     except Exception as e:
         log.exception("OLAP worker crashed: %s", e)
     finally:
         try:
-            flush()
-            consumer.commit()
+            # 종료 시 마지막 flush 는 1회만 시도, 실패하면 commit 하지 않음 (재시작 시 재수신)
+            if ingestor.flush():
+                consumer.commit()
         except Exception:
-            pass
+            log.warning("final flush failed; uncommitted records will be redelivered", exc_info=True)
+        ingestor.close()
+        consumer.close()
+
+
+# ----------------------------- DLQ replay ----------------------------- #
+def replay_messages(messages: Iterable[Dict], sink: Any, ingestor: Optional[OlapIngestor] = None,
+                    dry_run: bool = False) -> Dict[str, int]:
+    """DLQ 메시지({stream, records, ...})를 sink 로 재기록. 실패 시 예외 (호출측은 commit 금지).
+
+    ingestor 미지정 시 이 호출 동안만 쓰는 재시도 헬퍼를 만들고 반환 전에 닫는다.
+    """
+    helper = ingestor or _replay_ingestor(sink)
+    stats = {"messages": 0, "records": 0}
+    try:
+        for msg in messages:
+            stream = msg.get("stream")
+            rows = msg.get("records") or []
+            if stream not in STREAMS or not rows:
+                continue
+            if not dry_run:
+                error = helper._write_with_retry(stream, rows)
+                if error is not None:
+                    raise RuntimeError(f"DLQ replay failed stream={stream}: {error}")
+                metric(_REPLAYED, "inc", len(rows), stream=stream)
+            stats["messages"] += 1
+            stats["records"] += len(rows)
+    finally:
+        if ingestor is None:
+            helper.close()
+    return stats
+
+
+def _replay_ingestor(sink: Any) -> OlapIngestor:
+    return OlapIngestor(sink, LocalDLQ(fail=True), workers=1)
+
+
+def replay(max_messages: Optional[int] = None, dry_run: bool = False, consumer: Any = None, sink: Any = None) -> Dict[str, int]:
+    """DLQ 토픽 재처리. 메시지 단위로 sink 기록 성공 후 commit (at-least-once).
+
+    재시도 헬퍼(OlapIngestor)와 sink 는 실행당 1개, 종료 시 닫는다.
+    """
+    from kafka import KafkaConsumer
+
+    consumer = consumer or KafkaConsumer(
+        settings.KAFKA_DLQ_TOPIC,
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
+        group_id="cc_olap_dlq_replay",
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+        consumer_timeout_ms=5000,
+        value_deserializer=lambda v: v,
+    )
+    own_sink = sink is None
+    sink = sink or ClickHouseSink()
+    helper = _replay_ingestor(sink)
+    totals = {"messages": 0, "records": 0}
+    try:
+        for m in consumer:
+            stats = replay_messages([_parse(m)], sink, ingestor=helper, dry_run=dry_run)
+            if not dry_run:
+                consumer.commit()
+            totals["messages"] += stats["messages"]
+            totals["records"] += stats["records"]
+            if max_messages and totals["messages"] >= max_messages:
+                break
+    finally:
+        helper.close()
+        if own_sink:
+            sink.close()
         consumer.close()
+    log.warning("DLQ replay done messages=%d records=%d dry_run=%s", totals["messages"], totals["records"], dry_run)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OLAP ingestion worker")
+    sub = parser.add_subparsers(dest="command")
+    rp = sub.add_parser("replay", help="DLQ 토픽 메시지를 ClickHouse 로 재적재")
+    rp.add_argument("--max", type=int, default=None, dest="max_messages")
+    rp.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.command == "replay":
+        print(json.dumps(replay(max_messages=args.max_messages, dry_run=args.dry_run)))
+    else:
+        run()
+
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    main()
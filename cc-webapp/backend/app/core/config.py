@@ -15,6 +15,15 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "cc_webapp")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     SQLALCHEMY_DATABASE_URI: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    # Connection pool tunables (Postgres QueuePool; SQLite는 pre-ping 만 적용)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # checkout 대기 최대 초
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 연결 최대 수명(초), -1 비활성
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = 서버 기본값
+    # Optional read replica (비어있으면 primary 엔진 공유)
+    DATABASE_READ_REPLICA_URL: str = os.getenv("DATABASE_READ_REPLICA_URL", "")
 
     # Redis Settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "cc_redis")
@@ -57,6 +66,7 @@ class Settings(BaseSettings):
     KAFKA_ACTIONS_TOPIC: str = "cc_user_actions"
     KAFKA_REWARDS_TOPIC: str = "cc_rewards"
     KAFKA_PURCHASES_TOPIC: str = "buy_package"  # topic used by limited buy analytics
+    KAFKA_SEGMENTS_TOPIC: str = "cc_segment_changes"  # RFM segment_change events (rfm_stream)
     KAFKA_DLQ_TOPIC: str = "cc_olap_dlq"
     # Optional comma-separated list of topics used by debug endpoints; may be empty
     KAFKA_TOPICS: str = ""
@@ -67,8 +77,20 @@ class Settings(BaseSettings):
     CLICKHOUSE_DATABASE: str = "cc_olap"
     CLICKHOUSE_USER: str = "default"
     CLICKHOUSE_PASSWORD: str = ""
+    # HTTP 적재: jsoneachrow(gzip, keep-alive 세션) | tsv(레거시 텍스트 SQL)
+    CLICKHOUSE_INSERT_FORMAT: str = "jsoneachrow"
+    CLICKHOUSE_HTTP_COMPRESSION: bool = True
+    CLICKHOUSE_INSERT_CHUNK_ROWS: int = 50000
+    CLICKHOUSE_POOL_SIZE: int = 8
+    CLICKHOUSE_TIMEOUT_SECONDS: float = 10.0
     OLAP_BATCH_SIZE: int = 500
     OLAP_FLUSH_SECONDS: int = 2
+    # OLAP 적재 재시도/동시성 (consumers/olap_worker)
+    OLAP_MAX_RETRIES: int = 3
+    OLAP_RETRY_BACKOFF_SECONDS: float = 0.5
+    OLAP_RETRY_BACKOFF_MAX_SECONDS: float = 10.0
+    OLAP_FLUSH_WORKERS: int = 3
+    OLAP_DLQ_CHUNK_SIZE: int = 500
 
     # Web Push (VAPID) — optional
     VAPID_PUBLIC_KEY: str = os.getenv("VAPID_PUBLIC_KEY", "")
@@ -104,7 +126,8 @@ class Settings(BaseSettings):
     # Legacy WS fallback toggle: when False, /api/games/ws rejects connections (monitor-only)
     ENABLE_LEGACY_GAMES_WS: bool = True
 
-    # Security: key rotation version (propagated to JWT 'kid' header)
+    # Security: 키 링 도입 전 JWT 'kid' 헤더 값. core/jwt_keyring 이 이 kid 를 JWT_SECRET_KEY 로 매핑하고
+    # JWT_KEY_ID 미설정 시 active kid 로 사용 (기존 토큰 검증 유지)
     KEY_ROTATION_VERSION: str = os.getenv("KEY_ROTATION_VERSION", "v1")
 
     # Observability / APM
@@ -75,6 +75,11 @@ class GameLogicError(BaseDomainError):
 	status_code = 400
 	default_message = "Invalid game logic state"
 
+class InsufficientBalanceError(GameLogicError):
+	code = "INSUFFICIENT_BALANCE"
+	status_code = 400
+	default_message = "Insufficient balance"
+
 class UserServiceException(BaseDomainError):
 	code = "USER_SERVICE_ERROR"
 	status_code = 400
@@ -91,6 +96,7 @@ __all__ = [
 	"RateLimitError",
 	"ServiceError",
 	"GameLogicError",
+	"InsufficientBalanceError",
 	"UserServiceException",
 ]
 
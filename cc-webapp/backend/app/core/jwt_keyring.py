@@ -0,0 +1,227 @@
+"""JWT 서명 키 링 (kid 기반 조회)
+
+기존 verify_token 은 호출마다 JWT_SECRET_KEY_FALLBACKS 를 파싱해 후보 키 목록을 만들고
+순서대로 jwt.decode 를 시도했다 (fallback 키 토큰은 최대 6회 HMAC 실패 후 성공).
+키 링은 1회 로드 후 재사용하며, 토큰 헤더의 kid 로 키를 바로 찾아 decode 1회로 검증한다.
+
+키 구성 (우선순위):
+  1) JWT_KEYRING_FILE (JSON) : {"active": "v2", "keys": {"v2": "...", "v1": "..."}}
+     파일 mtime 이 바뀌면 다음 접근 시 재로드 → 재시작 없이 키 회전
+     (확인 주기 JWT_KEYRING_RELOAD_SECONDS, 기본 5초)
+  2) 환경변수: JWT_SECRET_KEY (kid=JWT_KEY_ID, 미설정 시 KEY_ROTATION_VERSION, 기본 "v1")
+     + JWT_SECRET_KEY_FALLBACKS "kid:secret,..." (kid 생략 시 env_fallback_{i})
+     키 링 도입 전 토큰은 kid=KEY_ROTATION_VERSION 헤더로 JWT_SECRET_KEY 서명 → 그 kid 를 JWT_SECRET_KEY 로 매핑
+     (JWT_KEY_ID 를 따로 지정해도 기존 토큰이 kid 조회 1회로 검증됨, 같은 kid 의 fallback 이 있으면 fallback 우선)
+  3) ALLOW_JWT_FALLBACKS != "0" 이면 개발용 기본 키(default_dev1..5) 추가
+
+검증: kid 가 링에 있으면 해당 키 1회 decode (서명 불일치 시 즉시 실패).
+kid 가 없거나 링에 없는 레거시 토큰만 전체 키를 순회한다
+(메트릭 jwt_keyring_verify_total{path=kid|legacy_scan}).
+예외: 키 링 도입 전 kid(KEY_ROTATION_VERSION, 기본 "v1") 토큰은 그 kid 가 어떤 비밀키로 서명됐는지
+보장되지 않는다 (JWT_SECRET_KEY 회전 후 이전 키는 JWT_SECRET_KEY_FALLBACKS 로 이동).
+이 kid 로 서명 불일치면 나머지 키를 순회한다 (기존 auth_service fallback 순회와 동일).
+
+회전 절차: 새 키를 active 로 추가하고 이전 키는 토큰 최대 수명(JWT_EXPIRE_MINUTES) 동안 유지 후 제거.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
+
+from app.utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter  # type: ignore
+    _VERIFY = Counter("jwt_keyring_verify_total", "JWT verifications by key ring lookup path", ["path"])
+except Exception:  # pragma: no cover
+    _VERIFY = None
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+DEV_DEFAULT_KEYS = (
+    ("default_dev1", "your-secret-key-here"),
+    ("default_dev2", "secret_key_for_development_only"),
+    ("default_dev3", "dev-jwt-secret-key"),
+    ("default_dev4", "casino-club-secret-key-2024"),
+    ("default_dev5", "super-secret-key-for-development-only"),
+)
+
+
+def token_kid(token: str) -> Optional[str]:
+    """헤더의 kid 만 추출 (jose get_unverified_header 는 토큰 전체를 파싱하므로 사용하지 않음)."""
+    try:
+        header = token.split(".", 1)[0]
+        kid = json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except Exception:
+        raise JWTError("Error decoding token headers.")
+    return str(kid) if kid is not None else None
+
+
+def legacy_kid_from_env(env: Optional[Dict[str, str]] = None) -> str:
+    """키 링 도입 전 발급 토큰의 kid (settings.KEY_ROTATION_VERSION 과 같은 기본값)."""
+    env = os.environ if env is None else env
+    return env.get("KEY_ROTATION_VERSION") or "v1"
+
+
+def keys_from_env(env: Optional[Dict[str, str]] = None) -> Tuple[str, Dict[str, str]]:
+    """환경변수로부터 (active kid, {kid: secret}) 구성. 순서 = 레거시 순회 순서."""
+    env = os.environ if env is None else env
+    legacy_kid = env.get("KEY_ROTATION_VERSION")
+    active = env.get("JWT_KEY_ID") or legacy_kid or "v1"
+    primary = env.get("JWT_SECRET_KEY", "your-secret-key-here")
+    keys: Dict[str, str] = {active: primary}
+    fallbacks = [x.strip() for x in env.get("JWT_SECRET_KEY_FALLBACKS", "").split(",") if x.strip()]
+    for i, item in enumerate(fallbacks):
+        kid, sep, secret = item.partition(":")
+        if not sep:
+            kid, secret = f"env_fallback_{i}", item
+        keys.setdefault(kid.strip(), secret.strip())
+    if legacy_kid:
+        keys.setdefault(legacy_kid, primary)
+    if env.get("ALLOW_JWT_FALLBACKS", "1") != "0":
+        for kid, secret in DEV_DEFAULT_KEYS:
+            keys.setdefault(kid, secret)
+    return active, keys
+
+
+class KeyRing:
+    def __init__(
+        self,
+        keys: Optional[Dict[str, str]] = None,
+        active: Optional[str] = None,
+        path: Optional[str] = None,
+        reload_seconds: Optional[float] = None,
+        legacy_kid: Optional[str] = None,
+    ) -> None:
+        self.path = path if path is not None else os.getenv("JWT_KEYRING_FILE") or None
+        self.reload_seconds = float(
+            reload_seconds if reload_seconds is not None else os.getenv("JWT_KEYRING_RELOAD_SECONDS", "5")
+        )
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        # 서명 불일치 시 순회를 허용하는 kid (명시 keys 구성에서는 지정한 경우만)
+        self.legacy_kid = legacy_kid
+        if keys is not None:
+            self._set(active or next(iter(keys)), keys)
+        else:
+            if legacy_kid is None:
+                self.legacy_kid = legacy_kid_from_env()
+            self._set(*keys_from_env())
+            if self.path:
+                self._maybe_reload(force=True)
+
+    def _set(self, active: str, keys: Dict[str, str]) -> None:
+        if active not in keys:
+            raise ValueError(f"active kid {active!r} not in key ring")
+        self._active = active
+        self._keys = dict(keys)
+        self._order: List[Tuple[str, str]] = list(self._keys.items())
+
+    # ---------------- rotation ---------------- #
+    def _maybe_reload(self, force: bool = False) -> None:
+        if not self.path:
+            return
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if not force and mtime == self._mtime:
+            return
+        with self._lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._set(str(data["active"]), {str(k): str(v) for k, v in data["keys"].items()})
+                self._mtime = mtime
+                logger.info("JWT key ring loaded from %s (active=%s, kids=%s)", self.path, self._active, list(self._keys))
+            except Exception as e:
+                # 잘못된 파일은 무시하고 기존 링 유지
+                logger.error("JWT key ring reload failed (%s): %s", self.path, e)
+
+    def rotate(self, kid: str, secret: str, retire: Optional[List[str]] = None) -> None:
+        """프로세스 내 회전: 새 키를 active 로 등록, retire 로 지정한 kid 제거."""
+        with self._lock:
+            keys = {kid: secret}
+            keys.update((k, v) for k, v in self._keys.items() if k != kid and k not in (retire or ()))
+            self._set(kid, keys)
+
+    # ---------------- sign / verify ---------------- #
+    @property
+    def active_kid(self) -> str:
+        self._maybe_reload()
+        return self._active
+
+    def kids(self) -> List[str]:
+        self._maybe_reload()
+        return list(self._keys)
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        self._maybe_reload()
+        kid, key = self._active, self._keys[self._active]
+        return jwt.encode(claims, key, algorithm=ALGORITHM, headers={"kid": kid})
+
+    def decode(self, token: str, **options: Any) -> Tuple[Dict[str, Any], str]:
+        """(payload, kid) 반환. 실패 시 JWTError."""
+        self._maybe_reload()
+        kid = token_kid(token)
+        keys = self._keys
+        if kid is not None and kid in keys:
+            metric(_VERIFY, "inc", path="kid")
+            try:
+                return jwt.decode(token, keys[kid], algorithms=[ALGORITHM], **options), kid
+            except (ExpiredSignatureError, JWTClaimsError):
+                raise
+            except JWTError as e:
+                if kid != self.legacy_kid:
+                    raise
+                # 회전 전 JWT_SECRET_KEY 로 서명된 레거시 kid 토큰: 나머지 키 순회
+                first_err: Exception = e
+            skip = kid
+        else:
+            first_err, skip = None, None
+        # kid 미포함/미등록 레거시 토큰: 전체 키 순회
+        metric(_VERIFY, "inc", path="legacy_scan")
+        last_err: Optional[Exception] = None
+        for name, key in self._order:
+            if name == skip:
+                continue
+            try:
+                return jwt.decode(token, key, algorithms=[ALGORITHM], **options), name
+            except JWTError as e:
+                last_err = e
+        raise first_err or last_err or JWTError("no keys configured")
+
+
+_ring: Optional[KeyRing] = None
+_ring_lock = threading.Lock()
+
+
+def get_keyring() -> KeyRing:
+    global _ring
+    if _ring is None:
+        with _ring_lock:
+            if _ring is None:
+                _ring = KeyRing()
+    return _ring
+
+
+def reload_keyring() -> KeyRing:
+    """환경변수/파일에서 링 재구성 (테스트, 관리 명령용)."""
+    global _ring
+    with _ring_lock:
+        _ring = KeyRing()
+    return _ring
@@ -1,9 +1,12 @@
-﻿import logging
+﻿import atexit
+import logging
 import json
+import os
+import queue
 import sys
 import time
-import uuid
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from contextvars import ContextVar
 from typing import Dict, Any, Optional
 
@@ -39,39 +42,86 @@ def log_service_call(service_name: str, operation: str, duration: float = None,
     
     logger.info(f"Service call: {service_name}.{operation} - {status}", extra=log_data)
 
+# LogRecord 표준 속성 (extra 필드 판별용, 1회 계산)
+_STD_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+_CONTEXT_FIELDS = (
+    ("request_id", request_id_ctx),
+    ("path", path_ctx),
+    ("method", method_ctx),
+    ("user_id", user_id_ctx),
+    ("client_ip", client_ip_ctx),
+    ("status_code", status_code_ctx),
+    ("latency_ms", latency_ms_ctx),
+)
+_CONTEXT_ATTR = "_log_context"
+
+
+def _capture_context() -> tuple:
+    return tuple(var.get() for _, var in _CONTEXT_FIELDS)
+
+
 class JSONLogFormatter(logging.Formatter):
-    """Lightweight JSON formatter adding contextvars and standard fields."""
+    """Lightweight JSON formatter adding contextvars and standard fields.
+
+    QueueHandler 경유 시 contextvars 는 enqueue 시점에 record 에 캡처된 값을 사용한다
+    (포맷은 리스너 스레드에서 수행되므로 요청 컨텍스트에 접근할 수 없음).
+    """
 
     def format(self, record: logging.LogRecord) -> str:  # type: ignore[override]
+        ctx = getattr(record, _CONTEXT_ATTR, None) or _capture_context()
+        request_id, path, method, user_id, client_ip, status_code, latency_ms = ctx
         base = {
-            "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + ".%03dZ" % record.msecs,
             "level": record.levelname,
             "logger": record.name,
             "msg": record.getMessage(),
-            "request_id": request_id_ctx.get(),
-            "path": path_ctx.get(),
-            "method": method_ctx.get(),
-            "user_id": user_id_ctx.get(),
-            "client_ip": client_ip_ctx.get(),
-            "status_code": status_code_ctx.get() or None,
-            "latency_ms": round(latency_ms_ctx.get(), 2) or None,
+            "request_id": request_id,
+            "path": path,
+            "method": method,
+            "user_id": user_id,
+            "client_ip": client_ip,
+            "status_code": status_code or None,
+            "latency_ms": round(latency_ms, 2) or None,
         }
         # Include extra attributes that aren't standard
-        for k, v in record.__dict__.items():
-            if k.startswith('_'):
-                continue
-            if k in base or k in ('msg', 'args', 'levelname', 'levelno', 'pathname', 'filename', 'module', 'exc_info', 'exc_text', 'stack_info', 'lineno', 'funcName', 'created', 'msecs', 'relativeCreated', 'thread', 'threadName', 'processName', 'process'):
+        for k in record.__dict__.keys() - _STD_RECORD_ATTRS:
+            if k.startswith('_') or k in base:
                 continue
-            base[k] = v
+            base[k] = record.__dict__[k]
         if record.exc_info:
             base["exc_type"] = record.exc_info[0].__name__ if record.exc_info[0] else None
-        return json.dumps(base, ensure_ascii=False)
+        return json.dumps(base, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """요청 컨텍스트를 record 에 캡처한 뒤 큐에 적재 (I/O 는 리스너 스레드)."""
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        setattr(record, _CONTEXT_ATTR, _capture_context())
+        return record
 
-def setup_logging(level: str = "INFO", json_logs: bool = True):
+
+_listener: Optional[QueueListener] = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+        _listener = None
+
+
+def setup_logging(level: str = "INFO", json_logs: bool = True, queued: Optional[bool] = None):
+    """루트 로거 구성. 기본은 QueueHandler → QueueListener(stdout) 비동기 출력 (LOG_QUEUE=0 이면 동기)."""
+    global _listener
     root = logging.getLogger()
     root.setLevel(getattr(logging, level.upper(), logging.INFO))
     # Clear existing handlers (idempotent setup)
+    _stop_listener()
     if root.handlers:
         for h in list(root.handlers):
             root.removeHandler(h)
@@ -80,42 +130,16 @@ def setup_logging(level: str = "INFO", json_logs: bool = True):
         handler.setFormatter(JSONLogFormatter())
     else:
         handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    root.addHandler(handler)
+    if queued is None:
+        queued = os.getenv("LOG_QUEUE", "1") != "0"
+    if queued:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_ContextQueueHandler(log_queue))
+    else:
+        root.addHandler(handler)
     logging.getLogger("uvicorn.access").propagate = False  # reduce duplicate access logs
 
-class LoggingContextMiddleware:
-    """ASGI middleware injecting request scoped context into contextvars for structured logs."""
-
-    def __init__(self, app):
-        self.app = app
-
-    async def __call__(self, scope, receive, send):
-        if scope.get("type") != "http":
-            return await self.app(scope, receive, send)
-        start = time.time()
-        req_id = uuid.uuid4().hex[:12]
-        request_id_ctx.set(req_id)
-        path_ctx.set(scope.get("path") or "-")
-        method_ctx.set(scope.get("method") or "-")
-        client = "-"
-        if scope.get("client"):
-            client = f"{scope['client'][0]}:{scope['client'][1]}"
-        client_ip_ctx.set(client)
-
-        # Capture status code from send events
-        async def send_wrapper(message):
-            if message.get('type') == 'http.response.start':
-                status_code_ctx.set(message.get('status'))
-            return await send(message)
 
-        try:
-            await self.app(scope, receive, send_wrapper)
-        finally:
-            latency_ms_ctx.set((time.time() - start) * 1000.0)
-            # Emit a single access log line (INFO) at request end
-            logging.getLogger("access").info(
-                "request complete",
-                extra={
-                    "event": "request_end",
-                }
-            )
+atexit.register(_stop_listener)
@@ -4,6 +4,9 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 import os
 import time
 
+from app.core.config import settings
+from app.db.pool import build_engine_kwargs, instrument_engine
+
 # Base class for all models
 Base = declarative_base()
 
@@ -58,7 +61,7 @@ def _create_engine_with_retry(url: str):
         last_err: Exception | None = None
         for i in range(1, attempts + 1):
             try:
-                eng = create_engine(url, connect_args=connect_args, echo=echo)
+                eng = create_engine(url, **build_engine_kwargs(url, connect_args=connect_args, echo=echo))
                 with eng.connect():
                     pass
                 print(f"✅ 데이터베이스 연결 성공: {url.split('@')[-1] if '@' in url else url}")
@@ -79,7 +82,7 @@ def _create_engine_with_retry(url: str):
         return eng
     else:
         # SQLite or other DBs: create directly
-        eng = create_engine(url, connect_args=connect_args, echo=echo)
+        eng = create_engine(url, **build_engine_kwargs(url, connect_args=connect_args, echo=echo))
         try:
             with eng.connect():
                 pass
@@ -94,22 +97,44 @@ def _create_engine_with_retry(url: str):
         return eng
 
 # Create engine with robust behavior
-engine = _create_engine_with_retry(DATABASE_URL)
+engine = instrument_engine(_create_engine_with_retry(DATABASE_URL), "primary")
 
 # ---------------------------------------------------------------------------
 # SQLite compatibility: emulate NOW() for models using server_default=func.now()
 # ---------------------------------------------------------------------------
+def _register_sqlite_now(dbapi_connection, connection_record):  # type: ignore
+    try:
+        # Register only if not already present
+        dbapi_connection.create_function("now", 0, lambda: __import__("datetime").datetime.utcnow().isoformat())
+    except Exception:
+        # Silent: function might already exist or driver doesn't support create_function
+        pass
+
 if DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def _register_sqlite_now(dbapi_connection, connection_record):  # type: ignore
-        try:
-            # Register only if not already present
-            dbapi_connection.create_function("now", 0, lambda: __import__("datetime").datetime.utcnow().isoformat())
-        except Exception:
-            # Silent: function might already exist or driver doesn't support create_function
-            pass
+    event.listen(engine, "connect", _register_sqlite_now)
+
+# ---------------------------------------------------------------------------
+# Optional read replica: DATABASE_READ_REPLICA_URL 설정 시 읽기 전용 의존성(get_read_db)
+# 을 replica 로 라우팅. 미설정 시 primary 엔진을 그대로 공유한다.
+# replica 장애가 부팅을 막지 않도록 연결 검증 없이 lazy 생성.
+# ---------------------------------------------------------------------------
+READ_REPLICA_URL = settings.DATABASE_READ_REPLICA_URL.strip()
+if READ_REPLICA_URL and READ_REPLICA_URL != DATABASE_URL:
+    _replica_connect_args = {} if READ_REPLICA_URL.startswith("postgresql") else {"check_same_thread": False}
+    read_engine = instrument_engine(
+        create_engine(
+            READ_REPLICA_URL,
+            **build_engine_kwargs(READ_REPLICA_URL, connect_args=_replica_connect_args, echo=echo, label="replica"),
+        ),
+        "replica",
+    )
+    if READ_REPLICA_URL.startswith("sqlite"):
+        event.listen(read_engine, "connect", _register_sqlite_now)
+else:
+    read_engine = engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 def get_db_url():
     """현재 데이터베이스 URL 반환"""
@@ -118,6 +143,17 @@ def get_db_url():
 def get_db():
     """Database session dependency for FastAPI"""
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """Read-only session dependency (replica 설정 시 replica, 아니면 primary).
+
+    쓰기/flush 가 없는 조회 전용 엔드포인트에서만 사용할 것 (replica lag 허용 가능한 경우).
+    """
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
@@ -0,0 +1,161 @@
+"""DB connection pool tuning & Prometheus instrumentation.
+
+app/database.py 가 엔진 생성 시 사용하는 헬퍼 모음.
+
+- build_engine_kwargs(): settings(DB_POOL_*) 기반 create_engine 인자 구성
+- instrument_engine(): 풀 이벤트에 메트릭 훅 연결 (checked-out / connection age)
+- InstrumentedQueuePool: checkout 대기 시간 & 대기열 깊이 측정용 QueuePool
+
+메트릭 (prometheus_client 미설치 시 no-op):
+  db_pool_checkout_seconds{pool}        checkout 소요 시간 (대기 포함)
+  db_pool_waiting{pool}                 현재 checkout 대기 중인 요청 수
+  db_pool_checked_out{pool}             사용 중인 연결 수
+  db_pool_connection_age_seconds{pool}  checkin 시점 연결 수명
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+try:  # optional prometheus metrics
+    from prometheus_client import Gauge, Histogram  # type: ignore
+    _POOL_CHECKOUT_SECONDS = Histogram(
+        "db_pool_checkout_seconds",
+        "Time spent acquiring a pooled DB connection",
+        ["pool"],
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+    )
+    _POOL_WAITING = Gauge("db_pool_waiting", "Requests waiting for a pooled DB connection", ["pool"])
+    _POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "DB connections currently checked out", ["pool"])
+    _POOL_CONN_AGE = Histogram(
+        "db_pool_connection_age_seconds",
+        "Age of pooled DB connections at checkin",
+        ["pool"],
+        buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200),
+    )
+except Exception:  # pragma: no cover
+    _POOL_CHECKOUT_SECONDS = None
+    _POOL_WAITING = None
+    _POOL_CHECKED_OUT = None
+    _POOL_CONN_AGE = None
+
+_CONNECTED_AT_KEY = "cc_connected_at"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool 의 _do_get 을 감싸 대기열 깊이/checkout 지연을 기록.
+
+    풀 이름은 클래스 속성으로 보관한다 (engine.dispose() → pool.recreate() 시
+    self.__class__ 로 재생성되므로 인스턴스 속성은 유실됨). make_pool_class() 사용.
+    """
+
+    pool_label: str = "primary"
+
+    def _do_get(self):  # type: ignore[override]
+        label = self.pool_label
+        if _POOL_WAITING is not None:
+            try:
+                _POOL_WAITING.labels(pool=label).inc()
+            except Exception:
+                pass
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if _POOL_WAITING is not None:
+                try:
+                    _POOL_WAITING.labels(pool=label).dec()
+                except Exception:
+                    pass
+            if _POOL_CHECKOUT_SECONDS is not None:
+                try:
+                    _POOL_CHECKOUT_SECONDS.labels(pool=label).observe(time.perf_counter() - start)
+                except Exception:
+                    pass
+
+
+def make_pool_class(label: str) -> type:
+    """label 이 고정된 InstrumentedQueuePool 서브클래스 반환."""
+    return type(f"InstrumentedQueuePool_{label}", (InstrumentedQueuePool,), {"pool_label": label})
+
+
+def build_engine_kwargs(url: str, *, connect_args: Dict[str, Any], echo: bool, label: str = "primary") -> Dict[str, Any]:
+    """settings 기반 create_engine kwargs.
+
+    Postgres: QueuePool 크기/overflow/timeout/recycle + statement_timeout(options) 적용.
+    SQLite: 파일 DB 락 특성상 풀 크기 조정 없이 pre-ping 만 적용 (기존 동작 유지).
+    """
+    kwargs: Dict[str, Any] = {
+        "connect_args": dict(connect_args),
+        "echo": echo,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.startswith("postgresql"):
+        kwargs.update(
+            poolclass=make_pool_class(label),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            opts = kwargs["connect_args"].get("options", "")
+            kwargs["connect_args"]["options"] = f"{opts} -c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}".strip()
+    return kwargs
+
+
+def instrument_engine(engine: Engine, label: str = "primary") -> Engine:
+    """풀 이벤트 리스너 등록 (connect/checkout/checkin). 여러 번 호출해도 안전."""
+    if getattr(engine, "_cc_pool_instrumented", False):
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):  # type: ignore
+        connection_record.info[_CONNECTED_AT_KEY] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # type: ignore
+        _adjust_checked_out(label, 1)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):  # type: ignore
+        connected_at = connection_record.info.get(_CONNECTED_AT_KEY)
+        if connected_at is not None and _POOL_CONN_AGE is not None:
+            try:
+                _POOL_CONN_AGE.labels(pool=label).observe(time.monotonic() - connected_at)
+            except Exception:
+                pass
+        _adjust_checked_out(label, -1)
+
+    engine._cc_pool_instrumented = True  # type: ignore[attr-defined]
+    return engine
+
+
+def _adjust_checked_out(label: str, delta: int) -> None:
+    # checkin 이벤트는 풀 반환 직전에 호출되므로 pool.checkedout() 대신 inc/dec 로 추적
+    if _POOL_CHECKED_OUT is None:
+        return
+    try:
+        _POOL_CHECKED_OUT.labels(pool=label).inc(delta)
+    except Exception:
+        pass
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """관측/헬스 용도 풀 상태 스냅샷."""
+    pool = engine.pool
+    out: Dict[str, Any] = {"class": type(pool).__name__, "status": pool.status()}
+    for attr in ("size", "checkedout", "overflow", "checkedin"):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            try:
+                out[attr] = fn()
+            except Exception:
+                pass
+    return out
@@ -1,6 +1,7 @@
 """인증 관련 의존성 모듈"""
 import logging
 import os
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
@@ -8,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from .database import get_db
 from .services.auth_service import AuthService
+from .services.principal_cache import Principal, get_principal_cache, observe_auth_latency
 from .models.auth_models import User
 from .core.logging import user_id_ctx  # contextvar for structured logging
 from jose import jwt
@@ -25,21 +27,44 @@ if not logger.handlers:
 
 security = HTTPBearer()
 
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
-    """현재 인증된 사용자 정보 반환"""
+    """현재 인증된 사용자 정보 반환
+
+    검증된 토큰은 principal 캐시(jti 키)에 보관되어 이후 요청은 토큰/세션 검증 없이
+    User PK 조회 1회로 처리된다. 그 사이 사용자가 삭제되었으면 캐시 엔트리를 제거하고
+    검증 경로와 같은 404 를 반환한다.
+    """
+    started = time.perf_counter()
     try:
         token = credentials.credentials
-        token_data = AuthService.verify_token(token, db=db)
-        user = db.query(User).filter(User.id == token_data.user_id).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        cache = get_principal_cache()
+        principal = cache.get(token)
+        if principal is not None:
+            user = db.get(User, principal.user_id)
+            if user is None:
+                cache.invalidate_user(principal.user_id)
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            path = "cached"
+        else:
+            token_data, payload, key_name = AuthService.verify_token_claims(token, db=db)
+            user = db.query(User).filter(User.id == token_data.user_id).first()
+            if not user:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            if payload.get("jti") and payload.get("exp") and key_name != "unverified-fallback":
+                cache.put(token, Principal(
+                    jti=str(payload["jti"]), user_id=user.id, site_id=user.site_id,
+                    is_admin=bool(token_data.is_admin), exp=float(payload["exp"]),
+                ))
+            path = "verified"
         try:
             user_id_ctx.set(str(user.id))
         except Exception:
             pass
+        observe_auth_latency(path, time.perf_counter() - started)
         return user
 
     except HTTPException as e:
@@ -24,11 +24,17 @@ from pydantic import BaseModel, Field
 
 # Core imports
 from app.database import get_db
-from app.utils.redis import init_redis_manager, get_redis_manager
-from app.core.logging import setup_logging, LoggingContextMiddleware
+from app.utils.redis import (
+    init_redis_manager,
+    get_redis_manager,
+    build_async_redis_client,
+    init_async_redis_manager,
+    get_async_redis_manager,
+)
+from app.core.logging import setup_logging
 from app.core.config import settings
 from app.core.error_handlers import add_exception_handlers
-from app.middleware.simple_logging import SimpleLoggingMiddleware
+from app.middleware.access_log import AccessLogMiddleware
 # from app.core.exceptions import add_exception_handlers  # Disabled - empty file
 # from app.middleware.error_handling import error_handling_middleware  # Disabled
 # from app.middleware.logging import LoggingContextMiddleware  # Disabled
@@ -207,8 +213,37 @@ async def lifespan(app: FastAPI):
                 print("🔌 Redis connected & manager initialized")
             except Exception as re:
                 print(f"⚠️ Redis connection failed, using in-memory fallback: {re}")
+            # async 라우터용 비동기 클라이언트 (공용 커넥션 풀). 실패 시 동기 매니저 위임 모드
+            if getattr(app.state, "redis_initialized", False):
+                aclient = build_async_redis_client(redis_host, redis_port, redis_password)
+                try:
+                    if aclient is not None:
+                        await aclient.ping()
+                        init_async_redis_manager(aclient)
+                        app.state.async_redis_manager = get_async_redis_manager()
+                        print("🔌 Async Redis manager initialized")
+                except Exception as are:
+                    print(f"⚠️ Async Redis connection failed, delegating to sync manager: {are}")
     except Exception as e:
         print(f"⚠️ Redis init wrapper error: {e}")
+    # 인증 principal 캐시 무효화 구독 (Redis 미연결 시 로컬 캐시만 사용)
+    try:
+        from app.services.principal_cache import get_principal_cache
+        get_principal_cache().start_listener()
+    except Exception as e:
+        print(f"⚠️ Principal cache listener start failed: {e}")
+    # Realtime hub 팬아웃 백엔드 구독 시작 (REALTIME_BACKEND=redis 일 때 멀티 워커 전달)
+    try:
+        from app.realtime.hub import hub as _realtime_hub
+        await _realtime_hub.start()
+    except Exception as e:
+        print(f"⚠️ Realtime hub backend start failed: {e}")
+    # 알림 브로커 (NOTIFY_BROKER_BACKEND=redis_streams 일 때 워커 간 팬아웃 구독)
+    try:
+        from app.realtime.broker import notification_broker
+        await notification_broker.start()
+    except Exception as e:
+        print(f"⚠️ Notification broker start failed: {e}")
     # Start Kafka consumer (optional)
     try:
         await start_consumer()
@@ -216,12 +251,41 @@ async def lifespan(app: FastAPI):
             print("📡 Kafka consumer started")
     except Exception as e:
         print(f"⚠️ Kafka consumer start failed: {e}")
+    # Outbox relay (event_outbox → Kafka 배치 발행, 기본 활성). 여러 인스턴스 동시 실행 가능 (SKIP LOCKED)
+    try:
+        if os.getenv("OUTBOX_RELAY_ENABLED", "1") == "1":
+            from app.services.outbox_relay import get_outbox_relay
+            get_outbox_relay().start()
+            print("📤 Outbox relay started")
+    except Exception as e:
+        print(f"⚠️ Outbox relay start failed: {e}")
+    # 공유 집계 스냅샷 producer (global metrics / dashboard 주기 계산 + SSE 팬아웃)
+    try:
+        if os.getenv("SNAPSHOT_PRODUCER_ENABLED", "1") == "1":
+            from app.services.snapshot_service import get_snapshot_store
+            get_snapshot_store().start_producer()
+            print("📊 Snapshot producer started")
+    except Exception as e:
+        print(f"⚠️ Snapshot producer start failed: {e}")
+    # 증분 RFM 세그먼트 (user_actions / games 커밋 훅 → 변경 사용자만 재평가). 보정은 스케줄러 nightly reconcile
+    try:
+        if os.getenv("RFM_STREAM_ENABLED", "1") == "1":
+            from app.services.rfm_stream import get_rfm_stream
+            get_rfm_stream().start()
+            print("🧮 RFM stream started")
+    except Exception as e:
+        print(f"⚠️ RFM stream start failed: {e}")
     print("✅ Backend startup complete")
     try:
         yield
     finally:
         # Shutdown
         print("🛑 Casino-Club F2P Backend shutting down...")
+        try:
+            from app.services.snapshot_service import get_snapshot_store
+            await get_snapshot_store().stop()
+        except Exception as e:
+            print(f"⚠️ Snapshot producer stop failed: {e}")
         # Stop Kafka consumer
         try:
             await stop_consumer()
@@ -229,6 +293,56 @@ async def lifespan(app: FastAPI):
                 print("📡 Kafka consumer stopped")
         except Exception as e:
             print(f"⚠️ Kafka consumer stop failed: {e}")
+        try:
+            from app.realtime.hub import hub as _realtime_hub
+            await _realtime_hub.stop()
+        except Exception as e:
+            print(f"⚠️ Realtime hub backend stop failed: {e}")
+        try:
+            from app.realtime.broker import notification_broker
+            await notification_broker.stop()
+        except Exception as e:
+            print(f"⚠️ Notification broker stop failed: {e}")
+        try:
+            from app.services.principal_cache import get_principal_cache
+            get_principal_cache().stop_listener()
+        except Exception as e:
+            print(f"⚠️ Principal cache listener stop failed: {e}")
+        try:
+            await get_async_redis_manager().close()
+        except Exception as e:
+            print(f"⚠️ Async Redis manager close failed: {e}")
+        # 게임 라운드 부수효과 풀 종료 (업적 파이프라인 제출 가능 → 업적 워커보다 먼저)
+        try:
+            from app.services.game_round import shutdown_effect_dispatcher
+            await asyncio.to_thread(shutdown_effect_dispatcher)
+        except Exception as e:
+            print(f"⚠️ Game round effect dispatcher shutdown failed: {e}")
+        # 남은 RFM 증분 flush (segment_change outbox 행 적재 → relay 종료 전에)
+        try:
+            from app.services.rfm_stream import shutdown_rfm_stream
+            await asyncio.to_thread(shutdown_rfm_stream)
+        except Exception as e:
+            print(f"⚠️ RFM stream shutdown failed: {e}")
+        try:
+            from app.services.outbox_relay import shutdown_outbox_relay
+            await asyncio.to_thread(shutdown_outbox_relay)
+        except Exception as e:
+            print(f"⚠️ Outbox relay shutdown failed: {e}")
+        # 웹푸시 발송 풀 종료 (진행 중 발송 완료 + 만료 구독 정리 flush)
+        try:
+            from app.services.push_delivery import shutdown_push_pool
+            await asyncio.to_thread(shutdown_push_pool)
+        except Exception as e:
+            print(f"⚠️ Push delivery pool shutdown failed: {e}")
+        # 업적 평가 워커 종료 (대기 작업은 best-effort 로 처리 후 종료)
+        try:
+            from app.services.achievement_pipeline import get_achievement_pipeline
+            _ach_pipeline = get_achievement_pipeline()
+            _ach_pipeline.shutdown(wait=True)
+            await asyncio.to_thread(_ach_pipeline.drain, 5.0)
+        except Exception as e:
+            print(f"⚠️ Achievement pipeline shutdown failed: {e}")
         if scheduler and getattr(scheduler, "running", False):
             try:
                 # shutdown may raise RuntimeError if event loop is closed (test lifecycle)
@@ -292,10 +406,8 @@ origins = (
 
 add_exception_handlers(app)
 
-# 간단한 API 로깅 미들웨어 추가
-app.add_middleware(SimpleLoggingMiddleware)
-
-app.add_middleware(LoggingContextMiddleware)
+# 요청 컨텍스트 + 액세스 로그 (순수 ASGI 단일 단계, 라우트별 샘플링)
+app.add_middleware(AccessLogMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -0,0 +1,200 @@
+"""단일 ASGI 액세스 로그 미들웨어
+
+기존 SimpleLoggingMiddleware(BaseHTTPMiddleware, 요청당 2줄) + LoggingContextMiddleware(1줄)를
+하나의 순수 ASGI 단계로 통합했다.
+
+- 요청 컨텍스트(contextvars: request_id/path/method/client_ip/status/latency) 설정
+- 요청 종료 시 access 로거로 1줄 기록 (extra: route/title/status_code/latency_ms)
+- 라우트 타이틀은 원시 경로가 아닌 라우트 템플릿(/api/users/{user_id}) 기준으로
+  첫 요청 시 app.routes 에서 한 번에 계산해 둔다 (매칭 실패 경로는 "<unmatched>")
+  라우트 테이블 밖 조합(임의 메서드 등)은 ACCESS_LOG_ROUTE_CACHE_MAX 크기 LRU 에만 캐시
+- 샘플링: 라우트별 비율 (ACCESS_LOG_ROUTE_SAMPLE_RATES) → 기본 비율 (ACCESS_LOG_SAMPLE_RATE)
+  4xx/5xx, 예외, 느린 요청(ACCESS_LOG_SLOW_MS 이상)은 항상 기록
+
+환경변수:
+  ACCESS_LOG_SAMPLE_RATE          기본 샘플링 비율 (기본 1.0)
+  ACCESS_LOG_ROUTE_SAMPLE_RATES   "GET /health=0,GET /api/users/balance=0.1" (메서드 생략 시 전체 메서드)
+  ACCESS_LOG_SLOW_MS              항상 기록할 지연 기준 (기본 1000)
+  ACCESS_LOG_ROUTE_CACHE_MAX      라우트 테이블 밖 (method, template) 캐시 상한 (기본 256)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.logging import (
+    client_ip_ctx,
+    latency_ms_ctx,
+    method_ctx,
+    path_ctx,
+    request_id_ctx,
+    status_code_ctx,
+)
+
+logger = logging.getLogger("access")
+
+UNMATCHED = "<unmatched>"
+
+# API 엔드포인트별 기능 타이틀 매핑 (키: "METHOD 라우트템플릿")
+API_TITLES = {
+    # 🔐 인증 관련
+    "POST /api/auth/signup": "👤 회원가입",
+    "POST /api/auth/login": "🔑 로그인",
+    "POST /api/auth/logout": "👋 로그아웃",
+    "POST /api/auth/refresh": "🔄 토큰갱신",
+    "POST /api/auth/admin/login": "👑 관리자로그인",
+
+    # 👤 사용자 관련
+    "GET /api/users/profile": "📋 프로필조회",
+    "PUT /api/users/profile": "✏️ 프로필수정",
+    "GET /api/users/balance": "💰 잔액조회",
+    "GET /api/users/stats": "📊 통계조회",
+    "GET /api/users/info": "ℹ️ 사용자정보",
+    "POST /api/users/tokens/add": "💎 토큰추가",
+
+    # 🎮 게임 관련
+    "GET /api/games": "🎲 게임목록",
+    "POST /api/games/slot/spin": "🎰 슬롯게임",
+    "POST /api/games/gacha/pull": "🎁 가챠뽑기",
+    "POST /api/games/rps/play": "✂️ 가위바위보",
+    "POST /api/games/prize-roulette/spin": "🎡 룰렛게임",
+    "GET /api/games/prize-roulette/info": "🎡 룰렛정보",
+
+    # 🛒 상점 관련
+    "GET /api/shop": "🛒 상점목록",
+    "POST /api/shop/buy": "💳 상품구매",
+    "GET /api/rewards": "🎁 보상목록",
+    "POST /api/rewards/claim": "🎁 보상수령",
+
+    # 📱 관리 관련
+    "GET /api/admin": "👑 관리자패널",
+    "GET /api/dashboard": "📊 대시보드",
+    "GET /api/analytics": "📈 분석데이터",
+
+    # 📝 기타
+    "GET /docs": "📚 API문서",
+    "GET /health": "💚 상태체크",
+    "GET /": "🏠 홈페이지",
+}
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """"GET /health=0,/metrics=0.5" → {"GET /health": 0.0, "/metrics": 0.5}"""
+    rates: Dict[str, float] = {}
+    for item in spec.split(","):
+        key, sep, value = item.strip().rpartition("=")
+        if not sep or not key.strip():
+            continue
+        try:
+            rates[key.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+class AccessLogMiddleware:
+    def __init__(
+        self,
+        app: Any,
+        sample_rate: Optional[float] = None,
+        route_sample_rates: Optional[Dict[str, float]] = None,
+        slow_ms: Optional[float] = None,
+        titles: Optional[Dict[str, str]] = None,
+        rng: Optional[random.Random] = None,
+        route_cache_max: Optional[int] = None,
+    ) -> None:
+        self.app = app
+        self.sample_rate = float(sample_rate if sample_rate is not None else os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+        self.route_sample_rates = (
+            route_sample_rates if route_sample_rates is not None
+            else parse_sample_rates(os.getenv("ACCESS_LOG_ROUTE_SAMPLE_RATES", ""))
+        )
+        self.slow_ms = float(slow_ms if slow_ms is not None else os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+        self.titles = API_TITLES if titles is None else titles
+        self._random = (rng or random.Random()).random
+        # (method, route template) -> (title, sample rate): app.routes 기준 고정 테이블
+        self._routes: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        # 테이블 밖 조합 (클라이언트가 고른 메서드 등) → bounded LRU
+        self._extra: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._extra_max = max(1, int(
+            route_cache_max if route_cache_max is not None else os.getenv("ACCESS_LOG_ROUTE_CACHE_MAX", "256")
+        ))
+        self._resolved = False
+
+    # ---------------- route table ---------------- #
+    def _entry(self, method: str, template: str) -> Tuple[str, float]:
+        key = f"{method} {template}"
+        rate = self.route_sample_rates.get(key, self.route_sample_rates.get(template, self.sample_rate))
+        return self.titles.get(key, f"🔧 {key}"), rate
+
+    def _resolve_routes(self, app: Any) -> None:
+        self._resolved = True
+        for route in getattr(app, "routes", ()) or ():
+            template = getattr(route, "path", None)
+            if not template:
+                continue
+            for method in getattr(route, "methods", None) or ("GET",):
+                self._routes[(method, template)] = self._entry(method, template)
+
+    def _lookup(self, method: str, template: str) -> Tuple[str, float]:
+        key = (method, template)
+        entry = self._routes.get(key)
+        if entry is not None:
+            return entry
+        entry = self._extra.get(key)
+        if entry is not None:
+            self._extra.move_to_end(key)
+            return entry
+        entry = self._extra[key] = self._entry(method, template)
+        if len(self._extra) > self._extra_max:
+            self._extra.popitem(last=False)
+        return entry
+
+    # ---------------- ASGI ---------------- #
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
+        if not self._resolved:
+            self._resolve_routes(scope.get("app"))
+        start = time.perf_counter()
+        request_id_ctx.set(uuid.uuid4().hex[:12])
+        path_ctx.set(scope.get("path") or "-")
+        method_ctx.set(scope.get("method") or "-")
+        client = scope.get("client")
+        client_ip_ctx.set(f"{client[0]}:{client[1]}" if client else "-")
+        status_holder = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+                status_code_ctx.set(message["status"])
+            await send(message)
+
+        error: Optional[Exception] = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000.0
+            latency_ms_ctx.set(latency_ms)
+            status = status_holder[0] or (500 if error is not None else 0)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED
+            method = scope.get("method") or "-"
+            title, rate = self._lookup(method, template)
+            always = error is not None or status >= 400 or latency_ms >= self.slow_ms
+            if always or (rate > 0.0 and (rate >= 1.0 or self._random() < rate)):
+                level = logging.ERROR if error is not None or status >= 500 else (
+                    logging.WARNING if status >= 400 else logging.INFO)
+                if logger.isEnabledFor(level):
+                    logger.log(
+                        level, "%s (%s) %.1fms", title, status, latency_ms,
+                        extra={"event": "request_end", "route": template, "title": title, "sample_rate": rate},
+                    )
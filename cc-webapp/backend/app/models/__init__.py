@@ -92,9 +92,12 @@ from .event_models import (
 from .admin_content_models import *  # noqa: F401,F403
 
 # History / Social 모델 추가
-from .history_models import GameHistory
+from .history_models import GameHistory, GameHistoryAggregate, UserWinStreak
 from .social_models import FollowRelation
 from .achievement_models import Achievement, UserAchievement
+from .outbox_models import EventOutbox
+from .activity_models import ActivityRollup, ActivityDailyUser
+from .rfm_models import UserRFMDaily, UserRFMState
 
 # 모든 모델 클래스들을 리스트로 정의
 __all__ = [
@@ -189,12 +192,20 @@ __all__ = [
 
     # History
     "GameHistory",
+    "GameHistoryAggregate",
+    "UserWinStreak",
+    "ActivityRollup",
+    "ActivityDailyUser",
+    "UserRFMDaily",
+    "UserRFMState",
 
     # Social
     "FollowRelation",
     # Achievements
     "Achievement",
     "UserAchievement",
+    # Outbox
+    "EventOutbox",
     # Shop (added 2025-08-17 for idempotent purchase tests)
     "ShopProduct",
     "ShopDiscount",
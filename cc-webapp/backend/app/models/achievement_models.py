@@ -6,7 +6,7 @@ from typing import Optional, Dict, Any
 from sqlalchemy import String, Integer, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from .base import Base
+from ..database import Base
 
 
 class Achievement(Base):
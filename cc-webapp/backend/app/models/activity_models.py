@@ -0,0 +1,38 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, UniqueConstraint, Index
+
+from ..database import Base
+
+
+class ActivityRollup(Base):
+    """user_actions / game_history 시간 버킷 롤업 (hour | day).
+
+    action_type='*' (game_history 는 game_type='*' 도) 행은 버킷 전체 합계이며
+    활동이 없는 버킷도 0 으로 기록한다 → 최대 bucket_start 가 롤업 워터마크.
+    갱신: activity_storage_service.refresh_rollups (스케줄러 5분 주기)
+    """
+    __tablename__ = "activity_rollups"
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(8), nullable=False)  # hour | day
+    source = Column(String(32), nullable=False)  # user_actions | game_history
+    bucket_start = Column(DateTime, nullable=False)
+    action_type = Column(String(50), nullable=False)
+    game_type = Column(String(50), nullable=False, default="")
+    event_count = Column(BigInteger, default=0, nullable=False)
+    user_count = Column(Integer, default=0, nullable=False)  # 버킷 내 고유 사용자 (버킷 간 합산 불가)
+    delta_coin = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("granularity", "source", "bucket_start", "action_type", "game_type",
+                         name="uq_activity_rollups_bucket_key"),
+        Index("ix_activity_rollups_action_bucket", "granularity", "source", "action_type", "bucket_start"),
+    )
+
+
+class ActivityDailyUser(Base):
+    """일별 활성 사용자 집합 (user_actions 기준). DAU/기간 활성 사용자 정확 계산용."""
+    __tablename__ = "activity_daily_users"
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, primary_key=True)
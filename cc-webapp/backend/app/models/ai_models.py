@@ -4,7 +4,7 @@
 개인화 추천 및 AI 기반 콘텐츠 제공 시스템
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Text, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -62,6 +62,11 @@ class UserRecommendation(Base):
     template = relationship("RecommendationTemplate", back_populates="recommendations")
     interactions = relationship("RecommendationInteraction", back_populates="recommendation")
 
+    __table_args__ = (
+        # 사용자별 pending 추천 조회 (중복 추천 재사용 판단)
+        Index("ix_user_recommendations_user_status", "user_id", "status"),
+    )
+
 
 class RecommendationInteraction(Base):
     """추천 상호작용 기록"""
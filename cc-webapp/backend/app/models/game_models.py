@@ -1,7 +1,7 @@
 """게임 관련 데이터베이스 모델"""
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -44,6 +44,14 @@ class UserAction(Base):
     # 관계
     user = relationship("User", back_populates="actions")
 
+    # 시간 범위 + 사용자/액션 필터용 복합 인덱스 (이름은 기존 마이그레이션과 동일)
+    # created_at 단독: Postgres 는 월 파티션별 BRIN (append-only), 그 외 dialect 는 btree
+    __table_args__ = (
+        Index("ix_user_actions_user_created", "user_id", "created_at"),
+        Index("ix_user_actions_type_created", "action_type", "created_at"),
+        Index("ix_user_actions_created_brin", "created_at", postgresql_using="brin"),
+    )
+
 
 class UserReward(Base):
     """사용자 보상 모델"""
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -19,3 +19,47 @@ class GameHistory(Base):
 
     user = relationship("User", backref="game_history")
     session = relationship("GameSession", backref="actions")
+
+    # 시간 범위 + 사용자/액션/게임 필터용 복합 인덱스 (이름은 기존 마이그레이션과 동일)
+    __table_args__ = (
+        Index("ix_game_history_user_created", "user_id", "created_at"),
+        Index("ix_game_history_action_created", "action_type", "created_at"),
+        Index("ix_game_history_game_created", "game_type", "created_at"),
+    )
+
+
+class GameHistoryAggregate(Base):
+    """GameHistory 증분 집계 (user, game_type, action_type 단위).
+
+    log_game_history 가 같은 트랜잭션에서 upsert 로 누적한다.
+    업적 평가기는 game_history 전체 SUM 대신 이 테이블을 조회(O(1)).
+    재구성: python -m app.scripts.rebuild_history_aggregates
+    """
+    __tablename__ = "game_history_aggregates"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    game_type = Column(String(50), nullable=False)
+    action_type = Column(String(30), nullable=False)
+    total_count = Column(Integer, default=0, nullable=False)
+    total_delta_coin = Column(BigInteger, default=0, nullable=False)
+    total_delta_gem = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "game_type", "action_type", name="uq_game_history_agg_user_game_action"),
+        Index("ix_game_history_agg_user_action", "user_id", "action_type"),
+    )
+
+
+class UserWinStreak(Base):
+    """사용자별 최신 GameHistory 꼬리(tail) 연속 WIN 상태.
+
+    win_streak: 최신 행부터 연속된 WIN 수 (게임 무관)
+    tail_game_type/tail_game_streak: 최신 행부터 연속된 '같은 게임의 WIN' 수
+    """
+    __tablename__ = "user_win_streaks"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    win_streak = Column(Integer, default=0, nullable=False)
+    tail_game_type = Column(String(50), nullable=True)
+    tail_game_streak = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -34,7 +34,9 @@ class NotificationCampaign(Base):
     - target_segment: 세그먼트 라벨 (segment 선택 시)
     - user_ids: 콤마로 구분된 대상 유저 ID 목록 (user_ids 선택 시)
     - scheduled_at: 예약 발송 시간 (UTC)
-    - status: 'scheduled' | 'sent' | 'cancelled'
+    - status: 'scheduled' | 'sending' | 'sent' | 'cancelled'
+    - dispatch_cursor: 발송 체크포인트 (마지막으로 알림을 생성한 user_id, 재시작 시 이후부터 재개)
+    - dispatched_count: 생성된 알림 수
     """
     __tablename__ = "notification_campaigns"
 
@@ -48,3 +50,5 @@ class NotificationCampaign(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     sent_at = Column(DateTime(timezone=True))
     status = Column(String(20), nullable=False, default="scheduled")
+    dispatch_cursor = Column(Integer, nullable=False, default=0, server_default="0")
+    dispatched_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..database import Base
+
+
+class EventOutbox(Base):
+    """Transactional outbox (도메인 변경과 같은 트랜잭션에서 기록).
+
+    enqueue_outbox 가 published_at NULL 로 적재하고,
+    outbox_relay 가 배치로 claim(FOR UPDATE SKIP LOCKED) → Kafka 발행 → published_at 일괄 기록.
+    """
+    __tablename__ = "event_outbox"
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    event_type = Column(String(120), nullable=False, index=True)
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    schema_version = Column(Integer, nullable=False, default=1, server_default="1")
+    dedupe_key = Column(String(255), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    published_at = Column(DateTime(timezone=True), nullable=True)
+    publish_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # relay claim: 미발행 행을 id 순으로 (미발행 행만 인덱싱)
+        Index("ix_event_outbox_pending_id", "id", postgresql_where=text("published_at IS NULL")),
+        # prune: 발행 완료 행을 published_at 기준으로 삭제
+        Index("ix_event_outbox_published_at", "published_at", postgresql_where=text("published_at IS NOT NULL")),
+    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, Index
+
+from ..database import Base
+
+
+class UserRFMDaily(Base):
+    """사용자별 일별 R/F/M 입력 버킷 (UTC 날짜).
+
+    action_count: user_actions 건수 / monetary: games.bet_amount 합.
+    rfm_stream 이 커밋된 이벤트의 증분을 upsert (+=) 하며, 집계 창(rfm_window_start) 밖 버킷은 정리한다.
+    """
+    __tablename__ = "user_rfm_daily"
+    user_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    action_count = Column(Integer, default=0, nullable=False)
+    monetary = Column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_rfm_daily_day", "day"),
+    )
+
+
+class UserRFMState(Base):
+    """사용자별 증분 RFM 상태.
+
+    last_action_at: 마지막 user_action 시각 (recency)
+    rfm_group: 마지막 스코어링 결과 (user_segments.rfm_group 과 동일해야 함)
+    next_rescore_at: 새 이벤트 없이도 시간 경과로 점수가 바뀔 수 있는 가장 이른 시각
+                     (recency 임계 통과 / 가장 오래된 버킷의 창 이탈). NULL 이면 시간에 따른 변화 없음.
+    """
+    __tablename__ = "user_rfm_state"
+    user_id = Column(Integer, primary_key=True)
+    last_action_at = Column(DateTime, nullable=True)
+    rfm_group = Column(String(50), nullable=True)
+    scored_at = Column(DateTime, nullable=True)
+    next_rescore_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_rfm_state_next_rescore", "next_rescore_at"),
+    )
@@ -1,26 +1,103 @@
+import gzip
+import json
 import logging
-from typing import List, Dict, Any
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Sequence
 import requests
+from requests.adapters import HTTPAdapter
 from app.core.config import settings
 
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Histogram  # type: ignore
+    _INSERT_ROWS = Counter("clickhouse_insert_rows_total", "Rows inserted into ClickHouse", ["table"])
+    _INSERT_BYTES = Counter("clickhouse_insert_bytes_total", "Bytes sent to ClickHouse for inserts (on the wire)", ["table"])
+    _INSERT_SECONDS = Histogram("clickhouse_insert_seconds", "ClickHouse insert request duration", ["table"])
+except Exception:  # pragma: no cover
+    _INSERT_ROWS = _INSERT_BYTES = _INSERT_SECONDS = None
+
 log = logging.getLogger(__name__)
 
+ACTION_COLUMNS = ("user_id", "action_type", "context_json")
+REWARD_COLUMNS = ("user_id", "reward_type", "reward_value", "source")
+PURCHASE_COLUMNS = ("user_id", "code", "quantity", "total_price_cents", "gems_granted", "charge_id")
+
+
+@dataclass
+class InsertStats:
+    table: str
+    rows: int = 0
+    raw_bytes: int = 0
+    wire_bytes: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.wire_bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d.update(rows_per_sec=round(self.rows_per_sec, 1), bytes_per_sec=round(self.bytes_per_sec, 1))
+        return d
+
+
+def _int(v: Any) -> int:
+    return int(v or 0)
+
+
+def _str(v: Any) -> str:
+    return str(v or "")
+
+
+def _action_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {"user_id": _int(r.get("user_id")), "action_type": _str(r.get("action_type")),
+            "context_json": str(r.get("context_json") or "{}")}
+
+
+def _reward_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {"user_id": _int(r.get("user_id")), "reward_type": _str(r.get("reward_type")),
+            "reward_value": _int(r.get("reward_value")), "source": _str(r.get("source"))}
+
+
+def _purchase_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {"user_id": _int(r.get("user_id")), "code": _str(r.get("code")), "quantity": _int(r.get("quantity")),
+            "total_price_cents": _int(r.get("total_price_cents")), "gems_granted": _int(r.get("gems_granted")),
+            "charge_id": _str(r.get("charge_id"))}
+
+
 class ClickHouseClient:
-    def __init__(self):
-        self.base = settings.CLICKHOUSE_URL.rstrip("/")
+    def __init__(self, base_url: Optional[str] = None, insert_format: Optional[str] = None,
+                 compression: Optional[bool] = None):
+        self.base = (base_url or settings.CLICKHOUSE_URL).rstrip("/")
         self.db = settings.CLICKHOUSE_DATABASE
         self.params = {}
         if settings.CLICKHOUSE_USER:
             self.params["user"] = settings.CLICKHOUSE_USER
         if settings.CLICKHOUSE_PASSWORD:
             self.params["password"] = settings.CLICKHOUSE_PASSWORD
+        self.insert_format = (insert_format or settings.CLICKHOUSE_INSERT_FORMAT).lower()
+        self.compression = settings.CLICKHOUSE_HTTP_COMPRESSION if compression is None else compression
+        self.timeout = settings.CLICKHOUSE_TIMEOUT_SECONDS
+        # keep-alive 커넥션 풀 (OLAP 워커 flush 스레드 간 공유)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, settings.CLICKHOUSE_POOL_SIZE))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
 
     def execute(self, sql: str) -> str:
-        r = requests.post(
+        r = self.session.post(
             f"{self.base}/?database={self.db}",
             params=self.params,
             data=sql.encode("utf-8"),
-            timeout=10,
+            timeout=self.timeout,
         )
         if not r.ok:
             # Log body for diagnostics and include a short preview of SQL
@@ -142,44 +219,75 @@ class ClickHouseClient:
                 log.warning("Unexpected CH count value: %s", cnt)
         return rows
 
-    def insert_actions(self, rows: List[Dict[str, Any]]):
+    # ------------------------------------------------------------------ #
+    # Bulk insert (JSONEachRow, gzip, keep-alive)
+    # ------------------------------------------------------------------ #
+    def insert_rows(self, table: str, columns: Sequence[str], rows: List[Dict[str, Any]],
+                    chunk_rows: Optional[int] = None) -> InsertStats:
+        """rows(dict) 를 JSONEachRow 로 직렬화해 chunk 단위 POST. 요청 본문은 gzip 압축.
+
+        INSERT 문은 query 파라미터로 전달하고 본문에는 데이터만 싣는다.
+        """
+        stats = InsertStats(table=table)
         if not rows:
-            return
-        # Rely on ClickHouse defaults for Date/DateTime columns to avoid format issues
-        data = "\n".join("\t".join([
-            str(int(r.get("user_id") or 0)),
-            str(r.get("action_type") or ""),
-            str(r.get("context_json") or "{}"),
-        ]) for r in rows)
-        sql = "INSERT INTO user_actions (user_id, action_type, context_json) FORMAT TSV\n" + data
-        self.execute(sql)
+            return stats
+        chunk = max(1, chunk_rows or settings.CLICKHOUSE_INSERT_CHUNK_ROWS)
+        query = f"INSERT INTO {table} ({', '.join(columns)}) FORMAT JSONEachRow"
+        params = dict(self.params, database=self.db, query=query)
+        headers = {"Content-Type": "application/x-ndjson"}
+        if self.compression:
+            params["enable_http_compression"] = "1"
+            headers["Content-Encoding"] = "gzip"
+        started = time.perf_counter()
+        for i in range(0, len(rows), chunk):
+            part = rows[i:i + chunk]
+            raw = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in part).encode("utf-8")
+            body = gzip.compress(raw, compresslevel=1) if self.compression else raw
+            t0 = time.perf_counter()
+            r = self.session.post(f"{self.base}/", params=params, data=body, headers=headers, timeout=self.timeout)
+            if not r.ok:
+                log.error("ClickHouse HTTP %s: %s | insert into %s rows=%d", r.status_code, r.text.strip()[:500], table, len(part))
+                r.raise_for_status()
+            if _INSERT_SECONDS is not None:
+                _INSERT_SECONDS.labels(table=table).observe(time.perf_counter() - t0)
+            stats.rows += len(part)
+            stats.raw_bytes += len(raw)
+            stats.wire_bytes += len(body)
+            stats.requests += 1
+        stats.seconds = time.perf_counter() - started
+        if _INSERT_ROWS is not None:
+            _INSERT_ROWS.labels(table=table).inc(stats.rows)
+            _INSERT_BYTES.labels(table=table).inc(stats.wire_bytes)
+        log.debug("clickhouse insert %s rows=%d bytes=%d (%.0f rows/s, %.0f B/s)",
+                  table, stats.rows, stats.wire_bytes, stats.rows_per_sec, stats.bytes_per_sec)
+        return stats
 
-    def insert_rewards(self, rows: List[Dict[str, Any]]):
+    def _insert_tsv(self, table: str, columns: Sequence[str], rows: List[Dict[str, Any]]) -> InsertStats:
+        """레거시 텍스트 경로: SQL 본문에 TSV 데이터 포함 (CLICKHOUSE_INSERT_FORMAT=tsv)."""
+        stats = InsertStats(table=table)
         if not rows:
-            return
-        # Let ClickHouse set awarded_at/day via defaults
-        data = "\n".join("\t".join([
-            str(int(r.get("user_id") or 0)),
-            str(r.get("reward_type") or ""),
-            str(int(r.get("reward_value") or 0)),
-            str(r.get("source") or ""),
-        ]) for r in rows)
-        sql = "INSERT INTO rewards (user_id, reward_type, reward_value, source) FORMAT TSV\n" + data
+            return stats
+        data = "\n".join("\t".join(str(r[c]) for c in columns) for r in rows)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) FORMAT TSV\n" + data
+        started = time.perf_counter()
         self.execute(sql)
+        stats.seconds = time.perf_counter() - started
+        stats.rows = len(rows)
+        stats.raw_bytes = stats.wire_bytes = len(sql.encode("utf-8"))
+        stats.requests = 1
+        return stats
 
-    def insert_purchases(self, rows: List[Dict[str, Any]]):
-        if not rows:
-            return
-        # Insert without explicit purchased_at to use DEFAULT now() and computed day
-        lines: List[str] = []
-        for r in rows:
-            user_id = str(int(r.get("user_id") or 0))
-            code = str(r.get("code") or "")
-            quantity = str(int(r.get("quantity") or 0))
-            total_price = str(int(r.get("total_price_cents") or 0))
-            gems = str(int(r.get("gems_granted") or 0))
-            charge_id = str(r.get("charge_id") or "")
-            lines.append("\t".join([user_id, code, quantity, total_price, gems, charge_id]))
-        data = "\n".join(lines)
-        sql = "INSERT INTO purchases (user_id, code, quantity, total_price_cents, gems_granted, charge_id) FORMAT TSV\n" + data
-        self.execute(sql)
\ No newline at end of file
+    def _insert(self, table: str, columns: Sequence[str], rows: List[Dict[str, Any]]) -> InsertStats:
+        if self.insert_format == "tsv":
+            return self._insert_tsv(table, columns, rows)
+        return self.insert_rows(table, columns, rows)
+
+    # Date/DateTime 컬럼은 ClickHouse DEFAULT(now()/today()) 에 맡긴다
+    def insert_actions(self, rows: List[Dict[str, Any]]) -> InsertStats:
+        return self._insert("user_actions", ACTION_COLUMNS, [_action_row(r) for r in rows])
+
+    def insert_rewards(self, rows: List[Dict[str, Any]]) -> InsertStats:
+        return self._insert("rewards", REWARD_COLUMNS, [_reward_row(r) for r in rows])
+
+    def insert_purchases(self, rows: List[Dict[str, Any]]) -> InsertStats:
+        return self._insert("purchases", PURCHASE_COLUMNS, [_purchase_row(r) for r in rows])
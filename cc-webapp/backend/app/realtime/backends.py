@@ -0,0 +1,169 @@
+"""RealtimeHub 팬아웃 백엔드
+
+허브는 이벤트를 백엔드에 1회 publish 하고, 각 워커(프로세스)는 자신이 보유한
+로컬 소켓에만 전달한다. 백엔드 선택은 환경변수 REALTIME_BACKEND:
+
+- memory (기본): 단일 프로세스. publish 는 no-op (허브가 로컬 전달만 수행)
+- redis: Redis Pub/Sub 채널(REALTIME_REDIS_CHANNEL, 기본 "realtime:events") 로 publish,
+  구독 태스크가 다른 노드에서 온 이벤트를 로컬 전달 콜백으로 넘김
+
+자기 노드가 publish 한 메시지는 이미 로컬 전달되었으므로 구독 시 무시한다(node id 비교).
+publish 는 Redis 로 직접 전송한다. broadcast 호출 경로의 비동기화(bounded 큐 +
+publisher 태스크, REALTIME_PUBLISH_QUEUE_MAX)는 허브가 백엔드 종류와 무관하게 담당.
+메트릭:
+  realtime_cross_node_latency_seconds  publish → 원격 노드 수신 지연
+  realtime_backend_publish_errors_total
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Histogram  # type: ignore
+    _CROSS_NODE_LATENCY = Histogram(
+        "realtime_cross_node_latency_seconds",
+        "Latency between hub publish and delivery on a remote node",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+    _PUBLISH_ERRORS = Counter("realtime_backend_publish_errors_total", "Realtime backend publish failures")
+except Exception:  # pragma: no cover
+    _CROSS_NODE_LATENCY = None
+    _PUBLISH_ERRORS = None
+
+logger = logging.getLogger(__name__)
+
+DeliverCallback = Callable[[dict], Awaitable[None]]
+
+
+def make_node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class MemoryBackend:
+    """단일 프로세스용 no-op 백엔드 (기존 동작)."""
+
+    name = "memory"
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        return None
+
+    async def publish(self, event: dict) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+
+class RedisPubSubBackend:
+    """Redis Pub/Sub 기반 멀티 워커 팬아웃.
+
+    redis_client: redis.asyncio.Redis 호환 객체 (테스트에서는 fakeredis.aioredis 사용).
+    미지정 시 REDIS_URL/REDIS_HOST 등에서 URL 을 구성해 lazy 생성.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_client: Any = None, channel: Optional[str] = None, node_id: Optional[str] = None) -> None:
+        self._redis = redis_client
+        self.channel = channel or os.getenv("REALTIME_REDIS_CHANNEL", "realtime:events")
+        self.node_id = node_id or make_node_id()
+        self._pubsub: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._deliver: Optional[DeliverCallback] = None
+
+    def _client(self) -> Any:
+        if self._redis is None:
+            from redis import asyncio as aioredis  # type: ignore
+            from app.utils.redis import _discover_url
+            self._redis = aioredis.Redis.from_url(_discover_url(), decode_responses=True)
+        return self._redis
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        if self._task is not None:
+            return
+        self._deliver = deliver
+        self._pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(), name="realtime-redis-listener")
+
+    async def publish(self, event: dict) -> None:
+        payload = json.dumps({"node": self.node_id, "sent_at": time.time(), "event": event}, default=str)
+        try:
+            await self._client().publish(self.channel, payload)
+        except Exception as e:
+            self._count_error()
+            logger.warning("realtime redis publish failed: %s", e)
+
+    @staticmethod
+    def _count_error() -> None:
+        if _PUBLISH_ERRORS is not None:
+            try:
+                _PUBLISH_ERRORS.inc()
+            except Exception:
+                pass
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                msg = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("realtime redis listener error: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if not msg or msg.get("type") != "message":
+                continue
+            await self._handle(msg.get("data"))
+
+    async def _handle(self, data: Any) -> None:
+        try:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            envelope = json.loads(data)
+        except Exception:
+            return
+        if envelope.get("node") == self.node_id:
+            return  # 자기 노드 이벤트는 publish 시점에 이미 로컬 전달됨
+        sent_at = envelope.get("sent_at")
+        if _CROSS_NODE_LATENCY is not None and isinstance(sent_at, (int, float)):
+            try:
+                _CROSS_NODE_LATENCY.observe(max(0.0, time.time() - sent_at))
+            except Exception:
+                pass
+        event = envelope.get("event")
+        if isinstance(event, dict) and self._deliver is not None:
+            try:
+                await self._deliver(event)
+            except Exception as e:
+                logger.warning("realtime remote delivery failed: %s", e)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+
+def backend_from_env() -> Any:
+    kind = os.getenv("REALTIME_BACKEND", "memory").strip().lower()
+    if kind == "redis":
+        return RedisPubSubBackend()
+    return MemoryBackend()
@@ -0,0 +1,425 @@
+"""알림 브로커 (SSE/WS 구독 + Last-Event-ID 재전송)
+
+routers/notifications 의 manager 인터페이스(register_sse/get_backfill/connect_ws/토픽 필터)를
+실제로 구현한다. 이전 _LegacyCompatManager 는 아무도 쓰지 않는 큐만 반환하는 stub 이었다.
+
+- 이벤트: {"id": 사용자별 단조 증가 정수, "topic", "priority", "ts", "data"}
+- 사용자별 bounded 링 버퍼 (NOTIFY_REPLAY_BUFFER, 기본 200): Last-Event-ID / since 재전송
+  버퍼 보유 사용자 수 상한 NOTIFY_REPLAY_MAX_USERS (기본 10000, LRU 제거)
+- 구독 인덱스: user_id → 전체 토픽 구독자 집합, (user_id, topic) → 토픽 구독자 집합
+  enqueue 는 해당 집합만 조회 (구독자 전체 순회/필터 없음)
+- 구독자별 bounded 우선순위 큐 (NOTIFY_SUBSCRIBER_QUEUE_MAX, 기본 500): 항목 ((-priority, id), event)
+  → 높은 priority 먼저, 같은 priority 는 id 순. 가득 차면 드롭 (클라이언트는 재접속 시 재전송으로 복구)
+- 재개 토큰: 우선순위 때문에 전달 순서 ≠ id 순서이므로 마지막 전달 id 를 Last-Event-ID 로 쓰면
+  아직 큐에 남은 낮은 id 가 재접속 시 건너뛰어진다. 구독자 큐는 "이하 전부 전달된" 커서와
+  커서 위에서 이미 전달된 id 를 추적해 토큰 "<cursor>" 또는 "<cursor>+<id>,<id>" 로 내보내고
+  (SSE id / WS resume), backfill 은 커서 이후를 id 순으로 재전송하되 토큰의 id 는 건너뛴다
+- WS 연결은 연결별 writer 태스크가 큐를 비우며 send_json
+
+선택적 Redis Streams 백엔드 (NOTIFY_BROKER_BACKEND=redis_streams):
+  - id 는 INCR {prefix}:{uid}:seq 로 워커 간 일관 부여
+  - 사용자별 스트림 {prefix}:{uid} (MAXLEN ~ 버퍼 크기): 다른 워커/재시작 후 재전송 소스
+  - 전역 스트림 {prefix}:fanout 을 XREAD 로 구독해 다른 워커 이벤트를 로컬 구독자에 전달
+
+메트릭:
+  notification_broker_fanout_seconds               enqueue → 로컬 구독자 큐 적재 지연
+  notification_broker_buffer_evictions_total{reason=ring|user}
+  notification_broker_dropped_total                구독자 큐 포화 드롭
+  notification_broker_subscribers{kind=sse|ws}
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.metrics import metric
+from .backends import make_node_id
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _FANOUT_SECONDS = Histogram(
+        "notification_broker_fanout_seconds", "Notification broker enqueue to subscriber queue latency",
+        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+    )
+    _EVICTIONS = Counter(
+        "notification_broker_buffer_evictions_total", "Replay buffer evictions", ["reason"]
+    )
+    _DROPPED = Counter("notification_broker_dropped_total", "Events dropped on full subscriber queues")
+    _SUBSCRIBERS = Gauge("notification_broker_subscribers", "Active notification subscribers", ["kind"])
+except Exception:  # pragma: no cover
+    _FANOUT_SECONDS = None
+    _EVICTIONS = None
+    _DROPPED = None
+    _SUBSCRIBERS = None
+
+logger = logging.getLogger(__name__)
+
+# 재개 토큰에 싣는 "커서 위 전달 id" 상한 (초과 시 커서만 → 재접속 시 중복 허용, 유실 없음)
+RESUME_EXTRA_MAX = 64
+
+
+def parse_resume_token(value: Any) -> Tuple[Optional[int], Set[int]]:
+    """Last-Event-ID / lastEventId 해석: "7" → (7, {}), "5+7,9" → (5, {7, 9}). 형식 오류는 ValueError."""
+    if value is None:
+        return None, set()
+    cursor, _, extra = str(value).strip().partition("+")
+    return int(cursor), {int(i) for i in extra.split(",") if i}
+
+
+class SubscriberQueue(asyncio.PriorityQueue):
+    """구독자 1개 = 우선순위 큐 (get() → (sort_key, event)) + 재개 커서 추적."""
+
+    def __init__(self, user_id: int, topics: Optional[Set[str]], kind: str, maxsize: int) -> None:
+        super().__init__(maxsize=maxsize)
+        self.user_id = user_id
+        self.topics = set(topics) if topics else None
+        self.kind = kind
+        self.last_seen = time.monotonic()
+        self._queued: Set[int] = set()
+        self._cursor = 0
+        self._above: Set[int] = set()
+
+    def put_nowait(self, item: Any) -> None:
+        super().put_nowait(item)
+        self._queued.add(item[1]["id"])
+
+    def get_nowait(self) -> Any:
+        # asyncio.Queue.get() 도 내부적으로 get_nowait() 를 거친다
+        item = super().get_nowait()
+        event_id = item[1]["id"]
+        self._queued.discard(event_id)
+        self._above.add(event_id)
+        # 큐에 남은 가장 낮은 id 직전까지는 모두 전달됨 (비었으면 전달한 최대 id 까지)
+        limit = min(self._queued) - 1 if self._queued else max(self._above)
+        self._cursor = max(self._cursor, limit)
+        self._above = {i for i in self._above if i > self._cursor}
+        return item
+
+    def resume_token(self) -> str:
+        if not self._above or len(self._above) > RESUME_EXTRA_MAX:
+            return str(self._cursor)
+        return f"{self._cursor}+" + ",".join(str(i) for i in sorted(self._above))
+
+
+class RedisStreamLog:
+    """Redis Streams 기반 id 부여/재전송/워커 간 팬아웃 (redis.asyncio 호환 클라이언트)."""
+
+    def __init__(self, redis_client: Any = None, prefix: Optional[str] = None, maxlen: int = 200,
+                 fanout_maxlen: int = 10000) -> None:
+        self._redis = redis_client
+        self.prefix = prefix or os.getenv("NOTIFY_STREAM_PREFIX", "notify")
+        self.maxlen = maxlen
+        self.fanout_maxlen = fanout_maxlen
+
+    def _client(self) -> Any:
+        if self._redis is None:
+            from redis import asyncio as aioredis  # type: ignore
+            from app.utils.redis import _discover_url
+            self._redis = aioredis.Redis.from_url(_discover_url(), decode_responses=True)
+        return self._redis
+
+    @property
+    def fanout_key(self) -> str:
+        return f"{self.prefix}:fanout"
+
+    async def next_id(self, user_id: int) -> int:
+        return int(await self._client().incr(f"{self.prefix}:{user_id}:seq"))
+
+    async def append(self, event: Dict[str, Any], node_id: str) -> None:
+        payload = json.dumps(event, default=str)
+        pipe = self._client().pipeline(transaction=False)
+        pipe.xadd(f"{self.prefix}:{event['user_id']}", {"e": payload}, maxlen=self.maxlen, approximate=True)
+        pipe.xadd(self.fanout_key, {"node": node_id, "e": payload}, maxlen=self.fanout_maxlen, approximate=True)
+        await pipe.execute()
+
+    async def since(self, user_id: int, last_event_id: Optional[int]) -> List[Dict[str, Any]]:
+        rows = await self._client().xrange(f"{self.prefix}:{user_id}", "-", "+")
+        events = []
+        for _, fields in rows:
+            raw = fields.get("e") if "e" in fields else fields.get(b"e")
+            try:
+                ev = json.loads(raw)
+            except Exception:
+                continue
+            if last_event_id is None or ev.get("id", 0) > last_event_id:
+                events.append(ev)
+        return events
+
+    async def _tail_id(self) -> str:
+        rows = await self._client().xrevrange(self.fanout_key, "+", "-", count=1)
+        return rows[0][0] if rows else "0-0"
+
+    async def listen(self, node_id: str, deliver) -> None:
+        last: Optional[str] = None
+        while True:
+            try:
+                if last is None:
+                    # "$" 대신 시작 시점 꼬리 id 고정 (XREAD 호출 사이 도착분 유실 방지)
+                    last = await self._tail_id()
+                res = await self._client().xread({self.fanout_key: last}, count=100, block=1000)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("notification stream listener error: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if not res:
+                await asyncio.sleep(0.05)
+                continue
+            for _, entries in res:
+                for entry_id, fields in entries:
+                    last = entry_id
+                    node = fields.get("node") if "node" in fields else fields.get(b"node")
+                    if isinstance(node, bytes):
+                        node = node.decode("utf-8")
+                    if node == node_id:
+                        continue  # 자기 워커 이벤트는 enqueue 시 이미 로컬 전달
+                    raw = fields.get("e") if "e" in fields else fields.get(b"e")
+                    try:
+                        await deliver(json.loads(raw))
+                    except Exception as e:
+                        logger.warning("notification remote delivery failed: %s", e)
+
+
+class NotificationBroker:
+    def __init__(
+        self,
+        replay_size: Optional[int] = None,
+        max_users: Optional[int] = None,
+        queue_max: Optional[int] = None,
+        stream: Optional[RedisStreamLog] = None,
+    ) -> None:
+        self.replay_size = int(replay_size if replay_size is not None else os.getenv("NOTIFY_REPLAY_BUFFER", "200"))
+        self.max_users = int(max_users if max_users is not None else os.getenv("NOTIFY_REPLAY_MAX_USERS", "10000"))
+        self.queue_max = int(queue_max if queue_max is not None else os.getenv("NOTIFY_SUBSCRIBER_QUEUE_MAX", "500"))
+        self.stream = stream
+        self.node_id = make_node_id()
+        # user_id -> 링 버퍼 (id 오름차순), LRU 순서
+        self._buffers: "OrderedDict[int, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._seq: Dict[int, int] = {}
+        # 구독 인덱스
+        self._all: Dict[int, Set[SubscriberQueue]] = {}
+        self._by_topic: Dict[Tuple[int, str], Set[SubscriberQueue]] = {}
+        self._ws: Dict[Any, Tuple[SubscriberQueue, asyncio.Task]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    # ---------------- lifecycle ---------------- #
+    async def start(self) -> None:
+        if self.stream is not None and self._listener is None:
+            self._listener = asyncio.create_task(
+                self.stream.listen(self.node_id, self._deliver_remote), name="notification-stream-listener"
+            )
+
+    async def stop(self) -> None:
+        task, self._listener = self._listener, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    # ---------------- subscription index ---------------- #
+    def _index(self, q: SubscriberQueue) -> None:
+        if q.topics is None:
+            self._all.setdefault(q.user_id, set()).add(q)
+        else:
+            for t in q.topics:
+                self._by_topic.setdefault((q.user_id, t), set()).add(q)
+
+    def _unindex(self, q: SubscriberQueue) -> None:
+        if q.topics is None:
+            bucket = self._all.get(q.user_id)
+            if bucket is not None:
+                bucket.discard(q)
+                if not bucket:
+                    self._all.pop(q.user_id, None)
+        else:
+            for t in q.topics:
+                bucket = self._by_topic.get((q.user_id, t))
+                if bucket is not None:
+                    bucket.discard(q)
+                    if not bucket:
+                        self._by_topic.pop((q.user_id, t), None)
+
+    def _subscribe(self, user_id: int, topics: Optional[Iterable[str]], kind: str) -> SubscriberQueue:
+        q = SubscriberQueue(user_id, set(topics) if topics else None, kind, self.queue_max)
+        self._index(q)
+        metric(_SUBSCRIBERS, "inc", kind=kind)
+        return q
+
+    def _unsubscribe(self, q: SubscriberQueue) -> None:
+        self._unindex(q)
+        metric(_SUBSCRIBERS, "dec", kind=q.kind)
+
+    def subscriber_count(self, user_id: int) -> int:
+        subs = set(self._all.get(user_id, ()))
+        for (uid, _), bucket in self._by_topic.items():
+            if uid == user_id:
+                subs |= bucket
+        return len(subs)
+
+    # ---------------- SSE ---------------- #
+    async def register_sse(self, user_id: int, topics: Optional[Iterable[str]] = None) -> SubscriberQueue:
+        return self._subscribe(user_id, topics, "sse")
+
+    async def unregister_sse(self, user_id: int, q: SubscriberQueue) -> None:
+        self._unsubscribe(q)
+
+    # ---------------- WebSocket ---------------- #
+    async def connect_ws(self, websocket: Any, user_id: int, topics: Optional[Iterable[str]] = None) -> None:
+        await websocket.accept()
+        q = self._subscribe(user_id, topics, "ws")
+        task = asyncio.create_task(self._ws_writer(websocket, q), name=f"notify-ws-{user_id}")
+        self._ws[websocket] = (q, task)
+
+    async def _ws_writer(self, websocket: Any, q: SubscriberQueue) -> None:
+        while True:
+            _, ev = await q.get()
+            try:
+                # resume: 재접속 시 lastEventId 로 돌려줄 토큰 (마지막 id 가 아님, 우선순위 역전 대비)
+                await websocket.send_json(dict(ev, resume=q.resume_token()))
+            except Exception:
+                return
+
+    def disconnect(self, user_id: int, websocket: Any) -> None:
+        entry = self._ws.pop(websocket, None)
+        if entry is None:
+            return
+        q, task = entry
+        self._unsubscribe(q)
+        task.cancel()
+
+    async def update_ws_topics(self, user_id: int, websocket: Any, topics: Optional[Iterable[str]]) -> None:
+        entry = self._ws.get(websocket)
+        if entry is None:
+            return
+        q = entry[0]
+        self._unindex(q)
+        q.topics = set(topics) if topics else None
+        self._index(q)
+
+    async def touch_ws(self, user_id: int, websocket: Any) -> None:
+        entry = self._ws.get(websocket)
+        if entry is not None:
+            entry[0].last_seen = time.monotonic()
+
+    # ---------------- replay ---------------- #
+    def _buffer(self, user_id: int) -> Deque[Dict[str, Any]]:
+        buf = self._buffers.get(user_id)
+        if buf is None:
+            buf = self._buffers[user_id] = deque(maxlen=self.replay_size)
+            while len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+                metric(_EVICTIONS, "inc", reason="user")
+        else:
+            self._buffers.move_to_end(user_id)
+        return buf
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        buf = self._buffer(event["user_id"])
+        if buf and buf[-1]["id"] >= event["id"]:
+            # 워커 간 도착 순서 역전: id 순서 유지 삽입 (드묾)
+            ids = [e["id"] for e in buf]
+            pos = bisect.bisect_left(ids, event["id"])
+            if pos < len(ids) and ids[pos] == event["id"]:
+                return
+            if len(buf) == buf.maxlen:
+                if pos == 0:
+                    return
+                buf.popleft()
+                pos -= 1
+                metric(_EVICTIONS, "inc", reason="ring")
+            buf.insert(pos, event)
+            return
+        if len(buf) == buf.maxlen:
+            metric(_EVICTIONS, "inc", reason="ring")
+        buf.append(event)
+
+    def get_backfill(self, user_id: int, last_event_id: Optional[int]) -> List[Dict[str, Any]]:
+        """로컬 링 버퍼에서 last_event_id 이후 이벤트 (None 이면 버퍼 전체)."""
+        buf = self._buffers.get(user_id)
+        if not buf:
+            return []
+        if last_event_id is None:
+            return list(buf)
+        if buf[0]["id"] > last_event_id:
+            return list(buf)
+        ids = [e["id"] for e in buf]
+        return list(buf)[bisect.bisect_right(ids, last_event_id):]
+
+    async def backfill(self, user_id: int, last_event_id: Optional[int],
+                       skip: Iterable[int] = ()) -> List[Dict[str, Any]]:
+        """last_event_id(재개 커서) 이후를 id 순으로 재전송, skip(토큰의 이미 전달된 id) 제외.
+
+        로컬 버퍼가 요청 구간을 덮지 못하면(다른 워커/재시작) 스트림에서 재전송.
+        """
+        skip = set(skip)
+        events = self.get_backfill(user_id, last_event_id)
+        buf = self._buffers.get(user_id)
+        covered = bool(buf) and last_event_id is not None and buf[0]["id"] <= last_event_id + 1
+        if self.stream is not None and not covered:
+            try:
+                events = await self.stream.since(user_id, last_event_id)
+            except Exception as e:
+                logger.warning("notification stream backfill failed: %s", e)
+        return [e for e in events if e.get("id") not in skip] if skip else events
+
+    # ---------------- publish ---------------- #
+    async def enqueue(self, user_id: int, message: Any, priority: int = 0, topic: Optional[str] = None) -> Dict[str, Any]:
+        if self.stream is not None:
+            event_id = await self.stream.next_id(user_id)
+        else:
+            event_id = self._seq[user_id] = self._seq.get(user_id, 0) + 1
+        event = {
+            "id": event_id,
+            "user_id": user_id,
+            "topic": topic,
+            "priority": int(priority),
+            "ts": time.time(),
+            "data": message,
+        }
+        self._deliver(event)
+        if self.stream is not None:
+            try:
+                await self.stream.append(event, self.node_id)
+            except Exception as e:
+                logger.warning("notification stream append failed: %s", e)
+        return event
+
+    async def _deliver_remote(self, event: Dict[str, Any]) -> None:
+        if isinstance(event, dict) and "id" in event and "user_id" in event:
+            self._deliver(event)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        self._record(event)
+        uid, topic = event["user_id"], event.get("topic")
+        targets: Set[SubscriberQueue] = set(self._all.get(uid, ()))
+        if topic is not None:
+            targets |= self._by_topic.get((uid, topic), set())
+        if targets:
+            item = ((-event["priority"], event["id"]), event)
+            for q in targets:
+                try:
+                    q.put_nowait(item)
+                except asyncio.QueueFull:
+                    metric(_DROPPED, "inc")
+        metric(_FANOUT_SECONDS, "observe", time.perf_counter() - started)
+
+
+def broker_from_env() -> NotificationBroker:
+    kind = os.getenv("NOTIFY_BROKER_BACKEND", "memory").strip().lower()
+    if kind == "redis_streams":
+        size = int(os.getenv("NOTIFY_REPLAY_BUFFER", "200"))
+        return NotificationBroker(replay_size=size, stream=RedisStreamLog(maxlen=size))
+    return NotificationBroker()
+
+
+notification_broker = broker_from_env()
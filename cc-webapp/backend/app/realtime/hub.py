@@ -1,25 +1,169 @@
-"""간단 인메모리 WebSocket 브로드캐스터 (MVP)
+"""WebSocket 브로드캐스터 (로컬 소켓 + 플러그형 팬아웃 백엔드)
 
-확장 고려 사항 (미구현/주석):
-- Redis Pub/Sub 또는 Kafka로 교체 시 이 모듈의 인터페이스 유지
-- backpressure / queue size 제한, disconnect GC 추가 예정
+- broadcast(): 이벤트를 로컬 소켓에 전달하고 백엔드 publish 는 bounded 큐에 적재만 함
+  (전용 publisher 태스크가 백엔드로 전송 → 느린 Redis 가 게임 라우트를 막지 않음)
+  * REALTIME_PUBLISH_QUEUE_MAX (기본 10000): publish 대기 상한, 초과 시 drop + 메트릭
+- 백엔드(app.realtime.backends): memory(기본, 단일 프로세스) | redis(Pub/Sub 멀티 워커)
+  다른 워커가 publish 한 이벤트는 백엔드 구독 태스크가 _deliver_local 로 넘김
+- 퍼유저 스로틀은 워커별 로컬 전달 단계에서 적용
+- 연결별 bounded 송신 큐 + 전용 writer 태스크: broadcast 는 enqueue 만 하고 즉시 반환
+  (느린 소켓이 /games/slot/spin 등 호출 경로를 막지 않음)
+  * REALTIME_SEND_QUEUE_MAX (기본 256): 연결별 대기 메시지 상한
+  * REALTIME_OVERFLOW_POLICY: drop_oldest(기본) | coalesce
+    coalesce 는 상태성 이벤트(_COALESCE_TYPES)를 같은 (type,user_id) 대기 항목과 교체
+  * REALTIME_SEND_TIMEOUT_MS (기본 5000): 단일 send 가 이 시간을 넘기면 stalled 로 보고 연결 제거
 """
 from __future__ import annotations
 
 import asyncio
 import time
 import os
-from typing import Dict, Set, Any
+from collections import deque
+from typing import Dict, Set, Any, Optional, Tuple
+
+from ..utils.metrics import metric
+from .backends import backend_from_env
+
 try:  # optional prometheus metrics
     from prometheus_client import Gauge, Counter  # type: ignore
     _REALTIME_ACTIVE_USERS = Gauge("realtime_active_users", "Active users with WS connections")
     _REALTIME_EVENTS_TOTAL = Counter("realtime_events_total", "Total realtime events broadcasted")
+    _REALTIME_QUEUE_DEPTH = Gauge("realtime_send_queue_depth", "Messages waiting in per-connection send queues")
+    _REALTIME_DROPPED_TOTAL = Counter(
+        "realtime_send_dropped_total", "Messages dropped from per-connection send queues", ["reason"]
+    )
+    _REALTIME_EVICTIONS_TOTAL = Counter(
+        "realtime_evictions_total", "Connections evicted as slow/broken consumers", ["reason"]
+    )
+    _REALTIME_PUBLISH_DROPPED_TOTAL = Counter(
+        "realtime_publish_dropped_total", "Events dropped because the backend publish queue was full"
+    )
 except Exception:  # pragma: no cover
     _REALTIME_ACTIVE_USERS = None
     _REALTIME_EVENTS_TOTAL = None
+    _REALTIME_QUEUE_DEPTH = None
+    _REALTIME_DROPPED_TOTAL = None
+    _REALTIME_EVICTIONS_TOTAL = None
+    _REALTIME_PUBLISH_DROPPED_TOTAL = None
+
+# 최신 값만 의미 있는 상태성 이벤트 (coalesce 정책 대상)
+_COALESCE_TYPES = {"balance_update", "profile_update", "stats_update", "streak_update"}
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)))
+    except ValueError:
+        return default
+
+
+class _SendQueue:
+    """연결 1개의 bounded 송신 큐 + writer 태스크.
+
+    enqueue 는 동기/논블로킹. writer 는 연결이 등록된 이벤트 루프에서 실행되며,
+    다른 루프(스레드)에서 enqueue 된 경우 call_soon_threadsafe 로 깨운다.
+    """
+
+    def __init__(self, hub: "RealtimeHub", ws: Any, maxsize: int, policy: str, send_timeout: float) -> None:
+        self.hub = hub
+        self.ws = ws
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self._items: deque[Tuple[Optional[tuple], str]] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self._task = self._loop.create_task(self._writer())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def enqueue(self, text: str, key: Optional[tuple] = None) -> None:
+        if self._closed:
+            return
+        if key is not None and self.policy == "coalesce":
+            for i, (k, _) in enumerate(self._items):
+                if k == key:
+                    self._items[i] = (key, text)
+                    metric(_REALTIME_DROPPED_TOTAL, "inc", reason="coalesced")
+                    return
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            metric(_REALTIME_DROPPED_TOTAL, "inc", reason="overflow")
+            metric(_REALTIME_QUEUE_DEPTH, "dec")
+        self._items.append((key, text))
+        metric(_REALTIME_QUEUE_DEPTH, "inc")
+        self._notify()
+
+    def _notify(self) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._idle.clear()
+            self._wakeup.set()
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._wake_from_other_loop)
+            except RuntimeError:
+                pass  # 루프 종료됨
+
+    def _wake_from_other_loop(self) -> None:
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def _writer(self) -> None:
+        while not self._closed:
+            if not self._items:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, text = self._items.popleft()
+            metric(_REALTIME_QUEUE_DEPTH, "dec")
+            try:
+                await asyncio.wait_for(self.ws.send_text(text), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                await self.hub._evict(self.ws, "timeout")
+                return
+            except Exception:
+                await self.hub._evict(self.ws, "error")
+                return
+
+    async def wait_idle(self) -> None:
+        if self._closed:
+            return
+        await self._idle.wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        metric(_REALTIME_QUEUE_DEPTH, "dec", len(self._items))
+        self._items.clear()
+        self._idle.set()
+        current = None
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            pass
+        if self._task is not current and not self._task.done():
+            try:
+                self._task.cancel()
+            except RuntimeError:
+                pass
 
 class RealtimeHub:
-    def __init__(self) -> None:
+    def __init__(self, backend: Any = None) -> None:
+        # 팬아웃 백엔드 (None → REALTIME_BACKEND 환경변수 기반)
+        self._backend = backend if backend is not None else backend_from_env()
+        self._started = False
         # user_id -> set(WebSocket-like) ; WebSocket은 .send_text(str) 지원 필요
         self._user_channels: Dict[int, Set[Any]] = {}
         # monitor(관리) 채널(전체 세션 관찰)
@@ -36,10 +180,141 @@ class RealtimeHub:
         except ValueError:
             ms = 300.0
         self._min_interval = ms / 1000.0
+        # 연결별 송신 큐 (ws -> _SendQueue)
+        self._queues: Dict[Any, _SendQueue] = {}
+        self._queue_max = int(_env_float("REALTIME_SEND_QUEUE_MAX", 256))
+        policy = os.getenv("REALTIME_OVERFLOW_POLICY", "drop_oldest").strip().lower()
+        self._overflow_policy = policy if policy in {"drop_oldest", "coalesce"} else "drop_oldest"
+        self._send_timeout = _env_float("REALTIME_SEND_TIMEOUT_MS", 5000) / 1000.0
+        # 백엔드 publish 큐 + publisher 태스크 (start 에서 생성)
+        self._publish_max = max(1, int(_env_float("REALTIME_PUBLISH_QUEUE_MAX", 10000)))
+        self._publish_queue: Optional[asyncio.Queue] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def backend(self) -> Any:
+        return self._backend
+
+    def set_backend(self, backend: Any) -> None:
+        """백엔드 교체 (start 이전에만 호출)."""
+        if self._started:
+            raise RuntimeError("RealtimeHub backend cannot be replaced after start()")
+        self._backend = backend
+
+    async def start(self) -> None:
+        """백엔드 구독 시작 (lifespan startup). 멱등."""
+        if self._started:
+            return
+        await self._backend.start(self._deliver_local)
+        self._loop = asyncio.get_running_loop()
+        self._publish_queue = asyncio.Queue(maxsize=self._publish_max)
+        self._publisher = asyncio.create_task(self._publish_loop(), name="realtime-hub-publisher")
+        self._started = True
+
+    async def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        queue, task = self._publish_queue, self._publisher
+        self._publish_queue, self._publisher = None, None
+        # 남은 publish 를 best-effort 로 비운 뒤 publisher/백엔드 종료
+        if queue is not None:
+            try:
+                await asyncio.wait_for(queue.join(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await self._backend.stop()
+
+    async def _publish(self, event: dict[str, Any]) -> None:
+        try:
+            await self._backend.publish(event)
+        except Exception:
+            pass
+
+    async def _publish_loop(self) -> None:
+        assert self._publish_queue is not None
+        queue = self._publish_queue
+        while True:
+            event = await queue.get()
+            try:
+                await self._publish(event)
+            finally:
+                queue.task_done()
+
+    def _put_publish(self, event: dict[str, Any]) -> None:
+        queue = self._publish_queue
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            metric(_REALTIME_PUBLISH_DROPPED_TOTAL, "inc")
+
+    def _enqueue_publish(self, event: dict[str, Any]) -> None:
+        """publish 큐 적재 (논블로킹). 다른 루프(스레드)에서 호출되면 허브 루프로 넘긴다."""
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or running is loop:
+            self._put_publish(event)
+            return
+        try:
+            loop.call_soon_threadsafe(self._put_publish, event)
+        except RuntimeError:
+            pass  # 허브 루프 종료됨
+
+    def _attach_queue(self, ws: Any) -> None:
+        if ws not in self._queues:
+            self._queues[ws] = _SendQueue(self, ws, self._queue_max, self._overflow_policy, self._send_timeout)
+
+    def _detach_queue(self, ws: Any) -> None:
+        q = self._queues.pop(ws, None)
+        if q is not None:
+            q.close()
+
+    async def _evict(self, ws: Any, reason: str) -> None:
+        """send 실패/지연 연결 제거 (writer 태스크에서 호출)."""
+        async with self._lock:
+            for uid, bucket in list(self._user_channels.items()):
+                if ws in bucket:
+                    bucket.discard(ws)
+                    if not bucket:
+                        self._user_channels.pop(uid, None)
+            self._monitor.discard(ws)
+            self._detach_queue(ws)
+            metric(_REALTIME_ACTIVE_USERS, "set", len(self._user_channels))
+        metric(_REALTIME_EVICTIONS_TOTAL, "inc", reason=reason)
+        close = getattr(ws, "close", None)
+        if close is not None:
+            try:
+                # 1013: Try Again Later (slow consumer)
+                await asyncio.wait_for(close(code=1013), timeout=1.0)
+            except Exception:
+                pass
+
+    async def flush(self, timeout: float = 5.0) -> None:
+        """모든 송신 큐가 비워질 때까지 대기 (테스트/종료 훅)."""
+        queues = list(self._queues.values())
+        if queues:
+            await asyncio.wait_for(asyncio.gather(*(q.wait_idle() for q in queues)), timeout=timeout)
+
+    def queue_depths(self) -> Dict[str, int]:
+        depths = [len(q) for q in self._queues.values()]
+        return {"connections": len(depths), "queued": sum(depths), "max": max(depths, default=0)}
 
     async def register_user(self, user_id: int, ws: Any) -> None:
         async with self._lock:
             self._user_channels.setdefault(user_id, set()).add(ws)
+            self._attach_queue(ws)
             if _REALTIME_ACTIVE_USERS is not None:
                 try:
                     _REALTIME_ACTIVE_USERS.set(len(self._user_channels))
@@ -53,6 +328,8 @@ class RealtimeHub:
                 bucket.remove(ws)
                 if not bucket:
                     self._user_channels.pop(user_id, None)
+                if ws not in self._monitor:
+                    self._detach_queue(ws)
             if _REALTIME_ACTIVE_USERS is not None:
                 try:
                     _REALTIME_ACTIVE_USERS.set(len(self._user_channels))
@@ -62,10 +339,13 @@ class RealtimeHub:
     async def register_monitor(self, ws: Any) -> None:
         async with self._lock:
             self._monitor.add(ws)
+            self._attach_queue(ws)
 
     async def unregister_monitor(self, ws: Any) -> None:
         async with self._lock:
             self._monitor.discard(ws)
+            if not any(ws in bucket for bucket in self._user_channels.values()):
+                self._detach_queue(ws)
 
     def _remember(self, event: dict[str, Any]) -> None:
         event.setdefault("ts", time.time())
@@ -77,21 +357,41 @@ class RealtimeHub:
     async def broadcast(self, event: dict[str, Any]) -> None:
         """모니터 + 사용자 타겟 브로드캐스트.
         event 예시: {"type":"game_event","user_id":123,"game_type":"slot", ...}
+
+        로컬 소켓 전달 후 백엔드 publish 는 큐에 적재만 한다 (다른 워커는 구독 경로로 수신).
+        start() 이전(스크립트 등)에는 publish 를 직접 기다린다.
         """
-        self._remember(event)
+        event.setdefault("ts", time.time())
         if _REALTIME_EVENTS_TOTAL is not None:
             try:
                 _REALTIME_EVENTS_TOTAL.inc()
             except Exception:
                 pass
+        await self._deliver_local(event)
+        if self._publish_queue is None:
+            await self._publish(event)
+            return
+        self._enqueue_publish(event)
+
+    async def _deliver_local(self, event: dict[str, Any]) -> None:
+        """이 워커가 보유한 소켓의 송신 큐에 적재 (스로틀 포함, 네트워크 대기 없음)."""
+        # user_ids: 다중 사용자 팬아웃(캠페인 청크 등). 수신자 목록은 전송 본문에서 제외
+        fanout = event.get("user_ids")
+        payload = {k: v for k, v in event.items() if k != "user_ids"} if fanout else event
+        self._remember(payload)
         text = None
         try:
             import json
-            text = json.dumps(event, default=str)
+            text = json.dumps(payload, default=str)
         except Exception:
             return
         targets: Set[Any] = set()
         async with self._lock:
+            if fanout:
+                for fid in fanout:
+                    bucket = self._user_channels.get(fid)
+                    if bucket:
+                        targets |= bucket
             uid = event.get("user_id")
             # 스로틀 적용(모니터 채널 제외) - user_id가 있고 type이 balance_update/reward_grant/game_session/game_event 등 빈번 이벤트인 경우
             throttled = False
@@ -109,17 +409,15 @@ class RealtimeHub:
                 if not throttled:
                     targets |= self._user_channels[uid]
             targets |= self._monitor
-        if not targets:
-            return
-        coros = []
-        for ws in list(targets):
-            try:
-                coros.append(ws.send_text(text))
-            except Exception:
-                # 개별 오류 무시
-                pass
-        if coros:
-            await asyncio.gather(*coros, return_exceptions=True)
+            if not targets:
+                return
+            evt_type = event.get("type")
+            key = (evt_type, uid) if evt_type in _COALESCE_TYPES else None
+            # enqueue 만 수행 (네트워크 I/O 는 연결별 writer 태스크가 담당)
+            for ws in targets:
+                q = self._queues.get(ws)
+                if q is not None:
+                    q.enqueue(text, key)
 
     async def snapshot_for_monitor(self) -> dict[str, Any]:
         async with self._lock:
@@ -127,6 +425,7 @@ class RealtimeHub:
                 "type": "monitor_snapshot",
                 "active_users": len(self._user_channels),
                 "connections": sum(len(v) for v in self._user_channels.values()),
+                "send_queues": self.queue_depths(),
                 "recent_events": self._recent_events[-20:],
             }
 
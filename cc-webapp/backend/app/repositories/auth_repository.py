@@ -105,6 +105,8 @@ class AuthRepository(BaseRepository[models.User]):
             if user:
                 user.is_active = False
                 self.db.commit()
+                from ..services.principal_cache import get_principal_cache  # services → repositories 순환 import 회피
+                get_principal_cache().invalidate_user(user_id)
                 logger.info(f"User {user_id} deactivated")
                 return True
             return False
@@ -319,6 +321,8 @@ class SessionRepository(BaseRepository[UserSession]):
             if session:
                 session.is_active = False
                 self.db_session.commit()
+                from ..services.principal_cache import get_principal_cache  # services → repositories 순환 import 회피
+                get_principal_cache().invalidate_user(session.user_id)
                 logger.info(f"Session invalidated for user_id {session.user_id}")
                 return True
             return False
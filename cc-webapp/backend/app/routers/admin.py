@@ -845,12 +845,28 @@ async def cancel_campaign(
     camp = db.query(models.NotificationCampaign).filter(models.NotificationCampaign.id == campaign_id).first()
     if not camp:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    if camp.status != "scheduled":
-        raise HTTPException(status_code=400, detail="Only scheduled campaigns can be cancelled")
+    # 발송은 user_id 커서 청크 단위로 커밋되므로 발송 중(sending) 캠페인도 취소 가능:
+    # 이미 커밋된 청크(dispatch_cursor 까지)의 알림은 유지되고, 디스패처는 다음 청크 커밋 시 중단
+    if camp.status not in ("scheduled", "sending"):
+        raise HTTPException(status_code=400, detail="Only scheduled or sending campaigns can be cancelled")
+    previous = camp.status
     camp.status = "cancelled"
     db.add(camp)
     db.commit()
-    return {"success": True}
+    if previous == "sending":
+        message = (
+            f"Dispatch stops at the next chunk; {camp.dispatched_count or 0} notifications already created "
+            f"(through user_id {camp.dispatch_cursor or 0}) are kept"
+        )
+    else:
+        message = "Cancelled before dispatch; no notifications were created"
+    return {
+        "success": True,
+        "previous_status": previous,
+        "dispatched_count": camp.dispatched_count or 0,
+        "dispatch_cursor": camp.dispatch_cursor or 0,
+        "message": message,
+    }
 
 # ====== Shop Transactions (Admin) ======
 from ..services.shop_service import ShopService
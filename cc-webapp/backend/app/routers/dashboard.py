@@ -12,7 +12,7 @@ from ..utils.redis import (
 )
 from ..utils.streak_utils import calc_next_streak_reward
 
-from ..services.dashboard_service import DashboardService
+from ..services.snapshot_service import DASHBOARD, get_snapshot_store
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..models.game_models import UserReward
@@ -24,21 +24,22 @@ router = APIRouter(
     tags=["Dashboard"],
 )
 
+# 플랫폼 집계(main/games/social_proof)는 공유 스냅샷(services/snapshot_service "dashboard")에서 제공.
+# producer 가 SNAPSHOT_DASHBOARD_INTERVAL_SEC 마다 1회 계산, 부재 시 요청 세션으로 single-flight 재계산.
+
 @router.get("/main")
 def get_main_dashboard(db = Depends(get_db)):
     """
     Get main dashboard statistics.
     """
-    dashboard_service = DashboardService(db)
-    return dashboard_service.get_main_dashboard_stats()
+    return get_snapshot_store().get(DASHBOARD, db).data["main"]
 
 @router.get("/games")
 def get_games_dashboard(db = Depends(get_db)):
     """
     Get game-specific dashboard statistics.
     """
-    dashboard_service = DashboardService(db)
-    return dashboard_service.get_game_dashboard_stats()
+    return get_snapshot_store().get(DASHBOARD, db).data["games"]
 
 @router.get("/social-proof")
 def get_social_proof(db = Depends(get_db)):
@@ -46,8 +47,7 @@ def get_social_proof(db = Depends(get_db)):
     Get statistics for social proof widgets.
     This endpoint is not protected by admin auth to be publicly available.
     """
-    dashboard_service = DashboardService(db)
-    return dashboard_service.get_social_proof_stats()
+    return get_snapshot_store().get(DASHBOARD, db).data["social_proof"]
 
 
 @router.get("", summary="Unified dashboard aggregate")
@@ -68,11 +68,11 @@ def get_unified_dashboard(
       "_meta": {"generated_at": "2025-08-21T12:34:56Z"}
     }
     """
-    service = DashboardService(db)
     try:
-        main_stats = service.get_main_dashboard_stats()
-        game_stats = service.get_game_dashboard_stats()
-        social = service.get_social_proof_stats()
+        snapshot = get_snapshot_store().get(DASHBOARD, db).data
+        main_stats = snapshot["main"]
+        game_stats = snapshot["games"]
+        social = snapshot["social_proof"]
     except Exception as e:  # 방어적 처리, 부분 실패 시 500
         raise HTTPException(status_code=500, detail=f"dashboard aggregation failed: {e}")
 
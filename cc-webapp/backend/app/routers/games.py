@@ -15,6 +15,10 @@ from ..models.game_models import Game, UserAction, GameSession as GameSessionMod
 from ..services.simple_user_service import SimpleUserService
 from ..services.game_service import GameService
 from ..services.history_service import log_game_history
+from ..services.game_round import GameRound
+from ..core.exceptions import InsufficientBalanceError
+from ..services.leaderboard_service import get_leaderboard_service
+from ..services.activity_streak_service import activity_streak
 from ..services.achievement_service import AchievementService
 from pydantic import BaseModel, ConfigDict
 
@@ -33,18 +37,12 @@ from ..schemas.game_schemas import (
     RPSPlayRequest, RPSPlayResponse,
     GachaPullRequest, GachaPullResponse,
     CrashBetRequest, CrashBetResponse,
-    GameStats, ProfileGameStats, Achievement, GameSession, GameLeaderboard
+    GameStats, ProfileGameStats, Achievement, GameSession, GameLeaderboard, LeaderboardEntry
 )
 from app import models
 from sqlalchemy import text, func
-from ..utils.redis import update_streak_counter
+from ..utils.redis import get_async_redis_manager
 from ..core.config import settings
-try:  # Kafka optional import
-    from app.messaging.kafka import get_kafka_producer  # type: ignore
-except Exception:  # pragma: no cover
-    def get_kafka_producer():  # type: ignore
-        return None
-
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/games", tags=["Games"])
 # Legacy WS usage counter (Prometheus optional)
@@ -64,36 +62,6 @@ except Exception:  # pragma: no cover
     _legacy_ws_conn_total = None  # type: ignore
     _legacy_ws_conn_by_result = None  # type: ignore
 
-# ---------------------------------------------------------------------------
-# 표준 사용자 액션 로깅 헬퍼
-# 통일된 envelope: {"v":1, "type":action_type, "ts": iso8601, "data": <payload dict>}
-# data 내부는 각 게임/행동별 스키마 (bet_amount, win_amount 등). 문자열 저장 (Text 컬럼) 최종 직렬화.
-def _log_user_action(db: Session, *, user_id: int, action_type: str, data: Dict[str, Any]) -> None:
-    try:
-        envelope = {
-            "v": 1,
-            "type": action_type,
-            "ts": datetime.utcnow().isoformat() + "Z",
-            "data": data,
-        }
-        ua = UserAction(user_id=user_id, action_type=action_type, action_data=_json.dumps(envelope, ensure_ascii=False))
-        db.add(ua)
-        db.commit()
-        # Kafka publish (best-effort)
-        try:
-            producer = get_kafka_producer()
-            if producer:
-                topic = getattr(settings, "KAFKA_USER_ACTION_TOPIC", "topic_user_actions")
-                producer.produce(topic, _json.dumps(envelope, ensure_ascii=False).encode("utf-8"))  # type: ignore
-        except Exception as ke:  # pragma: no cover
-            logger.debug(f"kafka publish skipped: {ke}")
-    except Exception as e:  # 실패 허용 (게임 진행 차단 X)
-        try:
-            db.rollback()
-        except Exception:
-            pass
-        logger.warning(f"user_action log failed action_type={action_type}: {e}")
-
 # ---------------------------------------------------------------------------
 # 공통 피드백 헬퍼
 # code 네이밍 규칙: <domain>.<event>[.<qualifier>]  / severity: info|success|warning|loss
@@ -644,12 +612,15 @@ async def spin_slot(
     슬롯머신 스핀
     """
     bet_amount = request.bet_amount
-    
-    # 잔액 확인 (토큰 잔액)
-    current_tokens = SimpleUserService.get_user_tokens(db, current_user.id)
-    if current_tokens < bet_amount:
-        raise HTTPException(status_code=400, detail="토큰이 부족합니다")
-    
+    redis_async = get_async_redis_manager()
+
+    # 스트릭/변동 보상: 플레이 스트릭(24h TTL) 기반 승리 보너스. 슬롯 플레이 스트릭은 "플레이 연속 시도" 기준(승패 무관).
+    # Redis 왕복은 라운드(사용자 행 잠금) 전에: 이번 스핀 포함 값 = 현재 + 1, 실제 증가는 commit 이후
+    try:
+        streak_count = await redis_async.get_streak_counter(str(current_user.id), "SLOT_SPIN") + 1
+    except Exception:
+        streak_count = 0
+
     # 슬롯 결과 생성
     # Load symbol weights from settings with safe fallback
     cfg_weights = getattr(settings, 'SLOT_SYMBOL_WEIGHTS', None) or {
@@ -668,23 +639,21 @@ async def spin_slot(
     elif reels[0] == reels[1] or reels[1] == reels[2]:
         win_amount = int(bet_amount * 1.5)
     
-    # 스트릭/변동 보상: 플레이 스트릭 증가(24h TTL) 및 소폭 보너스 가중치
-    # 슬롯 플레이 스트릭은 "플레이 연속 시도" 기준으로 증가(승패 무관). 보너스는 승리 시에만 적용.
-    streak_count = 0
-    try:
-        streak_count = update_streak_counter(str(current_user.id), "SLOT_SPIN", increment=True)
-    except Exception:
-        streak_count = 0
-
     if win_amount > 0:
         # 최대 +20%까지 승리 보너스 (연속 시도 기반) + 경미한 랜덤 변동(±5%)
         bonus_multiplier = 1.0 + min(max(streak_count, 0) * 0.02, 0.20)
         rng_variation = random.uniform(0.95, 1.05)
         win_amount = int(win_amount * bonus_multiplier * rng_variation)
 
-    # 잔액 업데이트
-    new_balance = SimpleUserService.update_user_tokens(db, current_user.id, -bet_amount + win_amount)
-    
+    # 라운드 단위 작업: 잔액/액션/히스토리 1 트랜잭션, 부수효과는 commit 이후
+    # 잔액 갱신: 잔액 확인 + 차감/지급을 조건부 원자 UPDATE 1회로 (잠금 구간에 await 없음)
+    rnd = GameRound(db, current_user.id, "slot")
+    try:
+        new_balance = rnd.apply_balance(-bet_amount + win_amount, require=bet_amount)
+    except InsufficientBalanceError:
+        rnd.rollback()
+        raise HTTPException(status_code=400, detail="토큰이 부족합니다")
+
     # 플레이 기록 저장
     action_data = {
         "game_type": "slot",
@@ -694,45 +663,39 @@ async def spin_slot(
         "is_jackpot": reels[0] == '7️⃣' and reels[0] == reels[1] == reels[2]
     }
     
-    _log_user_action(
-        db,
-        user_id=current_user.id,
-        action_type="SLOT_SPIN",
-        data={**action_data, "streak": streak_count}
-    )
-    
+    rnd.log_action("SLOT_SPIN", {**action_data, "streak": streak_count})
+
     message = "Jackpot!" if action_data["is_jackpot"] else ("Win" if win_amount > 0 else "Better luck next time")
     # SlotSpinResponse expects reels as List[List[str]]
     reels_matrix = [reels]
     # Derive an effective multiplier for reference (0 on lose)
     eff_multiplier = 0.0 if bet_amount <= 0 else round(win_amount / float(bet_amount), 2)
-    # GameHistory 로그 (return 이전)
+    # GameHistory (업적 증분 집계 포함)
+    rnd.log_history(
+        "WIN" if win_amount > 0 else "BET",
+        delta_coin=-bet_amount + win_amount,
+        result_meta={"reels": reels, "bet": bet_amount, "win": win_amount, "jackpot": action_data["is_jackpot"], "streak": streak_count}
+    )
+    # 실시간 브로드캐스트 (commit 이후 예약, 실패 허용)
+    rnd.broadcast({
+        "type": "game_event",
+        "subtype": "slot_spin",
+        "user_id": current_user.id,
+        "game_type": "slot",
+        "bet": bet_amount,
+        "win": win_amount,
+        "reels": reels,
+        "jackpot": action_data["is_jackpot"],
+        "streak": streak_count,
+    })
     try:
-        delta = -bet_amount + win_amount
-        log_game_history(
-            db,
-            user_id=current_user.id,
-            game_type="slot",
-            action_type="WIN" if win_amount > 0 else "BET",
-            delta_coin=delta,
-            result_meta={"reels": reels, "bet": bet_amount, "win": win_amount, "jackpot": action_data["is_jackpot"], "streak": streak_count}
-        )
+        rnd.commit()
     except Exception as e:
-        logger.warning(f"slot spin history log failed: {e}")
-    # 실시간 브로드캐스트 (실패 허용)
+        rnd.rollback()
+        logger.error(f"slot spin commit failed: {e}")
+        raise HTTPException(status_code=500, detail="슬롯 처리 오류")
     try:
-        from ..realtime import hub
-        await hub.broadcast({
-            "type": "game_event",
-            "subtype": "slot_spin",
-            "user_id": current_user.id,
-            "game_type": "slot",
-            "bet": bet_amount,
-            "win": win_amount,
-            "reels": reels,
-            "jackpot": action_data["is_jackpot"],
-            "streak": streak_count,
-        })
+        await redis_async.update_streak_counter(str(current_user.id), "SLOT_SPIN", increment=True)
     except Exception:
         pass
     near_miss_anim = 'near_miss' if win_amount == 0 and (reels[0] == reels[1] or reels[1] == reels[2]) else None
@@ -773,12 +736,7 @@ async def play_rps(
     """
     user_choice = request.choice
     bet_amount = request.bet_amount
-    
-    # 잔액 확인
-    current_tokens = SimpleUserService.get_user_tokens(db, current_user.id)
-    if current_tokens < bet_amount:
-        raise HTTPException(status_code=400, detail="토큰이 부족합니다")
-    
+
     # AI 선택
     choices = ['rock', 'paper', 'scissors']
     ai_choice = random.choice(choices)
@@ -801,9 +759,14 @@ async def play_rps(
         result = 'lose'
         win_amount = 0
     
-    # 잔액 업데이트
-    new_balance = SimpleUserService.update_user_tokens(db, current_user.id, -bet_amount + win_amount)
-    
+    # 잔액 갱신: 잔액 확인 + 차감/지급을 조건부 원자 UPDATE 1회로 (라운드 트랜잭션)
+    rnd = GameRound(db, current_user.id, "rps")
+    try:
+        new_balance = rnd.apply_balance(-bet_amount + win_amount, require=bet_amount)
+    except InsufficientBalanceError:
+        rnd.rollback()
+        raise HTTPException(status_code=400, detail="토큰이 부족합니다")
+
     # 플레이 기록 저장
     action_data = {
         "game_type": "rps",
@@ -814,48 +777,38 @@ async def play_rps(
         "result": result
     }
     
-    _log_user_action(
-        db,
-        user_id=current_user.id,
-        action_type="RPS_PLAY",
-        data=action_data
-    )
-    
+    rnd.log_action("RPS_PLAY", action_data)
+
     # Build response matching schema
     message_map = {
         'win': 'You win!',
         'lose': 'You lose!',
         'draw': 'It\'s a draw.'
     }
-    # GameHistory 로그 (return 이전)
+    # GameHistory (업적 증분 집계 포함)
+    rnd.log_history(
+        "WIN" if result == 'win' else ("DRAW" if result == 'draw' else "BET"),
+        delta_coin=-bet_amount + win_amount,
+        result_meta={"bet": bet_amount, "user_choice": user_choice, "ai_choice": ai_choice, "result": result}
+    )
+    # 실시간 브로드캐스트 (commit 이후 예약, 실패 허용)
+    rnd.broadcast({
+        "type": "game_event",
+        "subtype": "rps_play",
+        "user_id": current_user.id,
+        "game_type": "rps",
+        "bet": bet_amount,
+        "win": win_amount,
+        "result": result,
+        "user_choice": user_choice,
+        "ai_choice": ai_choice,
+    })
     try:
-        delta = -bet_amount + win_amount
-        log_game_history(
-            db,
-            user_id=current_user.id,
-            game_type="rps",
-            action_type="WIN" if result == 'win' else ("DRAW" if result == 'draw' else "BET"),
-            delta_coin=delta,
-            result_meta={"bet": bet_amount, "user_choice": user_choice, "ai_choice": ai_choice, "result": result}
-        )
+        rnd.commit()
     except Exception as e:
-        logger.warning(f"rps play history log failed: {e}")
-    # 실시간 브로드캐스트 (실패 허용)
-    try:
-        from ..realtime import hub
-        await hub.broadcast({
-            "type": "game_event",
-            "subtype": "rps_play",
-            "user_id": current_user.id,
-            "game_type": "rps",
-            "bet": bet_amount,
-            "win": win_amount,
-            "result": result,
-            "user_choice": user_choice,
-            "ai_choice": ai_choice,
-        })
-    except Exception:
-        pass
+        rnd.rollback()
+        logger.error(f"rps play commit failed: {e}")
+        raise HTTPException(status_code=500, detail="가위바위보 처리 오류")
     return {
         'success': True,
         'player_choice': user_choice,
@@ -948,41 +901,39 @@ async def pull_gacha(
     # special_animation: mirror animation_type for non-normal states for easier FE handling
     special_anim = last_animation if (last_animation in {"near_miss", "epic", "legendary", "pity"}) else None
 
-    # 표준 사용자 액션 로깅 (요약 데이터)
-    try:
-        summary = {
-            "game_type": "gacha",
-            "pull_count": pull_count,
-            "rare_count": rare_count,
-            "ultra_rare_count": ultra_rare_count,
-            "anim": special_anim,
-            "last_animation": last_animation,
-            "items_sample": items[:3],  # 과도한 길이 방지
-        }
-        _log_user_action(
-            db,
-            user_id=current_user.id,
-            action_type="GACHA_PULL",
-            data=summary,
-        )
-    except Exception:
-        pass
-
-    # 실시간 브로드캐스트 (실패 허용)
+    # 액션/히스토리 기록 + 브로드캐스트를 라운드 단위로 (commit 1회, 부수효과는 commit 이후)
+    # 잔액 차감/아이템 지급은 GachaService 내부 트랜잭션에서 이미 처리됨
+    rnd = GameRound(db, current_user.id, "gacha")
+    rnd.log_action("GACHA_PULL", {
+        "game_type": "gacha",
+        "pull_count": pull_count,
+        "rare_count": rare_count,
+        "ultra_rare_count": ultra_rare_count,
+        "anim": special_anim,
+        "last_animation": last_animation,
+        "items_sample": items[:3],  # 과도한 길이 방지
+    })
+    # GameHistory (리더보드/집계 공통 경로)
+    rnd.log_history(
+        "PULL",
+        delta_coin=net_change or 0,
+        result_meta={"pull_count": pull_count, "rare_count": rare_count, "ultra_rare_count": ultra_rare_count},
+    )
+    rnd.broadcast({
+        "type": "game_event",
+        "subtype": "gacha_pull",
+        "user_id": current_user.id,
+        "game_type": "gacha",
+        "pull_count": pull_count,
+        "rare": rare_count,
+        "ultra_rare": ultra_rare_count,
+        "anim": special_anim,
+    })
     try:
-        from ..realtime import hub
-        await hub.broadcast({
-            "type": "game_event",
-            "subtype": "gacha_pull",
-            "user_id": current_user.id,
-            "game_type": "gacha",
-            "pull_count": pull_count,
-            "rare": rare_count,
-            "ultra_rare": ultra_rare_count,
-            "anim": special_anim,
-        })
-    except Exception:
-        pass
+        rnd.commit()
+    except Exception as e:  # 기록 실패는 뽑기 결과에 영향 없음 (기존 동작과 동일)
+        rnd.rollback()
+        logger.warning(f"gacha pull history log failed: {e}")
     # feedback 구성
     qualifier = None
     if last_animation in {"legendary", "epic"}:
@@ -1022,31 +973,20 @@ async def place_crash_bet(
     """
     크래시 게임 베팅 (단일 요청 내 시뮬레이션) 
     개선 사항:
-    - 사용자 잔액 차감/승리 가산 단일 트랜잭션 처리
-    - 동시 중복 제출 방지용 행 잠금(SELECT ... FOR UPDATE) 기반 멱등 (초간단)
-    - broadcast 에 status 추가 (placed|auto_cashed)
+    - 사용자 잔액 차감/승리 가산 + 액션/세션/통계/히스토리 단일 트랜잭션 처리 (GameRound)
+    - 잔액은 조건부 원자 UPDATE ... RETURNING (동시 중복 제출에도 음수/이중 차감 없음)
+    - broadcast 에 status 추가 (placed|auto_cashed), commit 이후 예약
     - potential_win 과 별도로 simulated_max_win 제공 (auto_cashout 미지정 시 혼동 제거)
     """
     bet_amount = request.bet_amount
     auto_cashout_multiplier = request.auto_cashout_multiplier
 
-    # ---- 트랜잭션 스코프 시작 ----
-    from sqlalchemy import select, text as _text
+    # ---- 트랜잭션 스코프 시작 (라운드 단위 작업) ----
     from sqlalchemy.exc import SQLAlchemyError
-    from ..models.auth_models import User as UserModel
-    from ..core import economy
     from ..core.config import settings as _settings
 
+    rnd = GameRound(db, current_user.id, "crash")
     try:
-        # 사용자 행 잠금 (비관적 락) → 동시 중복 베팅 중복 차감 방지
-        user_row = db.execute(
-            select(UserModel).where(UserModel.id == current_user.id).with_for_update()
-        ).scalar_one_or_none()
-        if not user_row:
-            raise HTTPException(status_code=404, detail="사용자 없음")
-        if user_row.gold_balance < bet_amount:
-            raise HTTPException(status_code=400, detail="골드가 부족합니다")
-
         import uuid, random as _r
         game_id = str(uuid.uuid4())
 
@@ -1075,11 +1015,6 @@ async def place_crash_bet(
         # 소수점 둘째 자리로 반올림
         multiplier = round(multiplier, 2)
 
-        # 잔액 차감
-        user_row.gold_balance -= bet_amount
-        if user_row.gold_balance < 0:
-            user_row.gold_balance = 0
-
         win_amount = 0
         status = "placed"
         
@@ -1088,15 +1023,15 @@ async def place_crash_bet(
             # 자동 캐시아웃 성공 - 한 번만 당첨 처리
             net_win = int(bet_amount * (auto_cashout_multiplier - 1.0))  # 순이익만 계산
             win_amount = net_win
-            user_row.gold_balance += net_win  # 순이익만 추가
             status = "auto_cashed"
         else:
             # 크래시 발생 - 손실
             status = "crashed"
 
-        new_balance = user_row.gold_balance
+        # 잔액 차감 + 순이익 가산을 조건부 원자 UPDATE 1회로 (잔액 부족 시 InsufficientBalanceError)
+        new_balance = rnd.apply_balance(-bet_amount + win_amount, require=bet_amount)
 
-        # 로그(UserAction) → 기존 함수 재사용
+        # 로그(UserAction) → 같은 트랜잭션
         action_data = {
             "game_type": "crash",
             "bet_amount": bet_amount,
@@ -1106,12 +1041,7 @@ async def place_crash_bet(
             "win_amount": win_amount,
             "status": status,
         }
-        _log_user_action(
-            db,
-            user_id=current_user.id,
-            action_type="CRASH_BET",
-            data=action_data
-        )
+        rnd.log_action("CRASH_BET", action_data)
 
         # crash_sessions / crash_bets upsert (동일 트랜잭션)
         db.execute(text(
@@ -1185,7 +1115,7 @@ async def place_crash_bet(
         except Exception as e:
             logger.warning(f"crash game stats update failed: {e}")
 
-        # Server-authoritative aggregate stats (user_game_stats)
+        # Server-authoritative aggregate stats (user_game_stats) — 라운드 트랜잭션 안에서 flush 만
         try:
             from ..services.game_stats_service import GameStatsService as _GSS
             gss = _GSS(db)
@@ -1193,44 +1123,26 @@ async def place_crash_bet(
                 user_id=current_user.id,
                 bet_amount=bet_amount,
                 win_amount=win_amount,
-                final_multiplier=float(auto_cashout_multiplier or multiplier)
+                final_multiplier=float(auto_cashout_multiplier or multiplier),
+                commit=False,
             )
         except Exception as e:  # pragma: no cover
             logger.warning("GameStatsService.update_from_round failed user=%s err=%s", current_user.id, e)
 
-        # GameHistory
-        try:
-            delta = -bet_amount + win_amount
-            log_game_history(
-                db,
-                user_id=current_user.id,
-                game_type="crash",
-                action_type="WIN" if win_amount > 0 else "BET",
-                delta_coin=delta,
-                result_meta={
-                    "bet": bet_amount,
-                    "auto_cashout": auto_cashout_multiplier,
-                    "actual_multiplier": multiplier,
-                    "win": win_amount,
-                    "status": status,
-                }
-            )
-        except Exception as e:
-            logger.warning(f"crash bet history log failed: {e}")
-
-        db.commit()
-    except HTTPException:
-        db.rollback()
-        raise
-    except SQLAlchemyError as e:
-        db.rollback()
-        logger.error(f"crash bet failed: {e}")
-        raise HTTPException(status_code=500, detail="크래시 베팅 처리 오류")
-
-    # 실시간 브로드캐스트 (commit 후)
-    try:
-        from ..realtime import hub
-        await hub.broadcast({
+        # GameHistory (업적 증분 집계 포함)
+        rnd.log_history(
+            "WIN" if win_amount > 0 else "BET",
+            delta_coin=-bet_amount + win_amount,
+            result_meta={
+                "bet": bet_amount,
+                "auto_cashout": auto_cashout_multiplier,
+                "actual_multiplier": multiplier,
+                "win": win_amount,
+                "status": status,
+            }
+        )
+        # 실시간 브로드캐스트 (commit 후 예약)
+        rnd.broadcast({
             "type": "game_event",
             "subtype": "crash_bet",
             "user_id": current_user.id,
@@ -1241,8 +1153,17 @@ async def place_crash_bet(
             "win": win_amount,
             "status": status,
         })
-    except Exception:
-        pass
+        rnd.commit()
+    except InsufficientBalanceError:
+        rnd.rollback()
+        raise HTTPException(status_code=400, detail="골드가 부족합니다")
+    except HTTPException:
+        rnd.rollback()
+        raise
+    except SQLAlchemyError as e:
+        rnd.rollback()
+        logger.error(f"crash bet failed: {e}")
+        raise HTTPException(status_code=500, detail="크래시 베팅 처리 오류")
 
     # potential_win / simulated_max_win 계산 (표시용)
     potential_win_raw = bet_amount * (auto_cashout_multiplier or multiplier)
@@ -1356,38 +1277,54 @@ def get_profile_game_stats(user_id: int, db: Session = Depends(get_db)):
     )
 
 @router.get("/leaderboard", response_model=List[GameLeaderboard])
-def get_game_leaderboard(game_type: Optional[str] = None, limit: int = 10, db: Session = Depends(get_db)):
-    """게임별 또는 전체 리더보드"""
-    if game_type:
-        leaderboard_query = db.query(
-            models.User.id,
-            models.User.nickname,
-            db.func.count(models.UserAction.id).label('score')
-        ).join(
-            models.UserAction, models.User.id == models.UserAction.user_id
-        ).filter(
-            models.UserAction.action_type == game_type
-        ).group_by(
-            models.User.id, models.User.nickname
-        ).order_by(db.text('score DESC')).limit(limit).all()
-    else:
-        leaderboard_query = db.query(
-            models.User.id,
-            models.User.nickname,
-            models.User.total_spent.label('score')
-        ).order_by(models.User.total_spent.desc()).limit(limit).all()
-
-    results: List[GameLeaderboard] = []
-    # NOTE: GameLeaderboard 스키마 구조 조정 필요할 수 있음 (현재 정의와 불일치 가능)
-    for rank, (user_id, nickname, score) in enumerate(leaderboard_query, 1):
-        results.append(GameLeaderboard(
-            game_type=game_type or 'overall',
-            period='daily',
-            entries=[],  # 간단화 - 상세 항목 분리 가능
-            user_rank=rank,
-            updated_at=datetime.utcnow()
-        ))
-    return results
+def get_game_leaderboard(
+    game_type: Optional[str] = None,
+    period: str = Query("all_time", pattern="^(daily|weekly|all_time)$"),
+    limit: int = Query(10, ge=1, le=100),
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """게임별 또는 전체 리더보드 (sorted set 기반, 기간: daily/weekly/all_time)
+
+    user_id 지정 시 해당 사용자의 순위를 user_rank 로 함께 반환.
+    """
+    board = get_leaderboard_service()
+    top = board.top(game_type, period=period, limit=limit)
+    nicknames = dict(
+        db.query(models.User.id, models.User.nickname)
+        .filter(models.User.id.in_([row["user_id"] for row in top]))
+        .all()
+    ) if top else {}
+    entries = [
+        LeaderboardEntry(
+            rank=row["rank"],
+            user_id=row["user_id"],
+            nickname=nicknames.get(row["user_id"]) or f"user{row['user_id']}",
+            score=int(row["score"]),
+        )
+        for row in top
+    ]
+    mine = board.rank(user_id, game_type, period=period) if user_id is not None else None
+    return [GameLeaderboard(
+        game_type=game_type or 'overall',
+        period=period,
+        entries=entries,
+        user_rank=mine["rank"] if mine else None,
+        updated_at=datetime.utcnow(),
+    )]
+
+
+@router.get("/leaderboard/me")
+def get_my_leaderboard_rank(
+    game_type: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """현재 사용자의 기간별 순위/점수 (순위 없음 → null)"""
+    board = get_leaderboard_service()
+    return {
+        "game_type": game_type or 'overall',
+        "ranks": {period: board.rank(current_user.id, game_type, period=period) for period in ("daily", "weekly", "all_time")},
+    }
 
 @router.get("/achievements/{user_id}", response_model=List[Achievement])
 def get_user_achievements(user_id: int, db: Session = Depends(get_db)):
@@ -1409,20 +1346,9 @@ def get_user_achievements(user_id: int, db: Session = Depends(get_db)):
 # Helper
 from uuid import uuid4
 
-def calculate_user_streak(user_id: int, db: Session) -> int:
-    today = datetime.utcnow().date()
-    streak = 0
-    for i in range(30):
-        check_date = today - timedelta(days=i)
-        activity = db.query(models.UserAction).filter(
-            models.UserAction.user_id == user_id,
-            func.date(models.UserAction.created_at) == check_date
-        ).first()
-        if activity:
-            streak += 1
-        else:
-            break
-    return streak
+def calculate_user_streak(user_id: int, db: Session, lookback_days: Optional[int] = 30) -> int:
+    """연속 활동일 수 (활동 날짜 DISTINCT 단일 쿼리, services.activity_streak_service 참고)"""
+    return activity_streak(db, user_id, lookback_days=lookback_days)
 
 # --------------------------- GameHistory 조회 엔드포인트 ---------------------------
 @router.get("/history", response_model=GameHistoryListResponse)
@@ -5,6 +5,7 @@ Provides endpoints for listing notifications and marking them read/unread.
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import Session
 
@@ -13,7 +14,7 @@ from ..dependencies import get_current_user
 from ..models.auth_models import User
 from .. import models
 from ..services.notification_service import NotificationService
-from ..utils.redis import RedisManager
+from ..utils.redis import get_async_redis_manager
 from ..core.config import settings
 
 router = APIRouter(prefix="/api/notification", tags=["Notification Center"])
@@ -116,9 +117,9 @@ async def unread_count(
 async def get_settings_auth(
     current_user: User = Depends(get_current_user),
 ):
-    rm = RedisManager()
+    rm = get_async_redis_manager()
     key = _settings_key(current_user.id)
-    data = rm.get_cached_data(key)
+    data = await rm.get_cached_data(key)
     if isinstance(data, dict) and data:
         # Redis에 저장된 구조를 그대로 반환
         try:
@@ -133,9 +134,9 @@ async def put_settings_auth(
     body: NotificationSettings,
     current_user: User = Depends(get_current_user),
 ):
-    rm = RedisManager()
+    rm = get_async_redis_manager()
     key = _settings_key(current_user.id)
-    rm.cache_user_data(key, body.model_dump(), expire_seconds=7 * 24 * 3600)
+    await rm.cache_user_data(key, body.model_dump(), expire_seconds=7 * 24 * 3600)
     return body
 
 
@@ -157,14 +158,14 @@ async def push_subscribe(
     sub: PushSubscription,
     current_user: User = Depends(get_current_user),
 ):
-    rm = RedisManager()
+    rm = get_async_redis_manager()
     key = _push_key(current_user.id)
-    existing = rm.get_cached_data(key) or {"subs": []}
+    existing = await rm.get_cached_data(key) or {"subs": []}
     subs = existing.get("subs", [])
     # 중복 방지: endpoint 기준
     subs = [s for s in subs if s.get("endpoint") != sub.endpoint]
     subs.append(sub.model_dump())
-    rm.cache_user_data(key, {"subs": subs}, expire_seconds=30 * 24 * 3600)
+    await rm.cache_user_data(key, {"subs": subs}, expire_seconds=30 * 24 * 3600)
     return {"ok": True, "count": len(subs)}
 
 
@@ -173,11 +174,11 @@ async def push_unsubscribe(
     sub: PushSubscription,
     current_user: User = Depends(get_current_user),
 ):
-    rm = RedisManager()
+    rm = get_async_redis_manager()
     key = _push_key(current_user.id)
-    existing = rm.get_cached_data(key) or {"subs": []}
+    existing = await rm.get_cached_data(key) or {"subs": []}
     subs = [s for s in existing.get("subs", []) if s.get("endpoint") != sub.endpoint]
-    rm.cache_user_data(key, {"subs": subs}, expire_seconds=30 * 24 * 3600)
+    await rm.cache_user_data(key, {"subs": subs}, expire_seconds=30 * 24 * 3600)
     return {"ok": True, "count": len(subs)}
 
 
@@ -186,9 +187,9 @@ async def push_test(
     current_user: User = Depends(get_current_user),
 ):
     # 실제 Web Push 발송은 별도 서비스/키(VAPID) 필요. 여기서는 구독 유무 확인만.
-    rm = RedisManager()
+    rm = get_async_redis_manager()
     key = _push_key(current_user.id)
-    existing = rm.get_cached_data(key) or {"subs": []}
+    existing = await rm.get_cached_data(key) or {"subs": []}
     return {"ok": True, "subs": existing.get("subs", [])}
 
 
@@ -222,5 +223,6 @@ async def push_send(
         target_user_id = body.user_id or current_user.id
 
     payload = {"title": body.title or "알림", "message": body.message or "", "url": body.url, "type": body.type or "info"}
-    sent, failed, removed = service.push_to_user_subscriptions(target_user_id, payload)
+    # 발송 대기는 이벤트 루프 밖에서 (구독별 병렬 발송은 PushDeliveryPool 이 수행)
+    sent, failed, removed = await run_in_threadpool(service.push_to_user_subscriptions, target_user_id, payload)
     return {"ok": True, "sent": sent, "failed": failed, "removed": removed}
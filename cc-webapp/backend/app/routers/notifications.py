@@ -7,46 +7,16 @@ from pydantic import BaseModel
 
 """Notifications router
 
-기존 manager.enqueue / register_sse 구조를 단순화된 hub 브로드캐스트로 점진 전환.
-필요 메서드 미존재 시 No-op Fallback 구성.
+WS/SSE 알림 스트림 + 개발용 REST. manager 는 app.realtime.broker.NotificationBroker
+(사용자별 재전송 링 버퍼, 토픽 인덱스 구독, 우선순위 큐; NOTIFY_BROKER_BACKEND=redis_streams 로 워커 간 공유).
 """
 try:  # pragma: no cover
     from ..realtime import hub as _hub  # type: ignore
 except Exception:  # pragma: no cover
     _hub = None
+from ..realtime.broker import notification_broker, parse_resume_token
 
-class _LegacyCompatManager:
-    """이전 manager API를 참조하는 기존 코드 호환을 위한 최소 wrapper.
-    SSE/WS 개별 큐 없이 hub.broadcast 로 대체 (MVP 용)
-    """
-    async def connect_ws(self, websocket, user_id: int, topics=None):  # noqa: D401
-        await websocket.accept()
-
-    def disconnect(self, user_id: int, websocket):  # noqa: D401
-        try:
-            # nothing
-            pass
-        except Exception:
-            pass
-
-    async def update_ws_topics(self, user_id: int, websocket, topics):
-        return None
-
-    async def touch_ws(self, user_id: int, websocket):
-        return None
-
-    def get_backfill(self, user_id: int, last_event_id):
-        return []
-
-    async def register_sse(self, user_id: int):
-        import asyncio
-        q: asyncio.Queue = asyncio.Queue()
-        return q
-
-    async def unregister_sse(self, user_id: int, q):
-        return None
-
-manager = _LegacyCompatManager()
+manager = notification_broker
 
 # WebSocket router
 router = APIRouter(prefix="/ws", tags=["websockets"])
@@ -59,7 +29,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
 
     Query params:
       - topics: comma-separated list of topics to subscribe to (optional)
-      - lastEventId: initial backfill id
+      - lastEventId: initial backfill id (수신 이벤트의 resume 토큰)
     """
     topics_param = websocket.query_params.get("topics")
     topics: Optional[Set[str]] = set(
@@ -71,8 +41,8 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
     last_event_id_param = websocket.query_params.get("lastEventId")
     if last_event_id_param:
         try:
-            last_event_id = int(last_event_id_param)
-            for ev in list(manager.get_backfill(user_id, last_event_id)):
+            last_event_id, seen = parse_resume_token(last_event_id_param)
+            for ev in await manager.backfill(user_id, last_event_id, skip=seen):
                 if topics and ev.get("topic") not in topics:
                     continue
                 try:
@@ -119,11 +89,13 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
 sse_router = APIRouter(prefix="/sse", tags=["sse"])
 
 
-def _format_sse(event: Dict[str, Any]) -> str:
-    """Format a single SSE event frame."""
+def _format_sse(event: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """Format a single SSE event frame (event_id: 재개 토큰, 없으면 이벤트 id)."""
     lines = []
-    if event.get("id") is not None:
-        lines.append(f"id: {event['id']}")
+    if event_id is None and event.get("id") is not None:
+        event_id = str(event["id"])
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
     if event.get("topic"):
         lines.append(f"event: {event['topic']}")
     lines.append("data: " + JSONResponse(content=event["data"]).body.decode("utf-8"))
@@ -136,18 +108,18 @@ async def sse_notifications(request: Request, user_id: int, topics: Optional[str
     """SSE notifications stream for a user with topic filter and backfill support."""
     topic_set: Optional[Set[str]] = set(t.strip() for t in topics.split(",") if t.strip()) if topics else None
     last_event_id: Optional[int] = None
+    seen: Set[int] = set()
     try:
-        lei = request.headers.get("Last-Event-ID")
-        if lei is not None:
-            last_event_id = int(lei)
+        last_event_id, seen = parse_resume_token(request.headers.get("Last-Event-ID"))
     except Exception:
-        last_event_id = None
+        last_event_id, seen = None, set()
 
     async def event_generator():
-        q = await manager.register_sse(user_id)
+        # 토픽 필터는 구독 인덱스에서 적용 (큐에는 해당 토픽 이벤트만 적재)
+        q = await manager.register_sse(user_id, topic_set)
 
         try:
-            for ev in list(manager.get_backfill(user_id, last_event_id)):
+            for ev in await manager.backfill(user_id, last_event_id, skip=seen):
                 if topic_set and ev.get("topic") not in topic_set:
                     continue
                 yield _format_sse(ev)
@@ -157,18 +129,16 @@ async def sse_notifications(request: Request, user_id: int, topics: Optional[str
         try:
             while True:
                 try:
-                    priority, ev = await asyncio.wait_for(q.get(), timeout=15.0)
-                    if topic_set and ev.get("topic") not in topic_set:
-                        continue
-                    batch: List[str] = [_format_sse(ev)]
+                    # 우선순위 높은 이벤트부터, 대기 중인 것은 최대 50개 한 프레임 묶음으로 전송
+                    # SSE id 는 재개 토큰 (전달 순서가 id 순서와 달라도 Last-Event-ID 재개 시 누락 없음)
+                    _, ev = await asyncio.wait_for(q.get(), timeout=15.0)
+                    batch: List[str] = [_format_sse(ev, q.resume_token())]
                     for _ in range(49):
                         try:
-                            priority2, ev2 = q.get_nowait()
-                            if topic_set and ev2.get("topic") not in topic_set:
-                                continue
-                            batch.append(_format_sse(ev2))
-                        except Exception:
+                            _, ev2 = q.get_nowait()
+                        except asyncio.QueueEmpty:
                             break
+                        batch.append(_format_sse(ev2, q.resume_token()))
                     yield "".join(batch)
                 except asyncio.TimeoutError:
                     yield ": ping\n\n"
@@ -199,7 +169,7 @@ async def send_notification(user_id: int, body: SendNotificationRequest):
 @api_router.get("/{user_id}/backfill")
 async def get_backfill(user_id: int, since: Optional[int] = None, topics: Optional[str] = None):
     topic_set: Optional[Set[str]] = set(t.strip() for t in topics.split(",") if t.strip()) if topics else None
-    buf = list(manager.get_backfill(user_id, since))
+    buf = await manager.backfill(user_id, since)
     if topic_set:
         buf = [e for e in buf if e.get("topic") in topic_set]
     return {"count": len(buf), "items": buf[-200:]}
@@ -135,8 +135,8 @@ async def get_user_sync_state(user_id: int, db: Session) -> Dict[str, Any]:
         # Redis에서 스트릭 정보 가져오기
         streak_data = {}
         try:
-            from ..utils.redis import get_streak_counter
-            streak_count = get_streak_counter(str(user.id), "SLOT_SPIN")
+            from ..utils.redis import get_async_redis_manager
+            streak_count = await get_async_redis_manager().get_streak_counter(str(user.id), "SLOT_SPIN")
             streak_data = {
                 "streak_count": streak_count,
                 "action_type": "SLOT_SPIN"
@@ -83,8 +83,9 @@ from ..dependencies import get_current_user
 from ..auth.auth_service import get_current_user_optional
 from ..services.limited_package_service import LimitedPackageService
 from ..schemas.limited_package import LimitedPackageOut, LimitedBuyRequest, LimitedBuyReceipt
-from ..kafka_client import send_kafka_message
-from ..utils.redis import get_redis_manager
+from ..services.outbox_producer import enqueue_outbox
+from ..services.outbox_relay import notify_outbox
+from ..utils.redis import get_redis_manager, get_async_redis_manager
 from ..core.config import settings
 from ..utils.utils import WebhookUtils
 from fastapi import Request, BackgroundTasks
@@ -109,6 +110,19 @@ def _metric_inc(flow: str, result: str, reason: str | None = None):  # helper
         except Exception:
             pass
 
+def _enqueue_buy_event(db: Session, user_id: int, code: str, quantity: int, total_price_cents: int, total_gold: int, charge_id: str) -> None:
+    """BUY_PACKAGE analytics 이벤트를 outbox 에 적재 (commit 은 호출자, charge_id 로 dedupe)"""
+    enqueue_outbox(db, "purchase", {
+        "type": "BUY_PACKAGE",
+        "user_id": user_id,
+        "code": code,
+        "quantity": quantity,
+        "total_price_cents": total_price_cents,
+        "gold_granted": total_gold,
+        "charge_id": charge_id,
+        "server_ts": datetime.utcnow().isoformat(),
+    }, dedupe_key=f"buy_package:{charge_id}")
+
 def get_shop_service(db = Depends(get_db)) -> ShopService:
     """Dependency provider for ShopService."""
     return ShopService(db)
@@ -382,29 +396,17 @@ def buy_limited_compat(req: LimitedBuyCompatRequest, *, db = Depends(get_db), ba
     if pkg.per_user_limit and already + req.quantity > pkg.per_user_limit:
         raise HTTPException(status_code=403, detail="Per-user limit exceeded")
 
-    # Sweep expired holds and try reserve
-    try:
-        LimitedPackageService.sweep_expired_holds(pkg.code)
-    except Exception:
-        pass
-    hold_id: Optional[str] = None
-    if not LimitedPackageService.try_reserve(pkg.code, req.quantity):
+    # Reserve stock + hold in one atomic step (expired holds are swept back to stock first)
+    reserved, hold_id = LimitedPackageService.reserve(pkg.code, req.quantity, ttl_seconds=settings.LIMITED_HOLD_TTL_SECONDS)
+    if not reserved:
         # Out of stock → 409
         raise HTTPException(status_code=409, detail="Out of stock")
-    try:
-        hold_id = LimitedPackageService.add_hold(pkg.code, req.quantity, ttl_seconds=settings.LIMITED_HOLD_TTL_SECONDS)
-    except Exception:
-        hold_id = None
 
     # Pricing with promo
     unit_price = pkg.price_cents
     if req.promo_code:
         if not LimitedPackageService.can_use_promo(req.promo_code):
-            try:
-                if hold_id:
-                    LimitedPackageService.remove_hold(pkg.code, hold_id)
-            finally:
-                LimitedPackageService.release_reservation(pkg.code, req.quantity)
+            LimitedPackageService.release_hold(pkg.code, hold_id)
             # Treat as conflict
             raise HTTPException(status_code=409, detail="Promo code usage limit reached")
         off = LimitedPackageService.get_promo_discount(pkg.code, req.promo_code)
@@ -434,11 +436,7 @@ def buy_limited_compat(req: LimitedBuyCompatRequest, *, db = Depends(get_db), ba
         except Exception:
             try: db.rollback()
             except Exception: pass
-        try:
-            if hold_id:
-                LimitedPackageService.remove_hold(pkg.code, hold_id)
-        finally:
-            LimitedPackageService.release_reservation(pkg.code, req.quantity)
+        LimitedPackageService.release_hold(pkg.code, hold_id)
         receipt = LimitedBuyReceipt(
             success=False,
             message=f"Payment failed: {auth.message}",
@@ -477,11 +475,7 @@ def buy_limited_compat(req: LimitedBuyCompatRequest, *, db = Depends(get_db), ba
         except Exception:
             try: db.rollback()
             except Exception: pass
-        try:
-            if hold_id:
-                LimitedPackageService.remove_hold(pkg.code, hold_id)
-        finally:
-            LimitedPackageService.release_reservation(pkg.code, req.quantity)
+        LimitedPackageService.release_hold(pkg.code, hold_id)
         receipt = LimitedBuyReceipt(
             success=False,
             message=f"Capture failed: {cap.message}",
@@ -547,25 +541,14 @@ def buy_limited_compat(req: LimitedBuyCompatRequest, *, db = Depends(get_db), ba
     ))
 
     # finalize counters
-    LimitedPackageService.finalize_user_purchase(pkg.code, user_id, req.quantity)
+    LimitedPackageService.finalize_hold(pkg.code, hold_id, user_id, req.quantity)
     if req.promo_code:
         LimitedPackageService.record_promo_use(req.promo_code)
+    # Kafka 이벤트 (analytics) → 같은 트랜잭션의 outbox 행 (commit 실패 시 함께 폐기, 발행 유실 없음)
+    _enqueue_buy_event(db, user_id, pkg.code, req.quantity, total_price_cents, total_gold, cap.charge_id)
     db.commit()
 
-    # Kafka event (best-effort)
-    try:
-        send_kafka_message("buy_package", {
-            "type": "BUY_PACKAGE",
-            "user_id": user_id,
-            "code": pkg.code,
-            "quantity": req.quantity,
-            "total_price_cents": total_price_cents,
-            "gold_granted": total_gold,
-            "charge_id": cap.charge_id,
-            "server_ts": datetime.utcnow().isoformat(),
-        })
-    except Exception:
-        pass
+    notify_outbox()  # Kafka 이벤트는 commit 된 outbox 행으로 relay 가 발행
 
     # synthetic receipt + cleanup hold
     import uuid
@@ -574,11 +557,6 @@ def buy_limited_compat(req: LimitedBuyCompatRequest, *, db = Depends(get_db), ba
     secret = settings.PAYMENT_WEBHOOK_SECRET.encode()
     sig_payload = f"{user_id}|{pkg.code}|{req.quantity}|{total_price_cents}|{cap.charge_id}|{int(time.time())}".encode()
     receipt_signature = hmac.new(secret, sig_payload, hashlib.sha256).hexdigest()
-    try:
-        if hold_id:
-            LimitedPackageService.remove_hold(pkg.code, hold_id)
-    except Exception:
-        pass
     # Record promo usage into DB (best-effort) for analytics/compliance
     try:
         if req.promo_code:
@@ -670,20 +648,18 @@ async def payment_webhook(request: Request, background_tasks: BackgroundTasks):
     if abs(now - ts_val) > ALLOWED_SKEW:
         raise HTTPException(status_code=400, detail="Stale timestamp")
 
-    # 3. Redis 기반 Replay 방어 (ts+nonce 조합)
-    rman = get_redis_manager()
+    # 3. Redis 기반 Replay 방어 (ts+nonce 조합) — 비동기 클라이언트로 이벤트 루프 블로킹 없음
+    aredis = get_async_redis_manager()
     replay_key = f"webhook:pay:replay:{ts_val}:{nonce}"
     REPLAY_TTL = 600  # 10분
-    client = getattr(rman, 'redis_client', None)
-    if client:
-        try:
-            if not client.set(replay_key, "1", nx=True, ex=REPLAY_TTL):
-                # 이미 처리된 (replay)
-                raise HTTPException(status_code=409, detail="Replay detected")
-        except HTTPException:
-            raise
-        except Exception as e:  # Redis 장애시 degrade
-            logger.warning(f"Replay key set 실패(degrade): {e}")
+    try:
+        if await aredis.set_nx(replay_key, "1", REPLAY_TTL) is False:
+            # 이미 처리된 (replay)
+            raise HTTPException(status_code=409, detail="Replay detected")
+    except HTTPException:
+        raise
+    except Exception as e:  # Redis 장애시 degrade
+        logger.warning(f"Replay key set 실패(degrade): {e}")
 
     # 4. Payload 파싱 (event_id 추출)
     event_id = event_id_hdr
@@ -698,11 +674,11 @@ async def payment_webhook(request: Request, background_tasks: BackgroundTasks):
 
     # 5. 이벤트 멱등 처리
     duplicate = False
-    if event_id and client:
+    if event_id:
         idemp_key = f"webhook:pay:event:{event_id}"
         IDEMP_TTL = 60 * 60 * 24  # 24h
         try:
-            if not client.set(idemp_key, "1", nx=True, ex=IDEMP_TTL):
+            if await aredis.set_nx(idemp_key, "1", IDEMP_TTL) is False:
                 duplicate = True
         except Exception as e:
             logger.warning(f"Webhook event idempotency set 실패(degrade): {e}")
@@ -1525,15 +1501,10 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
             new_gold_balance=getattr(user, 'gold_balance', 0),
         )
 
-    # Sweep expired holds to return any timed-out reservations back to stock (best-effort)
-    try:
-        LimitedPackageService.sweep_expired_holds(pkg.code)
-    except Exception:
-        pass
-
-    # stock reservation
-    hold_id: Optional[str] = None
-    if not LimitedPackageService.try_reserve(pkg.code, req.quantity):
+    # stock reservation + hold in one atomic step (expired holds are swept back to stock first);
+    # if payment fails or client drops, stock returns after the hold TTL
+    reserved, hold_id = LimitedPackageService.reserve(pkg.code, req.quantity, ttl_seconds=settings.LIMITED_HOLD_TTL_SECONDS)
+    if not reserved:
         _metric_inc("limited", "fail", "OUT_OF_STOCK")
         return LimitedBuyReceipt(
             success=False,
@@ -1544,23 +1515,12 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
             new_gold_balance=getattr(user, 'gold_balance', 0),
         )
 
-    # add a short hold so that if payment fails or client drops, stock returns after TTL
-    try:
-        hold_id = LimitedPackageService.add_hold(pkg.code, req.quantity, ttl_seconds=settings.LIMITED_HOLD_TTL_SECONDS)
-    except Exception:
-        # non-fatal if hold tracking fails; continue
-        hold_id = None
-
     # Promo code handling via service table (per-unit cents off) + max-uses guard
     unit_price = pkg.price_cents
     if req.promo_code:
         if not LimitedPackageService.can_use_promo(req.promo_code):
-            # clean up hold and reservation
-            try:
-                if hold_id:
-                    LimitedPackageService.remove_hold(pkg.code, hold_id)
-            finally:
-                LimitedPackageService.release_reservation(pkg.code, req.quantity)
+            # release hold and return reserved stock
+            LimitedPackageService.release_hold(pkg.code, hold_id)
             _metric_inc("limited", "fail", "PROMO_EXHAUSTED")
             return LimitedBuyReceipt(
                 success=False,
@@ -1592,12 +1552,8 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
     gateway = PaymentGateway()
     auth = gateway.authorize(total_price_cents, req.currency, card_token=req.card_token)
     if not auth.success:
-        # clean up hold and reservation
-        try:
-            if hold_id:
-                LimitedPackageService.remove_hold(pkg.code, hold_id)
-        finally:
-            LimitedPackageService.release_reservation(pkg.code, req.quantity)
+        # release hold and return reserved stock
+        LimitedPackageService.release_hold(pkg.code, hold_id)
         _metric_inc("limited", "fail", "PAYMENT_AUTH")
         return LimitedBuyReceipt(
             success=False,
@@ -1613,12 +1569,8 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
         )
     cap = gateway.capture(auth.charge_id or "")
     if not cap.success:
-        # clean up hold and reservation
-        try:
-            if hold_id:
-                LimitedPackageService.remove_hold(pkg.code, hold_id)
-        finally:
-            LimitedPackageService.release_reservation(pkg.code, req.quantity)
+        # release hold and return reserved stock
+        LimitedPackageService.release_hold(pkg.code, hold_id)
         _metric_inc("limited", "fail", "PAYMENT_CAPTURE")
         return LimitedBuyReceipt(
             success=False,
@@ -1674,7 +1626,7 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
     ))
 
     # finalize user limit counters
-    LimitedPackageService.finalize_user_purchase(pkg.code, user_id, req.quantity)
+    LimitedPackageService.finalize_hold(pkg.code, hold_id, user_id, req.quantity)
     if req.promo_code:
         LimitedPackageService.record_promo_use(req.promo_code)
 
@@ -1726,22 +1678,11 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
     except Exception:
         _metric_inc("limited", "fail", "TX_PERSIST")
 
+    # Kafka 이벤트 (analytics) → 같은 트랜잭션의 outbox 행 (commit 실패 시 함께 폐기, 발행 유실 없음)
+    _enqueue_buy_event(db, user_id, pkg.code, req.quantity, total_price_cents, total_gold, cap.charge_id)
     db.commit()
 
-    # Emit Kafka event for analytics (best-effort)
-    try:
-        send_kafka_message("buy_package", {
-            "type": "BUY_PACKAGE",
-            "user_id": user_id,
-            "code": pkg.code,
-            "quantity": req.quantity,
-            "total_price_cents": total_price_cents,
-            "gold_granted": total_gold,
-            "charge_id": cap.charge_id,
-            "server_ts": datetime.utcnow().isoformat(),
-        })
-    except Exception:
-        pass
+    notify_outbox()  # analytics Kafka 이벤트는 commit 된 outbox 행으로 relay 가 발행
 
     # include a synthetic receipt code for client-side tracking
     resp = LimitedBuyReceipt(
@@ -1756,12 +1697,6 @@ def buy_limited(req: LimitedBuyRequest, *, db = Depends(get_db), current_user =
         charge_id=cap.charge_id,
         receipt_code=receipt_code,
     )
-    # remove hold after successful finalize
-    try:
-        if hold_id:
-            LimitedPackageService.remove_hold(pkg.code, hold_id)
-    except Exception:
-        pass
     # Mark idempotency after success
     if idem and rman.redis_client:
         try:
@@ -11,16 +11,7 @@ from ..database import get_db
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
-from ..utils.redis import (
-    update_streak_counter,
-    get_streak_counter,
-    get_streak_ttl,
-    record_attendance_day,
-    get_attendance_month,
-    get_streak_protection,
-    set_streak_protection,
-)
-from app.utils.redis import get_redis  # 일일 중복 가드용 직접 Redis 접근
+from ..utils.redis import get_async_redis_manager  # 이벤트 루프를 막지 않는 비동기 Redis 접근
 from app.utils.streak_utils import calc_next_streak_reward
 
 router = APIRouter(prefix="/api/streak", tags=["Streaks"])
@@ -49,8 +40,7 @@ async def status(
     action_type: str = Query(DEFAULT_ACTION),
     current_user: User = Depends(get_current_user),
 ):
-    cnt = get_streak_counter(str(current_user.id), action_type)
-    ttl = get_streak_ttl(str(current_user.id), action_type)
+    cnt, ttl = await get_async_redis_manager().get_streak_state(str(current_user.id), action_type)
     next_reward = calc_next_streak_reward(cnt + 1)
     return StreakStatus(action_type=action_type, count=cnt, ttl_seconds=ttl, next_reward=next_reward)
 
@@ -76,30 +66,19 @@ async def tick(
     allow_increment = True
     today_iso = datetime.utcnow().date().isoformat()
     daily_lock_key = f"user:{current_user.id}:streak_daily_lock:{action_type}:{today_iso}"
+    redis = get_async_redis_manager()
     try:
-        r = get_redis()
-        if r is not None:
-            # setnx (nx=True) 실패하면 이미 오늘 증가 처리된 것 → 증가 생략
-            if not r.set(daily_lock_key, "1", nx=True, ex=60 * 60 * 48):
-                allow_increment = False
+        # setnx (nx=True) 실패하면 이미 오늘 증가 처리된 것 → 증가 생략 (미연결 시 None → 가드 비활성)
+        if await redis.set_nx(daily_lock_key, "1", 60 * 60 * 48) is False:
+            allow_increment = False
     except Exception:
         # Redis 문제는 가드 비활성(증가 허용)
         pass
 
-    if allow_increment:
-        cnt = update_streak_counter(str(current_user.id), action_type, increment=True)
-    else:
-        cnt = get_streak_counter(str(current_user.id), action_type)
-
-    ttl = get_streak_ttl(str(current_user.id), action_type)
+    # 카운터 증가(또는 조회) + TTL + 출석 기록(SADD idempotent) 을 파이프라인 1회 왕복으로 처리
+    cnt, ttl = await redis.record_streak_tick(str(current_user.id), action_type, today_iso, increment=allow_increment)
     next_reward = calc_next_streak_reward(cnt + 1)
 
-    # 출석 기록 (증가 여부와 무관하게 하루 한 번 기록 시도 – SADD idempotent)
-    try:
-        record_attendance_day(str(current_user.id), action_type, today_iso)
-    except Exception:
-        pass
-
     # 실시간 브로드캐스트: 스트릭 카운터 업데이트 (증가된 경우만)
     if allow_increment:
         try:
@@ -129,7 +108,7 @@ async def reset(
 ):
     action_type = body.action_type or DEFAULT_ACTION
     # Use update_streak_counter with increment=False to reset
-    update_streak_counter(str(current_user.id), action_type, increment=False)
+    await get_async_redis_manager().update_streak_counter(str(current_user.id), action_type, increment=False)
     return {"ok": True}
 
 
@@ -138,7 +117,7 @@ async def next_reward(
     action_type: str = Query(DEFAULT_ACTION),
     current_user: User = Depends(get_current_user),
 ):
-    cnt = get_streak_counter(str(current_user.id), action_type)
+    cnt = await get_async_redis_manager().get_streak_counter(str(current_user.id), action_type)
     return {"next_reward": calc_next_streak_reward(cnt + 1)}
 
 
@@ -162,7 +141,7 @@ async def history(
     month: int = Query(..., ge=1, le=12),
     current_user: User = Depends(get_current_user),
 ):
-    days = get_attendance_month(str(current_user.id), action_type, year, month)
+    days = await get_async_redis_manager().get_attendance_month(str(current_user.id), action_type, year, month)
     return AttendanceHistory(action_type=action_type, year=year, month=month, days=days)
 
 
@@ -179,7 +158,7 @@ async def protection_status(
     action_type: str = Query(DEFAULT_ACTION),
     current_user: User = Depends(get_current_user),
 ):
-    enabled = get_streak_protection(str(current_user.id), action_type)
+    enabled = await get_async_redis_manager().get_streak_protection(str(current_user.id), action_type)
     return ProtectionStatus(action_type=action_type, enabled=enabled)
 
 
@@ -221,7 +200,7 @@ async def preview(
     - today_reward: streak_count 기반 산식
     - next_day_reward: streak_count+1 기반 산식
     """
-    streak_count = get_streak_counter(str(current_user.id), action_type)
+    streak_count = await get_async_redis_manager().get_streak_counter(str(current_user.id), action_type)
     if streak_count < 0:
         streak_count = 0
     # 멱등키 존재 여부 확인
@@ -263,11 +242,12 @@ async def claim(
     except Exception:
         logger = None
     # 현재 streak 읽기 (증가 없이)
-    streak_count = get_streak_counter(str(current_user.id), action_type)
+    redis = get_async_redis_manager()
+    streak_count = await redis.get_streak_counter(str(current_user.id), action_type)
     if streak_count <= 0:
         # 최초 claim 시 자동 seed (tick 1회와 동일 효과) -> 사용자 UX 개선
         try:
-            seeded = update_streak_counter(str(current_user.id), action_type, increment=True)
+            seeded = await redis.update_streak_counter(str(current_user.id), action_type, increment=True)
             streak_count = seeded
             if logger:
                 logger.info("[streak.claim] auto_seed_applied", extra={"user_id": current_user.id, "action_type": action_type, "seeded": seeded})
@@ -300,11 +280,9 @@ async def claim(
     idempotency_key = f"streak:{current_user.id}:{action_type}:{claim_day}"
 
     # Redis/DB 멱등: Redis 플래그(선택적) 우선 확인 (존재 시 DB 조회 생략 가능)
-    from app.utils.redis import get_redis
+    redis_flag_key = f"streak_claimed:{current_user.id}:{action_type}:{claim_day}"
     try:
-        r = get_redis()
-        redis_flag_key = f"streak_claimed:{current_user.id}:{action_type}:{claim_day}"
-        if r.get(redis_flag_key):
+        if await redis.command("get", redis_flag_key):
             existing = (
                 db.query(UserReward)
                 .filter(UserReward.user_id == current_user.id, UserReward.idempotency_key == idempotency_key)
@@ -408,8 +386,7 @@ async def claim(
 
     # Redis 플래그 TTL = 1일 (UTC 자정 교차 허용: 26h 여유)
     try:
-        if r:
-            r.set(redis_flag_key, "1", ex=60*60*26)
+        await redis.command("set", redis_flag_key, "1", ex=60*60*26)
     except Exception:
         pass
 
@@ -476,6 +453,7 @@ async def set_protection(
     current_user: User = Depends(get_current_user),
 ):
     action_type = body.action_type or DEFAULT_ACTION
-    set_streak_protection(str(current_user.id), action_type, body.enabled)
-    enabled = get_streak_protection(str(current_user.id), action_type)
+    redis = get_async_redis_manager()
+    await redis.set_streak_protection(str(current_user.id), action_type, body.enabled)
+    enabled = await redis.get_streak_protection(str(current_user.id), action_type)
     return ProtectionStatus(action_type=action_type, enabled=enabled)
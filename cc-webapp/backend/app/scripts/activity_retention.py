@@ -0,0 +1,47 @@
+"""활동 테이블 보존 정책 실행 (파티션 생성 / 롤업 갱신 / 만료 데이터 정리)
+
+사용: python -m app.scripts.activity_retention [--months 13] [--archive-dir /backups/activity] [--dry-run]
+                                               [--skip-purge] [--chunk-size 5000]
+
+1) 앞으로 ACTIVITY_PARTITION_MONTHS_AHEAD 개월 월 파티션 생성 (Postgres 파티션 테이블)
+2) activity_rollups / activity_daily_users 갱신 (삭제 전 집계 보존)
+3) --months 이전 user_actions / game_history 정리 (파티션 DROP 또는 chunk 삭제, --archive-dir 시 gzip JSONL 보관)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.database import SessionLocal
+from app.services import activity_storage_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Activity table retention")
+    parser.add_argument("--months", type=int, default=None, help="원본 보존 개월 (기본 ACTIVITY_RETENTION_MONTHS=13)")
+    parser.add_argument("--archive-dir", default=None, help="삭제 전 gzip JSONL 아카이브 디렉터리")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="삭제 대상만 보고")
+    parser.add_argument("--skip-purge", action="store_true", help="파티션/롤업만 갱신")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    result = {}
+    try:
+        result["partitions_created"] = activity_storage_service.ensure_partitions(db)
+        result["rollups"] = activity_storage_service.refresh_rollups(db)
+        if not args.skip_purge:
+            result["purge"] = activity_storage_service.purge_expired(
+                db, months=args.months, archive_dir=args.archive_dir,
+                chunk_size=args.chunk_size, dry_run=args.dry_run,
+            )
+    finally:
+        db.close()
+    result["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(result, default=str))
+
+
+if __name__ == "__main__":
+    main()
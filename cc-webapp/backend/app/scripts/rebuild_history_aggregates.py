@@ -0,0 +1,35 @@
+"""GameHistory 증분 집계 재구성 (backfill)
+
+사용: python -m app.scripts.rebuild_history_aggregates [--user-id 1 --user-id 2] [--chunk-size 500]
+
+game_history_aggregates / user_win_streaks 를 game_history 원본으로부터 다시 계산한다.
+최초 배포 직후 1회 실행하거나, 집계 drift 의심 시 특정 사용자만 재구성.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.database import SessionLocal
+from app.services import history_aggregate_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild game history aggregates")
+    parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="특정 사용자만 재구성 (반복 지정 가능)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = history_aggregate_service.rebuild(db, user_ids=args.user_ids, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    result["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
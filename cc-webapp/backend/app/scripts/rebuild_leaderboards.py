@@ -0,0 +1,36 @@
+"""리더보드 sorted set 재구성
+
+사용: python -m app.scripts.rebuild_leaderboards
+
+game_history 를 스트리밍하여 현재 daily/weekly/all-time 보드(게임별 + 전체)를 다시 채운다.
+Redis 초기화/유실 후, 또는 점수 규칙(score_for) 변경 배포 직후 1회 실행.
+"""
+from __future__ import annotations
+
+import json
+import time
+
+from app.database import SessionLocal
+from app.services.leaderboard_service import get_leaderboard_service
+
+
+def main() -> None:
+    try:
+        from app.utils.redis import get_redis, init_redis_manager
+        client = get_redis()
+        if client is not None:
+            init_redis_manager(client)
+    except Exception:
+        pass
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = get_leaderboard_service().rebuild(db)
+    finally:
+        db.close()
+    result["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,19 @@ and register it via AchievementEvaluatorRegistry.register("TYPE", evaluator)
 
 All database access must go through ctx.db; NO side effects (notifications,
 model mutation, broadcasting) happen here—this layer is pure calculation.
+
+Built-in evaluators read the incremental counters maintained by
+history_aggregate_service (game_history_aggregates / user_win_streaks), so the
+cost per evaluation does not grow with the user's lifetime history.
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Dict, Any, Optional, Protocol
-from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
 from ..models.history_models import GameHistory
+from . import history_aggregate_service as aggregates
 
 
 @dataclass
@@ -65,16 +69,12 @@ class AchievementEvaluatorRegistry:
 def _cumulative_amount(ctx: EvalContext, cond: Dict[str, Any], action_filter: str) -> EvalResult:
     game_type = cond.get("game_type")
     threshold = int(cond.get("threshold", 0))
-    stmt = select(func.sum(GameHistory.delta_coin)).where(
-        GameHistory.user_id == ctx.history.user_id,
-        GameHistory.action_type == action_filter,
+    if game_type and ctx.history.game_type != game_type:
+        return EvalResult(progress=0, unlocked=False)
+    total = aggregates.amount_total(
+        ctx.db, user_id=ctx.history.user_id, action_type=action_filter, game_type=game_type
     )
-    if game_type:
-        if ctx.history.game_type != game_type:
-            return EvalResult(progress=0, unlocked=False)
-        stmt = stmt.where(GameHistory.game_type == game_type)
-    total = ctx.db.execute(stmt).scalar() or 0
-    return EvalResult(progress=int(total), unlocked=int(total) >= threshold)
+    return EvalResult(progress=total, unlocked=total >= threshold)
 
 
 def eval_cumulative_bet(ctx: EvalContext, cond: Dict[str, Any]) -> EvalResult:
@@ -90,21 +90,7 @@ def eval_win_streak(ctx: EvalContext, cond: Dict[str, Any]) -> EvalResult:
     threshold = int(cond.get("threshold", 0))
     if game_type and ctx.history.game_type != game_type:
         return EvalResult(progress=0, unlocked=False)
-
-    q = (
-        select(GameHistory.action_type, GameHistory.game_type)
-        .where(GameHistory.user_id == ctx.history.user_id)
-        .order_by(GameHistory.created_at.desc())
-        .limit(100)
-    )
-    rows = ctx.db.execute(q).all()
-    streak = 0
-    for action_type, gtype in rows:
-        if action_type != "WIN":
-            break
-        if game_type and gtype != game_type:
-            break
-        streak += 1
+    streak = aggregates.win_streak(ctx.db, user_id=ctx.history.user_id, game_type=game_type)
     return EvalResult(progress=streak, unlocked=streak >= threshold)
 
 
@@ -0,0 +1,247 @@
+"""업적 평가 비동기 파이프라인 (commit 이후 실행)
+
+log_game_history 가 commit 후 submit(user_id, history_id) 로 평가를 예약한다.
+
+- 전용 워커 스레드 풀 (기본 event loop executor 미사용)
+- 작업마다 독립 SessionLocal (요청 세션 공유 금지)
+- 사용자 단위 배치: 같은 사용자에 대한 요청이 batch window 내 연속 도착하면 1개 작업으로 병합
+- bounded pending: 대기 사용자 수가 상한을 넘으면 신규 사용자 작업은 drop (메트릭 기록)
+- drain(): 테스트/종료용 동기 처리 훅
+
+환경변수:
+  ACHIEVEMENT_EVAL_WORKERS          워커 수 (기본 2, 0 이면 drain 호출 시에만 처리)
+  ACHIEVEMENT_EVAL_MAX_PENDING      대기 사용자 상한 (기본 10000)
+  ACHIEVEMENT_EVAL_BATCH_WINDOW_MS  사용자별 병합 대기 (기본 50ms)
+
+메트릭:
+  achievement_eval_pending / achievement_eval_inflight (Gauge)
+  achievement_eval_submitted_total{result=queued|coalesced|dropped}
+  achievement_eval_batch_size / achievement_eval_seconds (Histogram)
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from ..models.history_models import GameHistory
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _PENDING = Gauge("achievement_eval_pending", "Users waiting for achievement evaluation")
+    _INFLIGHT = Gauge("achievement_eval_inflight", "Achievement evaluation jobs currently running")
+    _SUBMITTED = Counter("achievement_eval_submitted_total", "Achievement evaluation submissions", ["result"])
+    _BATCH_SIZE = Histogram(
+        "achievement_eval_batch_size", "History rows merged into one evaluation job",
+        buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+    )
+    _EVAL_SECONDS = Histogram("achievement_eval_seconds", "Achievement evaluation job duration")
+except Exception:  # pragma: no cover
+    _PENDING = _INFLIGHT = _SUBMITTED = _BATCH_SIZE = _EVAL_SECONDS = None
+
+logger = logging.getLogger(__name__)
+
+# 평가 대상 액션 (세션 시작/종료 등 메타 이벤트 제외)
+EVALUABLE_ACTIONS = {"BET", "WIN", "LOSE", "BONUS", "JACKPOT"}
+
+
+@dataclass
+class _Job:
+    user_id: int
+    due: float
+    history_ids: List[int] = field(default_factory=list)
+
+
+class AchievementEvaluationPipeline:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        batch_window: Optional[float] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.workers = int(os.getenv("ACHIEVEMENT_EVAL_WORKERS", "2")) if workers is None else workers
+        self.max_pending = int(os.getenv("ACHIEVEMENT_EVAL_MAX_PENDING", "10000")) if max_pending is None else max_pending
+        if batch_window is None:
+            batch_window = float(os.getenv("ACHIEVEMENT_EVAL_BATCH_WINDOW_MS", "50")) / 1000.0
+        self.batch_window = max(0.0, batch_window)
+        self._session_factory = session_factory
+        self._pending: Dict[int, _Job] = {}
+        self._heap: List[tuple] = []  # (due, seq, user_id)
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._inflight = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        # 실시간 알림 전송용 이벤트 루프 (submit 호출 스레드의 running loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------------- lifecycle ---------------- #
+    def start(self) -> None:
+        with self._cv:
+            if self._threads or self.workers <= 0:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"achievement-eval-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0) -> None:
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+            threads, self._threads = self._threads, []
+        if wait:
+            for t in threads:
+                t.join(timeout=timeout)
+
+    # ---------------- submission ---------------- #
+    def submit(self, user_id: int, history_id: int) -> bool:
+        """평가 예약. 대기열 포화로 drop 된 경우 False."""
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        with self._cv:
+            job = self._pending.get(user_id)
+            if job is not None:
+                job.history_ids.append(history_id)
+                metric(_SUBMITTED, "inc", result="coalesced")
+                return True
+            if len(self._pending) >= self.max_pending:
+                metric(_SUBMITTED, "inc", result="dropped")
+                logger.warning("achievement eval queue full (pending=%s); dropping user=%s", len(self._pending), user_id)
+                return False
+            job = _Job(user_id=user_id, due=time.monotonic() + self.batch_window, history_ids=[history_id])
+            self._pending[user_id] = job
+            heapq.heappush(self._heap, (job.due, next(self._seq), user_id))
+            metric(_SUBMITTED, "inc", result="queued")
+            metric(_PENDING, "set", len(self._pending))
+            self._cv.notify()
+        if not self._threads and self.workers > 0:
+            self.start()
+        return True
+
+    def pending_count(self) -> int:
+        with self._cv:
+            return len(self._pending)
+
+    # ---------------- processing ---------------- #
+    def _take(self, force: bool = False) -> Optional[_Job]:
+        """due 가 지난 작업 1개 pop (lock 보유 상태에서 호출)."""
+        while self._heap:
+            due, _, user_id = self._heap[0]
+            job = self._pending.get(user_id)
+            if job is None or job.due != due:
+                heapq.heappop(self._heap)  # stale
+                continue
+            if not force and due > time.monotonic():
+                return None
+            heapq.heappop(self._heap)
+            self._pending.pop(user_id, None)
+            self._inflight += 1
+            metric(_PENDING, "set", len(self._pending))
+            metric(_INFLIGHT, "set", self._inflight)
+            return job
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cv:
+                job = None
+                while not self._stopping:
+                    job = self._take()
+                    if job is not None:
+                        break
+                    wait = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cv.wait(timeout=wait if wait is None or wait > 0 else 0)
+                if job is None:
+                    return
+            self._run(job)
+
+    def _run(self, job: _Job) -> None:
+        started = time.perf_counter()
+        try:
+            self._evaluate(job)
+        except Exception:
+            logger.warning("achievement evaluation failed user=%s", job.user_id, exc_info=True)
+        finally:
+            metric(_BATCH_SIZE, "observe", len(job.history_ids))
+            metric(_EVAL_SECONDS, "observe", time.perf_counter() - started)
+            with self._cv:
+                self._inflight -= 1
+                metric(_INFLIGHT, "set", self._inflight)
+                self._cv.notify_all()
+
+    def _new_session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from ..database import SessionLocal
+        return SessionLocal()
+
+    def _evaluate(self, job: _Job) -> None:
+        from .achievement_service import AchievementService
+
+        db = self._new_session()
+        try:
+            rows = db.scalars(
+                select(GameHistory).where(GameHistory.id.in_(job.history_ids)).order_by(GameHistory.id)
+            ).all()
+            # 게임 종류별 최신 행 1건만 평가 (집계 기반 평가기는 최신 상태만 필요)
+            latest: Dict[str, GameHistory] = {}
+            for h in rows:
+                latest[h.game_type] = h
+            svc = AchievementService(db)
+            for h in latest.values():
+                svc.evaluate_after_history(h)
+            db.commit()
+            svc.broadcast_pending(self._loop)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def drain(self, timeout: float = 10.0) -> None:
+        """대기 작업을 호출 스레드에서 즉시 처리하고 실행 중 작업 완료까지 대기 (테스트 훅)."""
+        while True:
+            with self._cv:
+                job = self._take(force=True)
+            if job is None:
+                break
+            self._run(job)
+        deadline = time.monotonic() + timeout
+        with self._cv:
+            while self._inflight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("achievement pipeline drain timed out")
+                self._cv.wait(timeout=remaining)
+
+
+_pipeline: Optional[AchievementEvaluationPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_achievement_pipeline() -> AchievementEvaluationPipeline:
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = AchievementEvaluationPipeline()
+        return _pipeline
+
+
+def should_evaluate(action_type: str, result_meta: Optional[Dict[str, Any]]) -> bool:
+    if isinstance(result_meta, dict) and result_meta.get("is_user_action") is False:
+        return False
+    return action_type in EVALUABLE_ACTIONS
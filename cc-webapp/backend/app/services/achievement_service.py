@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from datetime import datetime
+import asyncio
+import logging
 
 from ..models.achievement_models import Achievement, UserAchievement
 from ..models.history_models import GameHistory
@@ -11,12 +13,15 @@ from ..models.notification_models import Notification
 from ..realtime.hub import hub
 from .achievement_evaluator import AchievementEvaluatorRegistry, EvalContext, EvalResult
 
+logger = logging.getLogger(__name__)
+
 
 class AchievementService:
     """Service layer for achievements evaluation and retrieval."""
 
     def __init__(self, db: Session):
         self.db = db
+        self.pending_events: List[Dict[str, Any]] = []
 
     def list_active(self) -> List[Achievement]:
         return self.db.scalars(select(Achievement).where(Achievement.is_active == True)).all()  # noqa: E712
@@ -48,10 +53,12 @@ class AchievementService:
     def evaluate_after_history(self, history: GameHistory) -> List[str]:
         """Evaluate achievements for a new `GameHistory` via strategy registry.
 
-        Returns list of unlocked achievement codes.
+        Returns list of unlocked achievement codes. 실시간 이벤트는 commit 이후
+        broadcast_pending() 으로 전송하도록 self.pending_events 에 적재만 한다.
         """
-        metadata = history.metadata or {}
-        if not metadata.get("is_user_action", False):
+        from .achievement_pipeline import should_evaluate
+
+        if not should_evaluate(history.action_type, history.result_meta):
             return []
 
         unlocked_codes: List[str] = []
@@ -79,29 +86,41 @@ class AchievementService:
                     title=f"Achievement Unlocked: {ach.title}",
                     message=ach.description or ach.code,
                     notification_type="achievement_unlock",
-                    related_code=ach.code,
                 )
                 self.db.add(notif)
-                hub.broadcast(history.user_id, {
+                self.pending_events.append({
                     "type": "achievement_unlock",
+                    "user_id": history.user_id,
                     "code": ach.code,
                     "title": ach.title,
                     "reward_coins": ach.reward_coins,
                     "reward_gold": 0,
                 })
-                try:
-                    from ..routers.realtime import broadcast_achievement_progress
-                    import asyncio
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        loop.create_task(broadcast_achievement_progress(
-                            user_id=history.user_id,
-                            achievement_code=ach.code,
-                            progress=result.progress,
-                            unlocked=True
-                        ))
-                except Exception:
-                    pass
+                self.pending_events.append({
+                    "type": "achievement_progress",
+                    "user_id": history.user_id,
+                    "achievement_code": ach.code,
+                    "progress": result.progress,
+                    "unlocked": True,
+                })
         return unlocked_codes
 
+    def broadcast_pending(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> int:
+        """적재된 실시간 이벤트를 hub 로 전송 (commit 이후 호출).
+
+        워커 스레드에서 호출되면 loop(요청 처리 이벤트 루프)에 run_coroutine_threadsafe 로 위임.
+        """
+        events, self.pending_events = self.pending_events, []
+        if not events:
+            return 0
+        if loop is None or not loop.is_running():
+            # 이벤트 루프 없는 컨텍스트(스크립트/배치): Notification 행으로 충분
+            return 0
+        for event in events:
+            try:
+                asyncio.run_coroutine_threadsafe(hub.broadcast(event), loop)
+            except Exception:
+                logger.debug("achievement broadcast failed", exc_info=True)
+        return len(events)
+
     # Aggregation helpers moved into achievement_evaluator strategies.
@@ -0,0 +1,462 @@
+"""활동 테이블(user_actions / game_history) 저장 레이아웃 + 롤업
+
+append-only 활동 테이블을 시간 범위 기준으로 관리한다.
+
+파티션 (Postgres):
+  20261018 마이그레이션이 두 테이블을 created_at 월 단위 range 파티션으로 전환한다
+  (기존 테이블은 복사 없이 legacy 파티션으로 attach). ensure_partitions() 가 앞으로
+  ACTIVITY_PARTITION_MONTHS_AHEAD 개월 파티션을 미리 만든다 (스케줄러 일 1회).
+  SQLite 등: 파티션 없음 → 같은 인터페이스로 복합 인덱스 + 범위 chunk 삭제.
+
+롤업 (activity_rollups):
+  hour/day 버킷 × action_type (game_history 는 × game_type) 의 건수/고유 사용자/delta_coin 합.
+  '*' 행은 버킷 합계이며 활동 없는 버킷도 0 으로 기록 → 최대 bucket_start + 1 버킷 = 워터마크.
+  refresh_rollups() 는 [워터마크 - LOOKBACK, floor(now - SETTLE)) 를 다시 계산해 늦게 commit 된 행을 보정.
+  activity_daily_users 에는 (day, user_id) 집합을 같은 주기로 적재 (DAU 는 버킷 합산이 불가하므로).
+
+조회:
+  count_actions() / active_users() = 롤업(워터마크 이전 완결 버킷) + 원본 tail(워터마크 이후, 인덱스 범위 스캔)
+  롤업 시작(rollup_start: 최초 backfill 시점 또는 hour 롤업 보존 만료) 이전 구간도 원본으로 센다.
+  → 롤업 갱신 주기와 무관하게 원본 스캔과 같은 값.
+
+보존:
+  purge_expired() — 보존 기간이 지난 월 파티션은 DROP (Postgres), 나머지는 id chunk 단위 DELETE.
+  archive_dir 지정 시 삭제 전 gzip JSONL 로 내보낸다. 명령: python -m app.scripts.activity_retention
+
+환경변수:
+  ACTIVITY_ROLLUP_SETTLE_MINUTES          버킷 종료 후 롤업 대상이 되기까지 대기 (기본 5)
+  ACTIVITY_ROLLUP_LOOKBACK_HOURS          매 갱신 시 재계산할 과거 시간 (기본 2)
+  ACTIVITY_ROLLUP_BACKFILL_DAYS           워터마크가 없을 때 최초 롤업 범위 (기본 35)
+  ACTIVITY_ROLLUP_HOURLY_RETENTION_DAYS   hour 롤업 보존 (기본 90, day 롤업은 유지)
+  ACTIVITY_PARTITION_MONTHS_AHEAD         미리 만들 월 파티션 수 (기본 2)
+  ACTIVITY_RETENTION_MONTHS               원본 보존 개월 (기본 13)
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, and_, cast, delete, func, literal, select, text, union
+from sqlalchemy.orm import Session
+
+from ..models.activity_models import ActivityDailyUser, ActivityRollup
+from ..models.game_models import UserAction
+from ..models.history_models import GameHistory
+
+logger = logging.getLogger(__name__)
+
+ALL = "*"
+HOUR = "hour"
+DAY = "day"
+_UNIT = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+
+@dataclass(frozen=True)
+class _Source:
+    name: str
+    model: Any
+    game_column: Optional[str] = None
+    delta_column: Optional[str] = None
+
+
+SOURCES: Dict[str, _Source] = {
+    "user_actions": _Source("user_actions", UserAction),
+    "game_history": _Source("game_history", GameHistory, game_column="game_type", delta_column="delta_coin"),
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def floor_bucket(value: datetime, granularity: str) -> datetime:
+    if granularity == HOUR:
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_bucket(value: datetime, granularity: str) -> datetime:
+    floor = floor_bucket(value, granularity)
+    return floor if floor == value else floor + _UNIT[granularity]
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    idx = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=idx // 12, month=idx % 12 + 1, day=1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _insert_for(db: Session):
+    name = _dialect(db)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _bucket_expr(db: Session, column, granularity: str):
+    """버킷 시작 시각 식 (Postgres date_trunc / SQLite strftime). 미지원 dialect 는 None."""
+    name = _dialect(db)
+    if name == "postgresql":
+        return func.date_trunc(granularity, column)
+    if name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00" if granularity == HOUR else "%Y-%m-%d 00:00:00", column)
+    return None
+
+
+def _as_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.fromisoformat(str(value))
+
+
+# ---------------------------------------------------------------------------
+# 롤업
+# ---------------------------------------------------------------------------
+def _grouped(db: Session, src: _Source, start: datetime, end: datetime, granularity: str,
+             keys: List[Any]) -> Iterable[Tuple]:
+    """(bucket, *keys, count, distinct_users, delta_sum) 행"""
+    model = src.model
+    delta = func.coalesce(func.sum(getattr(model, src.delta_column)), 0) if src.delta_column else literal(0)
+    measures = [func.count(), func.count(func.distinct(model.user_id)), delta]
+    window = and_(model.created_at >= start, model.created_at < end)
+    bucket = _bucket_expr(db, model.created_at, granularity)
+    if bucket is not None:
+        stmt = select(bucket.label("bucket"), *keys, *measures).where(window).group_by(bucket, *keys)
+        for row in db.execute(stmt):
+            yield (_as_datetime(row[0]), *row[1:])
+        return
+    cursor = start  # 미지원 dialect: 버킷별 질의
+    while cursor < end:
+        nxt = cursor + _UNIT[granularity]
+        stmt = select(*keys, *measures).where(model.created_at >= cursor, model.created_at < nxt)
+        if keys:
+            stmt = stmt.group_by(*keys)
+        for row in db.execute(stmt):
+            if row[len(keys)]:
+                yield (cursor, *row)
+        cursor = nxt
+
+
+def rollup_range(db: Session, source: str, granularity: str, start: datetime, end: datetime) -> int:
+    """[start, end) 버킷 롤업 재계산 (기존 행 교체, commit 은 호출자). 기록한 행 수 반환."""
+    src = SOURCES[source]
+    start, end = floor_bucket(start, granularity), floor_bucket(end, granularity)
+    if start >= end:
+        return 0
+    model = src.model
+    keys = [model.action_type] + ([getattr(model, src.game_column)] if src.game_column else [])
+    total_game = ALL if src.game_column else ""
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    for bucket, *rest in _grouped(db, src, start, end, granularity, keys):
+        action_type, game_type = rest[0], (rest[1] if src.game_column else "")
+        count, users, delta = rest[-3:]
+        rows.append(dict(granularity=granularity, source=source, bucket_start=bucket,
+                         action_type=action_type or "", game_type=game_type or "",
+                         event_count=int(count), user_count=int(users), delta_coin=int(delta or 0), updated_at=now))
+    totals = {bucket: rest for bucket, *rest in _grouped(db, src, start, end, granularity, [])}
+    cursor = start
+    while cursor < end:  # 활동 없는 버킷도 0 합계 행 → 워터마크 전진
+        count, users, delta = totals.get(cursor, (0, 0, 0))
+        rows.append(dict(granularity=granularity, source=source, bucket_start=cursor, action_type=ALL,
+                         game_type=total_game, event_count=int(count), user_count=int(users),
+                         delta_coin=int(delta or 0), updated_at=now))
+        cursor += _UNIT[granularity]
+    db.execute(
+        delete(ActivityRollup)
+        .where(ActivityRollup.granularity == granularity, ActivityRollup.source == source,
+               ActivityRollup.bucket_start >= start, ActivityRollup.bucket_start < end)
+        .execution_options(synchronize_session=False)
+    )
+    if rows:
+        db.execute(ActivityRollup.__table__.insert(), rows)
+    return len(rows)
+
+
+def _record_daily_users(db: Session, start: datetime, end: datetime) -> int:
+    """(day, user_id) 집합 적재. 서버 측 INSERT ... SELECT DISTINCT (행을 앱으로 가져오지 않음)."""
+    pairs = (
+        select(cast(UserAction.created_at, Date) if _dialect(db) == "postgresql" else func.date(UserAction.created_at),
+               UserAction.user_id)
+        .where(UserAction.created_at >= start, UserAction.created_at < end)
+        .distinct()
+    )
+    insert = _insert_for(db)
+    if insert is not None:
+        stmt = insert(ActivityDailyUser.__table__).from_select(["day", "user_id"], pairs)
+        return db.execute(stmt.on_conflict_do_nothing(index_elements=["day", "user_id"])).rowcount or 0
+    added = 0  # pragma: no cover - 기타 dialect
+    for d, uid in db.execute(pairs).all():
+        day = d if type(d) is date else _as_datetime(d).date()
+        if db.get(ActivityDailyUser, (day, uid)) is None:
+            db.add(ActivityDailyUser(day=day, user_id=uid))
+            added += 1
+    db.flush()
+    return added
+
+
+def watermark(db: Session, source: str = "user_actions", granularity: str = HOUR) -> Optional[datetime]:
+    """롤업이 완결된 구간의 끝 (이 시각 이전 버킷은 롤업만으로 조회 가능)"""
+    last = db.execute(
+        select(func.max(ActivityRollup.bucket_start))
+        .where(ActivityRollup.granularity == granularity, ActivityRollup.source == source,
+               ActivityRollup.action_type == ALL)
+    ).scalar()
+    return _as_datetime(last) + _UNIT[granularity] if last is not None else None
+
+
+def rollup_start(db: Session, source: str = "user_actions", granularity: str = HOUR) -> Optional[datetime]:
+    """롤업이 남아 있는 구간의 시작 (최초 backfill 이전 / 보존 만료로 삭제된 구간은 원본으로 조회)"""
+    first = db.execute(
+        select(func.min(ActivityRollup.bucket_start))
+        .where(ActivityRollup.granularity == granularity, ActivityRollup.source == source,
+               ActivityRollup.action_type == ALL)
+    ).scalar()
+    return _as_datetime(first) if first is not None else None
+
+
+def refresh_rollups(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """hour/day 롤업 + 일별 활성 사용자 갱신 후 commit. 소스별 처리 범위 반환."""
+    now = now or datetime.utcnow()
+    settle = timedelta(minutes=_env_int("ACTIVITY_ROLLUP_SETTLE_MINUTES", 5))
+    lookback = timedelta(hours=_env_int("ACTIVITY_ROLLUP_LOOKBACK_HOURS", 2))
+    backfill = timedelta(days=_env_int("ACTIVITY_ROLLUP_BACKFILL_DAYS", 35))
+    report: Dict[str, Any] = {}
+    for source in SOURCES:
+        for granularity in (HOUR, DAY):
+            end = floor_bucket(now - settle, granularity)
+            wm = watermark(db, source, granularity)
+            if wm is None:
+                start = floor_bucket(now - backfill, granularity)
+            else:
+                start = min(wm, floor_bucket(wm - lookback, granularity)) if granularity == HOUR else wm - _UNIT[DAY]
+            written = rollup_range(db, source, granularity, start, end)
+            if source == "user_actions" and granularity == HOUR and start < end:
+                _record_daily_users(db, start, end)
+            report[f"{source}:{granularity}"] = {"start": start.isoformat(), "end": end.isoformat(), "rows": written}
+        db.commit()
+    return report
+
+
+# ---------------------------------------------------------------------------
+# 조회 (롤업 + 원본 tail)
+# ---------------------------------------------------------------------------
+def count_actions(
+    db: Session,
+    action_type: str,
+    since: datetime,
+    until: Optional[datetime] = None,
+    *,
+    source: str = "user_actions",
+    game_type: Optional[str] = None,
+) -> int:
+    """[since, until) 구간 action_type 건수. 원본 COUNT 와 같은 값."""
+    src = SOURCES[source]
+    model = src.model
+    until = until or datetime.utcnow()
+    if since >= until:
+        return 0
+
+    def raw(lo: datetime, hi: datetime) -> int:
+        if lo >= hi:
+            return 0
+        stmt = select(func.count()).select_from(model).where(
+            model.action_type == action_type, model.created_at >= lo, model.created_at < hi)
+        if game_type is not None and src.game_column:
+            stmt = stmt.where(getattr(model, src.game_column) == game_type)
+        return int(db.execute(stmt).scalar() or 0)
+
+    wm = watermark(db, source, HOUR)
+    h0 = _ceil_bucket(since, HOUR)
+    if wm:
+        h0 = max(h0, rollup_start(db, source, HOUR))  # 롤업 시작 이전은 원본 COUNT
+    h1 = min(wm, floor_bucket(until, HOUR)) if wm else h0
+    if h0 >= h1:
+        return raw(since, until)
+    stmt = select(func.coalesce(func.sum(ActivityRollup.event_count), 0)).where(
+        ActivityRollup.granularity == HOUR, ActivityRollup.source == source,
+        ActivityRollup.action_type == action_type,
+        ActivityRollup.bucket_start >= h0, ActivityRollup.bucket_start < h1,
+    )
+    if src.game_column and game_type is not None:
+        stmt = stmt.where(ActivityRollup.game_type == game_type)
+    rolled = int(db.execute(stmt).scalar() or 0)
+    return rolled + raw(since, h0) + raw(h1, until)
+
+
+def active_users(db: Session, since: datetime, until: Optional[datetime] = None) -> int:
+    """[since, until) 구간 user_actions 고유 사용자 수. 원본 COUNT(DISTINCT) 와 같은 값.
+
+    since 가 자정이고 until 이 현재(None)이면 activity_daily_users ∪ 워터마크 이후 원본으로 계산.
+    """
+    raw_window = select(UserAction.user_id).where(UserAction.created_at >= since)
+    if until is not None or since != floor_bucket(since, DAY):
+        if until is not None:
+            raw_window = raw_window.where(UserAction.created_at < until)
+        return int(db.execute(select(func.count(func.distinct(raw_window.subquery().c.user_id)))).scalar() or 0)
+    wm = watermark(db, "user_actions", HOUR)
+    # activity_daily_users 는 hour 롤업과 같은 범위로 적재됨 → 첫 온전한 날부터만 신뢰
+    covered = max(since, _ceil_bucket(rollup_start(db, "user_actions", HOUR), DAY)) if wm else since
+    if wm is None or wm <= covered:
+        return int(db.execute(select(func.count(func.distinct(raw_window.subquery().c.user_id)))).scalar() or 0)
+    parts = [
+        select(ActivityDailyUser.user_id).where(ActivityDailyUser.day >= covered.date()),
+        select(UserAction.user_id).where(UserAction.created_at >= wm),
+    ]
+    if covered > since:
+        parts.append(select(UserAction.user_id).where(UserAction.created_at >= since, UserAction.created_at < covered))
+    merged = union(*parts).subquery()
+    return int(db.execute(select(func.count()).select_from(merged)).scalar() or 0)
+
+
+# ---------------------------------------------------------------------------
+# 파티션 / 보존
+# ---------------------------------------------------------------------------
+def is_partitioned(db: Session, table: str) -> bool:
+    if _dialect(db) != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :t AND c.relnamespace = to_regnamespace(current_schema())::oid"
+    ), {"t": table}).scalar())
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+    """이번 달 ~ months_ahead 개월 뒤 월 파티션 생성 (Postgres 파티션 테이블만). 생성한 이름 반환."""
+    months_ahead = _env_int("ACTIVITY_PARTITION_MONTHS_AHEAD", 2) if months_ahead is None else months_ahead
+    base = month_start(now or datetime.utcnow())
+    created: List[str] = []
+    for table in SOURCES:
+        if not is_partitioned(db, table):
+            continue
+        for i in range(months_ahead + 1):
+            lo, hi = add_months(base, i), add_months(base, i + 1)
+            name = partition_name(table, lo)
+            exists = db.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar()
+            if exists:
+                continue
+            try:
+                with db.begin_nested():  # legacy 파티션 범위와 겹치면 건너뜀
+                    db.execute(text(
+                        f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{lo.isoformat(sep=' ')}') TO ('{hi.isoformat(sep=' ')}')"
+                    ))  # 인덱스는 부모 파티션 인덱스가 자동 생성 (created_at BRIN 포함)
+                created.append(name)
+            except Exception as e:
+                logger.info("partition %s skipped: %s", name, e)
+    db.commit()
+    return created
+
+
+_BOUND_TO = re.compile(r"TO \('([^']+)'\)")
+
+
+def _expired_partitions(db: Session, table: str, cutoff: datetime) -> List[str]:
+    rows = db.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :t"
+    ), {"t": table}).all()
+    expired = []
+    for name, bound in rows:
+        m = _BOUND_TO.search(bound or "")
+        if m and "DEFAULT" not in bound and _as_datetime(m.group(1)[:19]) <= cutoff:
+            expired.append(name)
+    return expired
+
+
+def purge_expired(
+    db: Session,
+    *,
+    months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    chunk_size: int = 5000,
+    now: Optional[datetime] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """보존 기간 이전 원본 삭제 (+ 선택적 gzip JSONL 아카이브). 롤업(day)은 유지."""
+    months = _env_int("ACTIVITY_RETENTION_MONTHS", 13) if months is None else months
+    now = now or datetime.utcnow()
+    cutoff = add_months(month_start(now), -months)
+    report: Dict[str, Any] = {"cutoff": cutoff.isoformat(), "dry_run": dry_run}
+    for table, src in SOURCES.items():
+        model = src.model
+        archive = None
+        if archive_dir and not dry_run:
+            os.makedirs(archive_dir, exist_ok=True)
+            path = os.path.join(archive_dir, f"{table}_before_{cutoff:%Y%m}_{now:%Y%m%d%H%M%S}.jsonl.gz")
+            archive = gzip.open(path, "at", encoding="utf-8")
+            report[f"{table}:archive"] = path
+        dropped: List[str] = []
+        deleted = 0
+        try:
+            if is_partitioned(db, table):
+                for name in _expired_partitions(db, table, cutoff):
+                    if dry_run:
+                        dropped.append(name)
+                        continue
+                    if archive is not None:
+                        for row in db.execute(text(f'SELECT * FROM "{name}"')).mappings():
+                            archive.write(json.dumps(dict(row), ensure_ascii=False, default=str) + "\n")
+                    db.execute(text(f'DROP TABLE "{name}"'))
+                    db.commit()
+                    dropped.append(name)
+            # legacy/default 파티션 또는 비파티션 테이블: id chunk 삭제
+            if dry_run:
+                deleted = int(db.execute(
+                    select(func.count()).select_from(model).where(model.created_at < cutoff)).scalar() or 0)
+            table_obj = model.__table__
+            while not dry_run:
+                # created_at 인덱스 순으로 chunk 선택 → id 목록 삭제 (chunk 당 짧은 잠금)
+                ids = db.execute(
+                    select(table_obj.c.id).where(table_obj.c.created_at < cutoff)
+                    .order_by(table_obj.c.created_at).limit(chunk_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                window = table_obj.c.id.in_(ids)
+                if archive is not None:
+                    for row in db.execute(select(table_obj).where(window)).mappings():
+                        archive.write(json.dumps(dict(row), ensure_ascii=False, default=str) + "\n")
+                deleted += db.execute(table_obj.delete().where(window)).rowcount or 0
+                db.commit()
+        finally:
+            if archive is not None:
+                archive.close()
+        report[table] = {"dropped_partitions": dropped, "deleted_rows": deleted}
+
+    if not dry_run:
+        hourly_cutoff = now - timedelta(days=_env_int("ACTIVITY_ROLLUP_HOURLY_RETENTION_DAYS", 90))
+        report["hourly_rollups_deleted"] = db.execute(
+            delete(ActivityRollup).where(ActivityRollup.granularity == HOUR,
+                                         ActivityRollup.bucket_start < floor_bucket(hourly_cutoff, HOUR))
+        ).rowcount
+        report["daily_users_deleted"] = db.execute(
+            delete(ActivityDailyUser).where(ActivityDailyUser.day < cutoff.date())
+        ).rowcount
+        db.commit()
+    return report
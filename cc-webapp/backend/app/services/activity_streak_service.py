@@ -0,0 +1,62 @@
+"""UserAction 기반 연속 활동일(streak) 계산
+
+기존 routers/games.calculate_user_streak 는 하루씩 func.date(created_at) == d 로 최대 30회 조회했다
+(함수 비교로 인덱스 사용 불가 + 순차 round trip).
+
+여기서는 created_at 범위 조건(인덱스 사용 가능) 1회로 lookback 구간의 활동 날짜를
+DISTINCT 로 최신순 조회한 뒤, 오늘부터 끊기는 지점까지 파이썬에서 센다.
+lookback_days=None 이면 하한 없이 첫 공백일까지 계산.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.game_models import UserAction
+
+
+def _as_date(v) -> Optional[date]:
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return date.fromisoformat(str(v)[:10])
+
+
+def activity_streak(
+    db: Session,
+    user_id: int,
+    lookback_days: Optional[int] = 30,
+    today: Optional[date] = None,
+) -> int:
+    """오늘(UTC)부터 거꾸로 활동이 있는 연속 일수 (최대 lookback_days)."""
+    today = today or datetime.utcnow().date()
+    if lookback_days is not None and lookback_days <= 0:
+        return 0
+    day = func.date(UserAction.created_at)
+    stmt = (
+        select(day)
+        .where(
+            UserAction.user_id == user_id,
+            UserAction.created_at < datetime.combine(today + timedelta(days=1), datetime.min.time()),
+        )
+        .group_by(day)
+        .order_by(day.desc())
+    )
+    if lookback_days is not None:
+        since = datetime.combine(today - timedelta(days=lookback_days - 1), datetime.min.time())
+        stmt = stmt.where(UserAction.created_at >= since)
+
+    streak = 0
+    expected = today
+    for (value,) in db.execute(stmt):
+        if _as_date(value) != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return streak
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from .. import models
+from .principal_cache import get_principal_cache
 
 class AdminService:
     def __init__(self, db: Session):
@@ -177,6 +178,7 @@ class AdminService:
             pass
         self.db.add(user)
         self.db.commit()
+        get_principal_cache().invalidate_user(user_id)  # 캐시된 토큰으로 계속 인증되지 않도록
         banned_until = None
         if duration_hours and duration_hours > 0:
             from datetime import datetime, timedelta
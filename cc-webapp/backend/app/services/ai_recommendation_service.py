@@ -2,14 +2,35 @@
 🤖 Casino-Club F2P - AI 추천 시스템 서비스
 ========================================
 AI 기반 개인화 추천 및 콘텐츠 제공 서비스
+
+추천 파이프라인:
+  - 세그먼트 후보: 세그먼트별 정적 추천 + 활성 RecommendationTemplate 을 세그먼트 단위로
+    미리 계산해 프로세스 내 TTL 캐시에 보관 (사용자마다 재조회/재구성하지 않음)
+  - 사용자별 결과 캐시: 생성된 추천 id 목록을 Redis(RedisManager temp data)에 보관.
+    캐시 키는 사용자 단위이며 최근 액션 워터마크(윈도 내 max(id), count)가 바뀌면 무효
+    (모든 UserAction 기록 경로를 수정하지 않고도 새 액션 발생 시 자동 무효화).
+    상호작용/선호도 변경 시에는 invalidate_user_recommendations 로 명시 무효화
+  - 중복 방지: (type, title, content_data) 지문이 같은 pending 추천이 있으면 새 행을
+    INSERT 하지 않고 기존 행을 재사용
+  - 오프라인 배치: generate_batch 가 최근 활동 사용자를 user_id 키셋 청크로 순회하며
+    청크당 고정 개수 쿼리로 세그먼트/선호도/최근 액션/pending 추천을 일괄 로드 후 생성
+
+환경변수:
+  AI_RECS_CACHE_TTL_SECONDS          사용자별 결과 캐시 TTL (기본 300)
+  AI_SEGMENT_CANDIDATES_TTL_SECONDS  세그먼트 후보 캐시 TTL (기본 600)
+  AI_RECS_BATCH_CHUNK_SIZE           배치 청크 크기 (기본 500)
 """
 
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, or_
 
 from ..models.ai_models import (
     RecommendationTemplate, UserRecommendation, RecommendationInteraction,
@@ -24,114 +45,440 @@ from ..schemas.ai_schemas import (
     UserPreferenceUpdate, PersonalizationRequest
 )
 from ..utils.emotion_engine import EmotionEngine
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter  # type: ignore
+    _REQUESTS = Counter("ai_recommendations_requests_total", "Recommendation generation requests", ["result"])
+    _ROWS = Counter("ai_recommendations_rows_total", "Recommendation rows returned", ["outcome"])
+except Exception:  # pragma: no cover
+    _REQUESTS = _ROWS = None
 
 logger = logging.getLogger(__name__)
 
+RECENT_ACTION_DAYS = 7
+RECENT_ACTION_LIMIT = 50
+ALGORITHM_VERSION = "v1.0"
+
+# 세그먼트 기반 게임 추천
+SEGMENT_GAMES: Dict[str, List[str]] = {
+    "Whale": ["premium_slots", "high_stakes_poker"],
+    "High": ["tournament_games", "competitive_modes"],
+    "Medium": ["daily_missions", "casual_slots"],
+    "At-risk": ["free_games", "tutorial_modes"]
+}
+
+# RFM 세그먼트 명칭(rfm_group) → 추천 세그먼트
+_SEGMENT_ALIASES = {"High Engaged": "High", "Low/At-risk": "At-risk", "Low": "At-risk"}
+
+_candidate_cache: Dict[str, Tuple[float, Tuple[Dict[str, Any], ...]]] = {}
+_candidate_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def normalize_segment(segment: Optional[UserSegment]) -> str:
+    name = (segment.rfm_group or segment.name) if segment else None
+    if not name:
+        return "Medium"
+    return _SEGMENT_ALIASES.get(name, name)
+
+
+def _action_payload(action: UserAction) -> Dict[str, Any]:
+    """action_data(Text, JSON 문자열/표준 envelope) → dict"""
+    try:
+        payload = json.loads(action.action_data) if action.action_data else {}
+    except Exception:
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    data = payload.get("data")
+    return {**payload, **data} if isinstance(data, dict) else payload
+
+
+def recommendation_fingerprint(rec_type: str, title: str, content_data: Optional[Dict[str, Any]]) -> str:
+    raw = json.dumps([rec_type, title, content_data or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _segment_candidates(db: Session, segment: str) -> Tuple[Dict[str, Any], ...]:
+    """세그먼트 후보 추천 사양 (프로세스 내 TTL 캐시)"""
+    now = time.monotonic()
+    cached = _candidate_cache.get(segment)
+    if cached and cached[0] > now:
+        return cached[1]
+    with _candidate_lock:
+        cached = _candidate_cache.get(segment)
+        if cached and cached[0] > now:
+            return cached[1]
+        specs: List[Dict[str, Any]] = []
+        for game_type in SEGMENT_GAMES.get(segment, []):
+            specs.append({
+                "recommendation_type": "game",
+                "title": f"{segment} 사용자 추천 게임",
+                "description": f"{game_type} 게임을 시도해보세요!",
+                "content_data": {
+                    "game_type": game_type,
+                    "reason": "segment_based",
+                    "target_segment": segment
+                },
+                "priority_score": 0.6,
+                "confidence_score": 0.7,
+                "personalization_factors": {
+                    "segment": segment,
+                    "recommendation_basis": "segment_targeting"
+                },
+            })
+        try:
+            templates = db.query(RecommendationTemplate).filter(
+                RecommendationTemplate.is_active.is_(True),
+                RecommendationTemplate.target_segment == segment
+            ).order_by(desc(RecommendationTemplate.priority)).all()
+        except Exception as e:
+            logger.warning(f"Failed to load recommendation templates: {str(e)}")
+            templates = []
+        for tpl in templates:
+            body = tpl.content_template or {}
+            specs.append({
+                "recommendation_type": tpl.template_type,
+                "template_id": tpl.id,
+                "title": body.get("title") or tpl.name,
+                "description": body.get("description"),
+                "content_data": body.get("content_data") or {},
+                "priority_score": float(body.get("priority_score", 0.5)),
+                "confidence_score": float(body.get("confidence_score", 0.5)),
+                "personalization_factors": {
+                    "segment": segment,
+                    "recommendation_basis": "template"
+                },
+            })
+        result = tuple(specs)
+        ttl = _env_int("AI_SEGMENT_CANDIDATES_TTL_SECONDS", 600)
+        _candidate_cache[segment] = (now + ttl, result)
+        return result
+
+
+def clear_segment_candidates() -> None:
+    """템플릿 변경 시 세그먼트 후보 재계산 유도"""
+    with _candidate_lock:
+        _candidate_cache.clear()
+
+
+def _cache_key(user_id: int) -> str:
+    return f"ai:recs:{user_id}"
+
+
+def _cache_backend(redis) -> Optional[Any]:
+    return redis if redis is not None and hasattr(redis, "get_temp_data") else None
+
+
+def invalidate_user_recommendations(redis, user_id: int) -> None:
+    backend = _cache_backend(redis)
+    if backend is not None:
+        backend.store_temp_data(_cache_key(user_id), {}, 1)
+
 
 class AIRecommendationService:
     """AI 추천 시스템 서비스"""
-    
+
     def __init__(self, db: Session, redis=None):
         self.db = db
         self.redis = redis
         self.emotion_engine = EmotionEngine(redis) if redis else None
-        
+        self._cache = _cache_backend(redis)
+
     async def generate_recommendations(
-        self, 
-        user_id: int, 
+        self,
+        user_id: int,
         recommendation_type: str = None,
         max_recommendations: int = 5
     ) -> List[UserRecommendation]:
-        """사용자를 위한 개인화 추천 생성"""
+        """사용자를 위한 개인화 추천 생성 (캐시 적중 시 DB 재생성/INSERT 없음)"""
         try:
+            now = datetime.utcnow()
+            since = now - timedelta(days=RECENT_ACTION_DAYS)
+            variant = f"{recommendation_type or 'all'}:{max_recommendations}"
+            watermark = self._action_watermark(user_id, since)
+
+            cached = self._load_cached(user_id, variant, watermark)
+            if cached is not None:
+                metric(_REQUESTS, "inc", result="hit")
+                return cached
+            metric(_REQUESTS, "inc", result="miss")
+
             # 사용자 정보 조회
             user = self.db.query(User).filter(User.id == user_id).first()
             if not user:
                 logger.error(f"User not found: {user_id}")
                 return []
-            
+
             # 사용자 세그먼트 조회
             user_segment = self.db.query(UserSegment).filter(
                 UserSegment.user_id == user_id
             ).first()
-            
-            segment_name = user_segment.segment_name if user_segment else "Medium"
-            
+
             # 사용자 선호도 조회
             user_preference = self.db.query(UserPreference).filter(
                 UserPreference.user_id == user_id
             ).first()
-            
+
             # 최근 활동 분석
             recent_actions = self.db.query(UserAction).filter(
                 UserAction.user_id == user_id,
-                UserAction.action_timestamp >= datetime.utcnow() - timedelta(days=7)
-            ).limit(50).all()
-            
-            # 추천 생성
-            recommendations = []
-            
-            # 1. 게임 추천
-            if not recommendation_type or recommendation_type == "game":
-                game_recs = await self._generate_game_recommendations(
-                    user_id, segment_name, user_preference, recent_actions
-                )
-                recommendations.extend(game_recs)
-            
-            # 2. 보상 추천
-            if not recommendation_type or recommendation_type == "reward":
-                reward_recs = await self._generate_reward_recommendations(
-                    user_id, segment_name, user_preference, recent_actions
-                )
-                recommendations.extend(reward_recs)
-            
-            # 3. 미션 추천
-            if not recommendation_type or recommendation_type == "mission":
-                mission_recs = await self._generate_mission_recommendations(
-                    user_id, segment_name, user_preference, recent_actions
-                )
-                recommendations.extend(mission_recs)
-            
-            # 4. 콘텐츠 추천
-            if not recommendation_type or recommendation_type == "content":
-                content_recs = await self._generate_content_recommendations(
-                    user_id, segment_name, user_preference, recent_actions
-                )
-                recommendations.extend(content_recs)
-            
-            # 우선순위별 정렬 및 제한
-            recommendations.sort(key=lambda x: x.priority_score, reverse=True)
-            recommendations = recommendations[:max_recommendations]
-            
-            # DB에 저장
-            for rec in recommendations:
-                self.db.add(rec)
+                UserAction.created_at >= since
+            ).order_by(desc(UserAction.created_at)).limit(RECENT_ACTION_LIMIT).all()
+
+            mood = None
+            if self.emotion_engine and self.redis:
+                # RedisManager 는 비동기 get 이 없어 get_user_mood 가 매번 예외 후 "neutral" 반환 → 조회 생략
+                mood = await self.emotion_engine.get_user_mood(user_id) if hasattr(self.redis, "get") else "neutral"
+
+            recommendations, _ = self._build_for_user(
+                user_id, normalize_segment(user_segment), user_preference, recent_actions, mood,
+                recommendation_type, max_recommendations, self._pending_by_fingerprint([user_id], now).get(user_id, {})
+            )
+            rec_ids = [rec.id for rec in recommendations]  # 커밋 후 만료(재조회) 전에 확보
             self.db.commit()
-            
+
+            self._store_cached(user_id, variant, watermark, rec_ids)
             return recommendations
-            
+
         except Exception as e:
             logger.error(f"Failed to generate recommendations: {str(e)}")
             self.db.rollback()
             return []
-    
-    async def _generate_game_recommendations(
-        self, 
-        user_id: int, 
-        segment: str, 
+
+    def generate_batch(
+        self,
+        max_recommendations: int = 5,
+        chunk_size: Optional[int] = None,
+        since_days: int = RECENT_ACTION_DAYS
+    ) -> Dict[str, int]:
+        """최근 활동 사용자 전체 추천 일괄 생성 (오프라인 배치)
+
+        user_id 키셋 청크 단위로 처리하며 청크마다 커밋한다. 감정 기반 콘텐츠 추천은
+        실시간 기분에 의존하므로 배치에서는 생성하지 않는다.
+        """
+        chunk_size = chunk_size or _env_int("AI_RECS_BATCH_CHUNK_SIZE", 500)
+        now = datetime.utcnow()
+        since = now - timedelta(days=since_days)
+        variant = f"all:{max_recommendations}"
+        stats = {"users": 0, "inserted": 0, "reused": 0, "chunks": 0}
+        cursor = 0
+        while True:
+            user_ids = [row[0] for row in self.db.query(UserAction.user_id).filter(
+                UserAction.created_at >= since,
+                UserAction.user_id > cursor
+            ).distinct().order_by(UserAction.user_id).limit(chunk_size).all()]
+            if not user_ids:
+                break
+            cursor = user_ids[-1]
+
+            segments = {
+                seg.user_id: seg for seg in
+                self.db.query(UserSegment).filter(UserSegment.user_id.in_(user_ids)).all()
+            }
+            preferences = {
+                pref.user_id: pref for pref in
+                self.db.query(UserPreference).filter(UserPreference.user_id.in_(user_ids)).all()
+            }
+            recent = self._recent_actions_by_user(user_ids, since)
+            watermarks = self._action_watermarks(user_ids, since)
+            pending = self._pending_by_fingerprint(user_ids, now)
+
+            results: Dict[int, List[int]] = {}
+            try:
+                for uid in user_ids:
+                    recs, inserted = self._build_for_user(
+                        uid, normalize_segment(segments.get(uid)), preferences.get(uid), recent.get(uid, []), None,
+                        None, max_recommendations, pending.get(uid, {})
+                    )
+                    results[uid] = [rec.id for rec in recs]
+                    stats["inserted"] += inserted
+                    stats["reused"] += len(recs) - inserted
+                self.db.commit()
+            except Exception as e:
+                logger.error(f"Failed to generate recommendation batch after user {cursor}: {str(e)}")
+                self.db.rollback()
+                raise
+
+            for uid, rec_ids in results.items():
+                self._store_cached(uid, variant, watermarks.get(uid, [0, 0]), rec_ids)
+            stats["users"] += len(user_ids)
+            stats["chunks"] += 1
+            if len(user_ids) < chunk_size:
+                break
+        return stats
+
+    # ---------------- 내부: 생성/중복 제거 ---------------- #
+    def _build_for_user(
+        self,
+        user_id: int,
+        segment: str,
+        preference: Optional[UserPreference],
+        recent_actions: List[UserAction],
+        mood: Optional[str],
+        recommendation_type: Optional[str],
+        max_recommendations: int,
+        pending: Dict[str, UserRecommendation]
+    ) -> Tuple[List[UserRecommendation], int]:
+        """추천 구성 후 동일 pending 추천은 재사용, 나머지만 세션에 추가. (결과, 신규 INSERT 수)"""
+        recommendations: List[UserRecommendation] = []
+
+        # 1. 게임 추천
+        if not recommendation_type or recommendation_type == "game":
+            recommendations.extend(self._generate_game_recommendations(
+                user_id, segment, preference, recent_actions
+            ))
+
+        # 2. 보상 추천
+        if not recommendation_type or recommendation_type == "reward":
+            recommendations.extend(self._generate_reward_recommendations(
+                user_id, segment, preference, recent_actions
+            ))
+
+        # 3. 미션 추천
+        if not recommendation_type or recommendation_type == "mission":
+            recommendations.extend(self._generate_mission_recommendations(
+                user_id, segment, preference, recent_actions
+            ))
+
+        # 4. 콘텐츠 추천
+        if not recommendation_type or recommendation_type == "content":
+            recommendations.extend(self._generate_content_recommendations(
+                user_id, segment, preference, recent_actions, mood
+            ))
+
+        # 5. 세그먼트 후보 (미리 계산된 세그먼트 추천 + 템플릿)
+        for spec in _segment_candidates(self.db, segment):
+            if recommendation_type and spec["recommendation_type"] != recommendation_type:
+                continue
+            recommendations.append(UserRecommendation(
+                user_id=user_id, source="ai_engine", algorithm_version=ALGORITHM_VERSION, **spec
+            ))
+
+        # 우선순위별 정렬 및 제한
+        recommendations.sort(key=lambda x: x.priority_score, reverse=True)
+        recommendations = recommendations[:max_recommendations]
+
+        # 동일 pending 추천 재사용 (DB에는 새 추천만 저장)
+        result: List[UserRecommendation] = []
+        new_rows: List[UserRecommendation] = []
+        for rec in recommendations:
+            fp = recommendation_fingerprint(rec.recommendation_type, rec.title, rec.content_data)
+            existing = pending.get(fp)
+            if existing is not None:
+                result.append(existing)
+                continue
+            pending[fp] = rec
+            new_rows.append(rec)
+            result.append(rec)
+        if new_rows:
+            self.db.add_all(new_rows)
+            self.db.flush()
+        metric(_ROWS, "inc", len(new_rows), outcome="inserted")
+        metric(_ROWS, "inc", len(result) - len(new_rows), outcome="reused")
+        return result, len(new_rows)
+
+    def _pending_by_fingerprint(self, user_ids: List[int], now: datetime) -> Dict[int, Dict[str, UserRecommendation]]:
+        rows = self.db.query(UserRecommendation).filter(
+            UserRecommendation.user_id.in_(user_ids),
+            UserRecommendation.status == "pending",
+            or_(UserRecommendation.expires_at.is_(None), UserRecommendation.expires_at > now)
+        ).order_by(UserRecommendation.id).all()
+        by_user: Dict[int, Dict[str, UserRecommendation]] = {}
+        for row in rows:
+            fp = recommendation_fingerprint(row.recommendation_type, row.title, row.content_data)
+            by_user.setdefault(row.user_id, {}).setdefault(fp, row)
+        return by_user
+
+    def _recent_actions_by_user(self, user_ids: List[int], since: datetime) -> Dict[int, List[UserAction]]:
+        """사용자별 최근 액션 상위 RECENT_ACTION_LIMIT 건 (윈도 함수로 청크당 1쿼리)"""
+        rn = func.row_number().over(
+            partition_by=UserAction.user_id, order_by=(desc(UserAction.created_at), desc(UserAction.id))
+        ).label("rn")
+        ranked = self.db.query(UserAction.id.label("id"), rn).filter(
+            UserAction.user_id.in_(user_ids),
+            UserAction.created_at >= since
+        ).subquery()
+        rows = self.db.query(UserAction).join(ranked, ranked.c.id == UserAction.id).filter(
+            ranked.c.rn <= RECENT_ACTION_LIMIT
+        ).order_by(UserAction.user_id, desc(UserAction.created_at), desc(UserAction.id)).all()
+        by_user: Dict[int, List[UserAction]] = {}
+        for row in rows:
+            by_user.setdefault(row.user_id, []).append(row)
+        return by_user
+
+    # ---------------- 내부: 사용자별 결과 캐시 ---------------- #
+    def _action_watermark(self, user_id: int, since: datetime) -> List[int]:
+        return self._action_watermarks([user_id], since).get(user_id, [0, 0])
+
+    def _action_watermarks(self, user_ids: List[int], since: datetime) -> Dict[int, List[int]]:
+        """윈도 내 (max(id), count) — 새 액션 기록 또는 윈도 이탈 시 값이 바뀐다"""
+        if self._cache is None:
+            return {}
+        rows = self.db.query(
+            UserAction.user_id, func.max(UserAction.id), func.count(UserAction.id)
+        ).filter(
+            UserAction.user_id.in_(user_ids),
+            UserAction.created_at >= since
+        ).group_by(UserAction.user_id).all()
+        return {uid: [int(max_id or 0), int(cnt or 0)] for uid, max_id, cnt in rows}
+
+    def _load_cached(self, user_id: int, variant: str, watermark: List[int]) -> Optional[List[UserRecommendation]]:
+        if self._cache is None:
+            return None
+        entry = self._cache.get_temp_data(_cache_key(user_id))
+        if not entry or entry.get("wm") != watermark:
+            return None
+        ids = (entry.get("variants") or {}).get(variant)
+        if ids is None:
+            return None
+        if not ids:
+            return []
+        rows = self.db.query(UserRecommendation).filter(
+            UserRecommendation.id.in_(ids),
+            UserRecommendation.status == "pending"
+        ).all()
+        if len(rows) != len(ids):
+            return None
+        by_id = {row.id: row for row in rows}
+        return [by_id[i] for i in ids]
+
+    def _store_cached(self, user_id: int, variant: str, watermark: List[int], ids: List[int]) -> None:
+        if self._cache is None:
+            return
+        key = _cache_key(user_id)
+        entry = self._cache.get_temp_data(key) or {}
+        variants = entry.get("variants") if entry.get("wm") == watermark else None
+        variants = dict(variants or {})
+        variants[variant] = ids
+        self._cache.store_temp_data(
+            key, {"wm": watermark, "variants": variants}, _env_int("AI_RECS_CACHE_TTL_SECONDS", 300)
+        )
+
+    def _generate_game_recommendations(
+        self,
+        user_id: int,
+        segment: str,
         preference: UserPreference,
         recent_actions: List[UserAction]
     ) -> List[UserRecommendation]:
-        """게임 추천 생성"""
+        """게임 추천 생성 (선호도 기반, 세그먼트 기반은 _segment_candidates)"""
         recommendations = []
-        
+
         # 최근 플레이한 게임 분석
         recent_games = {}
         for action in recent_actions:
             if action.action_type.startswith("GAME_"):
-                game_type = action.metadata.get("game_type", "unknown")
+                game_type = _action_payload(action).get("game_type", "unknown")
                 recent_games[game_type] = recent_games.get(game_type, 0) + 1
-        
+
         # 선호 게임 기반 추천
         if preference and preference.preferred_games:
             for game_type, score in preference.preferred_games.items():
@@ -154,43 +501,13 @@ class AIRecommendationService:
                             "recent_activity": recent_games.get(game_type, 0)
                         },
                         source="ai_engine",
-                        algorithm_version="v1.0"
+                        algorithm_version=ALGORITHM_VERSION
                     )
                     recommendations.append(rec)
-        
-        # 세그먼트 기반 추천
-        segment_games = {
-            "Whale": ["premium_slots", "high_stakes_poker"],
-            "High": ["tournament_games", "competitive_modes"],
-            "Medium": ["daily_missions", "casual_slots"],
-            "At-risk": ["free_games", "tutorial_modes"]
-        }
-        
-        for game_type in segment_games.get(segment, []):
-            rec = UserRecommendation(
-                user_id=user_id,
-                recommendation_type="game",
-                title=f"{segment} 사용자 추천 게임",
-                description=f"{game_type} 게임을 시도해보세요!",
-                content_data={
-                    "game_type": game_type,
-                    "reason": "segment_based",
-                    "target_segment": segment
-                },
-                priority_score=0.6,
-                confidence_score=0.7,
-                personalization_factors={
-                    "segment": segment,
-                    "recommendation_basis": "segment_targeting"
-                },
-                source="ai_engine",
-                algorithm_version="v1.0"
-            )
-            recommendations.append(rec)
-        
+
         return recommendations
-    
-    async def _generate_reward_recommendations(
+
+    def _generate_reward_recommendations(
         self,
         user_id: int,
         segment: str,
@@ -227,7 +544,7 @@ class AIRecommendationService:
                 },
                 expires_at=datetime.utcnow() + timedelta(hours=24),
                 source="ai_engine",
-                algorithm_version="v1.0"
+                algorithm_version=ALGORITHM_VERSION
             )
             recommendations.append(rec)
         
@@ -250,13 +567,13 @@ class AIRecommendationService:
                     "vip_status": True
                 },
                 source="ai_engine",
-                algorithm_version="v1.0"
+                algorithm_version=ALGORITHM_VERSION
             )
             recommendations.append(rec)
         
         return recommendations
     
-    async def _generate_mission_recommendations(
+    def _generate_mission_recommendations(
         self,
         user_id: int,
         segment: str,
@@ -291,7 +608,7 @@ class AIRecommendationService:
                     "player_type": "mission_enthusiast"
                 },
                 source="ai_engine",
-                algorithm_version="v1.0"
+                algorithm_version=ALGORITHM_VERSION
             )
             recommendations.append(rec)
         
@@ -313,25 +630,26 @@ class AIRecommendationService:
                     "needs_guidance": True
                 },
                 source="ai_engine",
-                algorithm_version="v1.0"
+                algorithm_version=ALGORITHM_VERSION
             )
             recommendations.append(rec)
         
         return recommendations
     
-    async def _generate_content_recommendations(
+    def _generate_content_recommendations(
         self,
         user_id: int,
         segment: str,
         preference: UserPreference,
-        recent_actions: List[UserAction]
+        recent_actions: List[UserAction],
+        mood: Optional[str] = None
     ) -> List[UserRecommendation]:
-        """콘텐츠 추천 생성"""
+        """콘텐츠 추천 생성 (mood: 호출 측에서 조회한 현재 기분)"""
         recommendations = []
         
         # 감정 기반 콘텐츠 추천
-        if self.emotion_engine and self.redis:
-            current_mood = await self.emotion_engine.get_user_mood(user_id)
+        if mood:
+            current_mood = mood
             
             mood_content = {
                 "joy": {
@@ -370,7 +688,7 @@ class AIRecommendationService:
                         "mood_adaptation": True
                     },
                     source="ai_engine",
-                    algorithm_version="v1.0"
+                    algorithm_version=ALGORITHM_VERSION
                 )
                 recommendations.append(rec)
         
@@ -419,6 +737,7 @@ class AIRecommendationService:
             await self._update_user_preference_from_interaction(
                 user_id, recommendation, interaction_data
             )
+            invalidate_user_recommendations(self.redis, user_id)
             
             return interaction
             
@@ -503,6 +822,7 @@ class AIRecommendationService:
             
             user_preference.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_user_recommendations(self.redis, user_id)
             
             return user_preference
             
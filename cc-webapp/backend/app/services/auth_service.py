@@ -14,6 +14,8 @@ from sqlalchemy.exc import OperationalError
 from ..models.auth_models import User, LoginAttempt, UserSession
 from ..models.token_blacklist import TokenBlacklist
 from ..schemas.auth import TokenData, UserCreate, UserLogin, AdminLogin
+from .principal_cache import get_principal_cache
+from ..core.jwt_keyring import get_keyring
 
 from ..models.auth_models import InviteCode
 
@@ -78,80 +80,24 @@ class AuthService:
             "iat": int(now.timestamp()),
             "jti": str(uuid.uuid4()),
         })
-        # Include rotation hint in header (kid)
-        from app.core.config import settings
-        headers = {"kid": getattr(settings, "KEY_ROTATION_VERSION", "v1")}
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM, headers=headers)
-        # Debug: verify signature locally
-        try:
-            import base64, hmac, hashlib
-            parts = encoded_jwt.split('.')
-            if len(parts) == 3:
-                signing_input = (parts[0] + '.' + parts[1]).encode('utf-8')
-                key_bytes = SECRET_KEY.encode('utf-8') if isinstance(SECRET_KEY, str) else SECRET_KEY
-                digest = hmac.new(key_bytes, signing_input, hashlib.sha256).digest()
-                calc_sig = base64.urlsafe_b64encode(digest).rstrip(b'=')
-                masked = (SECRET_KEY[:4] + '***' + SECRET_KEY[-4:]) if isinstance(SECRET_KEY, str) and len(SECRET_KEY) >= 8 else 'short'
-                logging.info(f"create_access_token: key_masked={masked} calc_sig_prefix={calc_sig[:10].decode('utf-8')} provided_sig_prefix={parts[2][:10]}")
-        except Exception as e:
-            logging.warning(f"create_access_token debug failed: {e}")
+        # 활성 키로 서명 + kid 헤더 (검증 시 kid 로 키 직접 조회)
+        encoded_jwt = get_keyring().sign(to_encode)
         return encoded_jwt
     
     @staticmethod
     def verify_token(token: str, db: Session | None = None) -> TokenData:
-        print("=== DEBUG: verify_token called ===")
-        print(f"Token: {token[:30]}...")
-        try:
-
-            logging.info(f'Attempting to verify token: {token}')
-            logging.info(f'Using secret key: {SECRET_KEY}')
-            logging.info(f'Using algorithm: {ALGORITHM}')
-            # Debug: Try decoding without verification
-            import json, base64
-            token_parts = token.split('.')
-            if len(token_parts) == 3:
-                header_raw, payload_raw, sig = token_parts
-                try:
-                    header_json = base64.b64decode(header_raw + "=" * ((4 - len(header_raw) % 4) % 4)).decode('utf-8')
-                    payload_json = base64.b64decode(payload_raw + "=" * ((4 - len(payload_raw) % 4) % 4)).decode('utf-8')
-                    print(f"Debug header: {header_json}")
-                    print(f"Debug payload: {payload_json}")
-                except Exception as e:
-
-                    logging.error(f'Token verification error: {e}')
-                    print(f"Debug decode error: {e}")
-        except Exception as debug_e:
-            print(f"Debug error: {debug_e}")
-        """토큰 검증"""
-        # Try primary secret first, then fallbacks if enabled
-        def _secret_candidates():
-            cands = [("primary", SECRET_KEY)]
-            fb_env = os.getenv("JWT_SECRET_KEY_FALLBACKS", "")
-            if fb_env:
-                for i, s in enumerate([x.strip() for x in fb_env.split(',') if x.strip()]):
-                    cands.append((f"env_fallback_{i}", s))
-            # Dev-only well-known defaults (enabled when ALLOW_JWT_FALLBACKS != '0')
-            if os.getenv("ALLOW_JWT_FALLBACKS", "1") != "0":
-                cands.extend([
-                    ("default_dev1", "your-secret-key-here"),
-                    ("default_dev2", "secret_key_for_development_only"),
-                    ("default_dev3", "dev-jwt-secret-key"),
-                    ("default_dev4", "casino-club-secret-key-2024"),
-                    ("default_dev5", "super-secret-key-for-development-only"),
-                ])
-            return cands
+        return AuthService.verify_token_claims(token, db=db)[0]
 
+    @staticmethod
+    def verify_token_claims(token: str, db: Session | None = None) -> tuple[TokenData, dict, str]:
+        """verify_token 본체. (TokenData, payload, 검증에 사용된 키 이름) 반환."""
         last_err: Exception | None = None
         payload = None
         used_key_name = None
-        for name, key in _secret_candidates():
-            try:
-                payload = jwt.decode(token, key, algorithms=[ALGORITHM])
-                used_key_name = name
-                break
-            except JWTError as e:
-                last_err = e
-                continue
+        try:
+            payload, used_key_name = get_keyring().decode(token)
+        except JWTError as e:
+            last_err = e
         if payload is None:
             # Fallback: decode without signature verification to extract claims (dev/local only)
             allow_unverified = (
@@ -176,7 +122,7 @@ class AuthService:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="토큰이 유효하지 않습니다"
                 )
-        logging.info(f"JWT verified with key: {used_key_name}")
+        logging.debug("JWT verified with key: %s", used_key_name)
         # Blacklist check (optional when db provided)
         jti = payload.get("jti")
         if db is not None and jti:
@@ -209,7 +155,7 @@ class AuthService:
                 detail="토큰이 유효하지 않습니다"
             )
         token_data = TokenData(site_id=site_id, user_id=user_id, is_admin=is_admin)
-        return token_data
+        return token_data, payload, used_key_name
     
     @staticmethod
     def authenticate_user(db: Session, site_id: str, password: str) -> Optional[User]:
@@ -471,7 +417,7 @@ class AuthService:
     def blacklist_token(db: Session, token: str, reason: str | None = None, by_user_id: int | None = None) -> None:
         """Store token jti into blacklist until its exp."""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload, _ = get_keyring().decode(token)
         except JWTError:
             # Can't decode -> nothing to do
             return
@@ -491,12 +437,13 @@ class AuthService:
         if not db.query(TokenBlacklist).filter(TokenBlacklist.jti == jti).first():
             db.add(item)
             db.commit()
+        get_principal_cache().invalidate_jti(jti)
 
     @staticmethod
     def create_session(db: Session, user: User, token: str, request: Request | None = None) -> UserSession:
         """Record a user session minimally for concurrency controls."""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload, _ = get_keyring().decode(token)
         except JWTError:
             # In dev or when secrets rotated, fallback to unverified to capture jti for session tracking
             try:
@@ -517,6 +464,9 @@ class AuthService:
         )
         db.add(session)
         db.commit()
+        if MAX_CONCURRENT_SESSIONS <= 1:
+            # 비활성화된 기존 세션 토큰의 캐시된 principal 제거 (신규 토큰은 아직 캐시 전)
+            get_principal_cache().invalidate_user(user.id)
         return session
 
     @staticmethod
@@ -528,6 +478,7 @@ class AuthService:
             cnt += 1
         if cnt:
             db.commit()
+        get_principal_cache().invalidate_user(user_id)
         return cnt
 
     # ===== Minimal helper for interim /api/auth/register =====
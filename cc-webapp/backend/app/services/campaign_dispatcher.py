@@ -4,14 +4,69 @@ from __future__ import annotations
 
 Processes due NotificationCampaigns by creating Notification rows for targeted users
 and marking campaigns as sent. Designed to be called by a scheduler periodically.
+
+대상 사용자는 전체를 메모리에 올리지 않고 user_id 키셋 페이지(id > cursor ORDER BY id LIMIT n)로
+스트리밍하며, 청크마다 Notification 을 bulk INSERT 하고 즉시 커밋한다.
+커밋과 같은 트랜잭션에서 캠페인의 dispatch_cursor(마지막 처리 user_id)/dispatched_count 를
+CAS(이전 cursor 일치 + status='sending') 로 전진시키므로:
+  - 중단된 발송은 다음 실행에서 'sending' 상태로 다시 잡혀 cursor 이후부터 재개 (중복 없음)
+  - 발송 중 취소(status='cancelled')되면 다음 청크 커밋 시점에 중단
+
+환경변수:
+  CAMPAIGN_DISPATCH_CHUNK_SIZE  청크 크기 (기본 1000)
+  CAMPAIGN_PUSH_REALTIME        청크 커밋 후 실시간 허브로 접속 중 사용자에게 push (기본 1, loop 전달 시)
 """
 
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Set
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import and_, func, insert, update
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
 from app import models
+from app.utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Histogram  # type: ignore
+    _NOTIFICATIONS = Counter("campaign_notifications_total", "Notifications created by campaign dispatch")
+    _DISPATCH_SECONDS = Histogram(
+        "campaign_dispatch_seconds", "Campaign dispatch duration", buckets=(0.05, 0.1, 0.5, 1, 5, 15, 60, 300)
+    )
+except Exception:  # pragma: no cover
+    _NOTIFICATIONS = None
+    _DISPATCH_SECONDS = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class DispatchStats:
+    campaign_id: int
+    notifications: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    completed: bool = False
+
+    @property
+    def per_sec(self) -> float:
+        return self.notifications / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "campaign_id": self.campaign_id,
+            "notifications": self.notifications,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 4),
+            "per_sec": round(self.per_sec, 1),
+            "completed": self.completed,
+        }
 
 
 def _parse_user_ids(csv_text: str | None) -> List[int]:
@@ -30,32 +85,159 @@ def _parse_user_ids(csv_text: str | None) -> List[int]:
 
 
 def _target_user_ids(db: Session, campaign: models.NotificationCampaign) -> Set[int]:
-    if campaign.targeting_type == "all":
-        q = db.query(models.User.id).filter(models.User.is_active == True)  # noqa: E712
-        return {uid for (uid,) in q.all()}
-    if campaign.targeting_type == "segment":
-        if not campaign.target_segment:
-            return set()
-        # Join users with user_segments on user_id, filter by rfm_group label
-        q = (
-            db.query(models.User.id)
-            .join(models.UserSegment, models.UserSegment.user_id == models.User.id)
-            .filter(models.User.is_active == True, models.UserSegment.rfm_group == campaign.target_segment)  # noqa: E712
+    """대상 전체 집합 (소규모 조회/미리보기용). 발송은 iter_target_chunks 사용."""
+    ids: Set[int] = set()
+    for chunk in iter_target_chunks(db, campaign, after_id=0, chunk_size=DEFAULT_CHUNK_SIZE):
+        ids.update(chunk)
+    return ids
+
+
+def iter_target_chunks(
+    db: Session,
+    campaign: models.NotificationCampaign,
+    after_id: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[int]]:
+    """after_id 이후 대상 user_id 를 오름차순 청크로 생성.
+
+    서버 측 커서 대신 키셋 페이지를 쓰므로 청크 사이 커밋에도 안전하다.
+    """
+    active = models.User.is_active == True  # noqa: E712
+    if campaign.targeting_type in ("all", "segment"):
+        if campaign.targeting_type == "segment" and not campaign.target_segment:
+            return
+        cursor = after_id
+        while True:
+            q = db.query(models.User.id).filter(active, models.User.id > cursor)
+            if campaign.targeting_type == "segment":
+                q = q.join(models.UserSegment, models.UserSegment.user_id == models.User.id).filter(
+                    models.UserSegment.rfm_group == campaign.target_segment
+                ).distinct()
+            chunk = [uid for (uid,) in q.order_by(models.User.id).limit(chunk_size).all()]
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            cursor = chunk[-1]
+    elif campaign.targeting_type == "user_ids":
+        ids = sorted({i for i in _parse_user_ids(campaign.user_ids) if i > after_id})
+        for start in range(0, len(ids), chunk_size):
+            part = ids[start:start + chunk_size]
+            rows = db.query(models.User.id).filter(and_(models.User.id.in_(part), active)).all()
+            chunk = sorted(uid for (uid,) in rows)
+            if chunk:
+                yield chunk
+
+
+def _push_realtime(loop: Optional[asyncio.AbstractEventLoop], campaign: models.NotificationCampaign,
+                   user_ids: List[int]) -> None:
+    """청크 커밋 후 접속 중 사용자에게 1회 팬아웃 (허브가 로컬 소켓/백엔드 publish 처리)."""
+    if loop is None or loop.is_closed():
+        return
+    try:
+        from app.realtime.hub import hub
+        event = {
+            "type": "notification",
+            "campaign_id": campaign.id,
+            "title": campaign.title,
+            "message": campaign.message,
+            "user_ids": user_ids,
+        }
+        asyncio.run_coroutine_threadsafe(hub.broadcast(event), loop)
+    except Exception as e:  # push 실패는 발송(DB 기록)에 영향 없음
+        logger.debug("campaign realtime push skipped: %s", e)
+
+
+def dispatch_campaign(
+    db: Session,
+    camp: models.NotificationCampaign,
+    now: datetime,
+    chunk_size: Optional[int] = None,
+    push: Optional[bool] = None,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> DispatchStats:
+    """캠페인 1건을 청크 단위로 발송 (cursor 이후부터 재개)."""
+    if chunk_size is None:
+        chunk_size = int(os.getenv("CAMPAIGN_DISPATCH_CHUNK_SIZE", str(DEFAULT_CHUNK_SIZE)))
+    chunk_size = max(1, chunk_size)
+    if push is None:
+        push = os.getenv("CAMPAIGN_PUSH_REALTIME", "1") != "0"
+    Campaign = models.NotificationCampaign
+    stats = DispatchStats(campaign_id=camp.id)
+    started = time.perf_counter()
+
+    # 발송 선점: 예약/발송중 상태일 때만 'sending' 으로 전환 (취소된 캠페인은 건너뜀)
+    claimed = db.execute(
+        update(Campaign)
+        .where(Campaign.id == camp.id, Campaign.status.in_(("scheduled", "sending")))
+        .values(status="sending")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return stats
+    db.refresh(camp)
+    title = getattr(camp, "title", "")
+    message = getattr(camp, "message", "")
+    cursor = camp.dispatch_cursor or 0
+    dispatched = camp.dispatched_count or 0
+
+    for chunk in iter_target_chunks(db, camp, after_id=cursor, chunk_size=chunk_size):
+        db.execute(
+            insert(models.Notification),
+            [{"user_id": uid, "title": title, "message": message, "is_sent": False} for uid in chunk],
         )
-        return {uid for (uid,) in q.all()}
-    if campaign.targeting_type == "user_ids":
-        ids = _parse_user_ids(campaign.user_ids)
-        if not ids:
-            return set()
-        q = db.query(models.User.id).filter(and_(models.User.id.in_(ids), models.User.is_active == True))  # noqa: E712
-        return {uid for (uid,) in q.all()}
-    return set()
+        advanced = db.execute(
+            update(Campaign)
+            .where(
+                Campaign.id == camp.id,
+                Campaign.status == "sending",
+                func.coalesce(Campaign.dispatch_cursor, 0) == cursor,
+            )
+            .values(dispatch_cursor=chunk[-1], dispatched_count=dispatched + len(chunk))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not advanced:
+            # 취소되었거나 다른 워커가 같은 구간을 이미 처리 → 이 청크 폐기 후 중단
+            db.rollback()
+            stats.seconds = time.perf_counter() - started
+            logger.info("campaign %s dispatch stopped at cursor %s (cancelled or taken over)", camp.id, cursor)
+            return stats
+        db.commit()
+        cursor = chunk[-1]
+        dispatched += len(chunk)
+        stats.notifications += len(chunk)
+        stats.chunks += 1
+        metric(_NOTIFICATIONS, "inc", len(chunk))
+        if push:
+            _push_realtime(loop, camp, chunk)
+
+    db.refresh(camp)
+    if camp.status == "sending":
+        camp.status = "sent"
+        camp.sent_at = now
+        db.commit()
+        stats.completed = True
+    stats.seconds = time.perf_counter() - started
+    metric(_DISPATCH_SECONDS, "observe", stats.seconds)
+    logger.info(
+        "campaign %s dispatched: %d notifications in %d chunks (%.3fs, %.0f/s)",
+        camp.id, stats.notifications, stats.chunks, stats.seconds, stats.per_sec,
+    )
+    return stats
 
 
-def dispatch_due_campaigns(db: Session, now: datetime | None = None) -> int:
+def dispatch_due_campaigns(
+    db: Session,
+    now: datetime | None = None,
+    chunk_size: Optional[int] = None,
+    push: Optional[bool] = None,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> int:
     """Dispatch campaigns that are due (scheduled and time <= now).
 
-    Returns number of campaigns processed.
+    중단된 발송('sending')도 함께 재개한다. Returns number of campaigns processed.
     """
     if now is None:
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
@@ -63,39 +245,18 @@ def dispatch_due_campaigns(db: Session, now: datetime | None = None) -> int:
     due_campaigns: List[models.NotificationCampaign] = (
         db.query(models.NotificationCampaign)
         .filter(
-            models.NotificationCampaign.status == "scheduled",
+            models.NotificationCampaign.status.in_(("scheduled", "sending")),
             # If scheduled_at is NULL, treat as immediate
             (models.NotificationCampaign.scheduled_at == None)  # noqa: E711
             | (models.NotificationCampaign.scheduled_at <= now)
         )
+        .order_by(models.NotificationCampaign.id)
         .all()
     )
 
     processed = 0
     for camp in due_campaigns:
-        user_ids = _target_user_ids(db, camp)
-        if not user_ids:
-            # Nothing to do, mark as sent to avoid endless retries
-            camp.status = "sent"
-            camp.sent_at = now
-            db.add(camp)
-            db.commit()
+        stats = dispatch_campaign(db, camp, now, chunk_size=chunk_size, push=push, loop=loop)
+        if stats.completed:
             processed += 1
-            continue
-        # Create notifications for each user
-        for uid in user_ids:
-            notif = models.Notification(
-                user_id=uid,
-                title=getattr(camp, "title", ""),
-                message=getattr(camp, "message", ""),
-                is_sent=False,
-            )
-            db.add(notif)
-        # Mark campaign as sent
-        camp.status = "sent"
-        camp.sent_at = now
-        db.add(camp)
-        db.commit()
-        processed += 1
-
     return processed
@@ -3,6 +3,7 @@ from sqlalchemy import func
 from datetime import datetime, timedelta
 
 from .. import models
+from . import activity_storage_service
 
 class DashboardService:
     def __init__(self, db: Session):
@@ -15,7 +16,7 @@ class DashboardService:
         today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
 
         # Daily Active Users (DAU) - users with any action today
-        dau = self.db.query(models.UserAction.user_id).filter(models.UserAction.created_at >= today_start).distinct().count()
+        dau = activity_storage_service.active_users(self.db, today_start)
 
         # New Users Today
         new_users = self.db.query(models.User).filter(models.User.created_at >= today_start).count()
@@ -36,14 +37,18 @@ class DashboardService:
         games = ["slot", "roulette", "rps", "gacha"]
         game_stats = {}
 
-        for game_name in games:
-            stats = self.db.query(
-                func.sum(models.Game.bet_amount).label("total_bet"),
-                func.sum(models.Game.payout).label("total_payout")
-            ).filter(models.Game.game_type == game_name).first()
+        # 게임별 SUM 을 단일 GROUP BY 로 (게임 수만큼 왕복하지 않음)
+        rows = self.db.query(
+            models.Game.game_type,
+            func.sum(models.Game.bet_amount).label("total_bet"),
+            func.sum(models.Game.payout).label("total_payout")
+        ).filter(models.Game.game_type.in_(games)).group_by(models.Game.game_type).all()
+        by_game = {row.game_type: row for row in rows}
 
-            total_bet = stats.total_bet or 0
-            total_payout = stats.total_payout or 0
+        for game_name in games:
+            stats = by_game.get(game_name)
+            total_bet = (stats.total_bet if stats else 0) or 0
+            total_payout = (stats.total_payout if stats else 0) or 0
             profit = total_bet - total_payout
 
             game_stats[game_name] = {
@@ -62,10 +67,7 @@ class DashboardService:
         today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
 
         # Total Gacha spins today
-        gacha_spins_today = self.db.query(models.UserAction).filter(
-            models.UserAction.action_type == "GACHA_PULL",
-            models.UserAction.created_at >= today_start
-        ).count()
+        gacha_spins_today = activity_storage_service.count_actions(self.db, "GACHA_PULL", today_start)
 
         # Recent big winners (e.g., payout > 100,000)
         recent_big_winners = self.db.query(models.Game, models.User).join(models.User).filter(
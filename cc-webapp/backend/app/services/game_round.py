@@ -0,0 +1,325 @@
+"""게임 라운드 단위 작업 (unit of work)
+
+슬롯/RPS/가챠/크래시 1회 처리의 DB 변경(잔액, user_actions + event_outbox, game_history + 업적 증분 집계)을
+하나의 트랜잭션으로 묶고, commit 이후 부수효과는 백그라운드로 넘긴다.
+
+    with GameRound(db, user_id, "slot") as rnd:
+        balance = rnd.apply_balance(-bet + win, require=bet)
+        rnd.log_action("SLOT_SPIN", {...})
+        rnd.log_history("WIN", delta_coin=-bet + win, result_meta={...})
+        rnd.broadcast({...})
+    # 정상 종료 → commit 1회 + 부수효과 디스패치 / 예외 → rollback (부수효과 폐기)
+
+잔액:
+  UPDATE users SET gold_balance = gold_balance + :delta
+   WHERE id = :uid AND gold_balance >= :require RETURNING gold_balance
+  읽고-수정-쓰기 없이 조건부 원자 갱신 → 동시 요청에서도 잔액이 음수가 되지 않는다.
+  조건 불일치 시 InsufficientBalanceError.
+
+commit 이후 부수효과:
+  - Kafka 발행은 같은 트랜잭션의 event_outbox 행 → outbox_relay 가 배치 발행 (commit 후 relay 깨움)
+  - 동기 작업(리더보드 Redis 갱신)은 전용 워커 풀 (GAME_ROUND_EFFECT_WORKERS, 기본 4)
+  - 코루틴(hub 브로드캐스트, game_history 이벤트)은 실행 중 이벤트 루프에 task 로 예약
+  - 업적 평가는 기존 achievement_pipeline.submit
+
+환경변수:
+  GAME_ROUND_EFFECT_WORKERS      부수효과 워커 수 (0 이면 commit 스레드에서 즉시 실행)
+  GAME_ROUND_EFFECT_MAX_PENDING  대기 작업 상한 (초과 시 drop + 메트릭, 기본 10000)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from ..core.exceptions import InsufficientBalanceError
+from ..models.auth_models import User
+from ..models.game_models import UserAction
+from ..models.history_models import GameHistory
+from . import history_aggregate_service
+from .achievement_pipeline import get_achievement_pipeline, should_evaluate
+from .leaderboard_service import get_leaderboard_service
+from .outbox_producer import enqueue_outbox
+from .outbox_relay import notify_outbox
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter  # type: ignore
+    _ROUNDS = Counter("game_rounds_total", "Game round unit-of-work outcomes", ["game", "result"])
+    _EFFECTS = Counter("game_round_effects_total", "Deferred game round side effects", ["kind", "result"])
+except Exception:  # pragma: no cover
+    _ROUNDS = _EFFECTS = None
+
+logger = logging.getLogger(__name__)
+
+
+def user_action_envelope(action_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """표준 사용자 액션 envelope: {"v":1, "type", "ts", "data"}"""
+    return {"v": 1, "type": action_type, "ts": datetime.utcnow().isoformat() + "Z", "data": data}
+
+
+class EffectDispatcher:
+    """commit 이후 동기 부수효과 실행용 제한 워커 풀"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None) -> None:
+        self.workers = int(workers if workers is not None else os.getenv("GAME_ROUND_EFFECT_WORKERS", "4"))
+        self.max_pending = int(
+            max_pending if max_pending is not None else os.getenv("GAME_ROUND_EFFECT_MAX_PENDING", "10000")
+        )
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="game-round")
+            if self.workers > 0 else None
+        )
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any) -> bool:
+        if self._executor is None:
+            self._run(kind, fn, *args)
+            return True
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                metric(_EFFECTS, "inc", kind=kind, result="dropped")
+                return False
+            fut = self._executor.submit(self._run, kind, fn, *args)
+            self._pending.add(fut)
+        fut.add_done_callback(self._done)
+        return True
+
+    def _done(self, fut: Future) -> None:
+        with self._lock:
+            self._pending.discard(fut)
+
+    @staticmethod
+    def _run(kind: str, fn: Callable[..., Any], *args: Any) -> None:
+        try:
+            fn(*args)
+            metric(_EFFECTS, "inc", kind=kind, result="ok")
+        except Exception as e:
+            metric(_EFFECTS, "inc", kind=kind, result="error")
+            logger.debug("game round effect %s failed: %s", kind, e)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """대기 중인 작업 완료까지 대기 (테스트/종료용)"""
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            wait(pending, timeout=timeout)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_dispatcher: Optional[EffectDispatcher] = None
+_dispatcher_lock = threading.Lock()
+# 실행 중 task 참조 유지 (GC 로 인한 조기 소멸 방지)
+_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def get_effect_dispatcher() -> EffectDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = EffectDispatcher()
+    return _dispatcher
+
+
+def shutdown_effect_dispatcher() -> None:
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.close()
+
+
+def _schedule(kind: str, factory: Callable[[], Awaitable[Any]]) -> None:
+    """실행 중 이벤트 루프(현재 스레드)에 코루틴 예약. 루프가 없으면 생략"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        metric(_EFFECTS, "inc", kind=kind, result="skipped")
+        return
+    try:
+        task = loop.create_task(factory())
+    except Exception as e:
+        logger.debug("game round %s schedule failed: %s", kind, e)
+        return
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _hub_broadcast(event: Dict[str, Any]) -> Awaitable[Any]:
+    from ..realtime import hub
+    return hub.broadcast(event)
+
+
+def _history_event(payload: Dict[str, Any]) -> Awaitable[Any]:
+    from .history_service import _lazy_broadcast_game_history_event
+    return _lazy_broadcast_game_history_event()(payload)
+
+
+class GameRound:
+    """게임 1회 처리의 DB 변경을 한 트랜잭션으로, 부수효과는 commit 이후로 미룬다."""
+
+    def __init__(self, db: Session, user_id: int, game_type: str, dispatcher: Optional[EffectDispatcher] = None):
+        self.db = db
+        self.user_id = int(user_id)
+        self.game_type = game_type
+        self.balance: Optional[int] = None
+        self.committed = False
+        self._dispatcher = dispatcher
+        self._histories: List[GameHistory] = []
+        self._envelopes: List[Dict[str, Any]] = []
+        self._events: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "GameRound":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.rollback()
+        elif not self.committed:
+            self.commit()
+        return False
+
+    # ---------------- DB (같은 트랜잭션) ---------------- #
+    def apply_balance(self, delta: int, *, require: int = 0) -> int:
+        """조건부 원자 잔액 갱신 후 새 잔액 반환.
+
+        require: 갱신 전 필요한 최소 잔액 (베팅액). 결과 잔액이 음수가 되는 갱신은 항상 거부.
+        """
+        delta = int(delta)
+        require = max(int(require), -delta, 0)
+        stmt = (
+            update(User)
+            .where(User.id == self.user_id, User.gold_balance >= require)
+            .values(gold_balance=User.gold_balance + delta)
+            .execution_options(synchronize_session=False)
+        )
+        if self.db.get_bind().dialect.update_returning:
+            row = self.db.execute(stmt.returning(User.gold_balance)).first()
+        else:  # pragma: no cover - RETURNING 미지원 DB
+            res = self.db.execute(stmt)
+            row = self.db.execute(select(User.gold_balance).where(User.id == self.user_id)).first() if res.rowcount else None
+        if row is None:
+            metric(_ROUNDS, "inc", game=self.game_type, result="insufficient")
+            raise InsufficientBalanceError(details={"user_id": self.user_id, "required": require})
+        self.balance = int(row[0])
+        # 세션에 로드된 User 인스턴스가 있으면 새 잔액으로 동기화 (추가 SELECT/UPDATE 없음)
+        loaded = self.db.identity_map.get(identity_key(User, self.user_id))
+        if loaded is not None:
+            set_committed_value(loaded, "gold_balance", self.balance)
+        return self.balance
+
+    def log_action(self, action_type: str, data: Dict[str, Any]) -> UserAction:
+        envelope = user_action_envelope(action_type, data)
+        action = UserAction(
+            user_id=self.user_id, action_type=action_type, action_data=json.dumps(envelope, ensure_ascii=False)
+        )
+        self.db.add(action)
+        # Kafka 발행용 outbox 행 (같은 트랜잭션 → 롤백 시 함께 폐기, 유실 없음)
+        enqueue_outbox(self.db, "user_action", dict(envelope, user_id=self.user_id))
+        self._envelopes.append(envelope)
+        return action
+
+    def log_history(
+        self,
+        action_type: str,
+        *,
+        delta_coin: int = 0,
+        delta_gem: int = 0,
+        session_id: Optional[int] = None,
+        result_meta: Optional[Dict[str, Any]] = None,
+    ) -> GameHistory:
+        record = GameHistory(
+            user_id=self.user_id,
+            game_type=self.game_type,
+            session_id=session_id,
+            action_type=action_type,
+            delta_coin=delta_coin,
+            delta_gem=delta_gem,
+            result_meta=result_meta,
+            created_at=datetime.utcnow(),
+        )
+        self.db.add(record)
+        history_aggregate_service.apply_history(
+            self.db,
+            user_id=self.user_id,
+            game_type=self.game_type,
+            action_type=action_type,
+            delta_coin=delta_coin,
+            delta_gem=delta_gem,
+        )
+        self._histories.append(record)
+        return record
+
+    def broadcast(self, event: Dict[str, Any]) -> None:
+        """commit 이후 hub 브로드캐스트 예약"""
+        self._events.append(event)
+
+    # ---------------- commit / rollback ---------------- #
+    def commit(self) -> None:
+        self.db.flush()
+        # commit 후 만료된 속성 재조회/다른 스레드 접근을 피하기 위해 flush 시점 값을 스냅샷
+        histories = [
+            SimpleNamespace(
+                id=h.id, user_id=h.user_id, game_type=h.game_type, action_type=h.action_type,
+                delta_coin=h.delta_coin or 0, delta_gem=h.delta_gem or 0, session_id=h.session_id,
+                result_meta=h.result_meta, created_at=h.created_at,
+            )
+            for h in self._histories
+        ]
+        self.db.commit()
+        self.committed = True
+        metric(_ROUNDS, "inc", game=self.game_type, result="committed")
+        self._dispatch(histories)
+
+    def rollback(self) -> None:
+        try:
+            self.db.rollback()
+        finally:
+            self._histories.clear()
+            self._envelopes.clear()
+            self._events.clear()
+            metric(_ROUNDS, "inc", game=self.game_type, result="rolled_back")
+
+    def _dispatch(self, histories: List[SimpleNamespace]) -> None:
+        dispatcher = self._dispatcher or get_effect_dispatcher()
+        if self._envelopes:
+            notify_outbox()
+        for h in histories:
+            payload = {
+                "user_id": h.user_id,
+                "game_type": h.game_type,
+                "action_type": h.action_type,
+                "delta_coin": h.delta_coin,
+                "delta_gem": h.delta_gem,
+                "session_id": h.session_id,
+                "id": h.id,
+                "created_at": h.created_at.isoformat() if h.created_at else None,
+            }
+            _schedule("history_event", lambda p=payload: _history_event(p))
+            dispatcher.submit("leaderboard", get_leaderboard_service().record_history, h)
+            if should_evaluate(h.action_type, h.result_meta):
+                try:
+                    get_achievement_pipeline().submit(h.user_id, h.id)
+                except Exception:  # pragma: no cover
+                    logger.debug("Achievement evaluation scheduling failed", exc_info=True)
+        for event in self._events:
+            _schedule("broadcast", lambda e=event: _hub_broadcast(e))
+        self._histories.clear()
+        self._envelopes.clear()
+        self._events.clear()
@@ -29,12 +29,14 @@ class GameStatsService:
         self.db.flush()
         return stats
 
-    def update_from_round(self, *, user_id: int, bet_amount: int, win_amount: int, final_multiplier: float) -> UserGameStats:
+    def update_from_round(self, *, user_id: int, bet_amount: int, win_amount: int, final_multiplier: float,
+                          commit: bool = True) -> UserGameStats:
         """Apply a single crash round result.
 
         bet_amount: amount wagered (positive integer)
         win_amount: amount returned (0 if loss) (positive int) -> profit = win_amount - bet_amount
         final_multiplier: achieved multiplier (>=1.0). If win, this is the cashout multiplier; if loss, the crash multiplier.
+        commit: False 면 flush 만 수행 (GameRound 등 호출자 트랜잭션 안에서 함께 커밋/롤백)
         """
         stats = self.get_or_create(user_id)
         profit = win_amount - bet_amount
@@ -55,7 +57,10 @@ class GameStatsService:
         # profit accumulation
         stats.total_profit = Decimal(str(stats.total_profit or 0)) + Decimal(str(profit))
         stats.updated_at = datetime.utcnow()
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         return stats
 
     def recalculate_user(self, user_id: int) -> Optional[UserGameStats]:
@@ -0,0 +1,229 @@
+"""GameHistory 증분 집계 (업적 평가용 materialised counters)
+
+- apply_history(): log_game_history 와 같은 트랜잭션에서 집계/연승 상태 upsert (commit 없음)
+- amount_total()/win_streak(): 업적 평가기가 사용하는 O(1) 조회
+- rebuild(): game_history 로부터 집계 재구성 (backfill / drift 복구)
+- 연승은 WIN 이 늘리고 패배(STREAK_RESET_ACTIONS)만 끊는다. 가챠 PULL, DRAW, 세션 로그 등
+  승패가 아닌 행은 연승 상태를 건드리지 않는다
+
+upsert 는 Postgres/SQLite 모두 INSERT ... ON CONFLICT DO UPDATE 로 원자적 누적.
+그 외 dialect 는 ORM read-modify-write 로 폴백.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional, Dict, Any, List
+import logging
+
+from sqlalchemy import select, func, delete, case
+from sqlalchemy.orm import Session
+
+from ..models.history_models import GameHistory, GameHistoryAggregate, UserWinStreak
+
+logger = logging.getLogger(__name__)
+
+WIN_ACTION = "WIN"
+# 패배로 기록되는 action_type (승리 없는 라운드는 "BET" 로 기록됨)
+STREAK_RESET_ACTIONS = frozenset({"BET", "LOSE", "LOSS"})
+
+
+def affects_streak(action_type: str) -> bool:
+    return action_type == WIN_ACTION or action_type in STREAK_RESET_ACTIONS
+
+
+def _insert_for(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def apply_history(
+    db: Session,
+    *,
+    user_id: int,
+    game_type: str,
+    action_type: str,
+    delta_coin: int = 0,
+    delta_gem: int = 0,
+) -> None:
+    """신규 GameHistory 1건을 집계/연승 상태에 반영 (호출측 트랜잭션에서 commit)."""
+    now = datetime.utcnow()
+    is_win = action_type == WIN_ACTION
+    insert = _insert_for(db)
+    if insert is None:
+        _apply_history_orm(db, user_id=user_id, game_type=game_type, action_type=action_type,
+                           delta_coin=delta_coin, delta_gem=delta_gem, now=now)
+        return
+
+    agg = insert(GameHistoryAggregate).values(
+        user_id=user_id,
+        game_type=game_type,
+        action_type=action_type,
+        total_count=1,
+        total_delta_coin=delta_coin or 0,
+        total_delta_gem=delta_gem or 0,
+        updated_at=now,
+    )
+    agg = agg.on_conflict_do_update(
+        index_elements=["user_id", "game_type", "action_type"],
+        set_={
+            "total_count": GameHistoryAggregate.total_count + 1,
+            "total_delta_coin": GameHistoryAggregate.total_delta_coin + (delta_coin or 0),
+            "total_delta_gem": GameHistoryAggregate.total_delta_gem + (delta_gem or 0),
+            "updated_at": now,
+        },
+    )
+    db.execute(agg)
+    if not affects_streak(action_type):
+        return
+
+    streak = insert(UserWinStreak).values(
+        user_id=user_id,
+        win_streak=1 if is_win else 0,
+        tail_game_type=game_type,
+        tail_game_streak=1 if is_win else 0,
+        updated_at=now,
+    )
+    if is_win:
+        streak_set = {
+            "win_streak": UserWinStreak.win_streak + 1,
+            "tail_game_streak": case(
+                (UserWinStreak.tail_game_type == game_type, UserWinStreak.tail_game_streak + 1),
+                else_=1,
+            ),
+        }
+    else:
+        streak_set = {"win_streak": 0, "tail_game_streak": 0}
+    streak_set.update(tail_game_type=game_type, updated_at=now)
+    db.execute(streak.on_conflict_do_update(index_elements=["user_id"], set_=streak_set))
+
+
+def _apply_history_orm(db: Session, *, user_id: int, game_type: str, action_type: str,
+                       delta_coin: int, delta_gem: int, now: datetime) -> None:
+    row = db.scalar(select(GameHistoryAggregate).where(
+        GameHistoryAggregate.user_id == user_id,
+        GameHistoryAggregate.game_type == game_type,
+        GameHistoryAggregate.action_type == action_type,
+    ))
+    if row is None:
+        row = GameHistoryAggregate(user_id=user_id, game_type=game_type, action_type=action_type,
+                                   total_count=0, total_delta_coin=0, total_delta_gem=0)
+        db.add(row)
+    row.total_count = (row.total_count or 0) + 1
+    row.total_delta_coin = (row.total_delta_coin or 0) + (delta_coin or 0)
+    row.total_delta_gem = (row.total_delta_gem or 0) + (delta_gem or 0)
+    row.updated_at = now
+    if not affects_streak(action_type):
+        return
+
+    st = db.get(UserWinStreak, user_id)
+    if st is None:
+        st = UserWinStreak(user_id=user_id, win_streak=0, tail_game_type=None, tail_game_streak=0)
+        db.add(st)
+    _advance_streak(st, game_type, action_type == WIN_ACTION)
+    st.updated_at = now
+
+
+def _advance_streak(st: UserWinStreak, game_type: str, is_win: bool) -> None:
+    if is_win:
+        st.win_streak = (st.win_streak or 0) + 1
+        st.tail_game_streak = (st.tail_game_streak or 0) + 1 if st.tail_game_type == game_type else 1
+    else:
+        st.win_streak = 0
+        st.tail_game_streak = 0
+    st.tail_game_type = game_type
+
+
+def amount_total(db: Session, *, user_id: int, action_type: str, game_type: Optional[str] = None) -> int:
+    """누적 delta_coin 합 (game_type 미지정 시 게임 종류 수만큼의 소수 행 합산)."""
+    stmt = select(func.coalesce(func.sum(GameHistoryAggregate.total_delta_coin), 0)).where(
+        GameHistoryAggregate.user_id == user_id,
+        GameHistoryAggregate.action_type == action_type,
+    )
+    if game_type:
+        stmt = stmt.where(GameHistoryAggregate.game_type == game_type)
+    return int(db.execute(stmt).scalar() or 0)
+
+
+def win_streak(db: Session, *, user_id: int, game_type: Optional[str] = None) -> int:
+    st = db.get(UserWinStreak, user_id)
+    if st is None:
+        return 0
+    if game_type:
+        return int(st.tail_game_streak or 0) if st.tail_game_type == game_type else 0
+    return int(st.win_streak or 0)
+
+
+def rebuild(db: Session, user_ids: Optional[Iterable[int]] = None, chunk_size: int = 500) -> Dict[str, Any]:
+    """game_history → 집계 테이블 재구성.
+
+    user_ids 지정 시 해당 사용자만, 아니면 전체. 사용자 chunk 단위로 commit.
+    """
+    if user_ids is None:
+        ids: List[int] = list(db.scalars(select(GameHistory.user_id).distinct().order_by(GameHistory.user_id)))
+    else:
+        ids = sorted(set(int(u) for u in user_ids))
+    rebuilt = 0
+    for i in range(0, len(ids), max(1, chunk_size)):
+        chunk = ids[i:i + chunk_size]
+        db.execute(delete(GameHistoryAggregate).where(GameHistoryAggregate.user_id.in_(chunk)))
+        db.execute(delete(UserWinStreak).where(UserWinStreak.user_id.in_(chunk)))
+        now = datetime.utcnow()
+        grouped = db.execute(
+            select(
+                GameHistory.user_id,
+                GameHistory.game_type,
+                GameHistory.action_type,
+                func.count(),
+                func.coalesce(func.sum(GameHistory.delta_coin), 0),
+                func.coalesce(func.sum(GameHistory.delta_gem), 0),
+            )
+            .where(GameHistory.user_id.in_(chunk))
+            .group_by(GameHistory.user_id, GameHistory.game_type, GameHistory.action_type)
+        ).all()
+        db.add_all([
+            GameHistoryAggregate(user_id=u, game_type=g, action_type=a, total_count=int(c),
+                                 total_delta_coin=int(sc), total_delta_gem=int(sg), updated_at=now)
+            for u, g, a, c, sc, sg in grouped
+        ])
+        for uid in chunk:
+            db.add(_streak_from_tail(db, uid, now))
+        db.commit()
+        rebuilt += len(chunk)
+    logger.info("history aggregates rebuilt users=%s", rebuilt)
+    return {"users": rebuilt}
+
+
+def _streak_from_tail(db: Session, user_id: int, now: datetime, page: int = 200) -> UserWinStreak:
+    """최신 행부터 WIN 연속이 끊길 때까지만 읽어 연승 상태 복원."""
+    st = UserWinStreak(user_id=user_id, win_streak=0, tail_game_type=None, tail_game_streak=0, updated_at=now)
+    offset = 0
+    tail_open = True
+    while True:
+        rows = db.execute(
+            select(GameHistory.action_type, GameHistory.game_type)
+            .where(GameHistory.user_id == user_id)
+            .order_by(GameHistory.created_at.desc(), GameHistory.id.desc())
+            .offset(offset)
+            .limit(page)
+        ).all()
+        if not rows:
+            return st
+        for action_type, gtype in rows:
+            if not affects_streak(action_type):
+                continue
+            if st.tail_game_type is None:
+                st.tail_game_type = gtype
+            if action_type != WIN_ACTION:
+                return st
+            st.win_streak += 1
+            if tail_open and gtype == st.tail_game_type:
+                st.tail_game_streak += 1
+            else:
+                tail_open = False
+        offset += page
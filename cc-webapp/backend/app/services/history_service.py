@@ -2,6 +2,9 @@
 
 단일 책임:
 - 게임 관련 액션(베팅, 승리, 세션 이벤트 등)을 game_history 테이블에 기록
+- 같은 트랜잭션에서 업적용 증분 집계(game_history_aggregates / user_win_streaks) 갱신
+- commit 후 리더보드(sorted set) 갱신
+- commit 후 업적 평가를 achievement_pipeline 워커 풀에 예약
 - 추후 이벤트 브로드캐스트(WS/Kafka) 훅 연동 지점 주석 표시
 """
 from __future__ import annotations
@@ -10,7 +13,9 @@ import asyncio
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from ..models.history_models import GameHistory
-from .achievement_service import AchievementService
+from .achievement_pipeline import get_achievement_pipeline, should_evaluate
+from .leaderboard_service import get_leaderboard_service
+from . import history_aggregate_service
 def _lazy_broadcast_game_history_event():
     try:
         from app import main  # type: ignore
@@ -56,6 +61,15 @@ def log_game_history(
             result_meta=result_meta,
         )
         db.add(record)
+        # 업적용 증분 집계 (같은 트랜잭션)
+        history_aggregate_service.apply_history(
+            db,
+            user_id=user_id,
+            game_type=game_type,
+            action_type=action_type,
+            delta_coin=delta_coin,
+            delta_gem=delta_gem,
+        )
         db.commit()
         # 비동기 브로드캐스트 (실패 허용) - 이벤트 최소 페이로드
         try:
@@ -76,21 +90,20 @@ def log_game_history(
                 loop.create_task(broadcast_game_history_event(payload))
         except Exception as be:  # pragma: no cover
             logger.debug("Broadcast schedule failed: %s", be)
+        # 리더보드 (sorted set) 갱신 - 실패 허용
+        try:
+            get_leaderboard_service().record_history(record)
+        except Exception as le:  # pragma: no cover
+            logger.debug("Leaderboard update failed: %s", le)
+        # 업적 평가: commit 후 전용 워커 풀에 예약 (독립 세션, 사용자 단위 배치)
+        if should_evaluate(action_type, result_meta):
+            try:
+                get_achievement_pipeline().submit(user_id, record.id)
+            except Exception:  # pragma: no cover
+                logger.debug("Achievement evaluation scheduling failed", exc_info=True)
         return record
     except SQLAlchemyError as e:
         db.rollback()
         logger.warning("GameHistory 로그 실패 user=%s action=%s err=%s", user_id, action_type, e)
         return None
 
-    # 업적 평가 비동기 실행 (commit 후)
-    try:
-        if record:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                def _eval():
-                    # 새 세션 열어야 하지만 간단히 동일 세션 재사용 (스레드 안전성 보강 필요 시 SessionLocal())
-                    svc = AchievementService(db)
-                    svc.evaluate_after_history(record)
-                loop.run_in_executor(None, _eval)
-    except Exception:  # pragma: no cover
-        logger.debug("Achievement evaluation scheduling failed", exc_info=True)
@@ -0,0 +1,277 @@
+"""게임 리더보드 (Redis sorted set, 기간 윈도우)
+
+키 구조: lb:{game_type}:{period}:{bucket}
+  - game_type: slot / rps / gacha / crash ... 및 전체 합산 "all"
+  - period: daily (bucket=YYYYMMDD) / weekly (bucket=ISO YYYY-Www) / all_time (bucket=all)
+  - daily/weekly 키는 기간 종료 후 자동 만료 (EXPIRE)
+
+점수:
+  - 기본: 승리 계열 액션(WIN/JACKPOT/BONUS)의 양수 delta_coin (= 순이익)
+  - gacha: result_meta 의 희귀 아이템 수 가중 합 (GACHA_RARITY_POINTS)
+
+갱신 경로: history_service.log_game_history commit 직후 record_history() (slot/rps/gacha/crash 공통).
+조회: top()=ZREVRANGE, rank()=ZREVRANK+ZSCORE → O(log N + limit).
+Redis 미연결 시 프로세스 로컬 MemoryLeaderboardStore 로 동작 (단일 워커 개발/테스트용).
+rebuild(): game_history 로부터 현재 윈도우 키 재구성 (python -m app.scripts.rebuild_leaderboards).
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.history_models import GameHistory
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("daily", "weekly", "all_time")
+OVERALL = "all"
+SCORING_ACTIONS = {"WIN", "JACKPOT", "BONUS"}
+GACHA_RARITY_POINTS = {"rare_count": 1, "ultra_rare_count": 5}
+_PERIOD_TTL = {"daily": timedelta(days=3), "weekly": timedelta(days=15)}
+
+
+def score_for(game_type: str, action_type: str, delta_coin: int, result_meta: Optional[Dict[str, Any]] = None) -> float:
+    """GameHistory 1건의 리더보드 점수 기여분."""
+    if game_type == "gacha":
+        meta = result_meta if isinstance(result_meta, dict) else {}
+        return float(sum(int(meta.get(k) or 0) * pts for k, pts in GACHA_RARITY_POINTS.items()))
+    if action_type in SCORING_ACTIONS and (delta_coin or 0) > 0:
+        return float(delta_coin)
+    return 0.0
+
+
+def bucket_for(period: str, at: datetime) -> str:
+    if period == "daily":
+        return at.strftime("%Y%m%d")
+    if period == "weekly":
+        year, week, _ = at.isocalendar()
+        return f"{year}-W{week:02d}"
+    return "all"
+
+
+def period_start(period: str, at: datetime) -> Optional[datetime]:
+    day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return None
+
+
+def board_key(game_type: str, period: str, at: datetime) -> str:
+    return f"lb:{game_type}:{period}:{bucket_for(period, at)}"
+
+
+class MemoryLeaderboardStore:
+    """Redis 부재 시 폴백. 키별 (member→score) + (-score, member) 정렬 리스트.
+
+    rank/top 은 bisect 로 O(log N); 점수 갱신은 정렬 리스트 삽입/삭제 비용이 든다.
+    """
+
+    def __init__(self) -> None:
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._order: Dict[str, List[Tuple[float, str]]] = {}
+        self._expires: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: datetime) -> None:
+        for key in [k for k, exp in self._expires.items() if exp <= now]:
+            self._expires.pop(key, None)
+            self._scores.pop(key, None)
+            self._order.pop(key, None)
+
+    def incr_many(self, updates: Iterable[Tuple[str, str, float]], ttl: Dict[str, timedelta]) -> None:
+        now = datetime.utcnow()
+        with self._lock:
+            self._purge(now)
+            for key, ttl_delta in ttl.items():
+                self._expires[key] = now + ttl_delta
+            for key, member, delta in updates:
+                scores = self._scores.setdefault(key, {})
+                order = self._order.setdefault(key, [])
+                old = scores.get(member)
+                if old is not None:
+                    del order[bisect.bisect_left(order, (-old, member))]
+                new = (old or 0.0) + delta
+                scores[member] = new
+                bisect.insort(order, (-new, member))
+
+    def replace(self, key: str, scores: Dict[str, float], ttl: Optional[timedelta] = None) -> None:
+        with self._lock:
+            self._scores[key] = dict(scores)
+            self._order[key] = sorted((-s, m) for m, s in scores.items())
+            if ttl is not None:
+                self._expires[key] = datetime.utcnow() + ttl
+
+    def top(self, key: str, limit: int) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(m, -s) for s, m in self._order.get(key, [])[:max(0, limit)]]
+
+    def rank(self, key: str, member: str) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            score = self._scores.get(key, {}).get(member)
+            if score is None:
+                return None
+            return bisect.bisect_left(self._order[key], (-score, member)), score
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+            self._order.clear()
+            self._expires.clear()
+
+
+class RedisLeaderboardStore:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def incr_many(self, updates: Iterable[Tuple[str, str, float]], ttl: Dict[str, timedelta]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, member, delta in updates:
+            pipe.zincrby(key, delta, member)
+            if key in ttl:
+                pipe.expire(key, int(ttl[key].total_seconds()))
+        pipe.execute()
+
+    def replace(self, key: str, scores: Dict[str, float], ttl: Optional[timedelta] = None) -> None:
+        # 임시 키에 채운 뒤 RENAME 으로 원자 교체 (조회 중 빈 보드 노출 방지)
+        tmp = f"{key}:rebuild"
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(tmp)
+        items = list(scores.items())
+        for i in range(0, len(items), 1000):
+            pipe.zadd(tmp, dict(items[i:i + 1000]))
+        if items:
+            pipe.rename(tmp, key)
+            if ttl is not None:
+                pipe.expire(key, int(ttl.total_seconds()))
+        else:
+            pipe.delete(key)
+        pipe.execute()
+
+    def top(self, key: str, limit: int) -> List[Tuple[str, float]]:
+        if limit <= 0:
+            return []
+        return [(_text(m), float(s)) for m, s in self.client.zrevrange(key, 0, limit - 1, withscores=True)]
+
+    def rank(self, key: str, member: str) -> Optional[Tuple[int, float]]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zrevrank(key, member)
+        pipe.zscore(key, member)
+        rank, score = pipe.execute()
+        if rank is None:
+            return None
+        return int(rank), float(score or 0.0)
+
+
+def _text(v: Any) -> str:
+    return v.decode("utf-8") if isinstance(v, bytes) else str(v)
+
+
+class LeaderboardService:
+    def __init__(self, store: Any = None) -> None:
+        self._store = store
+        self._memory = MemoryLeaderboardStore()
+
+    @property
+    def store(self) -> Any:
+        if self._store is not None:
+            return self._store
+        try:
+            from ..utils.redis import get_redis_manager
+            client = get_redis_manager().redis_client
+        except Exception:
+            client = None
+        return RedisLeaderboardStore(client) if client is not None else self._memory
+
+    # ---------------- write ---------------- #
+    def record(self, user_id: int, game_type: str, score: float, at: Optional[datetime] = None) -> None:
+        if not score:
+            return
+        at = at or datetime.utcnow()
+        member = str(user_id)
+        updates = []
+        ttl: Dict[str, timedelta] = {}
+        for gt in (game_type, OVERALL):
+            for period in PERIODS:
+                key = board_key(gt, period, at)
+                updates.append((key, member, float(score)))
+                if period in _PERIOD_TTL:
+                    ttl[key] = _PERIOD_TTL[period]
+        self.store.incr_many(updates, ttl)
+
+    def record_history(self, history: GameHistory) -> float:
+        score = score_for(history.game_type, history.action_type, history.delta_coin or 0, history.result_meta)
+        if score:
+            self.record(history.user_id, history.game_type, score, at=history.created_at)
+        return score
+
+    # ---------------- read ---------------- #
+    def top(self, game_type: Optional[str] = None, period: str = "all_time", limit: int = 10,
+            at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        key = board_key(game_type or OVERALL, period, at or datetime.utcnow())
+        return [
+            {"rank": i + 1, "user_id": int(member), "score": score}
+            for i, (member, score) in enumerate(self.store.top(key, limit))
+        ]
+
+    def rank(self, user_id: int, game_type: Optional[str] = None, period: str = "all_time",
+             at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        key = board_key(game_type or OVERALL, period, at or datetime.utcnow())
+        found = self.store.rank(key, str(user_id))
+        if found is None:
+            return None
+        return {"rank": found[0] + 1, "user_id": user_id, "score": found[1]}
+
+    # ---------------- rebuild ---------------- #
+    def rebuild(self, db: Session, at: Optional[datetime] = None, yield_per: int = 5000) -> Dict[str, Any]:
+        """game_history 를 스트리밍하여 현재 daily/weekly/all-time 보드 전부를 재구성."""
+        at = at or datetime.utcnow()
+        week_start = period_start("weekly", at)
+        day_start = period_start("daily", at)
+        boards: Dict[str, Dict[str, float]] = {}
+        rows = 0
+        stmt = select(
+            GameHistory.user_id, GameHistory.game_type, GameHistory.action_type,
+            GameHistory.delta_coin, GameHistory.result_meta, GameHistory.created_at,
+        ).where(GameHistory.created_at <= at).execution_options(yield_per=yield_per)
+        for user_id, game_type, action_type, delta_coin, meta, created_at in db.execute(stmt):
+            rows += 1
+            score = score_for(game_type, action_type, delta_coin or 0, meta)
+            if not score:
+                continue
+            periods = ["all_time"]
+            if created_at and created_at >= week_start:
+                periods.append("weekly")
+                if created_at >= day_start:
+                    periods.append("daily")
+            member = str(user_id)
+            for gt in (game_type, OVERALL):
+                for period in periods:
+                    board = boards.setdefault(board_key(gt, period, at), {})
+                    board[member] = board.get(member, 0.0) + score
+        # 데이터 없는 기존 보드도 비우기 위해 관측된 game_type 전체 × 기간 키를 교체
+        game_types = {k.split(":")[1] for k in boards} | {OVERALL}
+        store = self.store
+        for gt in game_types:
+            for period in PERIODS:
+                key = board_key(gt, period, at)
+                store.replace(key, boards.get(key, {}), _PERIOD_TTL.get(period))
+        logger.info("leaderboards rebuilt rows=%s boards=%s", rows, len(boards))
+        return {"rows": rows, "boards": len(boards), "game_types": sorted(game_types)}
+
+
+_service: Optional[LeaderboardService] = None
+
+
+def get_leaderboard_service() -> LeaderboardService:
+    global _service
+    if _service is None:
+        _service = LeaderboardService()
+    return _service
@@ -1,11 +1,112 @@
 from __future__ import annotations
 
+"""Limited packages catalog + stock reservation.
+
+재고 / hold 키 (Redis):
+  limited:{code}:stock      남은 재고 (정수)
+  limited:{code}:holds      hold_id → 만료 시각(epoch) ZSET (만료 회수용 인덱스)
+  limited:{code}:hold_qty   hold_id → 수량 HASH (hold_id 로 O(1) 조회/삭제)
+
+reserve / release_hold / finalize_hold / sweep_expired_holds 는 각각 Lua 스크립트 1회 왕복으로
+서버에서 원자적으로 실행된다 (WATCH/MULTI 재시도 루프 없음 → 경합 중 재고가 남아 있으면 실패하지 않음).
+reserve 는 같은 스크립트 안에서 만료 hold 를 최대 _SWEEP_BATCH 개 회수한 뒤 재고를 차감한다.
+EVAL 을 지원하지 않는 클라이언트(테스트 더블 등)와 Redis 미연결 시에는 프로세스 락 아래
+명령 단위로 같은 동작을 수행한다.
+"""
+
+import logging
+import threading
+import time
+import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple
 
 from ..core.config import settings
 from ..utils.redis import get_redis_manager
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter  # type: ignore
+    _STOCK_OPS = Counter("limited_stock_ops_total", "Limited package stock operations", ["action", "result"])
+except Exception:  # pragma: no cover
+    _STOCK_OPS = None
+
+logger = logging.getLogger(__name__)
+
+# reserve 1회당 함께 회수할 만료 hold 최대 개수
+_SWEEP_BATCH = 100
+
+# 공통 Lua 조각: 만료 hold 회수 (KEYS[2]=holds, KEYS[3]=hold_qty) → 회수 수량
+_LUA_SWEEP_BODY = """
+local returned = 0
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, sweep_limit)
+for _, m in ipairs(expired) do
+  local q = redis.call('HGET', KEYS[3], m)
+  if q then
+    redis.call('HDEL', KEYS[3], m)
+  else
+    local i = string.find(m, ':', 1, true)
+    q = i and string.sub(m, i + 1) or 0
+  end
+  returned = returned + (tonumber(q) or 0)
+  redis.call('ZREM', KEYS[2], m)
+end
+"""
+
+_LUA: Dict[str, str] = {
+    # KEYS: stock, holds, hold_qty / ARGV: qty, initial_stock, now, expires, hold_id('' = hold 없음), sweep_limit
+    "reserve": """
+local qty = tonumber(ARGV[1])
+local now = tonumber(ARGV[3])
+local sweep_limit = tonumber(ARGV[6])
+""" + _LUA_SWEEP_BODY + """
+local stock = redis.call('GET', KEYS[1])
+if not stock then
+  redis.call('SET', KEYS[1], ARGV[2])
+  stock = ARGV[2]
+end
+stock = tonumber(stock) + returned
+if stock < qty then
+  if returned > 0 then redis.call('INCRBY', KEYS[1], returned) end
+  return {0, stock}
+end
+redis.call('INCRBY', KEYS[1], returned - qty)
+if ARGV[5] ~= '' then
+  redis.call('HSET', KEYS[3], ARGV[5], qty)
+  redis.call('ZADD', KEYS[2], ARGV[4], ARGV[5])
+end
+return {1, stock - qty}
+""",
+    # KEYS: stock, holds, hold_qty / ARGV: hold_id
+    "release": """
+local q = redis.call('HGET', KEYS[3], ARGV[1])
+if not q then return 0 end
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('INCRBY', KEYS[1], q)
+return tonumber(q)
+""",
+    # KEYS: stock, holds, hold_qty, purchased / ARGV: hold_id, qty
+    "finalize": """
+local held = 1
+if redis.call('HDEL', KEYS[3], ARGV[1]) == 1 then
+  redis.call('ZREM', KEYS[2], ARGV[1])
+else
+  held = 0
+  redis.call('DECRBY', KEYS[1], ARGV[2])
+end
+return {held, redis.call('INCRBY', KEYS[4], ARGV[2])}
+""",
+    # KEYS: stock, holds, hold_qty / ARGV: now, limit
+    "sweep": """
+local now = tonumber(ARGV[1])
+local sweep_limit = tonumber(ARGV[2])
+""" + _LUA_SWEEP_BODY + """
+if returned > 0 then redis.call('INCRBY', KEYS[1], returned) end
+return returned
+""",
+}
 
 
 @dataclass
@@ -39,6 +140,13 @@ class LimitedPackageService:
     _stock_counts: Dict[str, int] = {}
     # In-memory hold fallback when Redis is unavailable
     _holds_mem: Dict[str, List[tuple]] = {}
+    # hold 수량 (Redis 해시를 쓸 수 없는 경우): {(code, hold_id): qty}
+    _hold_qty_mem: Dict[Tuple[str, str], int] = {}
+    # 스크립트 미지원 클라이언트 경로 / 메모리 폴백의 원자성
+    _lock = threading.RLock()
+    # id(client) → (client, {name: Script})
+    _scripts: Dict[int, Tuple[object, Dict[str, object]]] = {}
+    _no_scripting: Set[int] = set()
 
     @classmethod
     def _seed_catalog(cls):
@@ -157,6 +265,10 @@ class LimitedPackageService:
     def _holds_key(code: str) -> str:
         return f"limited:{code}:holds"
 
+    @staticmethod
+    def _hold_qty_key(code: str) -> str:
+        return f"limited:{code}:hold_qty"
+
     @classmethod
     def get_stock(cls, code: str) -> Optional[int]:
         pkg = cls.get(code)
@@ -192,477 +304,286 @@ class LimitedPackageService:
         return int(cls._user_purchases.get(code, {}).get(int(user_id), 0))
 
     @classmethod
-    def try_reserve(cls, code: str, quantity: int) -> bool:
+    def _stock_args(cls, code: str) -> List[str]:
+        return [cls._stock_key(code), cls._holds_key(code), cls._hold_qty_key(code)]
+
+    @classmethod
+    def reserve(cls, code: str, quantity: int, ttl_seconds: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+        """재고 차감 + hold 기록을 한 번에 수행. (성공 여부, hold_id)
+
+        Redis: Lua 스크립트 1회 왕복 (만료 hold 회수 → 재고 확인/차감 → hold 기록).
+        서버에서 원자적으로 실행되므로 경합 중에도 재고가 남아 있으면 실패하지 않는다.
+        무제한 패키지는 (True, None).
+        """
         pkg = cls.get(code)
         if not pkg:
-            return False
+            return False, None
         if pkg.initial_stock is None:
-            return True  # unlimited
+            return True, None
+        hold_id = uuid.uuid4().hex[:16]
+        now = int(time.time())
+        expires = now + int(ttl_seconds if ttl_seconds is not None else settings.LIMITED_HOLD_TTL_SECONDS)
+        ok = cls._reserve(code, pkg.initial_stock, int(quantity), now, expires, hold_id)
+        metric(_STOCK_OPS, "inc", action="reserve", result="ok" if ok else "sold_out")
+        return (True, hold_id) if ok else (False, None)
+
+    @classmethod
+    def release_hold(cls, code: str, hold_id: Optional[str]) -> int:
+        """hold 취소 후 재고 복원 (1회 왕복, 중복 호출/이미 회수된 hold 는 0). 복원 수량 반환."""
+        if not hold_id:
+            return 0
         r = get_redis_manager()
-        if not r.redis_client:
-            # Fallback: manage stock in-memory
-            if pkg.initial_stock is None:
-                return True
-            current = int(cls._stock_counts.get(code, pkg.initial_stock))
-            if current < quantity:
-                return False
-            cls._stock_counts[code] = current - int(quantity)
-            return True
-        key = cls._stock_key(code)
-        pipe = r.redis_client.pipeline()
-        while True:
+        client = r.redis_client
+        if client is not None and cls._scripting(client):
             try:
-                pipe.watch(key)
-                current = pipe.get(key)
-                current = int(current) if current is not None else pkg.initial_stock
-                if current < quantity:
-                    pipe.unwatch()
-                    return False
-                pipe.multi()
-                pipe.decrby(key, quantity)
-                pipe.execute()
-                return True
-            except Exception:
-                # Retry a couple times on contention
-                try:
-                    pipe.reset()
-                except Exception:
-                    pass
-                return False
+                returned = int(cls._script(client, "release")(keys=cls._stock_args(code), args=[hold_id]) or 0)
+                metric(_STOCK_OPS, "inc", action="release", result="ok" if returned else "missing")
+                return returned
+            except Exception as e:
+                if not cls._disable_scripting(client, e):
+                    raise
+        with cls._lock:
+            qty = cls._pop_hold(client, code, hold_id)
+            if qty:
+                cls._incr_stock(client, code, qty)
+        metric(_STOCK_OPS, "inc", action="release", result="ok" if qty else "missing")
+        return qty
 
     @classmethod
-    def finalize_user_purchase(cls, code: str, user_id: int, quantity: int) -> None:
+    def finalize_hold(cls, code: str, hold_id: Optional[str], user_id: int, quantity: int) -> int:
+        """결제 완료: hold 제거 + 사용자 구매 수 증가 (1회 왕복). 사용자 누적 구매 수 반환.
+
+        hold 가 이미 만료 회수된 경우(결제 지연)에는 판매분만큼 재고를 다시 차감한다.
+        """
+        pkg = cls.get(code)
+        limited = bool(pkg and pkg.initial_stock is not None and hold_id)
         r = get_redis_manager()
-        if r.redis_client:
-            r.redis_client.incrby(cls._purchased_key(code, user_id), quantity)
+        client = r.redis_client
+        purchased: Optional[int] = None
+        held = True
+        if client is not None and limited and cls._scripting(client):
+            try:
+                held_i, purchased = cls._script(client, "finalize")(
+                    keys=cls._stock_args(code) + [cls._purchased_key(code, user_id)], args=[hold_id, int(quantity)]
+                )
+                held = bool(int(held_i))
+                purchased = int(purchased)
+            except Exception as e:
+                if not cls._disable_scripting(client, e):
+                    raise
+        if purchased is None:
+            with cls._lock:
+                if limited and not cls._pop_hold(client, code, hold_id):
+                    held = False
+                    cls._incr_stock(client, code, -int(quantity))
+                if client is not None:
+                    purchased = int(client.incrby(cls._purchased_key(code, user_id), quantity))
+        if not held:
+            logger.warning("limited hold %s for %s expired before finalize; stock re-deducted", hold_id, code)
+        metric(_STOCK_OPS, "inc", action="finalize", result="ok" if held else "hold_expired")
         # Always update in-memory mirror so behavior is correct even without Redis
         mp = cls._user_purchases.setdefault(code, {})
         mp[int(user_id)] = int(mp.get(int(user_id), 0)) + int(quantity)
+        return int(purchased if purchased is not None else mp[int(user_id)])
+
+    @classmethod
+    def try_reserve(cls, code: str, quantity: int) -> bool:
+        """재고만 차감 (hold 없음). 경합 시에도 재고가 남아 있으면 성공."""
+        pkg = cls.get(code)
+        if not pkg:
+            return False
+        if pkg.initial_stock is None:
+            return True  # unlimited
+        ok = cls._reserve(code, pkg.initial_stock, int(quantity), int(time.time()), 0, "")
+        metric(_STOCK_OPS, "inc", action="reserve", result="ok" if ok else "sold_out")
+        return ok
+
+    @classmethod
+    def finalize_user_purchase(cls, code: str, user_id: int, quantity: int) -> None:
+        cls.finalize_hold(code, None, user_id, quantity)
 
     # ---- Hold tracking for timeout release ----
     @classmethod
     def add_hold(cls, code: str, quantity: int, ttl_seconds: int = 120) -> str:
-        """Record a hold with TTL in a Redis sorted set; fallback to memory.
+        """Record a hold (hold_id → qty, expiry index); fallback to memory.
 
         Note: Stock is already decremented by try_reserve; this marker allows
         sweeping back to stock if purchase doesn't finalize in time.
+        New callers should prefer reserve(), which does both in one round trip.
 
         TTL is configurable via settings.LIMITED_HOLD_TTL_SECONDS; the explicit
         ttl_seconds argument takes precedence when provided by callers.
         """
-        import time, uuid
         hold_id = uuid.uuid4().hex[:16]
         # Allow central configuration override
         effective_ttl = int(ttl_seconds if ttl_seconds is not None else settings.LIMITED_HOLD_TTL_SECONDS)
         expires = int(time.time()) + int(effective_ttl)
-        r = get_redis_manager()
-        member = f"{hold_id}:{int(quantity)}"
-        if r.redis_client:
-            try:
-                r.redis_client.zadd(cls._holds_key(code), {member: expires})
-            except Exception:
-                pass
-        else:
-            lst = cls._holds_mem.setdefault(code, [])
-            lst.append((expires, member))
+        client = get_redis_manager().redis_client
+        try:
+            cls._put_hold(client, code, hold_id, int(quantity), expires)
+        except Exception:
+            pass
         return hold_id
 
     @classmethod
     def remove_hold(cls, code: str, hold_id: str) -> None:
-        r = get_redis_manager()
-        key = cls._holds_key(code)
-        if r.redis_client:
-            try:
-                # Need to find exact member to remove (member includes qty)
-                members = r.redis_client.zrange(key, 0, -1)
-                for m in members or []:
-                    if isinstance(m, bytes):
-                        m = m.decode('utf-8')
-                    if m.startswith(f"{hold_id}:"):
-                        r.redis_client.zrem(key, m)
-                        break
-            except Exception:
-                pass
-        else:
-            lst = cls._holds_mem.get(code, [])
-            cls._holds_mem[code] = [(exp, mem) for (exp, mem) in lst if not mem.startswith(f"{hold_id}:")]
+        """hold 만 제거 (재고 복원 없음). hold_id 로 직접 삭제 — O(log N)."""
+        client = get_redis_manager().redis_client
+        try:
+            with cls._lock:
+                cls._pop_hold(client, code, hold_id)
+        except Exception:
+            pass
 
     @classmethod
-    def sweep_expired_holds(cls, code: str) -> int:
+    def sweep_expired_holds(cls, code: str, limit: int = 1000) -> int:
         """Return expired holds to stock. Returns number of units returned."""
-        import time
         now = int(time.time())
         r = get_redis_manager()
-        key = cls._holds_key(code)
-        returned = 0
-        if r.redis_client:
+        client = r.redis_client
+        if client is not None and cls._scripting(client):
             try:
-                expired = r.redis_client.zrangebyscore(key, '-inf', now)
-                if expired:
-                    # Sum quantities
-                    for m in expired:
-                        if isinstance(m, bytes):
-                            m = m.decode('utf-8')
-                        try:
-                            _, qty_s = m.split(":", 1)
-                            returned += int(qty_s)
-                        except Exception:
-                            pass
-                    # Remove expired members
-                    r.redis_client.zremrangebyscore(key, '-inf', now)
-                    if returned > 0:
-                        r.redis_client.incrby(cls._stock_key(code), returned)
-            except Exception:
-                return 0
-        else:
-            lst = cls._holds_mem.get(code, [])
-            keep: List[tuple] = []
-            for exp, mem in lst:
-                if exp <= now:
-                    try:
-                        _, qty_s = mem.split(":", 1)
-                        returned += int(qty_s)
-                    except Exception:
-                        pass
-                else:
-                    keep.append((exp, mem))
-            cls._holds_mem[code] = keep
-            if returned > 0:
-                pkg = cls.get(code)
-                if pkg and pkg.initial_stock is not None:
-                    cls._stock_counts[code] = int(cls._stock_counts.get(code, pkg.initial_stock)) + returned
+                return int(cls._script(client, "sweep")(keys=cls._stock_args(code), args=[now, int(limit)]) or 0)
+            except Exception as e:
+                if not cls._disable_scripting(client, e):
+                    return 0
+        try:
+            with cls._lock:
+                returned = cls._sweep_commands(client, code, now, limit)
+                if returned > 0:
+                    cls._incr_stock(client, code, returned)
+        except Exception:
+            return 0
         return int(returned)
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-        
-    
 
     @classmethod
     def release_reservation(cls, code: str, quantity: int) -> None:
         pkg = cls.get(code)
         if not pkg or pkg.initial_stock is None:
             return
+        with cls._lock:
+            cls._incr_stock(get_redis_manager().redis_client, code, int(quantity))
+
+    # ---- 내부: Lua 스크립트 / 스크립트 미지원 클라이언트 폴백 ----
+    @classmethod
+    def _script(cls, client, name: str):
+        scripts = cls._scripts.get(id(client))
+        if scripts is None or scripts[0] is not client:
+            scripts = (client, {k: client.register_script(src) for k, src in _LUA.items()})
+            cls._scripts[id(client)] = scripts
+        return scripts[1][name]
+
+    @classmethod
+    def _scripting(cls, client) -> bool:
+        return hasattr(client, "register_script") and id(client) not in cls._no_scripting
+
+    @classmethod
+    def _disable_scripting(cls, client, exc: Exception) -> bool:
+        """EVAL 미지원(테스트 더블, Lua 런타임 없는 fakeredis 등)이면 명령 단위 경로로 전환."""
+        msg = str(exc).lower()
+        if isinstance(exc, (ImportError, AttributeError, NotImplementedError)) or "unknown command" in msg:
+            logger.warning("Redis client does not support scripting (%s); using locked command path", exc)
+            cls._no_scripting.add(id(client))
+            return True
+        return False
+
+    @classmethod
+    def _reserve(cls, code: str, initial_stock: int, quantity: int, now: int, expires: int, hold_id: str) -> bool:
         r = get_redis_manager()
-        if r.redis_client:
-            r.redis_client.incrby(cls._stock_key(code), quantity)
+        client = r.redis_client
+        if client is not None and cls._scripting(client):
+            try:
+                ok, _ = cls._script(client, "reserve")(
+                    keys=cls._stock_args(code), args=[quantity, initial_stock, now, expires, hold_id, _SWEEP_BATCH]
+                )
+                return bool(int(ok))
+            except Exception as e:
+                if not cls._disable_scripting(client, e):
+                    raise
+        # 명령 단위 경로: 프로세스 내 락으로 원자성 보장 (단일 워커 개발/테스트)
+        with cls._lock:
+            returned = cls._sweep_commands(client, code, now, _SWEEP_BATCH)
+            if client is not None:
+                current = client.get(cls._stock_key(code))
+                if current is None:
+                    client.setnx(cls._stock_key(code), int(initial_stock))
+                    current = initial_stock
+            else:
+                current = cls._stock_counts.get(code, initial_stock)
+            ok = int(current) + returned >= quantity
+            delta = returned - (quantity if ok else 0)
+            if delta:
+                cls._incr_stock(client, code, delta)
+            if ok and hold_id:
+                cls._put_hold(client, code, hold_id, quantity, expires)
+            return ok
+
+    @classmethod
+    def _incr_stock(cls, client, code: str, delta: int) -> None:
+        pkg = cls.get(code)
+        initial = int(pkg.initial_stock or 0) if pkg else 0
+        if client is not None:
+            key = cls._stock_key(code)
+            if client.get(key) is None:
+                client.setnx(key, initial)
+            client.incrby(key, int(delta))
         else:
             # Fallback: adjust in-memory stock
-            cls._stock_counts[code] = int(cls._stock_counts.get(code, pkg.initial_stock)) + int(quantity)
+            cls._stock_counts[code] = int(cls._stock_counts.get(code, initial)) + int(delta)
+
+    @classmethod
+    def _put_hold(cls, client, code: str, hold_id: str, quantity: int, expires: int) -> None:
+        if client is None:
+            cls._holds_mem.setdefault(code, []).append((expires, hold_id))
+            cls._hold_qty_mem[(code, hold_id)] = int(quantity)
+        elif hasattr(client, "hset"):
+            pipe = client.pipeline()
+            pipe.hset(cls._hold_qty_key(code), hold_id, int(quantity))
+            pipe.zadd(cls._holds_key(code), {hold_id: expires})
+            pipe.execute()
+        else:
+            cls._hold_qty_mem[(code, hold_id)] = int(quantity)
+            client.zadd(cls._holds_key(code), {hold_id: expires})
+
+    @classmethod
+    def _pop_hold(cls, client, code: str, member: str) -> int:
+        """hold 제거 후 수량 반환 (없으면 0). 이전 형식 멤버("hold_id:qty")도 수량 해석."""
+        qty = None
+        if client is None:
+            lst = cls._holds_mem.get(code, [])
+            kept = [(exp, mem) for (exp, mem) in lst if mem != member]
+            if len(kept) == len(lst):
+                return 0
+            cls._holds_mem[code] = kept
+        else:
+            if hasattr(client, "hget"):
+                qty = client.hget(cls._hold_qty_key(code), member)
+                if qty is not None:
+                    client.hdel(cls._hold_qty_key(code), member)
+            if not client.zrem(cls._holds_key(code), member) and qty is None \
+                    and (code, member) not in cls._hold_qty_mem:
+                return 0
+        if qty is None:
+            qty = cls._hold_qty_mem.pop((code, member), None)
+        if qty is None and ":" in member:
+            qty = member.split(":", 1)[1]
+        try:
+            return int(qty or 0)
+        except Exception:
+            return 0
+
+    @classmethod
+    def _sweep_commands(cls, client, code: str, now: int, limit: int) -> int:
+        if client is None:
+            expired = [mem for (exp, mem) in cls._holds_mem.get(code, []) if exp <= now]
+        else:
+            expired = client.zrangebyscore(cls._holds_key(code), '-inf', now) or []
+        returned = 0
+        for m in expired[:limit]:
+            if isinstance(m, bytes):
+                m = m.decode('utf-8')
+            returned += cls._pop_hold(client, code, m)
+        return returned
 
     # ---- Promo usage helpers ----
     @classmethod
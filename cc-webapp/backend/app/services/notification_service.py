@@ -1,17 +1,11 @@
 from datetime import datetime, timezone
 from typing import Optional, List, Tuple
-import json
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app import models
-from app.utils.redis import RedisManager
-from app.core.config import settings
-try:
-    from pywebpush import webpush  # type: ignore
-except Exception:  # fallback if not installed
-    webpush = None
+from app.services.push_delivery import get_push_pool, webpush, webpush_sender
 
 
 class NotificationService:
@@ -167,48 +161,14 @@ class NotificationService:
     def push_to_user_subscriptions(self, user_id: int, payload: dict) -> Tuple[int, int, int]:
         """
         사용자 Redis에 저장된 PushSubscription들로 VAPID 웹푸시 발송.
+        발송은 PushDeliveryPool 워커에서 구독별 병렬 수행, 만료(404/410) 구독은 일괄 정리 대기열로.
+        대기는 PUSH_RESULT_TIMEOUT_SECONDS 까지 (초과분은 failed).
         반환: (sent_count, failed_count, removed_count)
         """
-        rm = RedisManager()
-        key = f"user:{user_id}:push:subs"
-        subs_obj = rm.get_cached_data(key) or {"subs": []}
-        subs = subs_obj.get("subs", [])
-
-        if not subs or webpush is None:
+        pool = get_push_pool()
+        if webpush is None and pool.sender is webpush_sender:
             return (0, 0, 0)
-
-        sent = failed = removed = 0
-        to_keep = []
-        vapid_pub = getattr(settings, "VAPID_PUBLIC_KEY", "") or ""
-        vapid_priv = getattr(settings, "VAPID_PRIVATE_KEY", "") or ""
-        claims = {"sub": "mailto:admin@casino-club.local"}
-
-        for s in subs:
-            try:
-                webpush(
-                    subscription_info={
-                        "endpoint": s.get("endpoint"),
-                        "keys": {"p256dh": s.get("p256dh"), "auth": s.get("auth")},
-                    },
-                    data=json.dumps(payload),
-                    vapid_private_key=vapid_priv,
-                    vapid_public_key=vapid_pub,
-                    vapid_claims=claims,
-                )
-                sent += 1
-                to_keep.append(s)
-            except Exception as e:
-                failed += 1
-                status = getattr(getattr(e, "response", None), "status_code", None)
-                if status in (404, 410):
-                    removed += 1
-                else:
-                    to_keep.append(s)
-
-        if removed:
-            rm.cache_user_data(key, {"subs": to_keep}, expire_seconds=30 * 24 * 3600)
-
-        return (sent, failed, removed)
+        return pool.deliver_user(user_id, payload).as_tuple()
 
     # Potential future method for batch creation or more complex logic
     # def create_notifications_batch(self, notifications_data: List[Dict]) -> List[models.Notification]:
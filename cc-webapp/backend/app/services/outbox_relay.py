@@ -0,0 +1,481 @@
+"""Transactional outbox relay (event_outbox → Kafka)
+
+enqueue_outbox 가 도메인 트랜잭션 안에서 적재한 미발행 행을 배치로 발행한다.
+
+    relay = get_outbox_relay()
+    relay.start()          # 워커 스레드 (OUTBOX_RELAY_WORKERS)
+    relay.run_once()       # 1 배치 동기 처리 (테스트/스크립트)
+    publish_outbox_now(("segment_change",))  # 백그라운드 작업: relay 미실행 프로세스면 호출 스레드에서 발행
+
+배치 1회:
+  1) SELECT ... WHERE published_at IS NULL AND publish_attempts < :max
+       ORDER BY id LIMIT :n FOR UPDATE SKIP LOCKED
+     → 여러 relay(프로세스/스레드)가 서로 다른 행을 claim (수평 확장, 중복 발행 없음)
+     단, 배치 간 발행 순서는 보장하지 않는다: 워커가 여럿이면 뒤 배치가 먼저 전송될 수 있음
+     (user_id 파티션 키는 같은 사용자 이벤트를 한 파티션으로 모을 뿐) → 순서가 필요한 소비자는 value.id 기준 정렬
+  2) sink.publish(messages) → 전달 확인된 id 목록
+  3) UPDATE ... SET published_at = now WHERE id IN (...)  (일괄) / 실패 행은 publish_attempts + 1
+  4) commit (행 잠금 해제)
+  발행 보장은 at-least-once (publish 후 commit 전 장애 시 재발행) → 소비자는 value.id 로 dedupe.
+
+sink:
+  - KafkaOutboxSink: kafka-python producer (compression/linger/batch_size), 배치 전송 후 flush 1회 (KAFKA_ENABLED 기본)
+  - DiscardOutboxSink: KAFKA_ENABLED=false → 전달 대상이 없으므로 발행 완료로 마킹 (prune 으로 정리, 테이블 무한 증가 방지)
+  - InMemoryOutboxSink: 테스트/벤치용 (set_outbox_sink 로 교체)
+
+prune: 발행 완료 후 OUTBOX_RETENTION_HOURS 지난 행을 OUTBOX_PRUNE_BATCH 단위로 삭제
+
+환경변수:
+  OUTBOX_RELAY_ENABLED           lifespan 에서 relay 시작 (기본 1, 0 이면 이 프로세스는 발행하지 않음 → 다른 인스턴스의 relay 필요)
+  OUTBOX_RELAY_WORKERS           relay 스레드 수 (기본 1)
+  OUTBOX_RELAY_BATCH_SIZE        배치 행 수 (기본 500)
+  OUTBOX_RELAY_POLL_MS           대기 행이 없을 때 폴링 간격 (기본 200)
+  OUTBOX_RELAY_MAX_ATTEMPTS      발행 시도 상한, 초과 행은 claim 제외 (기본 10)
+  OUTBOX_RETENTION_HOURS         발행 완료 행 보존 (기본 72)
+  OUTBOX_PRUNE_INTERVAL_SEC      prune 주기 (기본 600)
+  OUTBOX_PRUNE_BATCH             prune 1회 삭제 상한 (기본 5000)
+  OUTBOX_KAFKA_COMPRESSION       gzip | snappy | lz4 | zstd | none (기본 gzip)
+  OUTBOX_KAFKA_LINGER_MS         producer linger (기본 20)
+  OUTBOX_KAFKA_BATCH_BYTES       producer batch_size (기본 262144)
+  OUTBOX_DEFAULT_TOPIC           매핑 없는 event_type 의 토픽 (기본 cc_domain_events)
+
+메트릭:
+  outbox_relay_published_total / outbox_relay_pruned_total
+  outbox_relay_batches_total{result=ok|partial|error}
+  outbox_relay_batch_seconds (Histogram) / outbox_relay_lag_seconds (Gauge, 가장 오래된 미발행 행 대기 시간)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select, update
+
+from ..core.config import settings
+from ..models.outbox_models import EventOutbox
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _PUBLISHED = Counter("outbox_relay_published_total", "Outbox rows published")
+    _PRUNED = Counter("outbox_relay_pruned_total", "Published outbox rows pruned")
+    _BATCHES = Counter("outbox_relay_batches_total", "Outbox relay batches", ["result"])
+    _BATCH_SECONDS = Histogram("outbox_relay_batch_seconds", "Outbox relay claim+publish+mark duration")
+    _LAG = Gauge("outbox_relay_lag_seconds", "Age of the oldest unpublished outbox row")
+except Exception:  # pragma: no cover
+    _PUBLISHED = _PRUNED = _BATCHES = _BATCH_SECONDS = _LAG = None
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def topic_for(event_type: str) -> str:
+    topics = {
+        "user_action": settings.KAFKA_ACTIONS_TOPIC,
+        "reward": settings.KAFKA_REWARDS_TOPIC,
+        "purchase": settings.KAFKA_PURCHASES_TOPIC,
+        "segment_change": settings.KAFKA_SEGMENTS_TOPIC,
+    }
+    return topics.get(event_type) or os.getenv("OUTBOX_DEFAULT_TOPIC", "cc_domain_events")
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    topic: str
+    key: Optional[bytes]
+    value: bytes
+
+
+class InMemoryOutboxSink:
+    """테스트/벤치용 sink. fail_ids 에 포함된 id 는 전달 실패로 보고."""
+
+    def __init__(self) -> None:
+        self.messages: List[OutboxMessage] = []
+        self.fail_ids: set = set()
+        self._lock = threading.Lock()
+
+    def publish(self, messages: Sequence[OutboxMessage]) -> List[int]:
+        delivered = [m for m in messages if m.id not in self.fail_ids]
+        with self._lock:
+            self.messages.extend(delivered)
+        return [m.id for m in delivered]
+
+    def close(self) -> None:
+        pass
+
+
+class DiscardOutboxSink:
+    """Kafka 비활성 환경용 sink: 전부 전달된 것으로 보고 (행은 보존 기간 후 prune)"""
+
+    def publish(self, messages: Sequence[OutboxMessage]) -> List[int]:
+        return [m.id for m in messages]
+
+    def close(self) -> None:
+        pass
+
+
+class KafkaOutboxSink:
+    """kafka-python producer 로 배치 전송 (send 전부 → flush 1회 → future 결과로 전달 여부 판정)"""
+
+    def __init__(self, bootstrap_servers: Optional[str] = None) -> None:
+        self.bootstrap_servers = (
+            bootstrap_servers
+            or getattr(settings, "kafka_bootstrap_servers", None)
+            or settings.KAFKA_BOOTSTRAP_SERVERS
+        )
+        compression = os.getenv("OUTBOX_KAFKA_COMPRESSION", "gzip").lower()
+        self.compression = None if compression in ("", "none") else compression
+        self.linger_ms = int(os.getenv("OUTBOX_KAFKA_LINGER_MS", "20"))
+        self.batch_bytes = int(os.getenv("OUTBOX_KAFKA_BATCH_BYTES", "262144"))
+        self._producer = None
+
+    def _get_producer(self):
+        if self._producer is None:
+            from kafka import KafkaProducer  # type: ignore
+            self._producer = KafkaProducer(
+                bootstrap_servers=self.bootstrap_servers,
+                acks="all",
+                compression_type=self.compression,
+                linger_ms=self.linger_ms,
+                batch_size=self.batch_bytes,
+                retries=3,
+            )
+        return self._producer
+
+    def publish(self, messages: Sequence[OutboxMessage]) -> List[int]:
+        producer = self._get_producer()
+        futures = [(m.id, producer.send(m.topic, key=m.key, value=m.value)) for m in messages]
+        producer.flush()
+        delivered: List[int] = []
+        for mid, fut in futures:
+            try:
+                fut.get(timeout=0)
+                delivered.append(mid)
+            except Exception as e:
+                logger.debug("outbox publish failed id=%s: %s", mid, e)
+        return delivered
+
+    def close(self) -> None:
+        if self._producer is not None:
+            try:
+                self._producer.close(timeout=5)
+            finally:
+                self._producer = None
+
+
+def _to_message(row: EventOutbox) -> OutboxMessage:
+    payload = row.payload or {}
+    value = {
+        "id": row.id,
+        "event_type": row.event_type,
+        "schema_version": row.schema_version,
+        "dedupe_key": row.dedupe_key,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "payload": payload,
+    }
+    # user_id 를 파티션 키로 (같은 사용자 이벤트는 같은 파티션, 없으면 라운드로빈). 배치 간 순서는 보장 안 함 → value.id
+    user_id = payload.get("user_id") if isinstance(payload, dict) else None
+    return OutboxMessage(
+        id=row.id,
+        topic=topic_for(row.event_type),
+        key=str(user_id).encode("utf-8") if user_id is not None else None,
+        value=json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"),
+    )
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        sink: Optional[Any] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retention: Optional[timedelta] = None,
+    ) -> None:
+        self.sink = sink
+        self.workers = int(os.getenv("OUTBOX_RELAY_WORKERS", "1")) if workers is None else workers
+        self.batch_size = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "500")) if batch_size is None else batch_size
+        if poll_interval is None:
+            poll_interval = float(os.getenv("OUTBOX_RELAY_POLL_MS", "200")) / 1000.0
+        self.poll_interval = max(0.01, poll_interval)
+        self.max_attempts = int(os.getenv("OUTBOX_RELAY_MAX_ATTEMPTS", "10")) if max_attempts is None else max_attempts
+        if retention is None:
+            retention = timedelta(hours=float(os.getenv("OUTBOX_RETENTION_HOURS", "72")))
+        self.retention = retention
+        self.prune_interval = float(os.getenv("OUTBOX_PRUNE_INTERVAL_SEC", "600"))
+        self.prune_batch = int(os.getenv("OUTBOX_PRUNE_BATCH", "5000"))
+        self._session_factory = session_factory
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        self._stats: Dict[str, Any] = {"published": 0, "failed": 0, "batches": 0, "pruned": 0, "lag_seconds": 0.0}
+        self._started_at: Optional[float] = None
+
+    # ---------------- wiring ---------------- #
+    def _session(self):
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _get_sink(self):
+        if self.sink is None:
+            self.sink = KafkaOutboxSink() if settings.KAFKA_ENABLED else DiscardOutboxSink()
+        return self.sink
+
+    # ---------------- batch ---------------- #
+    def run_once(self, event_types: Optional[Sequence[str]] = None) -> int:
+        """미발행 행 1 배치 claim → 발행 → 일괄 마킹. 발행된 행 수 반환. event_types 지정 시 해당 유형만."""
+        return self._run_batch(event_types)[0]
+
+    def _run_batch(self, event_types: Optional[Sequence[str]] = None) -> Tuple[int, int]:
+        """(발행 행 수, 실패 행 수)"""
+        t0 = time.perf_counter()
+        db = self._session()
+        try:
+            claim = select(EventOutbox).where(
+                EventOutbox.published_at.is_(None), EventOutbox.publish_attempts < self.max_attempts
+            )
+            if event_types:
+                claim = claim.where(EventOutbox.event_type.in_(list(event_types)))
+            rows = db.execute(
+                claim.order_by(EventOutbox.id).limit(self.batch_size).with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not rows:
+                db.commit()
+                self._record_lag(0.0)
+                return 0, 0
+            messages = [_to_message(r) for r in rows]
+            try:
+                delivered = set(self._get_sink().publish(messages))
+            except Exception as e:
+                logger.warning("outbox publish batch failed (%d rows): %s", len(rows), e)
+                delivered = set()
+            failed = [m.id for m in messages if m.id not in delivered]
+            if delivered:
+                db.execute(
+                    update(EventOutbox)
+                    .where(EventOutbox.id.in_(delivered))
+                    .values(published_at=_utcnow(), publish_attempts=EventOutbox.publish_attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            if failed:
+                db.execute(
+                    update(EventOutbox)
+                    .where(EventOutbox.id.in_(failed))
+                    .values(publish_attempts=EventOutbox.publish_attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            result = "ok" if not failed else ("partial" if delivered else "error")
+            metric(_BATCHES, "inc", result=result)
+            metric(_PUBLISHED, "inc", len(delivered))
+            metric(_BATCH_SECONDS, "observe", time.perf_counter() - t0)
+            with self._lock:
+                self._stats["published"] += len(delivered)
+                self._stats["failed"] += len(failed)
+                self._stats["batches"] += 1
+            self._record_lag(self.lag_seconds(db))
+            return len(delivered), len(failed)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def drain(self, max_batches: int = 1000, event_types: Optional[Sequence[str]] = None) -> int:
+        """미발행 행이 없어질 때까지 run_once 반복 (테스트/스크립트/publish_outbox_now)"""
+        total = 0
+        for _ in range(max_batches):
+            n = self.run_once(event_types)
+            total += n
+            if n < self.batch_size:
+                break
+        return total
+
+    def lag_seconds(self, db=None) -> float:
+        """가장 오래된 미발행 행의 대기 시간(초)"""
+        own = db is None
+        db = db or self._session()
+        try:
+            oldest = db.execute(
+                select(EventOutbox.created_at)
+                .where(EventOutbox.published_at.is_(None), EventOutbox.publish_attempts < self.max_attempts)
+                .order_by(EventOutbox.id)
+                .limit(1)
+            ).scalar()
+        finally:
+            if own:
+                db.close()
+        oldest = _naive_utc(oldest)
+        return max(0.0, (_utcnow() - oldest).total_seconds()) if oldest else 0.0
+
+    def _record_lag(self, lag: float) -> None:
+        metric(_LAG, "set", lag)
+        with self._lock:
+            self._stats["lag_seconds"] = round(lag, 3)
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """보존 기간이 지난 발행 완료 행 삭제 (prune_batch 단위 반복)"""
+        cutoff = (now or _utcnow()) - self.retention
+        total = 0
+        db = self._session()
+        try:
+            while True:
+                ids = db.execute(
+                    select(EventOutbox.id)
+                    .where(EventOutbox.published_at.is_not(None), EventOutbox.published_at < cutoff)
+                    .limit(self.prune_batch)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.execute(
+                    delete(EventOutbox).where(EventOutbox.id.in_(ids)).execution_options(synchronize_session=False)
+                )
+                db.commit()
+                total += len(ids)
+                if len(ids) < self.prune_batch:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if total:
+            metric(_PRUNED, "inc", total)
+            with self._lock:
+                self._stats["pruned"] += total
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        out["publish_rate_per_sec"] = round(out["published"] / elapsed, 1) if elapsed > 0 else 0.0
+        out["running"] = bool(self._threads)
+        return out
+
+    # ---------------- lifecycle ---------------- #
+    def notify(self) -> None:
+        """새 행 적재 알림 → 폴링 대기 없이 다음 배치 시작"""
+        self._wake.set()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._stop.clear()
+            self._started_at = time.monotonic()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, args=(i,), name=f"outbox-relay-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if wait:
+            for t in threads:
+                t.join(timeout=timeout)
+        if self.sink is not None:
+            try:
+                self.sink.close()
+            except Exception:  # pragma: no cover
+                logger.debug("outbox sink close failed", exc_info=True)
+
+    def _worker(self, index: int) -> None:
+        backoff = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                n, failed = self._run_batch()
+                if failed and not n:  # sink 장애 → 지수 backoff
+                    backoff = min(backoff * 2, 30.0)
+                    self._wake.wait(backoff)
+                    self._wake.clear()
+                    continue
+                backoff = self.poll_interval
+                if index == 0 and time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + self.prune_interval
+                    self.prune()
+                if n >= self.batch_size:
+                    continue  # 적체 → 즉시 다음 배치
+                wait_for = self.poll_interval
+            except Exception as e:
+                logger.warning("outbox relay batch error: %s", e)
+                backoff = min(backoff * 2, 30.0)
+                wait_for = backoff
+            self._wake.wait(wait_for)
+            self._wake.clear()
+
+
+_relay: Optional[OutboxRelay] = None
+_relay_lock = threading.Lock()
+
+
+def get_outbox_relay() -> OutboxRelay:
+    global _relay
+    if _relay is None:
+        with _relay_lock:
+            if _relay is None:
+                _relay = OutboxRelay()
+    return _relay
+
+
+def set_outbox_sink(sink: Any) -> None:
+    """발행 sink 교체 (테스트: InMemoryOutboxSink)"""
+    get_outbox_relay().sink = sink
+
+
+def notify_outbox() -> None:
+    """relay 실행 중일 때만 깨움 (미실행이면 no-op)"""
+    relay = _relay
+    if relay is not None and relay._threads:
+        relay.notify()
+
+
+def publish_outbox_now(event_types: Sequence[str], session_factory: Optional[Callable[[], Any]] = None) -> int:
+    """백그라운드 작업(RFM flush/스케줄러)용: relay 가 이 프로세스에서 실행 중이면 깨우기만 하고,
+    아니면(OUTBOX_RELAY_ENABLED=0) 호출 스레드에서 event_types 미발행 행을 바로 발행한다. 발행 행 수 반환.
+    요청 경로에서는 notify_outbox 를 쓴다 (발행 I/O 를 응답 지연에 넣지 않도록).
+    """
+    relay = get_outbox_relay()
+    if relay._threads:
+        relay.notify()
+        return 0
+    if session_factory is not None:  # 호출자 DB 에 적재된 행 (공유 sink 로 발행)
+        relay = OutboxRelay(sink=relay._get_sink(), session_factory=session_factory, workers=0)
+    try:
+        return relay.drain(event_types=event_types)
+    except Exception as e:
+        logger.warning("inline outbox publish failed (%s): %s", ",".join(event_types), e)
+        return 0
+
+
+def shutdown_outbox_relay() -> None:
+    global _relay
+    with _relay_lock:
+        relay, _relay = _relay, None
+    if relay is not None:
+        relay.shutdown(wait=True)
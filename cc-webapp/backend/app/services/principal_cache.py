@@ -0,0 +1,268 @@
+"""검증된 액세스 토큰 → 인증 주체(principal) 캐시
+
+get_current_user 는 매 요청 verify_token(서명 검증 + TokenBlacklist/UserSession 조회)
++ User 조회로 DB 왕복 3회가 발생한다. 검증에 성공한 토큰을 jti 키로 캐시하여
+정상 상태(steady state) 인증 경로를 User PK 조회 1회로 줄인다 (삭제된 사용자는 조회
+miss → 캐시 제거 후 기존과 같은 404).
+
+- 키: jti. 엔트리는 토큰 SHA-256 다이제스트를 함께 보관하여 같은 jti 의 위조 토큰은 miss
+- TTL: min(AUTH_PRINCIPAL_CACHE_TTL_SECONDS, 토큰 exp 까지 남은 시간)
+- 무효화: 로그아웃(blacklist_token) / 세션 revoke 시 로컬 즉시 제거 + Redis Pub/Sub
+  (AUTH_PRINCIPAL_CHANNEL) 로 다른 워커에 전파. 수신은 start_listener() 데몬 스레드
+- Redis 미연결 시 프로세스 로컬 캐시로만 동작 (단일 워커 개발/테스트)
+
+환경변수:
+  AUTH_PRINCIPAL_CACHE_ENABLED      1(기본) / 0
+  AUTH_PRINCIPAL_CACHE_TTL_SECONDS  엔트리 최대 수명 (기본 60)
+  AUTH_PRINCIPAL_CACHE_MAX_ENTRIES  LRU 상한 (기본 50000)
+  AUTH_PRINCIPAL_CHANNEL            무효화 채널 (기본 "auth:principal:invalidate")
+
+메트릭:
+  auth_principal_cache_requests_total{result=hit|miss|bypass}
+  auth_principal_cache_entries (Gauge)
+  auth_principal_cache_invalidations_total{scope=jti|user,source=local|remote}
+  auth_request_seconds{path=cached|verified}
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _REQUESTS = Counter("auth_principal_cache_requests_total", "Principal cache lookups", ["result"])
+    _ENTRIES = Gauge("auth_principal_cache_entries", "Cached authenticated principals")
+    _INVALIDATIONS = Counter(
+        "auth_principal_cache_invalidations_total", "Principal cache invalidations", ["scope", "source"]
+    )
+    _AUTH_SECONDS = Histogram(
+        "auth_request_seconds", "get_current_user latency",
+        ["path"], buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    )
+except Exception:  # pragma: no cover
+    _REQUESTS = _ENTRIES = _INVALIDATIONS = _AUTH_SECONDS = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """인증 주체 스냅샷 (User ORM 대신 캐시되는 최소 필드)."""
+
+    jti: str
+    user_id: int
+    site_id: str
+    is_admin: bool
+    exp: float
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def unverified_jti(token: str) -> Optional[str]:
+    """서명 검증 없이 payload 의 jti 만 추출 (캐시 키 계산용, 실패 시 None)."""
+    try:
+        payload = token.split(".")[1]
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        jti = data.get("jti")
+        return str(jti) if jti else None
+    except Exception:
+        return None
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        redis_client: Any = None,
+        channel: Optional[str] = None,
+    ) -> None:
+        self.ttl = float(ttl_seconds if ttl_seconds is not None else os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+        self.max_entries = int(max_entries or os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "50000"))
+        self.enabled = enabled if enabled is not None else os.getenv("AUTH_PRINCIPAL_CACHE_ENABLED", "1") != "0"
+        self.channel = channel or os.getenv("AUTH_PRINCIPAL_CHANNEL", "auth:principal:invalidate")
+        self._redis = redis_client
+        # jti -> (principal, token digest, deadline(wall clock))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---------------- lookup ---------------- #
+    def get(self, token: str, now: Optional[float] = None) -> Optional[Principal]:
+        if not self.enabled:
+            metric(_REQUESTS, "inc", result="bypass")
+            return None
+        jti = unverified_jti(token)
+        entry = None
+        if jti is not None:
+            now = now if now is not None else time.time()
+            with self._lock:
+                entry = self._entries.get(jti)
+                if entry is not None and entry[2] <= now:
+                    self._drop(jti)
+                    entry = None
+                elif entry is not None:
+                    self._entries.move_to_end(jti)
+        if entry is None or not hmac.compare_digest(entry[1], token_digest(token)):
+            metric(_REQUESTS, "inc", result="miss")
+            return None
+        metric(_REQUESTS, "inc", result="hit")
+        return entry[0]
+
+    def put(self, token: str, principal: Principal, now: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        now = now if now is not None else time.time()
+        deadline = min(now + self.ttl, principal.exp)
+        if deadline <= now:
+            return
+        with self._lock:
+            self._drop(principal.jti)
+            self._entries[principal.jti] = (principal, token_digest(token), deadline)
+            self._by_user.setdefault(principal.user_id, set()).add(principal.jti)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            size = len(self._entries)
+        metric(_ENTRIES, "set", size)
+
+    def _drop(self, jti: str) -> bool:
+        entry = self._entries.pop(jti, None)
+        if entry is None:
+            return False
+        jtis = self._by_user.get(entry[0].user_id)
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                self._by_user.pop(entry[0].user_id, None)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------------- invalidation ---------------- #
+    def invalidate_jti(self, jti: Optional[str], publish: bool = True) -> None:
+        if not jti:
+            return
+        self._apply({"jti": str(jti)}, "local")
+        if publish:
+            self._publish({"jti": str(jti)})
+
+    def invalidate_user(self, user_id: Optional[int], publish: bool = True) -> None:
+        if user_id is None:
+            return
+        self._apply({"user_id": int(user_id)}, "local")
+        if publish:
+            self._publish({"user_id": int(user_id)})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+        metric(_ENTRIES, "set", 0)
+
+    def _apply(self, message: Dict[str, Any], source: str) -> None:
+        with self._lock:
+            if "jti" in message:
+                self._drop(str(message["jti"]))
+                scope = "jti"
+            else:
+                for jti in list(self._by_user.get(int(message["user_id"]), ())):
+                    self._drop(jti)
+                scope = "user"
+            size = len(self._entries)
+        metric(_INVALIDATIONS, "inc", scope=scope, source=source)
+        metric(_ENTRIES, "set", size)
+
+    def _client(self) -> Any:
+        if self._redis is not None:
+            return self._redis
+        try:
+            from ..utils.redis import get_redis_manager
+            return get_redis_manager().redis_client
+        except Exception:
+            return None
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.warning("principal cache invalidation publish failed: %s", e)
+
+    # ---------------- pub/sub listener ---------------- #
+    def start_listener(self, client: Any = None) -> bool:
+        """다른 워커의 무효화 메시지 구독 (데몬 스레드). Redis 미연결이면 False."""
+        if self._listener is not None:
+            return True
+        client = client or self._client()
+        if client is None:
+            return False
+        self._redis = client
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, args=(pubsub,), name="principal-cache-listener", daemon=True)
+        self._listener.start()
+        return True
+
+    def _listen(self, pubsub: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                msg = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as e:
+                logger.warning("principal cache listener error: %s", e)
+                self._stop.wait(1.0)
+                continue
+            if not msg or msg.get("type") != "message":
+                continue
+            data = msg.get("data")
+            try:
+                message = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+                if isinstance(message, dict) and ("jti" in message or "user_id" in message):
+                    self._apply(message, "remote")
+            except Exception:
+                continue
+        try:
+            pubsub.unsubscribe(self.channel)
+            pubsub.close()
+        except Exception:
+            pass
+
+    def stop_listener(self, timeout: float = 2.0) -> None:
+        thread, self._listener = self._listener, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+
+
+def observe_auth_latency(path: str, seconds: float) -> None:
+    metric(_AUTH_SECONDS, "observe", seconds, path=path)
+
+
+_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    global _cache
+    if _cache is None:
+        _cache = PrincipalCache()
+    return _cache
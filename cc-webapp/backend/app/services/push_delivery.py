@@ -0,0 +1,359 @@
+"""Web Push 동시 발송 풀
+
+기존 NotificationService.push_to_user_subscriptions 는 구독마다 webpush() 를 순차 호출해
+요청/잡 스레드가 원격 푸시 서비스 지연의 합만큼 묶였다. 이 모듈은 발송을 풀로 옮긴다.
+
+- 제한된 워커 풀 (ThreadPoolExecutor, PUSH_WORKERS) 에서 구독별 병렬 발송
+- 엔드포인트 호스트별 requests.Session 재사용 (FCM/Mozilla autopush 등 keep-alive 연결 유지)
+- 429/5xx/네트워크 오류는 지수 백오프 재시도 (PUSH_MAX_RETRIES, PUSH_RETRY_BACKOFF_SECONDS)
+- 404/410(만료 구독)은 즉시 쓰지 않고 모아서 일괄 정리
+  (PUSH_PRUNE_BATCH 건 이상이면 즉시, 아니면 첫 적재 후 PUSH_PRUNE_MAX_DELAY_SECONDS 타이머로.
+   Redis 는 사용자별 SET NX EX 잠금 후 MGET + 파이프라인 1회, 잠금 경합 사용자는 다음 주기로 이월)
+- deliver_user() 는 PUSH_RESULT_TIMEOUT_SECONDS 까지만 대기 (응답 없는 엔드포인트가 호출자를 붙잡지 않음)
+- 메트릭: push_delivery_seconds{outcome} (재시도 포함 구독별 지연), push_delivery_total{outcome}
+
+submit_user() 는 즉시 Future[PushResult] 를 반환한다 (워커 풀을 블로킹하지 않고 콜백으로 집계).
+sender 는 (subscription, data, session, timeout) -> HTTP status 형태로 교체 가능 (테스트용 로컬 서버 등).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.utils.metrics import metric
+from app.utils.redis import RedisManager, get_redis_manager
+
+try:
+    from pywebpush import WebPushException, webpush  # type: ignore
+except Exception:  # fallback if not installed
+    WebPushException = None  # type: ignore
+    webpush = None
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Histogram  # type: ignore
+    _DELIVERY_SECONDS = Histogram(
+        "push_delivery_seconds", "Web push delivery latency per subscription (incl. retries)", ["outcome"],
+        buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    _DELIVERY_TOTAL = Counter("push_delivery_total", "Web push delivery attempts by outcome", ["outcome"])
+except Exception:  # pragma: no cover
+    _DELIVERY_SECONDS = None
+    _DELIVERY_TOTAL = None
+
+logger = logging.getLogger(__name__)
+
+SUBS_TTL_SECONDS = 30 * 24 * 3600
+GONE_STATUSES = (404, 410)
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+PRUNE_LOCK_SECONDS = 10
+
+Sender = Callable[[Dict[str, Any], str, requests.Session, float], int]
+
+
+def push_subscriptions_key(user_id: int) -> str:
+    return f"user:{user_id}:push:subs"
+
+
+def push_prune_lock_key(user_id: int) -> str:
+    return f"user:{user_id}:push:subs:prune_lock"
+
+
+@dataclass
+class PushResult:
+    sent: int = 0
+    failed: int = 0
+    removed: int = 0
+
+    def as_tuple(self):
+        return (self.sent, self.failed, self.removed)
+
+
+def webpush_sender(sub: Dict[str, Any], data: str, session: requests.Session, timeout: float) -> int:
+    """pywebpush 로 VAPID 암호화 발송 (호스트별 세션 재사용). 응답 status 반환."""
+    if webpush is None:
+        raise RuntimeError("pywebpush not installed")
+    try:
+        resp = webpush(
+            subscription_info={
+                "endpoint": sub.get("endpoint"),
+                "keys": {"p256dh": sub.get("p256dh"), "auth": sub.get("auth")},
+            },
+            data=data,
+            vapid_private_key=getattr(settings, "VAPID_PRIVATE_KEY", "") or "",
+            vapid_claims={"sub": "mailto:admin@casino-club.local"},
+            timeout=timeout,
+            requests_session=session,
+        )
+        return int(getattr(resp, "status_code", 201) or 201)
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if WebPushException is not None and isinstance(e, WebPushException) and status:
+            return int(status)
+        raise
+
+
+class PushDeliveryPool:
+    def __init__(
+        self,
+        sender: Optional[Sender] = None,
+        store: Optional[RedisManager] = None,
+        workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        timeout_seconds: Optional[float] = None,
+        prune_batch: Optional[int] = None,
+        prune_max_delay: Optional[float] = None,
+        result_timeout: Optional[float] = None,
+    ) -> None:
+        self.sender = sender or webpush_sender
+        self._store = store
+        self.workers = int(workers if workers is not None else os.getenv("PUSH_WORKERS", "8"))
+        self.max_retries = int(max_retries if max_retries is not None else os.getenv("PUSH_MAX_RETRIES", "2"))
+        self.backoff_seconds = float(
+            backoff_seconds if backoff_seconds is not None else os.getenv("PUSH_RETRY_BACKOFF_SECONDS", "0.5")
+        )
+        self.timeout_seconds = float(
+            timeout_seconds if timeout_seconds is not None else os.getenv("PUSH_TIMEOUT_SECONDS", "10")
+        )
+        self.prune_batch = int(prune_batch if prune_batch is not None else os.getenv("PUSH_PRUNE_BATCH", "50"))
+        self.prune_max_delay = float(
+            prune_max_delay if prune_max_delay is not None else os.getenv("PUSH_PRUNE_MAX_DELAY_SECONDS", "5")
+        )
+        self.result_timeout = float(
+            result_timeout if result_timeout is not None else os.getenv("PUSH_RESULT_TIMEOUT_SECONDS", "30")
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="webpush")
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        # user_id -> 만료된 endpoint 집합 (일괄 정리 대기)
+        self._gone: Dict[int, Set[str]] = {}
+        self._gone_count = 0
+        self._gone_since: Optional[float] = None
+        self._gone_lock = threading.Lock()
+        self._prune_timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    @property
+    def store(self) -> RedisManager:
+        return self._store if self._store is not None else get_redis_manager()
+
+    # ---------------- connections ---------------- #
+    def session_for(self, endpoint: str) -> requests.Session:
+        host = urlsplit(endpoint or "").netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, self.workers))
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._sessions[host] = session
+        return session
+
+    # ---------------- delivery ---------------- #
+    def _deliver_one(self, sub: Dict[str, Any], data: str) -> str:
+        """구독 1건 발송 → outcome: sent | gone | failed"""
+        endpoint = sub.get("endpoint") or ""
+        session = self.session_for(endpoint)
+        started = time.perf_counter()
+        outcome = "failed"
+        for attempt in range(self.max_retries + 1):
+            retryable = True
+            try:
+                status = self.sender(sub, data, session, self.timeout_seconds)
+                if 200 <= status < 300:
+                    outcome = "sent"
+                    break
+                if status in GONE_STATUSES:
+                    outcome = "gone"
+                    break
+                retryable = status in RETRY_STATUSES
+                logger.debug("web push %s -> %s (attempt %d)", endpoint, status, attempt + 1)
+            except Exception as e:
+                logger.debug("web push %s error (attempt %d): %s", endpoint, attempt + 1, e)
+            if not retryable or attempt >= self.max_retries:
+                break
+            metric(_DELIVERY_TOTAL, "inc", outcome="retry")
+            time.sleep(self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2))
+        metric(_DELIVERY_TOTAL, "inc", outcome=outcome)
+        metric(_DELIVERY_SECONDS, "observe", time.perf_counter() - started, outcome=outcome)
+        return outcome
+
+    def load_subscriptions(self, user_id: int) -> List[Dict[str, Any]]:
+        data = self.store.get_cached_data(push_subscriptions_key(user_id)) or {"subs": []}
+        return list(data.get("subs", []))
+
+    def submit(self, user_id: int, subs: Iterable[Dict[str, Any]], payload: Dict[str, Any]) -> "Future[PushResult]":
+        """구독 목록을 병렬 발송하고 집계 Future 반환 (호출 스레드/워커 모두 블로킹 없음)."""
+        subs = [s for s in subs if s.get("endpoint")]
+        result = PushResult()
+        aggregate: "Future[PushResult]" = Future()
+        if not subs:
+            aggregate.set_result(result)
+            return aggregate
+        data = json.dumps(payload)
+        remaining = [len(subs)]
+        gone: Set[str] = set()
+        lock = threading.Lock()
+
+        def _done(fut: Future, endpoint: str) -> None:
+            try:
+                outcome = fut.result()
+            except Exception:
+                outcome = "failed"
+            with lock:
+                if outcome == "sent":
+                    result.sent += 1
+                else:
+                    result.failed += 1
+                    if outcome == "gone":
+                        result.removed += 1
+                        gone.add(endpoint)
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                if gone:
+                    self._queue_prune(user_id, gone)
+                aggregate.set_result(result)
+
+        for sub in subs:
+            fut = self._executor.submit(self._deliver_one, sub, data)
+            fut.add_done_callback(lambda f, ep=sub["endpoint"]: _done(f, ep))
+        return aggregate
+
+    def submit_user(self, user_id: int, payload: Dict[str, Any]) -> "Future[PushResult]":
+        return self.submit(user_id, self.load_subscriptions(user_id), payload)
+
+    def deliver_user(self, user_id: int, payload: Dict[str, Any], timeout: Optional[float] = None) -> PushResult:
+        """발송 후 최대 timeout(기본 result_timeout)초 대기. 초과 시 미확인 구독은 failed 로 집계."""
+        subs = self.load_subscriptions(user_id)
+        future = self.submit(user_id, subs, payload)
+        try:
+            return future.result(timeout=self.result_timeout if timeout is None else timeout)
+        except FutureTimeout:
+            metric(_DELIVERY_TOTAL, "inc", outcome="timeout")
+            logger.warning("web push for user %s not finished within %.1fs", user_id, self.result_timeout)
+            return PushResult(failed=len(subs))
+
+    def push_users(self, user_ids: Iterable[int], payload: Dict[str, Any]) -> List["Future[PushResult]"]:
+        """여러 사용자(캠페인 등)에게 발송 요청만 적재하고 Future 목록 반환."""
+        return [self.submit_user(uid, payload) for uid in user_ids]
+
+    # ---------------- pruning ---------------- #
+    def _queue_prune(self, user_id: int, endpoints: Set[str], flush: bool = True) -> None:
+        with self._gone_lock:
+            self._gone.setdefault(user_id, set()).update(endpoints)
+            self._gone_count += len(endpoints)
+            if self._gone_since is None:
+                self._gone_since = time.monotonic()
+            due = flush and self._gone_count >= self.prune_batch
+            if not due and self._prune_timer is None and not self._closed:
+                # 배치 미달이어도 다음 발송을 기다리지 않고 max_delay 후 정리
+                timer = threading.Timer(self.prune_max_delay, self._prune_timer_fired)
+                timer.daemon = True
+                self._prune_timer = timer
+                timer.start()
+        if due:
+            self.flush_pruned()
+
+    def _prune_timer_fired(self) -> None:
+        with self._gone_lock:
+            self._prune_timer = None
+        self.flush_pruned()
+
+    def flush_pruned(self) -> int:
+        """대기 중인 만료 구독을 사용자별 1회 읽기/쓰기로 정리. 제거된 구독 수 반환."""
+        with self._gone_lock:
+            pending, self._gone = self._gone, {}
+            self._gone_count = 0
+            self._gone_since = None
+            timer, self._prune_timer = self._prune_timer, None
+        if timer is not None:
+            timer.cancel()
+        if not pending:
+            return 0
+        store = self.store
+        user_ids = list(pending)
+        removed = 0
+        try:
+            if store.is_connected():
+                # 구독 목록 read-modify-write 를 사용자별 SET NX EX 잠금으로 직렬화 (동시 정리의 덮어쓰기 방지)
+                client = store.redis_client
+                token = uuid.uuid4().hex
+                locked = []
+                for uid in user_ids:
+                    if client.set(push_prune_lock_key(uid), token, nx=True, ex=PRUNE_LOCK_SECONDS):
+                        locked.append(uid)
+                    else:
+                        self._queue_prune(uid, pending[uid], flush=False)
+                if not locked:
+                    return 0
+                # RedisManager.cache_user_data 와 동일한 키/직렬화 형식으로 MGET + 파이프라인 SETEX
+                keys = [f"user:{push_subscriptions_key(uid)}:data" for uid in locked]
+                pipe = client.pipeline(transaction=False)
+                for key, uid, raw in zip(keys, locked, client.mget(keys)):
+                    if not raw:
+                        continue
+                    subs = json.loads(raw).get("subs", [])
+                    keep = [s for s in subs if s.get("endpoint") not in pending[uid]]
+                    removed += len(subs) - len(keep)
+                    pipe.setex(key, SUBS_TTL_SECONDS, json.dumps({"subs": keep}, default=str))
+                for uid in locked:
+                    pipe.delete(push_prune_lock_key(uid))
+                pipe.execute()
+            else:
+                for uid in user_ids:
+                    subs = self.load_subscriptions(uid)
+                    keep = [s for s in subs if s.get("endpoint") not in pending[uid]]
+                    removed += len(subs) - len(keep)
+                    store.cache_user_data(push_subscriptions_key(uid), {"subs": keep}, expire_seconds=SUBS_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("push subscription prune failed for %d users: %s", len(user_ids), e)
+        return removed
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._gone_lock:
+            self._closed = True
+        self.flush_pruned()
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_pool: Optional[PushDeliveryPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_push_pool() -> PushDeliveryPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PushDeliveryPool()
+    return _pool
+
+
+def shutdown_push_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -1,6 +1,10 @@
 import logging
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
 
 from ..models.auth_models import User
@@ -14,6 +18,63 @@ RECENCY_THRESHOLDS = {'high': 7, 'mid': 30}
 FREQUENCY_THRESHOLDS = {'high': 50, 'mid': 10} # Adjusted for more actions
 MONETARY_THRESHOLDS = {'high': 500000, 'mid': 100000} # Adjusted for coin values
 
+# bulk 모드 기본 chunk (사용자 수)
+RFM_BULK_CHUNK_SIZE = 5000
+RFM_WINDOW_DAYS = 30
+_NO_RECENCY = 999
+
+
+def rfm_window_start(now: datetime) -> datetime:
+    """집계 창 시작 (UTC 자정 정렬). 전체 재계산과 증분 경로(rfm_stream 일별 버킷)가 같은 창을 쓴다."""
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=RFM_WINDOW_DAYS)
+
+
+def score_rfm(recency_days: Sequence[int], frequency: Sequence[int], monetary: Sequence[float]) -> List[str]:
+    """R/F/M 원시값 컬럼 → rfm_group 목록"""
+    return [
+        _rfm_group(r, f, m)
+        for r, f, m in zip(
+            _score_column(recency_days, RECENCY_THRESHOLDS, higher_is_better=False),
+            _score_column(frequency, FREQUENCY_THRESHOLDS),
+            _score_column(monetary, MONETARY_THRESHOLDS),
+        )
+    ]
+
+
+def _score_column(values: Sequence[float], thresholds: Dict[str, float], higher_is_better: bool = True) -> List[int]:
+    """_get_rfm_score 와 동일 규칙을 컬럼 단위로 적용 (chunk 전체를 한 번에 스코어링)."""
+    if higher_is_better:
+        cuts = (thresholds['mid'], thresholds['high'])
+        return [(1, 3, 5)[bisect_right(cuts, v)] for v in values]
+    cuts = (thresholds['high'], thresholds['mid'])
+    return [(5, 3, 1)[bisect_left(cuts, v)] for v in values]
+
+
+def _rfm_group(r_score: int, f_score: int, m_score: int) -> str:
+    # Simplified RFM group assignment
+    if r_score >= 4 and f_score >= 4 and m_score >= 4:
+        return "Whale"
+    avg = (r_score + f_score + m_score) / 3
+    if avg >= 3:
+        return "High-Value"
+    if avg >= 2:
+        return "Medium-Value"
+    if r_score < 2:
+        return "At-Risk"
+    return "Low-Value"
+
+
+def _insert_for(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
 class RFMService:
     """Service for calculating and managing RFM metrics."""
 
@@ -30,9 +91,131 @@ class RFMService:
             if value <= thresholds['mid']: return 3
             return 1
 
-    def update_all_user_segments(self):
+    def update_all_user_segments(
+        self,
+        bulk: bool = True,
+        chunk_size: int = RFM_BULK_CHUNK_SIZE,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        now: Optional[datetime] = None,
+        on_changes: Optional[Callable[[List[tuple]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """
         Calculates RFM scores for all users and updates their segments in the database.
+
+        bulk=True (기본): 사용자 id keyset chunk 단위로 집계 2회(GROUP BY user_id) + bulk upsert 1회.
+        chunk 마다 commit 하며 progress 콜백/로그로 진행률 보고. bulk=False 는 기존 사용자별 루프.
+        on_changes: chunk commit 직전 [(user_id, 이전 그룹, 새 그룹)] (기존 세그먼트 중 그룹이 바뀐 행) 전달
+        → 같은 트랜잭션에서 후속 기록 가능 (rfm_stream.reconcile 의 drift 집계/이벤트).
+        """
+        if not bulk:
+            return self._update_all_user_segments_legacy()
+        return self._update_all_user_segments_bulk(chunk_size=chunk_size, progress=progress, now=now,
+                                                   on_changes=on_changes)
+
+    def _update_all_user_segments_bulk(
+        self,
+        chunk_size: int = RFM_BULK_CHUNK_SIZE,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        now: Optional[datetime] = None,
+        on_changes: Optional[Callable[[List[tuple]], None]] = None,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        since = rfm_window_start(now)
+        total = int(self.db.scalar(select(func.count(User.id))) or 0)
+        logger.info("RFM bulk computation started users=%s chunk=%s", total, chunk_size)
+        stats: Dict[str, Any] = {"users": 0, "created": 0, "updated": 0, "changed": 0, "chunks": 0, "total": total}
+        last_id = 0
+        try:
+            while True:
+                ids = list(self.db.scalars(
+                    select(User.id).where(User.id > last_id).order_by(User.id).limit(max(1, chunk_size))
+                ))
+                if not ids:
+                    break
+                created, updated, changes = self._segment_chunk(ids, since, now)
+                if changes and on_changes is not None:
+                    on_changes(changes)
+                self.db.commit()
+                last_id = ids[-1]
+                stats["users"] += len(ids)
+                stats["created"] += created
+                stats["updated"] += updated
+                stats["changed"] += len(changes)
+                stats["chunks"] += 1
+                stats["elapsed_sec"] = round(time.perf_counter() - started, 3)
+                logger.info("RFM bulk progress %s/%s users (%.1fs)", stats["users"], total, stats["elapsed_sec"])
+                if progress is not None:
+                    progress(dict(stats))
+        except Exception:
+            self.db.rollback()
+            logger.exception("RFM bulk segmentation failed after %s users", stats["users"])
+            raise
+        elapsed = time.perf_counter() - started
+        stats["elapsed_sec"] = round(elapsed, 3)
+        stats["users_per_sec"] = round(stats["users"] / elapsed, 1) if elapsed > 0 else None
+        logger.info(
+            "RFM bulk computation done users=%s created=%s updated=%s in %.2fs",
+            stats["users"], stats["created"], stats["updated"], elapsed,
+        )
+        return stats
+
+    def _segment_chunk(self, ids: List[int], since: datetime, now: datetime) -> tuple:
+        lo, hi = ids[0], ids[-1]
+        actions = {
+            uid: (last_at, freq)
+            for uid, last_at, freq in self.db.execute(
+                select(UserAction.user_id, func.max(UserAction.created_at), func.count(UserAction.id))
+                .where(UserAction.user_id.between(lo, hi), UserAction.created_at >= since)
+                .group_by(UserAction.user_id)
+            )
+        }
+        monetary = dict(self.db.execute(
+            select(Game.user_id, func.sum(Game.bet_amount))
+            .where(Game.user_id.between(lo, hi), Game.created_at >= since)
+            .group_by(Game.user_id)
+        ).all())
+
+        recency: List[int] = []
+        frequency: List[int] = []
+        money: List[float] = []
+        for uid in ids:
+            last_at, freq = actions.get(uid, (None, 0))
+            recency.append((now - last_at).days if last_at else _NO_RECENCY)
+            frequency.append(freq or 0)
+            money.append(monetary.get(uid) or 0.0)
+        groups = score_rfm(recency, frequency, money)
+
+        existing = dict(self.db.execute(
+            select(UserSegment.user_id, UserSegment.rfm_group).where(UserSegment.user_id.between(lo, hi))
+        ).all())
+        rows = [{"user_id": uid, "rfm_group": g, "last_updated": now} for uid, g in zip(ids, groups)]
+        insert = _insert_for(self.db)
+        if insert is not None:
+            stmt = insert(UserSegment).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"rfm_group": stmt.excluded.rfm_group, "last_updated": stmt.excluded.last_updated},
+            )
+            self.db.execute(stmt)
+        else:
+            segs = {s.user_id: s for s in self.db.scalars(
+                select(UserSegment).where(UserSegment.user_id.in_(ids))
+            )}
+            for row in rows:
+                seg = segs.get(row["user_id"])
+                if seg is None:
+                    self.db.add(UserSegment(**row))
+                else:
+                    seg.rfm_group = row["rfm_group"]
+                    seg.last_updated = now
+        updated = sum(1 for uid in ids if uid in existing)
+        changes = [(uid, existing[uid], g) for uid, g in zip(ids, groups) if uid in existing and existing[uid] != g]
+        return len(ids) - updated, updated, changes
+
+    def _update_all_user_segments_legacy(self):
+        """
+        사용자별 개별 조회(2N+ round trip) 기반 기존 구현. 비교/벤치마크용으로 유지.
         """
         print(f"[{datetime.utcnow()}] Starting RFM computation for all users...")
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -74,17 +257,7 @@ class RFMService:
             f_score = self._get_rfm_score(frequency, FREQUENCY_THRESHOLDS)
             m_score = self._get_rfm_score(monetary_value, MONETARY_THRESHOLDS)
 
-            # Simplified RFM group assignment
-            if r_score >= 4 and f_score >= 4 and m_score >= 4:
-                rfm_group = "Whale"
-            elif (r_score + f_score + m_score) / 3 >= 3:
-                rfm_group = "High-Value"
-            elif (r_score + f_score + m_score) / 3 >= 2:
-                rfm_group = "Medium-Value"
-            elif r_score < 2:
-                rfm_group = "At-Risk"
-            else:
-                rfm_group = "Low-Value"
+            rfm_group = _rfm_group(r_score, f_score, m_score)
 
             # Update or Create UserSegment
             user_segment = self.db.query(UserSegment).filter(UserSegment.user_id == user_id).first()
@@ -0,0 +1,800 @@
+"""증분 RFM 세그먼트 엔진 (이벤트 → 사용자별 R/F/M 상태 → 변경된 사용자만 재평가)
+
+기존 경로: 스케줄러가 5분마다 + 매일 전체 사용자 재계산 (RFMService.update_all_user_segments).
+증분 경로:
+
+    stream = get_rfm_stream()
+    stream.start()         # Session 이벤트 훅 설치 + flush 스레드 (RFM_STREAM_FLUSH_SEC)
+    stream.flush()         # 누적 증분 1회 반영 + 재평가 (테스트/스크립트)
+
+1) 수집 (in-process 훅): after_flush 에서 새 UserAction / Game 행을 session.info 에 모으고
+   after_commit 에 엔진 버퍼로 넘긴다 (rollback 시 폐기). 요청 경로 비용은 dict 갱신뿐, DB I/O 없음.
+   user_actions / games 는 10여 곳에서 기록되고 outbox(Kafka) 로는 일부만 발행되므로 Kafka 소비 대신 훅을 쓴다.
+2) flush: 버퍼 swap → user_rfm_daily (user_id, day) 증분 upsert(+=) / user_rfm_state.last_action_at 갱신
+   → 버퍼에 등장한 사용자만 rescore_users → 그룹이 바뀐 사용자만 user_segments upsert
+   + outbox "segment_change" 이벤트 (같은 트랜잭션, KAFKA_SEGMENTS_TOPIC). 증분은 가산이므로 여러 프로세스가 동시에 flush 해도 된다.
+   commit 후 publish_outbox_now: relay 실행 중이면 깨우고, 비활성(OUTBOX_RELAY_ENABLED=0)이면 flush 스레드에서 바로 발행.
+3) 시간 경과: 새 이벤트 없이도 recency 임계(8/31일) 통과나 가장 오래된 버킷의 창 이탈로 점수가 바뀐다.
+   스코어링 시 그 가장 이른 시각을 next_rescore_at 에 기록 → rescore_due 가 도래한 사용자만 재평가.
+4) reconcile (nightly): 전체 재계산(RFMService bulk)을 기준값으로 drift(증분 결과와 다른 세그먼트 수) 측정
+   + 상태 테이블을 원본에서 재구성. 훅을 거치지 않는 Core INSERT, savepoint rollback, 버퍼 상한 초과분 등을 보정.
+   재구성은 created_at <= snapshot 원본만 집계하고, snapshot 을 워터마크로 공유(프로세스 내 + Redis)한다.
+   버퍼는 이벤트 시각을 유지하므로 flush 는 워터마크 이하 이벤트(이미 재구성에 포함)를 버린다 → 중복 가산 없음.
+   실행 전 이 프로세스의 버퍼를 먼저 flush 하고, 워커마다 도는 스케줄러 중 하나만 실행되도록
+   잠금(Postgres advisory lock, 그 외 Redis SET NX — 미연결 시 잠금 없음)을 잡는다.
+
+집계 창은 rfm_service.rfm_window_start (UTC 자정 정렬 30일) 로 전체 재계산과 동일하다.
+
+환경변수:
+  RFM_STREAM_ENABLED          lifespan 에서 시작 + 스케줄러를 증분 모드로 (기본 1, 0 이면 기존 5분 전체 재계산)
+  RFM_STREAM_FLUSH_SEC        flush 주기 (기본 5)
+  RFM_STREAM_MAX_PENDING      flush 전 버퍼 사용자 상한, 초과 이벤트는 버리고 reconcile 에 맡김 (기본 100000)
+  RFM_RESCORE_BATCH           rescore_due 1회 처리 사용자 수 (기본 2000)
+  RFM_RECONCILE_LOCK_TTL_SEC  Redis 잠금 TTL (Postgres 외 dialect, 기본 3600)
+
+메트릭:
+  rfm_stream_events_total{kind=action|spend|dropped}
+  rfm_stream_rescored_total{mode=stream|aging|reconcile, result=changed|unchanged}
+  rfm_stream_staleness_seconds (Histogram, 이벤트 커밋 → 세그먼트 반영) / rfm_stream_pending_users (Gauge)
+  rfm_job_seconds{mode} (Histogram) / rfm_db_statements_total{mode} (DB 부하: 실행 SQL 문 수)
+  rfm_reconcile_drift_users (Gauge) / rfm_reconcile_last_success_timestamp (Gauge, 전체 재계산 기준 staleness)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dtime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import (Date, and_, bindparam, case, cast, delete, event, func, insert as core_insert, literal, or_,
+                        select, text)
+from sqlalchemy.orm import Session
+
+from ..models.game_models import Game, UserAction
+from ..models.rfm_models import UserRFMDaily, UserRFMState
+from ..models.user_models import UserSegment
+from .outbox_producer import enqueue_outbox
+from .outbox_relay import publish_outbox_now
+from .rfm_service import (
+    RECENCY_THRESHOLDS,
+    RFM_BULK_CHUNK_SIZE,
+    RFM_WINDOW_DAYS,
+    RFMService,
+    _NO_RECENCY,
+    _insert_for,
+    rfm_window_start,
+    score_rfm,
+)
+from ..utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _EVENTS = Counter("rfm_stream_events_total", "RFM stream input events", ["kind"])
+    _RESCORED = Counter("rfm_stream_rescored_total", "Users re-scored", ["mode", "result"])
+    _STALENESS = Histogram("rfm_stream_staleness_seconds", "Event commit to segment update delay",
+                           buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900))
+    _PENDING = Gauge("rfm_stream_pending_users", "Users with unflushed RFM events")
+    _JOB_SECONDS = Histogram("rfm_job_seconds", "RFM job duration", ["mode"])
+    _STATEMENTS = Counter("rfm_db_statements_total", "SQL statements executed by RFM jobs", ["mode"])
+    _DRIFT = Gauge("rfm_reconcile_drift_users", "Segments corrected by the last full reconciliation")
+    _RECONCILED_AT = Gauge("rfm_reconcile_last_success_timestamp", "Unix time of the last full reconciliation")
+except Exception:  # pragma: no cover
+    _EVENTS = _RESCORED = _STALENESS = _PENDING = _JOB_SECONDS = _STATEMENTS = _DRIFT = _RECONCILED_AT = None
+
+logger = logging.getLogger(__name__)
+
+RESCORE_CHUNK = 500
+RECONCILE_LOCK_KEY = 0x52464D01  # pg advisory lock key ("RFM" 01)
+WATERMARK_KEY = "rfm:rebuilt_through"
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _chunks(values: Sequence[int], size: int) -> Iterable[Sequence[int]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+# ---------------- DB 부하 계측 ---------------- #
+_tls = threading.local()
+_instrumented: "WeakSet[Any]" = WeakSet()
+_instrument_lock = threading.Lock()
+
+
+def _count_statement(*_args: Any) -> None:
+    counter = getattr(_tls, "counter", None)
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def _db_load(db: Session, mode: str):
+    """현재 스레드가 실행한 SQL 문 수/소요 시간을 mode 로 기록. 중첩 시 바깥 mode 로 합산."""
+    if getattr(_tls, "counter", None) is not None:
+        yield {}
+        return
+    engine = db.get_bind()
+    engine = getattr(engine, "engine", engine)
+    with _instrument_lock:
+        if engine not in _instrumented:
+            event.listen(engine, "before_cursor_execute", _count_statement)
+            _instrumented.add(engine)
+    load: Dict[str, Any] = {}
+    _tls.counter = [0]
+    t0 = time.perf_counter()
+    try:
+        yield load
+    finally:
+        load["statements"] = _tls.counter[0]
+        load["db_seconds"] = round(time.perf_counter() - t0, 4)
+        _tls.counter = None
+        metric(_STATEMENTS, "inc", load["statements"], mode=mode)
+        metric(_JOB_SECONDS, "observe", load["db_seconds"], mode=mode)
+
+
+# ---------------- 스코어링 ---------------- #
+def _floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_rescore_at(now: datetime, last_action_at: Optional[datetime], oldest_day: Optional[date]) -> Optional[datetime]:
+    """새 이벤트 없이 점수가 바뀔 수 있는 가장 이른 시각 (없으면 None)
+
+    recency 점수: (now - last).days <= 7 / <= 30 → now < last + 8일 / last + 31일 까지 유지
+    창 이탈: day 버킷(과 그날의 last)은 now >= day + (RFM_WINDOW_DAYS + 1)일 부터 집계 제외
+    """
+    candidates: List[datetime] = []
+    if last_action_at is not None:
+        candidates.append(last_action_at + timedelta(days=RECENCY_THRESHOLDS['high'] + 1))
+        candidates.append(last_action_at + timedelta(days=RECENCY_THRESHOLDS['mid'] + 1))
+        candidates.append(_floor_day(last_action_at) + timedelta(days=RFM_WINDOW_DAYS + 1))
+    if oldest_day is not None:
+        candidates.append(datetime.combine(oldest_day, dtime.min) + timedelta(days=RFM_WINDOW_DAYS + 1))
+    future = [c for c in candidates if c > now]
+    return min(future) if future else None
+
+
+def _emit_change(db: Session, user_id: int, previous: Optional[str], current: str, now: datetime,
+                 source: str, rfm: Optional[Tuple[int, int, float]] = None) -> None:
+    payload: Dict[str, Any] = {"user_id": user_id, "previous": previous, "current": current,
+                               "source": source, "changed_at": now.isoformat()}
+    if rfm is not None:
+        payload.update(recency_days=rfm[0], frequency=rfm[1], monetary=rfm[2])
+    enqueue_outbox(db, "segment_change", payload,
+                   dedupe_key=f"segment_change:{user_id}:{current}:{int(now.timestamp())}")
+
+
+def _publish_changes(db: Session) -> None:
+    """commit 된 segment_change 행 발행 (relay 미실행 프로세스면 호출 스레드에서, db 와 같은 엔진)"""
+    bind = db.get_bind()
+    publish_outbox_now(("segment_change",), lambda: Session(bind=bind))
+
+
+def _upsert_segments(db: Session, rows: List[Dict[str, Any]]) -> None:
+    insert = _insert_for(db)
+    if insert is not None:
+        stmt = insert(UserSegment).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"rfm_group": stmt.excluded.rfm_group, "last_updated": stmt.excluded.last_updated},
+        ))
+        return
+    segs = {s.user_id: s for s in db.scalars(
+        select(UserSegment).where(UserSegment.user_id.in_([r["user_id"] for r in rows]))
+    )}
+    for row in rows:
+        seg = segs.get(row["user_id"])
+        if seg is None:
+            db.add(UserSegment(**row))
+        else:
+            seg.rfm_group = row["rfm_group"]
+            seg.last_updated = row["last_updated"]
+
+
+def rescore_users(db: Session, user_ids: Iterable[int], now: Optional[datetime] = None, *,
+                  mode: str = "stream", emit: bool = True) -> Dict[str, Any]:
+    """user_rfm_daily / user_rfm_state 에서 지정 사용자만 재평가 (commit 은 호출자).
+
+    그룹이 바뀐 사용자(세그먼트 없음 포함)만 user_segments upsert + segment_change 이벤트,
+    모든 대상의 state.rfm_group / scored_at / next_rescore_at 갱신.
+    반환: {"scored": n, "changed": [(user_id, 이전, 새 그룹)]}
+    """
+    now = now or _utcnow()
+    ws = rfm_window_start(now)
+    D, S = UserRFMDaily.__table__, UserRFMState.__table__
+    out: Dict[str, Any] = {"scored": 0, "changed": []}
+    ids = sorted(set(user_ids))
+    state_update = S.update().where(S.c.user_id == bindparam("b_user_id")).values(
+        rfm_group=bindparam("b_group"), scored_at=bindparam("b_scored_at"), next_rescore_at=bindparam("b_next"))
+    for chunk in _chunks(ids, RESCORE_CHUNK):
+        agg = {
+            uid: (int(freq or 0), int(money or 0), oldest)
+            for uid, freq, money, oldest in db.execute(
+                select(D.c.user_id, func.sum(D.c.action_count), func.sum(D.c.monetary), func.min(D.c.day))
+                .where(D.c.user_id.in_(chunk), D.c.day >= ws.date())
+                .group_by(D.c.user_id)
+            )
+        }
+        last = dict(db.execute(select(S.c.user_id, S.c.last_action_at).where(S.c.user_id.in_(chunk))).all())
+        current = dict(db.execute(
+            select(UserSegment.user_id, UserSegment.rfm_group).where(UserSegment.user_id.in_(chunk))
+        ).all())
+
+        recency: List[int] = []
+        frequency: List[int] = []
+        money: List[float] = []
+        for uid in chunk:
+            freq, amount, _ = agg.get(uid, (0, 0, None))
+            last_at = last.get(uid)
+            recency.append((now - last_at).days if last_at is not None and last_at >= ws else _NO_RECENCY)
+            frequency.append(freq)
+            money.append(amount)
+        groups = score_rfm(recency, frequency, money)
+
+        changed = [(uid, current.get(uid), g) for uid, g in zip(chunk, groups) if current.get(uid) != g]
+        if changed:
+            _upsert_segments(db, [{"user_id": uid, "rfm_group": g, "last_updated": now} for uid, _, g in changed])
+            if emit:
+                raw = {uid: (r, f, m) for uid, r, f, m in zip(chunk, recency, frequency, money)}
+                for uid, previous, g in changed:
+                    _emit_change(db, uid, previous, g, now, mode, raw[uid])
+        db.execute(state_update, [
+            {"b_user_id": uid, "b_group": g, "b_scored_at": now,
+             "b_next": next_rescore_at(now, last.get(uid), agg.get(uid, (0, 0, None))[2])}
+            for uid, g in zip(chunk, groups)
+        ])
+        out["scored"] += len(chunk)
+        out["changed"].extend(changed)
+        metric(_RESCORED, "inc", len(changed), mode=mode, result="changed")
+        metric(_RESCORED, "inc", len(chunk) - len(changed), mode=mode, result="unchanged")
+    return out
+
+
+def rescore_due(db: Session, now: Optional[datetime] = None, *, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """next_rescore_at 이 도래한 사용자만 재평가 (batch 마다 commit) + 창 밖 일별 버킷 정리"""
+    now = now or _utcnow()
+    batch_size = batch_size or int(os.getenv("RFM_RESCORE_BATCH", "2000"))
+    S, D = UserRFMState.__table__, UserRFMDaily.__table__
+    stats: Dict[str, Any] = {"scored": 0, "changed": 0, "pruned": 0}
+    changed_any = False
+    with _db_load(db, "aging") as load:
+        try:
+            while True:
+                ids = list(db.scalars(
+                    select(S.c.user_id).where(S.c.next_rescore_at <= now)
+                    .order_by(S.c.next_rescore_at).limit(batch_size)
+                ))
+                if not ids:
+                    break
+                result = rescore_users(db, ids, now, mode="aging")
+                db.commit()
+                stats["scored"] += result["scored"]
+                stats["changed"] += len(result["changed"])
+                changed_any = changed_any or bool(result["changed"])
+                if len(ids) < batch_size:
+                    break
+            stats["pruned"] = db.execute(delete(D).where(D.c.day < rfm_window_start(now).date())).rowcount or 0
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    stats.update(load)
+    if changed_any:
+        _publish_changes(db)
+    return stats
+
+
+def _day_expr(db: Session, column: Any) -> Any:
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def rebuild_state(db: Session, now: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+    """user_rfm_daily / user_rfm_state 를 집계 창 내 원본(user_actions, games)에서 재구성 (commit 은 호출자)
+
+    until 지정 시 created_at <= until 원본만 집계 (그 이후 이벤트는 스트림 버퍼가 반영)
+    """
+    now = now or _utcnow()
+    ws = rfm_window_start(now)
+    action_window = [UserAction.created_at >= ws]
+    game_window = [Game.created_at >= ws]
+    if until is not None:
+        action_window.append(UserAction.created_at <= until)
+        game_window.append(Game.created_at <= until)
+    D, S = UserRFMDaily.__table__, UserRFMState.__table__
+    db.execute(delete(D))
+    db.execute(delete(S))
+    action_day = _day_expr(db, UserAction.created_at)
+    game_day = _day_expr(db, Game.created_at)
+    actions = (
+        select(UserAction.user_id, action_day, func.count(), literal(0))
+        .where(*action_window)
+        .group_by(UserAction.user_id, action_day)
+    )
+    spends = (
+        select(Game.user_id, game_day, literal(0), func.coalesce(func.sum(Game.bet_amount), 0))
+        .where(*game_window)
+        .group_by(Game.user_id, game_day)
+    )
+    last_actions = (
+        select(UserAction.user_id, func.max(UserAction.created_at), literal(now, UserRFMState.updated_at.type))
+        .where(*action_window)
+        .group_by(UserAction.user_id)
+    )
+    spenders = (
+        select(Game.user_id, literal(now, UserRFMState.updated_at.type))
+        .where(*game_window)
+        .distinct()
+    )
+    columns = ["user_id", "day", "action_count", "monetary"]
+    insert = _insert_for(db)
+    db.execute(core_insert(D).from_select(columns, actions))
+    db.execute(core_insert(S).from_select(["user_id", "last_action_at", "updated_at"], last_actions))
+    if insert is not None:
+        stmt = insert(D).from_select(columns, spends)
+        db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "day"],
+                                              set_={"monetary": stmt.excluded.monetary}))
+        db.execute(insert(S).from_select(["user_id", "updated_at"], spenders).on_conflict_do_nothing())
+    else:
+        existing = {(uid, day) for uid, day in db.execute(select(D.c.user_id, D.c.day))}
+        for uid, day, _, amount in db.execute(spends).all():
+            if (uid, day) in existing:
+                db.execute(D.update().where(D.c.user_id == uid, D.c.day == day).values(monetary=amount))
+            else:
+                db.execute(core_insert(D).values(user_id=uid, day=day, action_count=0, monetary=amount))
+        known = set(db.scalars(select(S.c.user_id)))
+        missing = [{"user_id": uid, "updated_at": now} for uid, _ in db.execute(spenders) if uid not in known]
+        if missing:
+            db.execute(core_insert(S), missing)
+    return {
+        "buckets": int(db.scalar(select(func.count()).select_from(D)) or 0),
+        "users": int(db.scalar(select(func.count()).select_from(S)) or 0),
+    }
+
+
+def state_is_empty(db: Session) -> bool:
+    return db.execute(select(UserRFMState.user_id).limit(1)).first() is None
+
+
+# ---------------- 재구성 워터마크 / reconcile 잠금 ---------------- #
+_rebuilt_through: Optional[datetime] = None
+
+
+def _redis() -> Any:
+    try:
+        from ..utils.redis import get_redis_manager
+        return getattr(get_redis_manager(), "redis_client", None)
+    except Exception:
+        return None
+
+
+def rebuild_watermark() -> Optional[datetime]:
+    """마지막 상태 재구성이 집계한 created_at 상한 (프로세스 내 값과 Redis 공유값 중 최신)"""
+    local = _rebuilt_through
+    client = _redis()
+    if client is None:
+        return local
+    try:
+        raw = client.get(WATERMARK_KEY)
+        shared = datetime.fromisoformat(raw.decode("utf-8") if isinstance(raw, bytes) else raw) if raw else None
+    except Exception:
+        return local
+    if shared is None or (local is not None and local >= shared):
+        return local
+    return shared
+
+
+def _set_rebuild_watermark(value: datetime) -> None:
+    global _rebuilt_through
+    _rebuilt_through = value
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.set(WATERMARK_KEY, value.isoformat(), ex=(RFM_WINDOW_DAYS + 1) * 86400)
+    except Exception as e:
+        logger.warning("RFM rebuild watermark publish failed: %s", e)
+
+
+@contextmanager
+def _reconcile_lock(db: Session):
+    """reconcile 단일 실행 잠금 (스케줄러가 워커 프로세스마다 돈다). 획득 여부를 yield.
+
+    Postgres: 전용 AUTOCOMMIT 연결의 pg_try_advisory_lock (reconcile 이 중간 commit 하므로 xact lock 대신 세션 lock)
+    그 외: Redis SET NX EX (미연결/오류 시 잠금 없이 진행)
+    """
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": RECONCILE_LOCK_KEY}).scalar())
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": RECONCILE_LOCK_KEY})
+        return
+    client = _redis()
+    token = uuid.uuid4().hex
+    key = "rfm:reconcile:lock"
+    acquired = True
+    if client is not None:
+        try:
+            acquired = bool(client.set(key, token, nx=True,
+                                       ex=int(os.getenv("RFM_RECONCILE_LOCK_TTL_SEC", "3600"))))
+        except Exception:
+            client = None
+    try:
+        yield acquired
+    finally:
+        if client is not None and acquired:
+            try:
+                held = client.get(key)
+                if (held.decode("utf-8") if isinstance(held, bytes) else held) == token:
+                    client.delete(key)
+            except Exception:
+                pass
+
+
+def reconcile(db: Session, now: Optional[datetime] = None, *, chunk_size: int = RFM_BULK_CHUNK_SIZE,
+              only_if_empty: bool = False) -> Dict[str, Any]:
+    """전체 재계산 기반 보정 (nightly). 다른 프로세스가 실행 중이면 {"skipped": "locked"}.
+
+    0) 이 프로세스 스트림 버퍼 flush (재구성 전에 반영)
+    1) rescore_due: 시간 경과분을 증분 경로로 먼저 반영 → 이후 차이는 증분 경로의 누락분(drift)
+    2) RFMService bulk 재계산 (기준값). 그룹이 바뀐 기존 세그먼트 = drift → segment_change(source=reconcile)
+    3) 워터마크(snapshot) 공유 → 상태 테이블을 created_at <= snapshot 원본으로 재구성
+       → 상태 보유 사용자 재평가 (next_rescore_at 재설정, 변경 0 이 정상)
+    only_if_empty=True: 잠금 획득 후 상태가 비어 있을 때만 실행 (기동 bootstrap)
+    """
+    with _reconcile_lock(db) as acquired:
+        if not acquired:
+            return {"skipped": "locked"}
+        if only_if_empty and not state_is_empty(db):
+            return {"skipped": "not_empty"}
+        return _reconcile(db, now or _utcnow(), chunk_size)
+
+
+def _reconcile(db: Session, now: datetime, chunk_size: int) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    drift: List[Tuple[int, str, str]] = []
+
+    def on_changes(changes: List[tuple]) -> None:
+        drift.extend(changes)
+        for uid, previous, current in changes:
+            _emit_change(db, uid, previous, current, now, "reconcile")
+
+    stream = _stream
+    if stream is not None:
+        stats["flushed"] = stream.flush(now).get("scored", 0)
+    with _db_load(db, "reconcile") as load:
+        stats["due"] = rescore_due(db, now)
+        stats["rebuild"] = RFMService(db).update_all_user_segments(now=now, chunk_size=chunk_size,
+                                                                   on_changes=on_changes)
+        try:
+            # 이후 flush 는 snapshot 이하 이벤트를 버림 (재구성에 포함) — 재구성보다 먼저 공유.
+            # 진행 중인 이 프로세스 flush 는 끝난 뒤(재구성 DELETE 이전 commit)에 워터마크를 올린다.
+            snapshot = _utcnow()
+            if stream is not None:
+                with stream._flush_lock:
+                    _set_rebuild_watermark(snapshot)
+            else:
+                _set_rebuild_watermark(snapshot)
+            stats["state"] = rebuild_state(db, now, until=snapshot)
+            db.commit()
+            ids = list(db.scalars(select(UserRFMState.user_id)))
+            post = rescore_users(db, ids, now, mode="reconcile")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    stats["drift"] = len(drift)
+    stats["post_changed"] = len(post["changed"])
+    stats.update(load)
+    if post["changed"]:
+        logger.warning("RFM reconcile: %d users changed after state rebuild", len(post["changed"]))
+    metric(_DRIFT, "set", len(drift))
+    metric(_RECONCILED_AT, "set", time.time())
+    if drift or post["changed"]:
+        _publish_changes(db)
+    logger.info("RFM reconcile done drift=%s users=%s statements=%s in %.2fs", len(drift),
+                (stats["rebuild"] or {}).get("users"), load.get("statements"), load.get("db_seconds", 0.0))
+    return stats
+
+
+# ---------------- 수집 + flush ---------------- #
+class RFMStream:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        if flush_interval is None:
+            flush_interval = float(os.getenv("RFM_STREAM_FLUSH_SEC", "5"))
+        self.flush_interval = max(0.05, flush_interval)
+        self.max_pending = int(os.getenv("RFM_STREAM_MAX_PENDING", "100000")) if max_pending is None else max_pending
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events: List[Tuple[int, datetime, int, int]] = []  # (user_id, at, actions, monetary)
+        self._first_seen: Dict[int, float] = {}
+        self._targets: List[Any] = []
+        self._info_key = f"rfm_stream_pending:{id(self)}"  # 인스턴스별 (훅 대상이 겹쳐도 서로의 대기분을 가져가지 않음)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Any] = {"events": 0, "dropped": 0, "discarded": 0, "flushes": 0, "errors": 0,
+                                       "rescored": 0, "changed": 0, "statements": 0, "max_staleness_sec": 0.0}
+
+    # ---------------- wiring ---------------- #
+    def _session(self):
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def install(self, target: Any = Session) -> None:
+        """SessionEvents 훅 설치 (target: Session 클래스 또는 sessionmaker)"""
+        with self._lock:
+            if target in self._targets:
+                return
+            event.listen(target, "after_flush", self._after_flush)
+            event.listen(target, "after_commit", self._after_commit)
+            event.listen(target, "after_rollback", self._after_rollback)
+            self._targets.append(target)
+
+    def uninstall(self) -> None:
+        with self._lock:
+            targets, self._targets = self._targets, []
+        for target in targets:
+            event.remove(target, "after_flush", self._after_flush)
+            event.remove(target, "after_commit", self._after_commit)
+            event.remove(target, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        pending = None
+        for obj in session.new:
+            if isinstance(obj, UserAction):
+                item = ("action", obj.user_id, obj.created_at, 0)
+            elif isinstance(obj, Game):
+                item = ("spend", obj.user_id, obj.created_at, obj.bet_amount or 0)
+            else:
+                continue
+            if pending is None:
+                pending = session.info.setdefault(self._info_key, [])
+            pending.append(item)
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop(self._info_key, None)
+        if pending:
+            self.record_many(pending)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self._info_key, None)
+
+    # ---------------- 버퍼 ---------------- #
+    def record_action(self, user_id: int, at: Optional[datetime] = None) -> None:
+        self.record_many([("action", user_id, at, 0)])
+
+    def record_spend(self, user_id: int, amount: int, at: Optional[datetime] = None) -> None:
+        self.record_many([("spend", user_id, at, amount)])
+
+    def record_many(self, items: Sequence[Tuple[str, Optional[int], Optional[datetime], int]]) -> None:
+        wall = time.time()
+        counts = {"action": 0, "spend": 0, "dropped": 0}
+        with self._lock:
+            for kind, user_id, at, amount in items:
+                if user_id is None:
+                    continue
+                if user_id not in self._first_seen:
+                    if len(self._first_seen) >= self.max_pending:
+                        counts["dropped"] += 1
+                        continue
+                    self._first_seen[user_id] = wall
+                at = _naive_utc(at) or _utcnow()
+                if kind == "action":
+                    self._events.append((user_id, at, 1, 0))
+                else:
+                    self._events.append((user_id, at, 0, int(amount or 0)))
+                counts[kind] += 1
+            self._stats["events"] += counts["action"] + counts["spend"]
+            self._stats["dropped"] += counts["dropped"]
+            pending = len(self._first_seen)
+        for kind, n in counts.items():
+            if n:
+                metric(_EVENTS, "inc", n, kind=kind)
+        metric(_PENDING, "set", pending)
+
+    def pending_users(self) -> int:
+        with self._lock:
+            return len(self._first_seen)
+
+    def _swap(self):
+        with self._lock:
+            snapshot = (self._events, self._first_seen)
+            self._events, self._first_seen = [], {}
+        return snapshot
+
+    def _restore(self, events, first_seen) -> None:
+        """flush 실패 → 꺼낸 이벤트를 버퍼에 되돌림 (그 사이 들어온 이벤트와 합침)"""
+        with self._lock:
+            self._events.extend(events)
+            for uid, wall in first_seen.items():
+                self._first_seen[uid] = min(wall, self._first_seen.get(uid, wall))
+
+    @staticmethod
+    def _aggregate(events: Sequence[Tuple[int, datetime, int, int]]):
+        """이벤트 → (user_id, day) 증분 + 사용자별 마지막 action 시각"""
+        daily: Dict[Tuple[int, date], List[int]] = {}
+        last: Dict[int, datetime] = {}
+        for uid, at, actions, amount in events:
+            bucket = daily.setdefault((uid, at.date()), [0, 0])
+            bucket[0] += actions
+            bucket[1] += amount
+            if actions and (uid not in last or at > last[uid]):
+                last[uid] = at
+        return daily, last
+
+    # ---------------- flush ---------------- #
+    def flush(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """버퍼 증분 반영 + 해당 사용자 재평가 (1 트랜잭션). 반환: scored / changed / statements / db_seconds"""
+        with self._flush_lock:
+            events, first_seen = self._swap()
+            if not first_seen:
+                return {"scored": 0, "changed": 0}
+            watermark = rebuild_watermark()
+            if watermark is not None:  # 상태 재구성이 이미 집계한 이벤트
+                kept = [e for e in events if e[1] > watermark]
+                with self._lock:
+                    self._stats["discarded"] += len(events) - len(kept)
+                events = kept
+            daily, last = self._aggregate(events)
+            users = {uid for uid, _ in daily}
+            if not users:
+                metric(_PENDING, "set", self.pending_users())
+                return {"scored": 0, "changed": 0}
+            now = now or _utcnow()
+            db = self._session()
+            try:
+                with _db_load(db, "stream") as load:
+                    self._apply_deltas(db, daily, last, now)
+                    result = rescore_users(db, users, now, mode="stream")
+                    db.commit()
+            except Exception:
+                db.rollback()
+                self._restore(events, first_seen)
+                with self._lock:
+                    self._stats["errors"] += 1
+                raise
+            finally:
+                db.close()
+        wall = time.time()
+        staleness = [wall - seen for seen in first_seen.values()]
+        for value in staleness:
+            metric(_STALENESS, "observe", value)
+        metric(_PENDING, "set", self.pending_users())
+        if result["changed"]:
+            publish_outbox_now(("segment_change",), self._session_factory)
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["rescored"] += result["scored"]
+            self._stats["changed"] += len(result["changed"])
+            self._stats["statements"] += load.get("statements", 0)
+            self._stats["max_staleness_sec"] = round(max(self._stats["max_staleness_sec"], max(staleness)), 3)
+        return {"scored": result["scored"], "changed": len(result["changed"]), **load}
+
+    def _apply_deltas(self, db: Session, daily, last, now: datetime) -> None:
+        D, S = UserRFMDaily.__table__, UserRFMState.__table__
+        daily_rows = [
+            {"user_id": uid, "day": day, "action_count": actions, "monetary": amount}
+            for (uid, day), (actions, amount) in sorted(daily.items())
+        ]
+        state_rows = [
+            {"user_id": uid, "last_action_at": last.get(uid), "updated_at": now}
+            for uid in sorted({uid for uid, _ in daily})
+        ]
+        insert = _insert_for(db)
+        if insert is not None:
+            stmt = insert(D)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id", "day"],
+                set_={"action_count": D.c.action_count + stmt.excluded.action_count,
+                      "monetary": D.c.monetary + stmt.excluded.monetary},
+            ), daily_rows)
+            stmt = insert(S)
+            newer = and_(stmt.excluded.last_action_at.is_not(None),
+                         or_(S.c.last_action_at.is_(None), stmt.excluded.last_action_at > S.c.last_action_at))
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"last_action_at": case((newer, stmt.excluded.last_action_at), else_=S.c.last_action_at),
+                      "updated_at": stmt.excluded.updated_at},
+            ), state_rows)
+            return
+        for row in daily_rows:
+            found = db.get(UserRFMDaily, (row["user_id"], row["day"]))
+            if found is None:
+                db.add(UserRFMDaily(**row))
+            else:
+                found.action_count += row["action_count"]
+                found.monetary += row["monetary"]
+        for row in state_rows:
+            found = db.get(UserRFMState, row["user_id"])
+            if found is None:
+                db.add(UserRFMState(**row))
+            elif row["last_action_at"] is not None and (
+                    found.last_action_at is None or row["last_action_at"] > found.last_action_at):
+                found.last_action_at = row["last_action_at"]
+        db.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["pending_users"] = len(self._first_seen)
+        out["running"] = self._thread is not None
+        return out
+
+    # ---------------- lifecycle ---------------- #
+    def start(self, target: Any = Session) -> None:
+        self.install(target)
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._worker, name="rfm-stream", daemon=True)
+            self._thread.start()
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0) -> None:
+        """훅 해제 → 워커 종료 → 남은 증분 flush"""
+        self.uninstall()
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if wait and thread is not None:
+            thread.join(timeout=timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("rfm stream final flush failed: %s", e)
+
+    def _worker(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("rfm stream flush error: %s", e)
+
+
+_stream: Optional[RFMStream] = None
+_stream_lock = threading.Lock()
+
+
+def get_rfm_stream() -> RFMStream:
+    global _stream
+    if _stream is None:
+        with _stream_lock:
+            if _stream is None:
+                _stream = RFMStream()
+    return _stream
+
+
+def shutdown_rfm_stream() -> None:
+    global _stream
+    with _stream_lock:
+        stream, _stream = _stream, None
+    if stream is not None:
+        stream.shutdown(wait=True)
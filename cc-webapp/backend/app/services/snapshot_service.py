@@ -0,0 +1,432 @@
+"""공유 집계 스냅샷 (글로벌 메트릭 / 대시보드)
+
+여러 독자가 같은 플랫폼 집계를 폴링/구독하는 경로용. 집계는 스냅샷 단위로 주기당 1회만 계산한다.
+
+    store = get_snapshot_store()
+    store.get("global_metrics", db)                  # 신선하면 캐시, 아니면 single-flight 재계산
+    async for data in store.subscribe("global_metrics", min_interval=5): ...   # SSE 팬아웃
+    store.start_producer() / await store.stop()      # lifespan: 주기 갱신 태스크
+
+계층:
+  1) 프로세스 로컬 최신 스냅샷
+  2) Redis snapshot:{name}:v1 (워커 간 공유, TTL = interval × 6)
+     Decimal/datetime/date 는 태그 객체({"$decimal": "..."} 등)로 직렬화 → 읽는 워커도 같은 타입 복원
+  3) 계산: 스냅샷별 threading.Lock 으로 프로세스 내 1회,
+     Redis SET NX PX=interval 락(snapshot:{name}:lock)으로 워커 간 interval 당 1회.
+     락을 못 잡은 워커는 공유 값을 사용 (없거나 너무 오래됐으면 직접 계산 — 가용성 우선)
+
+producer:
+  SNAPSHOT_PRODUCER_ENABLED=1(기본) 이면 lifespan 에서 asyncio 태스크로 실행.
+  스냅샷 나이가 interval 의 90% 에 도달하면 to_thread 로 갱신 → 구독자 큐(최신 값 1개)에 publish.
+  따라서 DB 부하는 구독자/요청 수와 무관하게 스냅샷별 interval 당 1회.
+  producer 가 없으면(테스트, 비활성) get()/subscribe() 가 같은 single-flight 경로로 lazy 갱신.
+
+환경변수:
+  SNAPSHOT_PRODUCER_ENABLED          lifespan producer 시작 (기본 1)
+  SNAPSHOT_METRICS_INTERVAL_SEC      global_metrics 갱신 주기 (기본 5)
+  SNAPSHOT_DASHBOARD_INTERVAL_SEC    dashboard 갱신 주기 (기본 30)
+
+메트릭:
+  snapshot_age_seconds{snapshot} (Gauge) / snapshot_compute_seconds{snapshot} (Histogram)
+  snapshot_refresh_total{snapshot, source=computed|shared|error} / snapshot_subscribers{snapshot} (Gauge)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.utils.metrics import metric
+
+try:  # optional prometheus metrics
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+    _AGE = Gauge("snapshot_age_seconds", "Age of the latest aggregate snapshot", ["snapshot"])
+    _COMPUTE_SECONDS = Histogram("snapshot_compute_seconds", "Aggregate snapshot compute duration", ["snapshot"])
+    _REFRESH = Counter("snapshot_refresh_total", "Aggregate snapshot refreshes", ["snapshot", "source"])
+    _SUBSCRIBERS = Gauge("snapshot_subscribers", "Active snapshot stream subscribers", ["snapshot"])
+except Exception:  # pragma: no cover
+    _AGE = _COMPUTE_SECONDS = _REFRESH = _SUBSCRIBERS = None
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_METRICS = "global_metrics"
+DASHBOARD = "dashboard"
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)))
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# 집계 함수 (Session → JSON 직렬화 가능한 dict)
+# ---------------------------------------------------------------------------
+def compute_global_metrics(db: Session) -> Dict[str, Any]:
+    from ..models import UserReward
+    from ..models.auth_models import UserSession
+    from . import activity_storage_service
+
+    now = datetime.utcnow()
+    one_hour_ago = now - timedelta(hours=1)
+    # online users: sessions active within last 5 minutes
+    online_users = db.execute(select(func.count(func.distinct(UserSession.user_id))).where(
+        (UserSession.last_used_at != None) & (UserSession.last_used_at > now - timedelta(minutes=5))  # noqa: E711
+    )).scalar() or 0
+    # spins_last_hour: 완결 시간 버킷은 activity_rollups, 나머지는 (action_type, created_at) 인덱스 범위
+    spins_last_hour = activity_storage_service.count_actions(db, "SLOT_SPIN", one_hour_ago, now)
+    # big_wins_last_hour: UserReward.claimed_at / gold_amount 기준 (임계값 BIG_WIN_THRESHOLD_GOLD)
+    threshold = int(os.getenv("BIG_WIN_THRESHOLD_GOLD", "1000"))
+    big_wins_last_hour = db.execute(select(func.count()).select_from(UserReward).where(
+        (UserReward.claimed_at > one_hour_ago) & (UserReward.gold_amount != None)  # noqa: E711
+        & (UserReward.gold_amount > threshold)
+    )).scalar() or 0
+    return {
+        "online_users": int(online_users),
+        "spins_last_hour": int(spins_last_hour),
+        "big_wins_last_hour": int(big_wins_last_hour),
+        "generated_at": now.isoformat(),
+    }
+
+
+def compute_dashboard(db: Session) -> Dict[str, Any]:
+    from .dashboard_service import DashboardService
+
+    service = DashboardService(db)
+    return {
+        "main": service.get_main_dashboard_stats(),
+        "games": service.get_game_dashboard_stats(),
+        "social_proof": service.get_social_proof_stats(),
+        "generated_at": datetime.utcnow().isoformat(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 공유 payload 직렬화 (계산한 워커와 같은 타입으로 복원)
+# ---------------------------------------------------------------------------
+def _encode(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, datetime):  # date 보다 먼저 (datetime 은 date 의 하위 클래스)
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"snapshot value of type {type(value).__name__} is not serializable")
+
+
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "$decimal": Decimal,
+    "$datetime": datetime.fromisoformat,
+    "$date": date.fromisoformat,
+}
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        (tag, raw), = obj.items()
+        decoder = _DECODERS.get(tag)
+        if decoder is not None and isinstance(raw, str):
+            return decoder(raw)
+    return obj
+
+
+def dumps_payload(doc: Dict[str, Any]) -> str:
+    return json.dumps(doc, default=_encode)
+
+
+def loads_payload(raw: Any) -> Dict[str, Any]:
+    return json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw, object_hook=_decode)
+
+
+# ---------------------------------------------------------------------------
+# 스냅샷 저장소
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class Snapshot:
+    name: str
+    data: Dict[str, Any]
+    generated_ts: float  # epoch 초 (워커 간 비교 가능)
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.generated_ts)
+
+
+@dataclass
+class SnapshotSpec:
+    name: str
+    compute: Callable[[Session], Dict[str, Any]]
+    interval: float
+
+
+class SnapshotStore:
+    def __init__(self, redis_client: Any = None, session_factory: Optional[Callable[[], Session]] = None) -> None:
+        self._redis_client = redis_client
+        self._session_factory = session_factory
+        self._specs: Dict[str, SnapshotSpec] = {}
+        self._local: Dict[str, Snapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._sub_lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._token = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    # -- 등록/조회 ---------------------------------------------------------
+    def register(self, name: str, compute: Callable[[Session], Dict[str, Any]], interval: float) -> None:
+        self._specs[name] = SnapshotSpec(name, compute, max(0.5, float(interval)))
+        self._locks.setdefault(name, threading.Lock())
+        self._subscribers.setdefault(name, set())
+        self._counts.setdefault(name, {"computed": 0, "shared": 0, "error": 0})
+        metric(_AGE, "set_function", lambda: self.age(name), snapshot=name)
+
+    def interval(self, name: str) -> float:
+        return self._specs[name].interval
+
+    def peek(self, name: str) -> Optional[Snapshot]:
+        return self._local.get(name)
+
+    def age(self, name: str) -> float:
+        snap = self._local.get(name)
+        return snap.age() if snap is not None else float("inf")
+
+    def get(self, name: str, db: Optional[Session] = None, max_age: Optional[float] = None) -> Snapshot:
+        """max_age(기본 interval) 이내 스냅샷 반환. 오래됐으면 single-flight 갱신.
+
+        db 를 넘기면 lazy 계산에 그 세션을 사용 (요청 의존성 override 유지). 계산 실패 시 이전 스냅샷이
+        있으면 그것을 반환.
+        """
+        spec = self._specs[name]
+        max_age = spec.interval if max_age is None else max_age
+        snap = self._local.get(name)
+        if snap is not None and snap.age() < max_age:
+            return snap
+        with self._locks[name]:
+            snap = self._local.get(name)
+            if snap is not None and snap.age() < max_age:
+                return snap
+            try:
+                return self._refresh(spec, db)
+            except Exception:
+                if snap is None:
+                    raise
+                logger.warning("snapshot %s refresh failed; serving stale (age=%.1fs)", name, snap.age(),
+                               exc_info=True)
+                return snap
+
+    # -- 갱신 --------------------------------------------------------------
+    def _redis(self) -> Any:
+        if self._redis_client is not None:
+            return self._redis_client
+        try:
+            from ..utils.redis import get_redis_manager
+            return getattr(get_redis_manager(), "redis_client", None)
+        except Exception:
+            return None
+
+    def _try_lock(self, spec: SnapshotSpec) -> bool:
+        client = self._redis()
+        if client is None:
+            return True
+        try:
+            return bool(client.set(f"snapshot:{spec.name}:lock", self._token, nx=True,
+                                   px=max(1, int(spec.interval * 1000))))
+        except Exception:
+            return True
+
+    def _read_shared(self, name: str) -> Optional[Snapshot]:
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(f"snapshot:{name}:v1")
+            if not raw:
+                return None
+            doc = loads_payload(raw)
+            return Snapshot(name, doc["data"], float(doc["generated_ts"]))
+        except Exception:
+            logger.warning("snapshot %s shared payload unreadable; ignoring", name, exc_info=True)
+            return None
+
+    def _write_shared(self, snap: Snapshot, spec: SnapshotSpec) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(f"snapshot:{snap.name}:v1",
+                       dumps_payload({"data": snap.data, "generated_ts": snap.generated_ts}),
+                       px=max(1000, int(spec.interval * 6000)))
+        except Exception:
+            logger.warning("snapshot %s shared write failed", snap.name, exc_info=True)
+
+    def _refresh(self, spec: SnapshotSpec, db: Optional[Session]) -> Snapshot:
+        """호출자가 self._locks[name] 보유"""
+        if not self._try_lock(spec):
+            shared = self._read_shared(spec.name)
+            if shared is not None and shared.age() < spec.interval * 2:
+                self._publish(shared, "shared")
+                return self._local.get(spec.name, shared)
+        own = db is None
+        session = self._new_session() if own else db
+        started = time.perf_counter()
+        try:
+            data = spec.compute(session)
+        except Exception:
+            self._counts[spec.name]["error"] += 1
+            metric(_REFRESH, "inc", snapshot=spec.name, source="error")
+            raise
+        finally:
+            if own:
+                session.close()
+        metric(_COMPUTE_SECONDS, "observe", time.perf_counter() - started, snapshot=spec.name)
+        snap = Snapshot(spec.name, data, time.time())
+        self._write_shared(snap, spec)
+        self._publish(snap, "computed")
+        return snap
+
+    def _new_session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from ..database import ReadSessionLocal
+        return ReadSessionLocal()
+
+    def _publish(self, snap: Snapshot, source: str) -> None:
+        current = self._local.get(snap.name)
+        if current is not None and current.generated_ts >= snap.generated_ts:
+            return
+        self._local[snap.name] = snap
+        self._counts[snap.name][source] += 1
+        metric(_REFRESH, "inc", snapshot=snap.name, source=source)
+        with self._sub_lock:
+            subscribers = list(self._subscribers.get(snap.name, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, snap)
+            except RuntimeError:  # 루프 종료
+                with self._sub_lock:
+                    self._subscribers[snap.name].discard((loop, queue))
+
+    def refresh_due(self, name: str) -> Optional[Snapshot]:
+        """producer 1회: 나이가 interval 의 90% 이상이면 갱신 (독자가 stale 을 만나기 전에)."""
+        spec = self._specs[name]
+        with self._locks[name]:
+            if self.age(name) < spec.interval * 0.9:
+                return None
+            return self._refresh(spec, None)
+
+    # -- 팬아웃 ------------------------------------------------------------
+    async def subscribe(self, name: str, min_interval: float = 0.0) -> AsyncIterator[Dict[str, Any]]:
+        """새 스냅샷마다 data 를 yield (최신 값만, 느린 구독자는 중간 값을 건너뜀).
+
+        DB 는 건드리지 않고 producer publish 를 기다린다. producer 부재 시 interval 경과 후
+        get() single-flight 로 갱신 (구독자가 많아도 1회 계산).
+        """
+        spec = self._specs[name]
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        entry = (loop, queue)
+        with self._sub_lock:
+            self._subscribers[name].add(entry)
+        metric(_SUBSCRIBERS, "inc", snapshot=name)
+        try:
+            snap = self.peek(name)
+            if snap is None or snap.age() >= spec.interval:
+                snap = await asyncio.to_thread(self.get, name)
+            last_ts, last_emit = snap.generated_ts, loop.time()
+            yield snap.data
+            while True:
+                try:
+                    snap = await asyncio.wait_for(queue.get(), timeout=max(spec.interval, min_interval))
+                except asyncio.TimeoutError:
+                    snap = self.peek(name)
+                    if snap is None or snap.age() >= spec.interval:
+                        snap = await asyncio.to_thread(self.get, name)
+                if snap.generated_ts <= last_ts:
+                    continue
+                wait = min_interval - (loop.time() - last_emit)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    snap = self.peek(name) or snap
+                last_ts, last_emit = snap.generated_ts, loop.time()
+                yield snap.data
+        finally:
+            with self._sub_lock:
+                self._subscribers[name].discard(entry)
+            metric(_SUBSCRIBERS, "dec", snapshot=name)
+
+    def subscriber_count(self, name: str) -> int:
+        return len(self._subscribers.get(name, ()))
+
+    # -- producer ----------------------------------------------------------
+    async def run(self) -> None:
+        while True:
+            for name in list(self._specs):
+                try:
+                    await asyncio.to_thread(self.refresh_due, name)
+                except Exception:
+                    logger.exception("snapshot %s producer refresh failed", name)
+            now = time.time()
+            due = [
+                (snap.generated_ts + spec.interval * 0.9 - now) if (snap := self._local.get(name)) else 0.0
+                for name, spec in self._specs.items()
+            ]
+            await asyncio.sleep(min([max(0.05, d) for d in due] or [1.0]))
+
+    def start_producer(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "age_seconds": round(self.age(name), 3) if name in self._local else None,
+                "subscribers": self.subscriber_count(name),
+                **self._counts[name],
+            }
+            for name in self._specs
+        }
+
+
+def _offer(queue: asyncio.Queue, snap: Snapshot) -> None:
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(snap)
+
+
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = SnapshotStore()
+                store.register(GLOBAL_METRICS, compute_global_metrics, _env_float("SNAPSHOT_METRICS_INTERVAL_SEC", 5))
+                store.register(DASHBOARD, compute_dashboard, _env_float("SNAPSHOT_DASHBOARD_INTERVAL_SEC", 30))
+                _store = store
+    return _store
@@ -9,6 +9,12 @@ _backend_root = os.path.abspath(os.path.join(_here, "..", ".."))
 if _backend_root not in sys.path:
 	sys.path.insert(0, _backend_root)
 
+# 증분 RFM 백그라운드 flush 비활성: 세션 전체 lifespan 동안 테스트 데이터 세그먼트를 비결정적으로 갱신하지 않도록
+# (필요한 테스트는 RFMStream 을 직접 생성해 flush 호출)
+os.environ.setdefault("RFM_STREAM_ENABLED", "0")
+# outbox relay 도 lifespan 에서 시작하지 않음 (테스트가 OutboxRelay 를 직접 구동하고 미발행 행을 검사)
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "0")
+
 # Ensure DB tables exist for tests
 from app.database import Base, engine  # noqa: E402
 from app.main import app as fastapi_app  # noqa: E402
@@ -0,0 +1,103 @@
+import json
+import logging
+import random
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.logging import JSONLogFormatter, _ContextQueueHandler, request_id_ctx
+from app.middleware.access_log import AccessLogMiddleware, parse_sample_rates
+
+
+def _app(**kw):
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    app.add_middleware(AccessLogMiddleware, titles={"GET /api/items/{item_id}": "📦 아이템"}, **kw)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def _access_logger_enabled():
+    # alembic fileConfig(disable_existing_loggers) 가 conftest 에서 access 로거를 비활성화함
+    logger = logging.getLogger("access")
+    disabled, logger.disabled = logger.disabled, False
+    yield
+    logger.disabled = disabled
+
+
+def _access_records(caplog):
+    return [r for r in caplog.records if r.name == "access"]
+
+
+def test_one_line_per_request_with_route_template(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    client = TestClient(_app())
+    client.get("/api/items/1")
+    client.get("/api/items/2")
+    client.get("/nope")
+    recs = _access_records(caplog)
+    assert len(recs) == 3
+    assert [r.route for r in recs] == ["/api/items/{item_id}", "/api/items/{item_id}", "<unmatched>"]
+    assert recs[0].title == "📦 아이템" and recs[0].getMessage().startswith("📦 아이템 (200)")
+    assert recs[2].levelno == logging.WARNING
+
+
+def test_route_sampling_keeps_errors(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    rates = parse_sample_rates("GET /health=0, /api/items/{item_id}=0.5, bad")
+    assert rates == {"GET /health": 0.0, "/api/items/{item_id}": 0.5}
+    client = TestClient(_app(route_sample_rates=rates, rng=random.Random(1)))
+    for _ in range(20):
+        client.get("/health")
+    assert _access_records(caplog) == []
+    for _ in range(200):
+        client.get("/api/items/1")
+    sampled = len(_access_records(caplog))
+    assert 60 < sampled < 140
+    client.get("/api/items/0")  # 404 는 항상 기록
+    assert _access_records(caplog)[-1].route == "/api/items/{item_id}"
+    assert len(_access_records(caplog)) == sampled + 1
+
+
+def test_route_cache_is_bounded_for_paths_and_methods_outside_the_route_table():
+    app = _app(route_cache_max=4)
+    client = TestClient(app)
+    for i in range(20):
+        client.get(f"/nope/{i}")
+        client.request(f"M{i}", "/api/items/1")
+    mw = _find_access_log(app.middleware_stack)
+    assert ("GET", "/api/items/{item_id}") in mw._routes
+    assert len(mw._extra) <= 4
+    assert all(method.startswith("M") or template == "<unmatched>" for method, template in mw._extra)
+
+
+def _find_access_log(node):
+    while node is not None and not isinstance(node, AccessLogMiddleware):
+        node = getattr(node, "app", None)
+    return node
+
+
+def test_queue_handler_captures_request_context():
+    formatter = JSONLogFormatter()
+    handler = _ContextQueueHandler(queue=None)
+    token = request_id_ctx.set("req-123")
+    try:
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+        record.route = "/r"
+        prepared = handler.prepare(record)
+    finally:
+        request_id_ctx.reset(token)
+    # 리스너 스레드(다른 컨텍스트)에서 포맷해도 캡처된 값 사용
+    data = json.loads(formatter.format(prepared))
+    assert data["request_id"] == "req-123" and data["msg"] == "hello world" and data["route"] == "/r"
@@ -0,0 +1,82 @@
+import random
+import threading
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import User, Achievement, UserAchievement
+from app.services.achievement_pipeline import AchievementEvaluationPipeline, get_achievement_pipeline
+from app.services.history_service import log_game_history
+
+
+def _make_user(db):
+    sid = f"achp_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def test_log_game_history_unlocks_achievement_after_drain():
+    db = SessionLocal()
+    code = f"PIPE_WIN_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    ach = Achievement(code=code, title="pipe", condition={"type": "TOTAL_WIN_AMOUNT", "game_type": "slot", "threshold": 100})
+    db.add(ach)
+    db.commit()
+    try:
+        u = _make_user(db)
+        for delta in (40, 40, 40):
+            assert log_game_history(db, user_id=u.id, game_type="slot", action_type="WIN", delta_coin=delta)
+        get_achievement_pipeline().drain()
+        check = SessionLocal()
+        try:
+            ua = check.scalar(select(UserAchievement).where(
+                UserAchievement.user_id == u.id, UserAchievement.achievement_id == ach.id))
+            assert ua is not None and ua.is_unlocked
+            assert ua.progress_value == 120
+        finally:
+            check.close()
+    finally:
+        ach.is_active = False
+        db.commit()
+        db.close()
+
+
+def test_pipeline_coalesces_per_user_and_applies_backpressure():
+    seen = []
+    lock = threading.Lock()
+
+    class _Recorder(AchievementEvaluationPipeline):
+        def _evaluate(self, job):
+            with lock:
+                seen.append((job.user_id, list(job.history_ids)))
+
+    p = _Recorder(workers=0, max_pending=2, batch_window=60.0)
+    assert p.submit(1, 10) and p.submit(1, 11) and p.submit(2, 20)
+    assert p.submit(3, 30) is False  # 대기 사용자 상한 초과 → drop
+    assert p.submit(2, 21)  # 기존 대기 사용자는 병합 허용
+    assert p.pending_count() == 2
+    p.drain()
+    assert sorted(seen) == [(1, [10, 11]), (2, [20, 21])]
+    assert p.pending_count() == 0
+
+
+def test_pipeline_workers_process_after_batch_window():
+    done = threading.Event()
+    seen = []
+
+    class _Recorder(AchievementEvaluationPipeline):
+        def _evaluate(self, job):
+            seen.append(list(job.history_ids))
+            done.set()
+
+    p = _Recorder(workers=1, max_pending=10, batch_window=0.05)
+    try:
+        p.submit(7, 1)
+        p.submit(7, 2)
+        assert done.wait(2.0)
+        assert seen == [[1, 2]]
+    finally:
+        p.shutdown()
@@ -0,0 +1,105 @@
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import ActivityRollup, GameHistory, UserAction
+from app.services import activity_storage_service as storage
+
+NOW = datetime(2026, 10, 18, 12, 34, 56)
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db, hours=50, per_hour=12):
+    rnd = random.Random(7)
+    for h in range(hours):
+        for _ in range(per_hour):
+            ts = NOW - timedelta(hours=h, minutes=rnd.randint(0, 59), seconds=rnd.randint(0, 59))
+            action = rnd.choice(["SLOT_SPIN", "GACHA_PULL", "LOGIN"])
+            db.add(UserAction(user_id=rnd.randint(1, 20), action_type=action, created_at=ts))
+            db.add(GameHistory(user_id=rnd.randint(1, 20), game_type=rnd.choice(["slot", "crash"]),
+                               action_type=rnd.choice(["BET", "WIN"]), delta_coin=rnd.randint(-50, 50),
+                               created_at=ts))
+    db.commit()
+
+
+def _raw_count(db, action_type, since, until):
+    return db.execute(select(func.count()).select_from(UserAction).where(
+        UserAction.action_type == action_type, UserAction.created_at >= since,
+        UserAction.created_at < until)).scalar()
+
+
+def test_rollup_plus_tail_matches_raw_scan():
+    db = _session()
+    _seed(db)
+    storage.refresh_rollups(db, now=NOW)
+    wm = storage.watermark(db)
+    assert wm == NOW.replace(minute=0, second=0) and db.query(ActivityRollup).count() > 0
+
+    # 롤업 이후 늦게 들어온 행 + 워터마크 이후 행도 반영
+    db.add(UserAction(user_id=99, action_type="SLOT_SPIN", created_at=NOW - timedelta(minutes=5)))
+    db.commit()
+    for since, until in [(NOW - timedelta(hours=1), NOW), (NOW - timedelta(hours=30, minutes=17), NOW),
+                         (NOW - timedelta(days=2), NOW - timedelta(hours=3, minutes=1))]:
+        for action in ("SLOT_SPIN", "GACHA_PULL"):
+            assert storage.count_actions(db, action, since, until) == _raw_count(db, action, since, until)
+
+    today = NOW.replace(hour=0, minute=0, second=0)
+    raw_dau = db.execute(select(func.count(func.distinct(UserAction.user_id)))
+                         .where(UserAction.created_at >= today)).scalar()
+    assert storage.active_users(db, today) == raw_dau
+
+    since = NOW - timedelta(hours=20)
+    raw_bets = db.execute(select(func.count()).select_from(GameHistory).where(
+        GameHistory.action_type == "BET", GameHistory.game_type == "crash",
+        GameHistory.created_at >= since, GameHistory.created_at < NOW)).scalar()
+    assert storage.count_actions(db, "BET", since, NOW, source="game_history", game_type="crash") == raw_bets
+
+
+def test_window_older_than_backfill_counts_raw_rows():
+    db = _session()
+    for days, uid in ((40, 1), (10, 2), (0, 3)):
+        db.add(UserAction(user_id=uid, action_type="SLOT_SPIN", created_at=NOW - timedelta(days=days, minutes=1)))
+    db.commit()
+    storage.refresh_rollups(db, now=NOW)  # backfill 35일 → -40d 행은 롤업 밖
+    assert storage.rollup_start(db) > NOW - timedelta(days=40)
+
+    since = NOW - timedelta(days=50)
+    assert storage.count_actions(db, "SLOT_SPIN", since, NOW) == _raw_count(db, "SLOT_SPIN", since, NOW) == 3
+    assert storage.active_users(db, since.replace(hour=0, minute=0, second=0)) == 3
+
+
+def test_refresh_is_idempotent():
+    db = _session()
+    _seed(db, hours=6)
+    storage.refresh_rollups(db, now=NOW)
+    first = db.execute(select(func.count(), func.sum(ActivityRollup.event_count))).one()
+    storage.refresh_rollups(db, now=NOW)
+    assert db.execute(select(func.count(), func.sum(ActivityRollup.event_count))).one() == first
+
+
+def test_purge_expired_archives_and_deletes_old_rows(tmp_path):
+    db = _session()
+    old = NOW - timedelta(days=500)
+    for i in range(7):
+        db.add(UserAction(user_id=1, action_type="LOGIN", created_at=old + timedelta(minutes=i)))
+    db.add(UserAction(user_id=1, action_type="LOGIN", created_at=NOW))
+    db.commit()
+
+    assert storage.purge_expired(db, months=13, now=NOW, dry_run=True)["user_actions"]["deleted_rows"] == 7
+    report = storage.purge_expired(db, months=13, archive_dir=str(tmp_path), chunk_size=3, now=NOW)
+    assert report["user_actions"]["deleted_rows"] == 7
+    assert db.query(UserAction).count() == 1
+    with gzip.open(report["user_actions:archive"], "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 7 and rows[0]["action_type"] == "LOGIN"
@@ -0,0 +1,40 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models import User, UserAction
+from app.services.activity_streak_service import activity_streak
+
+
+def _make_user(db):
+    sid = f"stk_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def test_streak_from_distinct_activity_dates():
+    db = SessionLocal()
+    try:
+        u = _make_user(db)
+        today = datetime.utcnow().date()
+        midday = datetime.combine(today, datetime.min.time()) + timedelta(hours=1)
+        # 오늘~39일 전 연속 활동(하루 여러 건), 41일 전 1건 (40일 전 공백)
+        for d in list(range(40)) + [41]:
+            for m in (0, 30):
+                db.add(UserAction(user_id=u.id, action_type="SLOT_SPIN", created_at=midday - timedelta(days=d, minutes=-m)))
+        db.commit()
+
+        assert activity_streak(db, u.id) == 30
+        assert activity_streak(db, u.id, lookback_days=7) == 7
+        assert activity_streak(db, u.id, lookback_days=365) == 40
+        assert activity_streak(db, u.id, lookback_days=None) == 40
+        assert activity_streak(db, u.id, today=today + timedelta(days=1)) == 0
+
+        other = _make_user(db)
+        assert activity_streak(db, other.id) == 0
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import User, UserAction, UserSegment
+from app.models.ai_models import RecommendationTemplate, UserPreference, UserRecommendation
+from app.services import ai_recommendation_service as svc_mod
+from app.services.ai_recommendation_service import AIRecommendationService
+from app.utils.redis import RedisManager
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db, n=3):
+    users = [
+        User(site_id=f"rec{i}", nickname=f"rec{i}", phone_number=f"0109000000{i}", password_hash="x",
+             invite_code="5858", is_active=True)
+        for i in range(n)
+    ]
+    db.add_all(users)
+    db.commit()
+    db.add(UserSegment(user_id=users[0].id, rfm_group="Whale"))
+    if n > 1:
+        db.add(UserSegment(user_id=users[1].id, rfm_group="Low/At-risk"))
+    db.add(UserPreference(user_id=users[0].id, preferred_games={"slot": 0.9}))
+    for u in users:
+        db.add(UserAction(user_id=u.id, action_type="GAME_SPIN",
+                          action_data=json.dumps({"v": 1, "data": {"game_type": "slot"}})))
+    db.commit()
+    return users
+
+
+def test_cached_result_reused_and_invalidated_by_new_action():
+    db = _session()
+    svc_mod.clear_segment_candidates()
+    u = _seed(db, 1)[0]
+    service = AIRecommendationService(db, RedisManager())
+
+    first = asyncio.run(service.generate_recommendations(u.id, max_recommendations=5))
+    assert [r.title for r in first][:2] == ["좋아하는 slot 게임", "VIP 특별 보상"]
+    assert first[0].personalization_factors["recent_activity"] == 1
+    assert db.query(UserRecommendation).count() == len(first)
+
+    again = asyncio.run(service.generate_recommendations(u.id, max_recommendations=5))
+    assert [r.id for r in again] == [r.id for r in first]
+
+    # 새 액션 → 워터마크 변경으로 재생성, 동일 추천은 재사용되어 INSERT 되지 않음
+    db.add(UserAction(user_id=u.id, action_type="LOGIN", action_data="{}"))
+    db.commit()
+    regenerated = asyncio.run(service.generate_recommendations(u.id, max_recommendations=5))
+    assert {r.id for r in regenerated} == {r.id for r in first}
+    assert db.query(UserRecommendation).count() == len(first)
+
+
+def test_batch_generates_for_active_users_in_chunks():
+    db = _session()
+    svc_mod.clear_segment_candidates()
+    users = _seed(db, 3)
+    db.add(RecommendationTemplate(name="comeback_event", template_type="content", target_segment="At-risk",
+                                  content_template={"title": "복귀 이벤트", "priority_score": 0.99}))
+    db.commit()
+    redis = RedisManager()
+    service = AIRecommendationService(db, redis)
+
+    stats = service.generate_batch(max_recommendations=3, chunk_size=2)
+    assert stats["users"] == 3 and stats["chunks"] == 2 and stats["reused"] == 0
+    assert db.query(UserRecommendation).count() == stats["inserted"]
+    at_risk = db.query(UserRecommendation).filter(UserRecommendation.user_id == users[1].id).all()
+    assert "복귀 이벤트" in [r.title for r in at_risk]
+
+    # 배치 결과가 온라인 캐시에 적재되어 요청 시 그대로 반환
+    online = asyncio.run(service.generate_recommendations(users[1].id, max_recommendations=3))
+    assert sorted(r.id for r in online) == sorted(r.id for r in at_risk)
+
+    again = service.generate_batch(max_recommendations=3, chunk_size=2)
+    assert again["inserted"] == 0 and again["reused"] == stats["inserted"]
@@ -0,0 +1,51 @@
+import asyncio
+
+import fakeredis
+from fakeredis import aioredis as fake_aioredis
+
+from app.utils.redis import AsyncRedisManager, RedisManager
+
+
+def test_async_manager_shares_data_with_sync_manager():
+    server = fakeredis.FakeServer()
+    sync = RedisManager(fakeredis.FakeRedis(server=server))
+    manager = AsyncRedisManager(fake_aioredis.FakeRedis(server=server), sync_manager=sync)
+
+    async def scenario():
+        assert await manager.update_streak_counter("7", "SLOT_SPIN") == 1
+        # 카운터 증가 + TTL + 출석 기록을 파이프라인 1회로 처리
+        cnt, ttl = await manager.record_streak_tick("7", "SLOT_SPIN", "2026-10-17")
+        assert cnt == 2 and 0 < ttl <= 86400
+        assert await manager.get_streak_state("7", "SLOT_SPIN") == (2, ttl)
+        assert await manager.set_nx("lock:1", "1", 60) is True
+        assert await manager.set_nx("lock:1", "1", 60) is False
+        await manager.store_temp_data("tmp:a", {"x": 1})
+        await manager.set_streak_protection("7", "SLOT_SPIN", True)
+
+    asyncio.run(scenario())
+    # 같은 키/직렬화 규칙 → 동기 매니저에서도 그대로 조회
+    assert sync.get_streak_counter("7", "SLOT_SPIN") == 2
+    assert sync.get_attendance_month("7", "SLOT_SPIN", 2026, 10) == ["2026-10-17"]
+    assert sync.get_temp_data("tmp:a") == {"x": 1}
+    assert sync.get_streak_protection("7", "SLOT_SPIN") is True
+
+
+def test_async_manager_delegates_to_sync_manager_without_async_client():
+    memory = RedisManager()  # Redis 미연결 → 메모리 폴백
+    manager = AsyncRedisManager(sync_manager=memory)
+
+    async def scenario():
+        assert await manager.set_nx("lock:1", "1", 60) is None  # 가드 비활성 신호
+        assert await manager.record_streak_tick("9", "DAILY_LOGIN", "2026-10-17") == (1, None)
+        assert await manager.record_streak_tick("9", "DAILY_LOGIN", "2026-10-17", increment=False) == (1, None)
+        return await manager.get_attendance_month("9", "DAILY_LOGIN", 2026, 10)
+
+    assert asyncio.run(scenario()) == ["2026-10-17"]
+    assert memory.get_streak_counter("9", "DAILY_LOGIN") == 1
+
+    # 동기 클라이언트만 있으면 스레드로 위임
+    sync = RedisManager(fakeredis.FakeRedis())
+    delegated = AsyncRedisManager(sync_manager=sync)
+    assert asyncio.run(delegated.update_streak_counter("9", "DAILY_LOGIN")) == 1
+    assert asyncio.run(delegated.set_nx("lock:2", "1", 60)) is True
+    assert asyncio.run(delegated.set_nx("lock:2", "1", 60)) is False
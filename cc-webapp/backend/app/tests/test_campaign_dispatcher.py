@@ -54,3 +54,60 @@ def test_dispatch_campaigns_all_and_user_ids():
     assert count2 == 0
 
     db.close()
+
+
+def test_dispatch_chunked_resume_and_cancel():
+    from sqlalchemy import update
+    from app.services import campaign_dispatcher
+    from app.services.campaign_dispatcher import dispatch_campaign
+
+    db = SessionLocal()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    u1, u2 = _seed_users(db)
+    u3 = User(site_id="u3", nickname="u3", phone_number="01000000003", password_hash="x", invite_code="5858", is_active=True)
+    db.add(u3)
+    db.commit()
+    now = datetime.utcnow().replace(tzinfo=timezone.utc)
+    camp = NotificationCampaign(title="chunk", message="m", targeting_type="all", scheduled_at=now)
+    db.add(camp)
+    db.commit()
+
+    # 두 번째 청크 처리 직전 중단(예외) → 첫 청크만 커밋된 상태
+    real_iter = campaign_dispatcher.iter_target_chunks
+
+    def crashing_iter(*a, **kw):
+        it = real_iter(*a, **kw)
+        yield next(it)
+        raise RuntimeError("worker died")
+
+    campaign_dispatcher.iter_target_chunks = crashing_iter
+    try:
+        try:
+            dispatch_campaign(db, camp, now, chunk_size=1, push=False)
+        except RuntimeError:
+            db.rollback()
+    finally:
+        campaign_dispatcher.iter_target_chunks = real_iter
+    db.refresh(camp)
+    assert camp.status == "sending"
+    assert camp.dispatch_cursor == u1.id and camp.dispatched_count == 1
+    assert db.query(Notification).count() == 1
+
+    # 재실행 시 cursor 이후부터 재개 (중복 없음)
+    assert dispatch_due_campaigns(db, now=now, chunk_size=2, push=False) == 1
+    db.refresh(camp)
+    assert camp.status == "sent" and camp.dispatched_count == 3
+    assert sorted(n.user_id for n in db.query(Notification).all()) == sorted([u1.id, u2.id, u3.id])
+
+    # 발송 중 취소되면 다음 청크 커밋에서 중단
+    c2 = NotificationCampaign(title="cancel", message="m", targeting_type="all", scheduled_at=now,
+                              status="sending")
+    db.add(c2)
+    db.commit()
+    db.execute(update(NotificationCampaign).where(NotificationCampaign.id == c2.id).values(status="cancelled"))
+    db.commit()
+    stats = dispatch_campaign(db, c2, now, chunk_size=1, push=False)
+    assert not stats.completed and stats.notifications == 0
+    assert db.query(Notification).filter(Notification.title == "cancel").count() == 0
+    db.close()
@@ -0,0 +1,76 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.olap.clickhouse_client import ClickHouseClient
+
+
+class _MockClickHouse(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests_log = []
+    connections = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        text = body.decode("utf-8")
+        if not query:  # 레거시: SQL + TSV 가 본문에 포함
+            query, _, text = text.partition("\n")
+        rows = [line for line in text.split("\n") if line]
+        self.requests_log.append({"query": query, "rows": rows})
+        self.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _MockClickHouse.requests_log = []
+    _MockClickHouse.connections = set()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _MockClickHouse)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _actions(n):
+    return [{"user_id": i, "action_type": "SLOT_SPIN", "context_json": json.dumps({"bet": 100, "i": i})} for i in range(n)]
+
+
+def test_bulk_jsoneachrow_rows_roundtrip_over_keepalive(server):
+    client = ClickHouseClient(base_url=server, insert_format="jsoneachrow", compression=True)
+    stats = client.insert_rows("user_actions", ("user_id", "action_type", "context_json"), _actions(2500), chunk_rows=1000)
+    client.close()
+
+    log = _MockClickHouse.requests_log
+    assert stats.rows == 2500 and stats.requests == 3
+    assert [len(r["rows"]) for r in log] == [1000, 1000, 500]
+    assert log[0]["query"].endswith("FORMAT JSONEachRow")
+    assert json.loads(log[-1]["rows"][-1])["user_id"] == 2499
+    assert len(_MockClickHouse.connections) == 1  # 세션 재사용
+    assert stats.wire_bytes < stats.raw_bytes
+    assert stats.rows_per_sec > 0 and stats.bytes_per_sec > 0
+
+
+def test_bulk_path_sends_fewer_bytes_than_text_path(server):
+    rows = _actions(5000)
+    text = ClickHouseClient(base_url=server, insert_format="tsv").insert_actions(rows)
+    bulk = ClickHouseClient(base_url=server, insert_format="jsoneachrow").insert_actions(rows)
+    print(f"\ntext: {text.as_dict()}\nbulk: {bulk.as_dict()}")
+
+    sent = [len(r["rows"]) for r in _MockClickHouse.requests_log]
+    assert sent[0] == 5000 and sum(sent[1:]) == 5000
+    assert text.rows == bulk.rows == 5000
+    assert bulk.wire_bytes * 3 < text.wire_bytes
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine, text
+from prometheus_client import REGISTRY
+
+from app.db.pool import build_engine_kwargs, instrument_engine, make_pool_class, pool_status
+
+
+def _sample(name: str, label: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": label}) or 0.0
+
+
+def test_build_engine_kwargs_postgres_applies_pool_settings(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 2500)
+    kw = build_engine_kwargs("postgresql://u:p@h/db", connect_args={}, echo=False, label="replica")
+    assert kw["pool_size"] == 7
+    assert kw["max_overflow"] == 3
+    assert kw["pool_pre_ping"] is True
+    assert kw["poolclass"].pool_label == "replica"
+    assert "statement_timeout=2500" in kw["connect_args"]["options"]
+
+
+def test_build_engine_kwargs_sqlite_keeps_default_pool():
+    kw = build_engine_kwargs("sqlite:///./x.db", connect_args={"check_same_thread": False}, echo=False)
+    assert "pool_size" not in kw and "poolclass" not in kw
+    assert kw["connect_args"] == {"check_same_thread": False}
+
+
+def test_instrumented_pool_records_checkout_and_age(tmp_path):
+    label = "pytest_pool"
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=make_pool_class(label),
+        pool_size=2,
+        max_overflow=0,
+    )
+    instrument_engine(eng, label)
+    before = _sample("db_pool_checkout_seconds_count", label)
+    with eng.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert _sample("db_pool_checked_out", label) == 1
+        assert pool_status(eng)["checkedout"] == 1
+    assert _sample("db_pool_checkout_seconds_count", label) == before + 1
+    assert _sample("db_pool_connection_age_seconds_count", label) >= 1
+    assert _sample("db_pool_checked_out", label) == 0
+    assert _sample("db_pool_waiting", label) == 0
+    # dispose → recreate 후에도 label 유지
+    eng.dispose()
+    assert eng.pool.pool_label == label
@@ -0,0 +1,130 @@
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.exceptions import InsufficientBalanceError
+from app.database import Base
+from app.models import EventOutbox, User, UserAction
+from app.models.history_models import GameHistory
+from app.services import game_round as game_round_mod
+from app.services.game_round import EffectDispatcher, GameRound
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _user(db, balance=100):
+    u = User(site_id="round1", nickname="round1", phone_number="01055550000", password_hash="x",
+             invite_code="5858", gold_balance=balance)
+    db.add(u)
+    db.commit()
+    return u
+
+
+@pytest.fixture
+def effects(monkeypatch):
+    calls = []
+    monkeypatch.setattr(game_round_mod, "notify_outbox", lambda: calls.append(("outbox", None)))
+    monkeypatch.setattr(game_round_mod, "get_leaderboard_service", lambda: type(
+        "LB", (), {"record_history": staticmethod(lambda h: calls.append(("leaderboard", h.action_type)))})())
+    monkeypatch.setattr(game_round_mod, "get_achievement_pipeline", lambda: type(
+        "AP", (), {"submit": staticmethod(lambda uid, hid: calls.append(("achievement", hid)))})())
+    return calls
+
+
+def test_round_commits_once_and_dispatches_effects_after_commit(effects):
+    db = _session()
+    u = _user(db)
+    commits = []
+    event.listen(db, "after_commit", lambda s: commits.append(list(effects)))
+
+    rnd = GameRound(db, u.id, "slot", dispatcher=EffectDispatcher(workers=0))
+    assert rnd.apply_balance(-10, require=10) == 90
+    assert rnd.apply_balance(25) == 115
+    assert u.gold_balance == 115  # 로드된 인스턴스 동기화
+    rnd.log_action("SLOT_SPIN", {"bet_amount": 10, "win_amount": 25})
+    rnd.log_history("WIN", delta_coin=15, result_meta={"bet": 10, "win": 25})
+    rnd.broadcast({"type": "game_event"})  # 실행 중 루프 없음 → 생략
+    rnd.commit()
+
+    assert commits == [[]]  # commit 1회, 부수효과는 commit 이후
+    assert ("outbox", None) in effects and ("leaderboard", "WIN") in effects
+    db.expire_all()
+    assert db.get(User, u.id).gold_balance == 115
+    action = db.execute(select(UserAction)).scalar_one()
+    assert json.loads(action.action_data)["data"]["win_amount"] == 25
+    assert db.execute(select(func.count()).select_from(GameHistory)).scalar() == 1
+    outbox = db.execute(select(EventOutbox)).scalar_one()  # Kafka 발행은 같은 트랜잭션의 outbox 행
+    assert outbox.event_type == "user_action" and outbox.published_at is None
+    assert outbox.payload["type"] == "SLOT_SPIN" and outbox.payload["user_id"] == u.id
+
+
+def test_insufficient_balance_and_rollback_discard_round(effects):
+    db = _session()
+    u = _user(db, balance=5)
+    with pytest.raises(InsufficientBalanceError):
+        with GameRound(db, u.id, "rps", dispatcher=EffectDispatcher(workers=0)) as rnd:
+            rnd.log_action("RPS_PLAY", {"bet_amount": 10})
+            rnd.apply_balance(-10, require=10)
+
+    assert effects == []
+    db.expire_all()
+    assert db.get(User, u.id).gold_balance == 5
+    assert db.execute(select(func.count()).select_from(UserAction)).scalar() == 0
+    assert db.execute(select(func.count()).select_from(EventOutbox)).scalar() == 0
+
+    # 결과 잔액이 음수가 되는 갱신은 require 와 무관하게 거부
+    rnd = GameRound(db, u.id, "crash", dispatcher=EffectDispatcher(workers=0))
+    with pytest.raises(InsufficientBalanceError):
+        rnd.apply_balance(-6)
+    rnd.rollback()
+
+
+def test_stats_update_inside_round_is_rolled_back_with_it(effects):
+    from app.models.game_stats_models import UserGameStats
+    from app.services.game_stats_service import GameStatsService
+
+    db = _session()
+    u = _user(db)
+    commits = []
+    event.listen(db, "after_commit", lambda s: commits.append(1))
+    rnd = GameRound(db, u.id, "crash", dispatcher=EffectDispatcher(workers=0))
+    with pytest.raises(RuntimeError):
+        try:
+            rnd.apply_balance(-10, require=10)
+            rnd.log_action("CRASH_BET", {"bet_amount": 10})
+            GameStatsService(db).update_from_round(
+                user_id=u.id, bet_amount=10, win_amount=0, final_multiplier=1.5, commit=False)
+            raise RuntimeError("later step in the round failed")  # log_history/commit 이전 실패
+        except Exception:
+            rnd.rollback()
+            raise
+
+    assert commits == [] and effects == []
+    db.expire_all()
+    assert db.get(User, u.id).gold_balance == 100
+    assert db.get(UserGameStats, u.id) is None
+    assert db.execute(select(func.count()).select_from(UserAction)).scalar() == 0
+
+
+def test_effect_dispatcher_bounds_pending_work():
+    dispatcher = EffectDispatcher(workers=1, max_pending=1)
+    try:
+        gate = threading.Event()
+        done = []
+        assert dispatcher.submit("slow", gate.wait, 5) is True
+        assert dispatcher.submit("drop", done.append, 1) is False  # 상한 초과 → drop
+        gate.set()
+        dispatcher.drain(5)
+        assert dispatcher.submit("ok", done.append, 2) is True
+        dispatcher.drain(5)
+        assert done == [2]
+    finally:
+        dispatcher.close()
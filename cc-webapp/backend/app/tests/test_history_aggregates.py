@@ -0,0 +1,104 @@
+import random
+import time
+
+from sqlalchemy import select, func
+
+from app.database import SessionLocal
+from app.models import User, GameHistory
+from app.services import history_aggregate_service as aggregates
+from app.services.achievement_evaluator import AchievementEvaluatorRegistry, EvalContext
+from app.services.history_service import log_game_history
+
+
+def _make_user(db):
+    sid = f"agg_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def _scan_streak(db, user_id, game_type=None):
+    rows = db.execute(
+        select(GameHistory.action_type, GameHistory.game_type)
+        .where(GameHistory.user_id == user_id)
+        .order_by(GameHistory.created_at.desc(), GameHistory.id.desc())
+    ).all()
+    streak = 0
+    for action_type, gtype in rows:
+        if action_type != "WIN" or (game_type and gtype != game_type):
+            break
+        streak += 1
+    return streak
+
+
+def test_incremental_counters_match_full_scan_and_rebuild():
+    db = SessionLocal()
+    try:
+        u = _make_user(db)
+        rng = random.Random(42)
+        seq = [("slot", "BET", -10), ("slot", "WIN", 30), ("rps", "BET", -5), ("rps", "WIN", 10),
+               ("slot", "WIN", 50), ("slot", "WIN", 20), ("slot", "WIN", 5)]
+        for _ in range(30):
+            seq.append((rng.choice(["slot", "rps"]), rng.choice(["BET", "WIN"]), rng.randint(1, 100)))
+        seq += [("rps", "WIN", 1), ("slot", "WIN", 2), ("slot", "WIN", 3)]
+        for game, action, delta in seq:
+            assert log_game_history(db, user_id=u.id, game_type=game, action_type=action, delta_coin=delta)
+
+        for action in ("BET", "WIN"):
+            for game in (None, "slot", "rps"):
+                q = select(func.coalesce(func.sum(GameHistory.delta_coin), 0)).where(
+                    GameHistory.user_id == u.id, GameHistory.action_type == action)
+                if game:
+                    q = q.where(GameHistory.game_type == game)
+                expected = db.execute(q).scalar()
+                assert aggregates.amount_total(db, user_id=u.id, action_type=action, game_type=game) == expected
+        for game in (None, "slot", "rps"):
+            assert aggregates.win_streak(db, user_id=u.id, game_type=game) == _scan_streak(db, u.id, game)
+
+        incremental = (aggregates.win_streak(db, user_id=u.id), aggregates.win_streak(db, user_id=u.id, game_type="slot"),
+                       aggregates.amount_total(db, user_id=u.id, action_type="WIN"))
+        aggregates.rebuild(db, user_ids=[u.id])
+        rebuilt = (aggregates.win_streak(db, user_id=u.id), aggregates.win_streak(db, user_id=u.id, game_type="slot"),
+                   aggregates.amount_total(db, user_id=u.id, action_type="WIN"))
+        assert incremental == rebuilt == (3, 2, incremental[2])
+    finally:
+        db.close()
+
+
+def test_registered_evaluators_read_counters():
+    db = SessionLocal()
+    try:
+        u = _make_user(db)
+        last = None
+        for _ in range(3):
+            last = log_game_history(db, user_id=u.id, game_type="slot", action_type="WIN", delta_coin=100)
+        ctx = EvalContext(db=db, history=last)
+        r = AchievementEvaluatorRegistry.evaluate(ctx, {"type": "TOTAL_WIN_AMOUNT", "game_type": "slot", "threshold": 250})
+        assert r.progress == 300 and r.unlocked
+        r = AchievementEvaluatorRegistry.evaluate(ctx, {"type": "WIN_STREAK", "threshold": 3})
+        assert r.progress == 3 and r.unlocked
+        r = AchievementEvaluatorRegistry.evaluate(ctx, {"type": "CUMULATIVE_BET", "game_type": "rps", "threshold": 1})
+        assert r.progress == 0 and not r.unlocked
+    finally:
+        db.close()
+
+
+def test_gacha_pulls_and_draws_do_not_break_the_win_streak():
+    db = SessionLocal()
+    try:
+        u = _make_user(db)
+        seq = [("slot", "BET", -10), ("slot", "WIN", 30), ("gacha", "PULL", -50), ("slot", "WIN", 20),
+               ("rps", "DRAW", 0), ("slot", "WIN", 5)]
+        for game, action, delta in seq:
+            assert log_game_history(db, user_id=u.id, game_type=game, action_type=action, delta_coin=delta)
+        incremental = (aggregates.win_streak(db, user_id=u.id), aggregates.win_streak(db, user_id=u.id, game_type="slot"))
+        assert incremental == (3, 3)
+        aggregates.rebuild(db, user_ids=[u.id])
+        assert (aggregates.win_streak(db, user_id=u.id), aggregates.win_streak(db, user_id=u.id, game_type="slot")) == (3, 3)
+
+        log_game_history(db, user_id=u.id, game_type="slot", action_type="BET", delta_coin=-10)  # 패배는 끊음
+        assert aggregates.win_streak(db, user_id=u.id) == 0
+    finally:
+        db.close()
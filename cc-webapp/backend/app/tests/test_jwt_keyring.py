@@ -0,0 +1,88 @@
+import json
+import os
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from app.core.jwt_keyring import KeyRing, keys_from_env, legacy_kid_from_env
+
+
+def test_keys_from_env_parses_kid_prefixed_fallbacks():
+    active, keys = keys_from_env({
+        "JWT_KEY_ID": "v3", "JWT_SECRET_KEY": "k3",
+        "JWT_SECRET_KEY_FALLBACKS": "v2:k2, legacy", "ALLOW_JWT_FALLBACKS": "0",
+    })
+    assert active == "v3"
+    assert keys == {"v3": "k3", "v2": "k2", "env_fallback_1": "legacy"}
+
+
+def test_pre_keyring_kid_from_key_rotation_version_maps_to_primary_key():
+    env = {"JWT_SECRET_KEY": "k1", "KEY_ROTATION_VERSION": "r7", "ALLOW_JWT_FALLBACKS": "0"}
+    assert keys_from_env(env) == ("r7", {"r7": "k1"})
+    active, keys = keys_from_env(dict(env, JWT_KEY_ID="v2"))
+    assert active == "v2" and keys == {"v2": "k1", "r7": "k1"}
+
+    ring = KeyRing(keys=keys, active=active, path="")
+    legacy = jwt.encode({"sub": "a", "user_id": 1}, "k1", algorithm="HS256", headers={"kid": "r7"})
+    assert ring.decode(legacy) == ({"sub": "a", "user_id": 1}, "r7")
+
+
+def test_pre_keyring_kid_token_still_verifies_after_secret_rotation():
+    # 회전 전: kid=v1 토큰을 JWT_SECRET_KEY=old 로 발급 (키 링 도입 전 auth_service 동작)
+    token = jwt.encode({"sub": "a", "user_id": 1}, "old", algorithm="HS256", headers={"kid": "v1"})
+    # 회전 후: 새 키가 JWT_SECRET_KEY, 이전 키는 fallback 으로 이동 (kid 미지정 → env_fallback_0)
+    env = {"JWT_SECRET_KEY": "new", "JWT_SECRET_KEY_FALLBACKS": "old", "ALLOW_JWT_FALLBACKS": "0"}
+    active, keys = keys_from_env(env)
+    assert keys == {"v1": "new", "env_fallback_0": "old"}
+    ring = KeyRing(keys=keys, active=active, path="", legacy_kid=legacy_kid_from_env(env))
+    assert ring.decode(token) == ({"sub": "a", "user_id": 1}, "env_fallback_0")
+    assert ring.decode(ring.sign({"sub": "b"}))[1] == "v1"
+
+    # 어떤 키로도 서명되지 않은 레거시 kid 토큰은 여전히 거부, 만료 토큰은 순회 없이 만료 오류
+    with pytest.raises(JWTError):
+        ring.decode(jwt.encode({"sub": "c"}, "unknown", algorithm="HS256", headers={"kid": "v1"}))
+    expired = jwt.encode({"sub": "d", "exp": int(time.time()) - 10}, "new", algorithm="HS256", headers={"kid": "v1"})
+    with pytest.raises(jwt.ExpiredSignatureError):
+        ring.decode(expired)
+
+
+def test_kid_lookup_single_decode_and_legacy_scan(monkeypatch):
+    ring = KeyRing(keys={"v2": "new", "v1": "old"}, active="v2", path="")
+    token = ring.sign({"sub": "a", "user_id": 1})
+    assert jwt.get_unverified_header(token)["kid"] == "v2"
+
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **k: calls.append(a[1]) or real_decode(*a, **k))
+    payload, kid = ring.decode(token)
+    assert (payload["user_id"], kid, calls) == (1, "v2", ["new"])
+
+    # kid 없는 레거시 토큰은 전체 순회
+    calls.clear()
+    legacy = jwt.encode({"sub": "b", "user_id": 2}, "old", algorithm="HS256")
+    assert ring.decode(legacy) == ({"sub": "b", "user_id": 2}, "v1")
+    assert calls == ["new", "old"]
+
+    # kid 가 등록된 키와 서명 불일치 → 다른 키로 재시도하지 않음
+    forged = jwt.encode({"sub": "c"}, "old", algorithm="HS256", headers={"kid": "v2"})
+    with pytest.raises(JWTError):
+        ring.decode(forged)
+
+
+def test_rotation_from_file_without_restart(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"active": "v1", "keys": {"v1": "one"}}))
+    ring = KeyRing(path=str(path), reload_seconds=0)
+    old_token = ring.sign({"sub": "a"})
+
+    path.write_text(json.dumps({"active": "v2", "keys": {"v2": "two", "v1": "one"}}))
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    new_token = ring.sign({"sub": "a"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "v2"
+    assert ring.decode(old_token)[1] == "v1" and ring.decode(new_token)[1] == "v2"
+
+    # 잘못된 파일은 무시하고 기존 링 유지
+    path.write_text("{broken")
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert ring.active_kid == "v2"
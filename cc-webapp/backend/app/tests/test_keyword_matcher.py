@@ -0,0 +1,55 @@
+import asyncio
+import random
+
+from app.utils import sentiment_analyzer as sa
+from app.utils.emotion_engine import EmotionEngine
+from app.utils.keyword_matcher import KeywordMatcher
+
+
+def test_matcher_equals_substring_scan_with_overlaps():
+    # 접두 포함(ab/abc), 중간 포함(b/abc), 접미-접두 겹침(실패/패배, cd/dc)
+    keywords = ["ab", "abc", "b", "cd", "dc", "실패", "패배", "와", "와우"]
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(3)
+    alphabet = "abcd 실패배와우"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert matcher.find(text) == {k for k in keywords if k in text}, text
+    assert matcher.find("실패배") == {"실패", "패배"}
+    assert KeywordMatcher([]).find("anything") == set()
+
+
+def test_emotion_engine_compiled_matches_keyword_loop():
+    engine = EmotionEngine()
+    text = "완벽한 승리! 근데 좀 짜증 나고 실패배 느낌"
+    result = asyncio.run(engine.detect_emotion_from_text(text))
+    assert result["emotion"] == "joy"
+    assert result["details"]["joy"] == {"score": 2.0, "keywords": ["완벽", "승리"]}
+    assert result["details"]["sad"]["keywords"] == ["실패", "패배"]
+    assert result["details"]["angry"]["score"] == 1.2
+    assert engine.analyze_many([text, "", text]) == [result, engine.analyze_text(""), result]
+    assert EmotionEngine()._matcher is engine._matcher  # 컴파일 결과 공유
+
+
+def test_emotion_engine_keywords_are_per_instance():
+    engine, other = EmotionEngine(), EmotionEngine()
+    engine.emotion_keywords["calm"]["keywords"].append("힐링")
+    assert engine.analyze_text("오늘은 힐링")["emotion"] == "calm"
+    assert other.analyze_text("오늘은 힐링")["details"] == {}  # 다른 인스턴스/매처는 그대로
+    assert "힐링" not in EmotionEngine().emotion_keywords["calm"]["keywords"]
+
+    first, second = engine.analyze_many(["대박 성공", "대박 성공"])
+    first["details"]["joy"]["keywords"].clear()
+    assert second["details"]["joy"]["keywords"] == ["대박", "성공"]
+
+
+def test_sentiment_shared_analyzer_and_batch():
+    sa.reset_sentiment_analyzer()
+    assert sa.get_sentiment_analyzer() is sa.get_sentiment_analyzer()
+    texts = ["와 대박 최고", "so angry and mad", "와 대박 최고"]
+    results = sa.analyze_many(texts)
+    assert results[0] == results[2] and results[0] is not results[2]
+    assert results[0].emotion == sa.SupportedEmotion.EXCITED
+    assert results[0].scores == {sa.SupportedEmotion.EXCITED: 3 / 8}
+    assert results[1].scores == {sa.SupportedEmotion.ANGER: 2 / 5}
+    sa.reset_sentiment_analyzer()
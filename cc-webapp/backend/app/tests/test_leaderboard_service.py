@@ -0,0 +1,81 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from app.database import SessionLocal
+from app.models import User
+from app.services.history_service import log_game_history
+from app.services.leaderboard_service import (
+    LeaderboardService, MemoryLeaderboardStore, RedisLeaderboardStore, score_for,
+)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def board(request):
+    if request.param == "redis":
+        store = RedisLeaderboardStore(fakeredis.FakeRedis(decode_responses=True))
+    else:
+        store = MemoryLeaderboardStore()
+    return LeaderboardService(store=store)
+
+
+def test_top_and_rank_per_period(board):
+    now = datetime(2026, 10, 14, 12, 0)  # 수요일
+    last_week = now - timedelta(days=7)
+    board.record(1, "slot", 100, at=now)
+    board.record(2, "slot", 300, at=now)
+    board.record(3, "rps", 50, at=now)
+    board.record(1, "slot", 250, at=now)
+    board.record(3, "slot", 1000, at=last_week)
+
+    assert [(r["user_id"], r["score"]) for r in board.top("slot", "daily", at=now)] == [(1, 350.0), (2, 300.0)]
+    assert [r["user_id"] for r in board.top("slot", "all_time", at=now)] == [3, 1, 2]
+    assert [r["user_id"] for r in board.top(None, "weekly", at=now)] == [1, 2, 3]
+    assert board.rank(2, "slot", "weekly", at=now) == {"rank": 2, "user_id": 2, "score": 300.0}
+    assert board.rank(3, "slot", "daily", at=now) is None
+    assert board.top("slot", "daily", limit=1, at=now)[0]["user_id"] == 1
+
+
+def test_score_rules():
+    assert score_for("slot", "WIN", 90) == 90
+    assert score_for("slot", "BET", -10) == 0
+    assert score_for("rps", "WIN", -5) == 0
+    assert score_for("gacha", "PULL", -500, {"rare_count": 2, "ultra_rare_count": 1}) == 7
+
+
+def _score(board, user_id, game, period):
+    found = board.rank(user_id, game, period)
+    return found["score"] if found else None
+
+
+def test_rebuild_matches_incremental_updates():
+    db = SessionLocal()
+    incremental = LeaderboardService(store=MemoryLeaderboardStore())
+    rebuilt = LeaderboardService(store=MemoryLeaderboardStore())
+    try:
+        users = []
+        for i in range(3):
+            sid = f"lb_{i}_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+            u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+            db.add(u)
+            db.commit()
+            users.append(u)
+        rng = random.Random(7)
+        for _ in range(40):
+            u = rng.choice(users)
+            game = rng.choice(["slot", "crash"])
+            win = rng.random() < 0.5
+            rec = log_game_history(db, user_id=u.id, game_type=game, action_type="WIN" if win else "BET",
+                                   delta_coin=rng.randint(1, 500) if win else -rng.randint(1, 50))
+            incremental.record_history(rec)
+        rebuilt.rebuild(db)
+        for game in ("slot", "crash", None):
+            for period in ("daily", "weekly", "all_time"):
+                for u in users:
+                    # 공유 테스트 DB 의 다른 사용자 기록이 rebuild 에 포함되므로 점수만 비교
+                    assert _score(rebuilt, u.id, game, period) == _score(incremental, u.id, game, period)
+    finally:
+        db.close()
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from app.services import limited_package_service as lps_mod
+from app.services.limited_package_service import LimitedPackageService
+from app.utils.redis import RedisManager
+
+CODE = "WEEKEND_STARTER"
+
+
+@pytest.fixture(params=["memory", "redis"])
+def manager(request, monkeypatch):
+    # redis: fakeredis (lupa 설치 시 Lua 스크립트 경로, 미설치 시 락 기반 명령 경로)
+    client = fakeredis.FakeRedis() if request.param == "redis" else None
+    mgr = RedisManager(client)
+    monkeypatch.setattr(lps_mod, "get_redis_manager", lambda: mgr)
+    monkeypatch.setattr(LimitedPackageService, "_catalog", {})  # 기본 카탈로그 재시드
+    monkeypatch.setattr(LimitedPackageService, "_stock_counts", {})
+    monkeypatch.setattr(LimitedPackageService, "_holds_mem", {})
+    monkeypatch.setattr(LimitedPackageService, "_hold_qty_mem", {})
+    monkeypatch.setattr(LimitedPackageService, "_user_purchases", {})
+    LimitedPackageService.set_initial_stock(CODE, 20)
+    return mgr
+
+
+def test_concurrent_reserve_never_fails_while_stock_remains(manager):
+    results = []
+    barrier = threading.Barrier(50)
+
+    def buyer():
+        barrier.wait()
+        results.append(LimitedPackageService.reserve(CODE, 1, ttl_seconds=60))
+
+    threads = [threading.Thread(target=buyer) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    holds = [h for ok, h in results if ok]
+    assert len(holds) == 20 and len(set(holds)) == 20
+    assert LimitedPackageService.get_stock(CODE) == 0
+
+    # 해제는 1회만 재고 복원, 확정은 hold 제거 + 사용자 구매 수 증가
+    assert LimitedPackageService.release_hold(CODE, holds[0]) == 1
+    assert LimitedPackageService.release_hold(CODE, holds[0]) == 0
+    assert LimitedPackageService.finalize_hold(CODE, holds[1], 7, 1) == 1
+    assert LimitedPackageService.release_hold(CODE, holds[1]) == 0
+    assert LimitedPackageService.get_stock(CODE) == 1
+    assert LimitedPackageService.get_user_purchased(CODE, 7) == 1
+
+
+def test_expired_holds_return_to_stock_on_next_reserve(manager):
+    ok, hold = LimitedPackageService.reserve(CODE, 20, ttl_seconds=-1)  # 즉시 만료
+    assert ok and LimitedPackageService.get_stock(CODE) == 0
+    # 다음 reserve 가 같은 원자 단계에서 만료 hold 를 회수한 뒤 차감
+    ok2, _ = LimitedPackageService.reserve(CODE, 5, ttl_seconds=60)
+    assert ok2 and LimitedPackageService.get_stock(CODE) == 15
+    # 만료 회수된 hold 의 결제가 뒤늦게 확정되면 판매분을 재고에서 다시 차감
+    LimitedPackageService.finalize_hold(CODE, hold, 8, 20)
+    assert LimitedPackageService.get_stock(CODE) == -5
+    assert LimitedPackageService.sweep_expired_holds(CODE) == 0
@@ -33,3 +33,37 @@ def test_global_metrics_cache_window():
     assert r3.status_code == 200
     g3 = r3.json()["generated_at"]
     assert g3 != g2
+
+
+def test_stream_keeps_running_after_snapshot_error(monkeypatch):
+    import asyncio
+    from app.routers import metrics as metrics_router
+
+    class _Store:
+        calls = 0
+
+        async def subscribe(self, name, min_interval=0.0):
+            _Store.calls += 1
+            if _Store.calls == 1:
+                raise RuntimeError("db down")
+            yield {"online_users": 1}
+
+    async def _no_sleep(_):
+        return None
+
+    monkeypatch.setattr(metrics_router, "get_snapshot_store", lambda: _Store())
+    monkeypatch.setattr(metrics_router.asyncio, "sleep", _no_sleep)
+
+    async def first_events():
+        response = await metrics_router.stream_global_metrics(interval=2)
+        events = []
+        async for chunk in response.body_iterator:
+            events.append(chunk)
+            if len(events) == 2:
+                break
+        await response.body_iterator.aclose()
+        return events
+
+    error, metrics = asyncio.run(first_events())
+    assert error.startswith("event: error") and "db down" in error
+    assert metrics.startswith("event: metrics")
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import fakeredis.aioredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.realtime.broker import NotificationBroker, RedisStreamLog, parse_resume_token
+from app.routers import notifications as notif_router
+
+
+def test_replay_buffer_topics_and_priority():
+    async def scenario():
+        broker = NotificationBroker(replay_size=3)
+        alpha = await broker.register_sse(1, {"alpha"})
+        everything = await broker.register_sse(1)
+        await broker.enqueue(1, {"m": 1}, topic="alpha")
+        await broker.enqueue(1, {"m": 2}, topic="beta", priority=5)
+        await broker.enqueue(2, {"m": "other"}, topic="alpha")
+        assert alpha.qsize() == 1 and everything.qsize() == 2
+        # 높은 priority 먼저
+        assert (await everything.get())[1]["data"] == {"m": 2}
+        assert (await everything.get())[1]["data"] == {"m": 1}
+
+        for i in range(3, 6):
+            await broker.enqueue(1, {"m": i}, topic="alpha")
+        assert [e["id"] for e in broker.get_backfill(1, None)] == [3, 4, 5]  # 링 버퍼 3개 유지
+        assert [e["id"] for e in broker.get_backfill(1, 3)] == [4, 5]
+        await broker.unregister_sse(1, alpha)
+        assert broker.subscriber_count(1) == 1
+
+    asyncio.run(scenario())
+
+
+def test_resume_token_does_not_skip_lower_priority_events_still_queued():
+    async def scenario():
+        broker = NotificationBroker()
+        q = await broker.register_sse(3)
+        await broker.enqueue(3, {"m": "low"})                 # id 1
+        await broker.enqueue(3, {"m": "high"}, priority=9)    # id 2
+        _, ev = await q.get()
+        assert ev["id"] == 2 and q.resume_token() == "0+2"
+        # id 1 이 큐에 남은 채 끊김 → 토큰으로 재개하면 1 만 재전송 (2 는 이미 받음)
+        cursor, seen = parse_resume_token(q.resume_token())
+        assert [e["id"] for e in await broker.backfill(3, cursor, skip=seen)] == [1]
+        _, ev = await q.get()
+        assert ev["id"] == 1 and q.resume_token() == "2"
+        assert parse_resume_token("2") == (2, set())
+
+    asyncio.run(scenario())
+
+
+def test_redis_streams_cross_worker_replay_and_fanout():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        a = NotificationBroker(stream=RedisStreamLog(redis, prefix="t", maxlen=50))
+        b = NotificationBroker(stream=RedisStreamLog(redis, prefix="t", maxlen=50))
+        await b.start()
+        await asyncio.sleep(0.05)
+        q = await b.register_sse(9, {"alpha"})
+        await a.enqueue(9, {"m": "x"}, topic="alpha")
+        await a.enqueue(9, {"m": "y"}, topic="alpha")
+        _, ev = await asyncio.wait_for(q.get(), timeout=3)  # 다른 워커에서 온 이벤트
+        assert ev["data"] == {"m": "x"} and ev["id"] == 1
+        # 새 워커(로컬 버퍼 없음)도 스트림에서 Last-Event-ID 이후 재전송
+        c = NotificationBroker(stream=RedisStreamLog(redis, prefix="t", maxlen=50))
+        assert [e["data"]["m"] for e in await c.backfill(9, 1)] == ["y"]
+        await b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_sse_and_rest_routes_use_broker(monkeypatch):
+    broker = NotificationBroker()
+    monkeypatch.setattr(notif_router, "manager", broker)
+    app = FastAPI()
+    app.include_router(notif_router.router)
+    app.include_router(notif_router.api_router)
+    client = TestClient(app)
+
+    for i, topic in enumerate(["alpha", "beta", "beta"]):
+        r = client.post("/api/notifications/5/send", json={"message": {"m": i}, "topic": topic})
+        assert r.status_code == 200
+    r = client.get("/api/notifications/5/backfill", params={"since": 1, "topics": "beta"})
+    assert [it["data"]["m"] for it in r.json()["items"]] == [1, 2]
+
+    with client.websocket_connect("/ws/notifications/5?topics=beta&lastEventId=2") as ws:
+        assert ws.receive_json()["data"] == {"m": 2}  # 재전송
+        client.post("/api/notifications/5/send", json={"message": {"m": "live"}, "topic": "beta"})
+        assert ws.receive_json()["data"] == {"m": "live"}
+        ws.send_text(json.dumps({"type": "unsubscribe", "topics": ["beta"]}))
@@ -0,0 +1,151 @@
+import json
+import threading
+from collections import namedtuple
+
+from app.consumers import olap_worker
+from app.consumers.olap_worker import LocalDLQ, LocalSink, OlapIngestor, replay_messages
+from app.core.config import settings
+
+Msg = namedtuple("Msg", "topic value")
+TP = namedtuple("TP", "topic partition")
+
+
+class FakeConsumer:
+    """kafka-python KafkaConsumer 최소 stand-in (poll/commit/pause/resume)."""
+
+    def __init__(self, batches, stop):
+        self.batches = list(batches)
+        self.stop = stop
+        self.consumed = 0
+        self.committed = 0
+        self.paused = False
+        self.pause_calls = 0
+        self.closed = False
+
+    def poll(self, timeout_ms=0, max_records=None):
+        if self.paused:
+            return {}
+        if not self.batches:
+            self.stop.set()
+            return {}
+        batch = self.batches.pop(0)
+        self.consumed += len(batch)
+        return {TP("t", 0): batch}
+
+    def commit(self):
+        self.committed = self.consumed
+
+    def assignment(self):
+        return {TP("t", 0)}
+
+    def pause(self, *tps):
+        self.paused = True
+        self.pause_calls += 1
+
+    def resume(self, *tps):
+        self.paused = False
+
+    def close(self):
+        self.closed = True
+
+
+def _action(i):
+    return Msg(settings.KAFKA_ACTIONS_TOPIC, json.dumps({"user_id": i, "action_type": "SPIN"}).encode())
+
+
+def _reward(i):
+    return Msg(settings.KAFKA_REWARDS_TOPIC, json.dumps({"user_id": i, "reward_type": "COIN", "reward_value": 5}).encode())
+
+
+def _ingestor(sink, dlq, **kw):
+    kw.setdefault("batch_size", 10)
+    kw.setdefault("flush_seconds", 3600)
+    return OlapIngestor(sink, dlq, backoff_seconds=0, sleep=lambda s: None, **kw)
+
+
+def test_retry_then_write_and_full_dlq_on_permanent_failure():
+    sink = LocalSink(fail_times={"user_actions": 2, "rewards": -1})  # actions: 2회 실패 후 성공, rewards: 항상 실패
+    dlq = LocalDLQ()
+    ing = _ingestor(sink, dlq, max_retries=3)
+    for i in range(250):
+        ing.add(settings.KAFKA_ACTIONS_TOPIC, {"user_id": i, "action_type": "SPIN"})
+        ing.add(settings.KAFKA_REWARDS_TOPIC, {"user_id": i, "reward_type": "COIN", "reward_value": 1})
+    assert ing.flush() is True
+    assert len(sink.rows["user_actions"]) == 250 and sink.calls["user_actions"] == 3
+    # 레거시 구현은 100건만 DLQ 로 보냈음 → 전체 250건 확인
+    dlq_records = [r for m in dlq.messages if m["stream"] == "rewards" for r in m["records"]]
+    assert len(dlq_records) == 250
+    assert ing.buffered() == 0
+    ing.close()
+
+
+def test_no_commit_until_flush_succeeds():
+    stop = threading.Event()
+    batches = [[_action(i) for i in range(6)], [_reward(i) for i in range(6)]]
+    consumer = FakeConsumer(batches, stop)
+    sink = LocalSink(fail_times={"rewards": 3})
+    dlq = LocalDLQ(fail=True)  # DLQ 까지 실패 → commit 금지, pause 후 재시도
+    ing = _ingestor(sink, dlq, max_retries=0)
+    olap_worker.run(consumer=consumer, sink=sink, stop=stop, ingestor=ing)
+    assert consumer.pause_calls == 1 and not consumer.paused
+    assert consumer.committed == 12
+    assert len(sink.rows["user_actions"]) == 6 and len(sink.rows["rewards"]) == 6
+    assert consumer.closed
+
+
+def test_replay_messages_writes_dlq_records():
+    sink = LocalSink()
+    msgs = olap_worker.dlq_messages("purchases", [{"user_id": i, "code": "P"} for i in range(7)], "boom", 3)
+    assert [len(m["records"]) for m in msgs] == [3, 3, 1]
+    stats = replay_messages(msgs, sink)
+    assert stats == {"messages": 3, "records": 7}
+    assert len(sink.rows["purchases"]) == 7
+
+
+def test_replay_run_uses_one_ingestor_and_closes_it(monkeypatch):
+    built = []
+
+    class TrackingIngestor(OlapIngestor):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.closed = False
+            built.append(self)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    class ReplayConsumer(FakeConsumer):
+        def __iter__(self):
+            return iter(self.batches)
+
+    monkeypatch.setattr(olap_worker, "OlapIngestor", TrackingIngestor)
+    msgs = olap_worker.dlq_messages("rewards", [{"user_id": i, "reward_type": "COIN"} for i in range(5)], "boom", 2)
+    consumer = ReplayConsumer([Msg(settings.KAFKA_DLQ_TOPIC, json.dumps(m).encode()) for m in msgs], threading.Event())
+    sink = LocalSink()
+    assert olap_worker.replay(consumer=consumer, sink=sink) == {"messages": 3, "records": 5}
+    assert len(built) == 1 and built[0].closed and consumer.closed
+    assert len(sink.rows["rewards"]) == 5
+
+
+def test_outbox_relay_envelope_is_unwrapped_before_mapping():
+    from datetime import datetime
+    from types import SimpleNamespace
+    from app.services.outbox_relay import _to_message
+
+    row = SimpleNamespace(id=7, event_type="purchase", schema_version=1, dedupe_key="buy_package:c1",
+                          created_at=datetime(2026, 10, 18, 12, 0, 0),
+                          payload={"type": "BUY_PACKAGE", "user_id": 42, "code": "PKG", "quantity": 2,
+                                   "total_price_cents": 990, "gold_granted": 500, "charge_id": "c1",
+                                   "server_ts": "2026-10-18T12:00:00"})
+    message = _to_message(row)
+    ingestor = _ingestor(LocalSink(), LocalDLQ())
+    try:
+        assert ingestor.add(message.topic, json.loads(message.value))
+        assert ingestor.add(settings.KAFKA_ACTIONS_TOPIC, {"user_id": 1, "action_type": "SPIN"})  # 기존 flat
+        row = ingestor.buffers["purchases"][0]
+        assert row == {"user_id": 42, "code": "PKG", "quantity": 2, "total_price_cents": 990,
+                       "gems_granted": 500, "charge_id": "c1", "purchased_at": "2026-10-18T12:00:00"}
+        assert ingestor.buffers["user_actions"][0]["user_id"] == 1
+    finally:
+        ingestor.close()
@@ -0,0 +1,101 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import EventOutbox
+from app.services.outbox_producer import enqueue_outbox
+from app.core.config import settings
+from app.services.outbox_relay import DiscardOutboxSink, InMemoryOutboxSink, OutboxRelay, topic_for
+
+
+def _factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _enqueue(Session, n, event_type="user_action"):
+    with Session() as db:
+        for i in range(n):
+            enqueue_outbox(db, event_type, {"user_id": i % 3, "seq": i}, dedupe_key=f"k{i}")
+        db.commit()
+
+
+def test_relay_publishes_in_batches_and_marks_rows_in_bulk():
+    Session = _factory()
+    _enqueue(Session, 7)
+    sink = InMemoryOutboxSink()
+    relay = OutboxRelay(sink=sink, session_factory=Session, batch_size=3)
+
+    assert relay.run_once() == 3
+    assert relay.drain() == 4
+    assert relay.run_once() == 0
+
+    values = [json.loads(m.value) for m in sink.messages]
+    assert [v["payload"]["seq"] for v in values] == list(range(7))  # id 순서
+    assert {m.topic for m in sink.messages} == {topic_for("user_action")}
+    assert sink.messages[1].key == b"1"  # user_id 파티션 키
+    with Session() as db:
+        assert db.execute(select(func.count()).where(EventOutbox.published_at.is_(None))).scalar() == 0
+    stats = relay.stats()
+    assert stats["published"] == 7 and stats["batches"] == 3 and stats["lag_seconds"] == 0.0
+
+
+def test_failed_rows_retry_until_max_attempts_and_prune_removes_old_rows():
+    Session = _factory()
+    _enqueue(Session, 3)
+    sink = InMemoryOutboxSink()
+    relay = OutboxRelay(sink=sink, session_factory=Session, batch_size=10, max_attempts=2,
+                        retention=timedelta(hours=1))
+    with Session() as db:
+        poison = db.execute(select(EventOutbox.id).order_by(EventOutbox.id)).scalars().first()
+    sink.fail_ids = {poison}
+
+    assert relay.run_once() == 2  # 부분 실패: 나머지는 발행/마킹
+    assert relay.lag_seconds() >= 0.0
+    assert relay.run_once() == 0
+    with Session() as db:
+        row = db.get(EventOutbox, poison)
+        assert row.published_at is None and row.publish_attempts == 2
+    # 시도 상한 초과 행은 claim 대상에서 제외
+    assert relay.run_once() == 0 and relay.lag_seconds() == 0.0
+
+    assert relay.prune(now=datetime.utcnow()) == 0  # 보존 기간 이내
+    assert relay.prune(now=datetime.utcnow() + timedelta(hours=2)) == 2
+    with Session() as db:
+        assert db.execute(select(EventOutbox.id)).scalars().all() == [poison]
+
+
+def test_relay_worker_wakes_on_notify():
+    Session = _factory()
+    sink = InMemoryOutboxSink()
+    relay = OutboxRelay(sink=sink, session_factory=Session, workers=1, poll_interval=5.0)
+    relay.start()
+    try:
+        time.sleep(0.05)  # 첫 (빈) 배치 후 폴링 대기 진입
+        _enqueue(Session, 2)
+        relay.notify()
+        deadline = time.time() + 3
+        while len(sink.messages) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(sink.messages) == 2
+    finally:
+        relay.shutdown(wait=True)
+
+
+def test_default_sink_without_kafka_marks_rows_so_prune_bounds_the_table(monkeypatch):
+    monkeypatch.setattr(settings, "KAFKA_ENABLED", False)
+    Session = _factory()
+    _enqueue(Session, 4, event_type="purchase")
+    relay = OutboxRelay(session_factory=Session, batch_size=10, retention=timedelta(hours=1))
+
+    assert relay.run_once() == 4
+    assert isinstance(relay.sink, DiscardOutboxSink)
+    assert relay.prune(now=datetime.utcnow() + timedelta(hours=2)) == 4
+    with Session() as db:
+        assert db.execute(select(func.count()).select_from(EventOutbox)).scalar() == 0
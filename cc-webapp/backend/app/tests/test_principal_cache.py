@@ -0,0 +1,153 @@
+import asyncio
+import random
+import threading
+import time
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.dependencies import get_current_user
+from app.models import User
+from app.auth.token_manager import TokenManager
+from app.services.admin_service import AdminService
+from app.services.auth_service import AuthService
+from app.services.principal_cache import Principal, PrincipalCache, get_principal_cache
+
+
+def _count_queries():
+    # 이 스레드의 쿼리만 센다 (백그라운드 잡/스레드가 같은 엔진을 쓰므로)
+    seen = []
+    me = threading.get_ident()
+
+    def _on_execute(conn, cursor, statement, *args):
+        if threading.get_ident() == me:
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    return seen, lambda: event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+def _auth(db, token):
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return asyncio.run(get_current_user(credentials=creds, db=db))
+
+
+def test_cached_principal_skips_db_until_logout():
+    db = SessionLocal()
+    get_principal_cache().clear()
+    try:
+        sid = f"pc_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+        u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+        db.add(u)
+        db.commit()
+        token = AuthService.create_access_token({"sub": u.site_id, "user_id": u.id, "is_admin": False})
+        AuthService.create_session(db, u, token)
+        db.expunge_all()
+
+        assert _auth(db, token).id == u.id  # miss → verify + 캐시 적재
+        db.expunge_all()
+        seen, stop = _count_queries()
+        try:
+            user = _auth(db, token)
+            assert user.id == u.id and user.nickname == sid
+            assert len(seen) == 1  # User PK 조회만 (토큰/세션 검증 생략)
+        finally:
+            stop()
+
+        AuthService.blacklist_token(db, token)
+        assert get_principal_cache().get(token) is None
+    finally:
+        db.close()
+
+
+def test_deleted_user_with_cached_principal_gets_404():
+    db = SessionLocal()
+    cache = get_principal_cache()
+    cache.clear()
+    try:
+        sid = f"pcd_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+        u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+        db.add(u)
+        db.commit()
+        uid = u.id
+        token = AuthService.create_access_token({"sub": sid, "user_id": uid})
+        jti = jwt.get_unverified_claims(token)["jti"]
+        cache.put(token, Principal(jti=jti, user_id=uid, site_id=sid, is_admin=False, exp=time.time() + 60))
+
+        db.delete(u)
+        db.commit()
+        db.expunge_all()
+        with pytest.raises(HTTPException) as exc:
+            _auth(db, token)
+        assert exc.value.status_code == 404
+        assert cache.get(token) is None
+    finally:
+        db.close()
+
+
+def test_revoke_and_ban_paths_drop_cached_principals():
+    db = SessionLocal()
+    cache = get_principal_cache()
+    cache.clear()
+    try:
+        sid = f"pcr_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+        u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+        db.add(u)
+        db.commit()
+
+        def cached():
+            token = AuthService.create_access_token({"sub": sid, "user_id": u.id})
+            jti = jwt.get_unverified_claims(token)["jti"]
+            cache.put(token, Principal(jti=jti, user_id=u.id, site_id=sid, is_admin=False, exp=time.time() + 60))
+            return token
+
+        token = cached()
+        TokenManager.revoke_all_refresh_tokens(u.id, db)
+        assert cache.get(token) is None
+        token = cached()
+        AdminService(db).ban_user(u.id, reason="test")
+        assert cache.get(token) is None
+    finally:
+        db.close()
+
+
+def test_forged_token_with_cached_jti_misses():
+    cache = PrincipalCache(ttl_seconds=60)
+    token = AuthService.create_access_token({"sub": "x", "user_id": 1})
+    jti = jwt.get_unverified_claims(token)["jti"]
+    cache.put(token, Principal(jti=jti, user_id=1, site_id="x", is_admin=False, exp=time.time() + 30))
+    assert cache.get(token).user_id == 1
+    head, payload, sig = token.split(".")
+    assert cache.get(f"{head}.{payload}.{sig[::-1]}") is None
+    # exp 경과 시 만료
+    assert cache.get(token, now=time.time() + 31) is None
+
+
+def test_invalidation_propagates_over_pubsub():
+    server = fakeredis.FakeServer()
+    a = PrincipalCache(redis_client=fakeredis.FakeRedis(server=server))
+    b = PrincipalCache(redis_client=fakeredis.FakeRedis(server=server))
+    assert b.start_listener()
+    try:
+        exp = time.time() + 600
+        for cache in (a, b):
+            cache.put("t1.x.y", Principal(jti="j1", user_id=7, site_id="s", is_admin=False, exp=exp))
+            cache.put("t2.x.y", Principal(jti="j2", user_id=7, site_id="s", is_admin=False, exp=exp))
+            cache.put("t3.x.y", Principal(jti="j3", user_id=8, site_id="t", is_admin=False, exp=exp))
+        time.sleep(0.1)  # 구독 등록 대기
+        a.invalidate_user(7)
+        deadline = time.time() + 3
+        while len(b) != 1 and time.time() < deadline:
+            time.sleep(0.02)
+        assert len(a) == 1 and len(b) == 1
+        a.invalidate_jti("j3")
+        while len(b) and time.time() < deadline:
+            time.sleep(0.02)
+        assert len(b) == 0
+    finally:
+        b.stop_listener()
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fakeredis
+import pytest
+
+from app.services.push_delivery import PushDeliveryPool, push_subscriptions_key
+from app.utils.redis import RedisManager
+
+
+class _PushServiceStandIn(BaseHTTPRequestHandler):
+    """로컬 푸시 서비스 대역: /ok → 201, /gone → 410, /flaky → 첫 요청 503 후 201, /slow → 0.2s 지연"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        srv = self.server
+        with srv.lock:
+            srv.requests.append((self.path, json.loads(body)))
+            srv.client_ports.add(self.client_address[1])
+            srv.hits[self.path] = srv.hits.get(self.path, 0) + 1
+            hits = srv.hits[self.path]
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+        if self.path.startswith("/gone"):
+            status = 410
+        elif self.path.startswith("/flaky") and hits == 1:
+            status = 503
+        else:
+            status = 201
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def push_server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _PushServiceStandIn)
+    srv.lock = threading.Lock()
+    srv.requests, srv.client_ports, srv.hits = [], set(), {}
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _http_sender(sub, data, session, timeout):
+    # 암호화 없이 평문 POST (VAPID/암호화는 pywebpush 영역, 여기서는 전달 경로만 검증)
+    return session.post(sub["endpoint"], data=data, timeout=timeout).status_code
+
+
+def _store(subs_by_user):
+    rm = RedisManager(fakeredis.FakeRedis())
+    for uid, endpoints in subs_by_user.items():
+        rm.cache_user_data(push_subscriptions_key(uid), {"subs": [{"endpoint": e} for e in endpoints]})
+    return rm
+
+
+def test_parallel_delivery_retry_and_batched_prune(push_server):
+    srv, base = push_server
+    rm = _store({1: [f"{base}/ok/1", f"{base}/gone/1", f"{base}/flaky/1"], 2: [f"{base}/gone/2", f"{base}/ok/2"]})
+    pool = PushDeliveryPool(sender=_http_sender, store=rm, workers=4, backoff_seconds=0.01, prune_batch=10)
+    try:
+        r1 = pool.submit_user(1, {"title": "t"}).result(timeout=5)
+        r2 = pool.submit_user(2, {"title": "t"}).result(timeout=5)
+        assert r1.as_tuple() == (2, 1, 1)  # flaky 는 재시도 후 성공
+        assert r2.as_tuple() == (1, 1, 1)
+        assert srv.hits["/flaky/1"] == 2
+        # 배치 미달 → 아직 정리 전
+        assert len(pool.load_subscriptions(1)) == 3
+        assert pool.flush_pruned() == 2
+        assert [s["endpoint"] for s in pool.load_subscriptions(1)] == [f"{base}/ok/1", f"{base}/flaky/1"]
+        assert [s["endpoint"] for s in pool.load_subscriptions(2)] == [f"{base}/ok/2"]
+        # 같은 호스트는 세션 1개, keep-alive 로 연결 재사용
+        assert len(pool._sessions) == 1
+        assert len(srv.client_ports) < len(srv.requests)
+    finally:
+        pool.close()
+
+
+def test_slow_endpoints_are_sent_concurrently(push_server):
+    srv, base = push_server
+    rm = _store({7: [f"{base}/slow/{i}" for i in range(8)]})
+    pool = PushDeliveryPool(sender=_http_sender, store=rm, workers=8)
+    try:
+        started = time.perf_counter()
+        result = pool.submit_user(7, {"title": "t"}).result(timeout=5)
+        elapsed = time.perf_counter() - started
+        assert result.sent == 8
+        assert elapsed < 0.2 * 8 / 2  # 순차 발송(1.6s) 대비 병렬
+    finally:
+        pool.close()
+
+
+def test_dead_subscriptions_are_pruned_on_timer_without_another_send(push_server):
+    srv, base = push_server
+    rm = _store({3: [f"{base}/gone/3", f"{base}/ok/3"]})
+    pool = PushDeliveryPool(sender=_http_sender, store=rm, workers=2, prune_batch=10, prune_max_delay=0.1)
+    try:
+        assert pool.submit_user(3, {"title": "t"}).result(timeout=5).removed == 1
+        deadline = time.monotonic() + 2
+        while len(pool.load_subscriptions(3)) != 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert [s["endpoint"] for s in pool.load_subscriptions(3)] == [f"{base}/ok/3"]
+    finally:
+        pool.close()
+
+
+def test_prune_skips_users_locked_by_a_concurrent_prune(push_server):
+    srv, base = push_server
+    rm = _store({4: [f"{base}/gone/4", f"{base}/ok/4"]})
+    pool = PushDeliveryPool(sender=_http_sender, store=rm, workers=2, prune_batch=10, prune_max_delay=60)
+    try:
+        pool.submit_user(4, {"title": "t"}).result(timeout=5)
+        rm.redis_client.set("user:4:push:subs:prune_lock", "other", nx=True, ex=10)
+        assert pool.flush_pruned() == 0  # 다른 정리가 잠금 보유 → 덮어쓰지 않고 이월
+        assert len(pool.load_subscriptions(4)) == 2
+        rm.redis_client.delete("user:4:push:subs:prune_lock")
+        assert pool.flush_pruned() == 1
+        assert rm.redis_client.get("user:4:push:subs:prune_lock") is None
+    finally:
+        pool.close()
+
+
+def test_deliver_user_stops_waiting_after_result_timeout(push_server):
+    srv, base = push_server
+    rm = _store({5: [f"{base}/slow/5"]})
+    pool = PushDeliveryPool(sender=_http_sender, store=rm, workers=1, result_timeout=0.05)
+    try:
+        started = time.perf_counter()
+        assert pool.deliver_user(5, {"title": "t"}).as_tuple() == (0, 1, 0)
+        assert time.perf_counter() - started < 0.2
+    finally:
+        pool.close()
@@ -26,6 +26,10 @@ async def test_hub_broadcast_payload_shape(monkeypatch):
     # user_id 포함 시 등록된 사용자 채널로 전송됨
     payload = {"type": "test", "foo": "bar", "user_id": 1}
     await hub.broadcast(payload)
+    # broadcast 는 송신 큐 적재 후 즉시 반환 → writer 태스크 전송 완료까지 대기
+    await hub.flush()
 
     # 모니터 채널에도 동일 payload 전달되므로 최소 한 번 이상 전송됨을 확인
     assert any(msg.get("type") == "test" and msg.get("foo") == "bar" for msg in ws.sent)
+
+    await hub.unregister_user(1, ws)
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+from fakeredis import aioredis as fake_aioredis  # noqa: E402
+
+from app.realtime.backends import RedisPubSubBackend  # noqa: E402
+from app.realtime.hub import RealtimeHub  # noqa: E402
+
+
+class StubWS:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+
+
+async def _wait_for(pred, timeout: float = 2.0):
+    deadline = asyncio.get_event_loop().time() + timeout
+    while asyncio.get_event_loop().time() < deadline:
+        if pred():
+            return True
+        await asyncio.sleep(0.02)
+    return pred()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_socket_on_other_worker():
+    server = fakeredis.FakeServer()
+    # 두 워커를 흉내: 같은 Redis 서버를 공유하는 두 허브
+    hub_a = RealtimeHub(backend=RedisPubSubBackend(fake_aioredis.FakeRedis(server=server), channel="rt:test"))
+    hub_b = RealtimeHub(backend=RedisPubSubBackend(fake_aioredis.FakeRedis(server=server), channel="rt:test"))
+    await hub_a.start()
+    await hub_b.start()
+    try:
+        ws_a, ws_b = StubWS(), StubWS()
+        await hub_a.register_user(1, ws_a)
+        await hub_b.register_user(2, ws_b)
+
+        await hub_a.broadcast({"type": "profile_update", "user_id": 2, "gold": 10})
+        assert await _wait_for(lambda: len(ws_b.sent) == 1)
+        assert ws_b.sent[0]["gold"] == 10
+        # 다른 사용자 대상 이벤트는 로컬 소켓에 전달되지 않음 + 자기 노드 echo 중복 없음
+        await asyncio.sleep(0.1)
+        assert ws_a.sent == []
+
+        await hub_b.broadcast({"type": "profile_update", "user_id": 1, "gold": 5})
+        assert await _wait_for(lambda: len(ws_a.sent) == 1)
+        await asyncio.sleep(0.1)
+        assert len(ws_b.sent) == 1
+    finally:
+        await hub_a.stop()
+        await hub_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_remote_delivery_keeps_per_user_throttle(monkeypatch):
+    monkeypatch.setenv("REALTIME_USER_MIN_INTERVAL_MS", "10000")
+    server = fakeredis.FakeServer()
+    hub_a = RealtimeHub(backend=RedisPubSubBackend(fake_aioredis.FakeRedis(server=server), channel="rt:throttle"))
+    hub_b = RealtimeHub(backend=RedisPubSubBackend(fake_aioredis.FakeRedis(server=server), channel="rt:throttle"))
+    await hub_a.start()
+    await hub_b.start()
+    try:
+        ws = StubWS()
+        await hub_b.register_user(7, ws)
+        for i in range(3):
+            await hub_a.broadcast({"type": "balance_update", "user_id": 7, "seq": i})
+        await asyncio.sleep(0.3)
+        assert [m["seq"] for m in ws.sent] == [0]
+    finally:
+        await hub_a.stop()
+        await hub_b.stop()
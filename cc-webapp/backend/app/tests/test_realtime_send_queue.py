@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from app.realtime.backends import MemoryBackend
+from app.realtime.hub import RealtimeHub
+
+
+class StubWS:
+    def __init__(self, delay: float = 0.0):
+        self.sent = []
+        self.delay = delay
+        self.closed_code = None
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.closed_code = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_socket(monkeypatch):
+    monkeypatch.setenv("REALTIME_USER_MIN_INTERVAL_MS", "0")
+    hub = RealtimeHub(backend=MemoryBackend())
+    slow, fast = StubWS(delay=0.5), StubWS()
+    await hub.register_monitor(slow)
+    await hub.register_user(1, fast)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await hub.broadcast({"type": "game_event", "user_id": 1})
+    assert loop.time() - start < 0.1
+
+    await hub.flush(timeout=2.0)
+    assert len(fast.sent) == 1 and len(slow.sent) == 1
+    await hub.unregister_monitor(slow)
+    await hub.unregister_user(1, fast)
+
+
+class SlowBackend(MemoryBackend):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.published = []
+
+    async def publish(self, event: dict) -> None:
+        await asyncio.sleep(self.delay)
+        self.published.append(event)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_backend(monkeypatch):
+    monkeypatch.setenv("REALTIME_USER_MIN_INTERVAL_MS", "0")
+    monkeypatch.setenv("REALTIME_PUBLISH_QUEUE_MAX", "2")
+    backend = SlowBackend(delay=0.3)
+    hub = RealtimeHub(backend=backend)
+    await hub.start()
+    try:
+        ws = StubWS()
+        await hub.register_user(1, ws)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(5):
+            await hub.broadcast({"type": "game_event", "user_id": 1, "seq": i})
+        assert loop.time() - start < 0.1
+        await hub.flush(timeout=2.0)
+        assert [m["seq"] for m in ws.sent] == [0, 1, 2, 3, 4]  # 로컬 전달은 publish 와 무관
+    finally:
+        await hub.stop()
+    # 큐 상한 2건 → 나머지는 drop, stop 은 남은 큐를 비운 뒤 종료
+    assert [e["seq"] for e in backend.published] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_oldest(monkeypatch):
+    monkeypatch.setenv("REALTIME_SEND_QUEUE_MAX", "3")
+    hub = RealtimeHub(backend=MemoryBackend())
+    ws = StubWS(delay=0.05)
+    await hub.register_monitor(ws)
+    for i in range(10):
+        await hub.broadcast({"type": "game_event", "seq": i})
+    await hub.flush(timeout=2.0)
+    seqs = [m["seq"] for m in ws.sent]
+    # 첫 메시지는 writer 가 즉시 가져가고, 나머지는 최신 3개만 남음
+    assert seqs[-3:] == [7, 8, 9]
+    assert len(seqs) <= 4
+    await hub.unregister_monitor(ws)
+
+
+@pytest.mark.asyncio
+async def test_coalesce_keeps_latest_state_event(monkeypatch):
+    monkeypatch.setenv("REALTIME_OVERFLOW_POLICY", "coalesce")
+    monkeypatch.setenv("REALTIME_USER_MIN_INTERVAL_MS", "0")
+    hub = RealtimeHub(backend=MemoryBackend())
+    ws = StubWS(delay=0.05)
+    await hub.register_user(5, ws)
+    await hub.broadcast({"type": "game_event", "user_id": 5, "seq": 0})
+    for gold in (10, 20, 30):
+        await hub.broadcast({"type": "profile_update", "user_id": 5, "gold": gold})
+    await hub.flush(timeout=2.0)
+    profile = [m for m in ws.sent if m["type"] == "profile_update"]
+    assert [m["gold"] for m in profile] == [30]
+    await hub.unregister_user(5, ws)
+
+
+@pytest.mark.asyncio
+async def test_stalled_consumer_is_evicted(monkeypatch):
+    monkeypatch.setenv("REALTIME_SEND_TIMEOUT_MS", "50")
+    hub = RealtimeHub(backend=MemoryBackend())
+    stalled = StubWS(delay=5.0)
+    await hub.register_user(9, stalled)
+    await hub.broadcast({"type": "user_action", "user_id": 9})
+    for _ in range(50):
+        if 9 not in hub._user_channels:
+            break
+        await asyncio.sleep(0.02)
+    assert 9 not in hub._user_channels
+    assert stalled.closed_code == 1013
+    assert hub.queue_depths()["connections"] == 0
@@ -0,0 +1,51 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import User, UserAction, Game, UserSegment
+from app.services.rfm_service import RFMService
+
+
+def _make_user(db, tag):
+    sid = f"rfm_{tag}_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def _groups(db, ids):
+    return dict(db.execute(select(UserSegment.user_id, UserSegment.rfm_group).where(UserSegment.user_id.in_(ids))).all())
+
+
+def test_bulk_segments_match_legacy_per_user_loop():
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        whale, risk, idle = _make_user(db, "w"), _make_user(db, "r"), _make_user(db, "i")
+        for i in range(60):
+            db.add(UserAction(user_id=whale.id, action_type="SLOT_SPIN", created_at=now - timedelta(days=1, minutes=i)))
+            db.add(Game(user_id=whale.id, game_type="slot", bet_amount=10_000, created_at=now - timedelta(days=1)))
+        for i in range(5):
+            db.add(UserAction(user_id=risk.id, action_type="SLOT_SPIN", created_at=now - timedelta(days=40 + i)))
+        db.commit()
+        ids = [whale.id, risk.id, idle.id]
+
+        RFMService(db).update_all_user_segments(bulk=False)
+        legacy = _groups(db, ids)
+
+        db.execute(UserSegment.__table__.delete().where(UserSegment.user_id == whale.id))
+        db.commit()
+        progress = []
+        stats = RFMService(db).update_all_user_segments(chunk_size=2, progress=progress.append)
+        db.expire_all()
+        assert _groups(db, ids) == legacy
+        assert legacy[whale.id] == "Whale" and legacy[idle.id] == "At-Risk"
+        assert stats["users"] == stats["total"] and stats["created"] >= 1
+        assert progress and progress[-1]["users"] == stats["users"]
+    finally:
+        db.close()
@@ -0,0 +1,174 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import fakeredis
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models import EventOutbox, Game, User, UserAction, UserRFMDaily, UserRFMState, UserSegment
+from app.services import rfm_stream
+from app.services.outbox_relay import InMemoryOutboxSink, get_outbox_relay, set_outbox_sink
+from app.services.rfm_service import RFMService
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def _make_user(db, tag):
+    sid = f"rfms_{tag}_{int(time.time() * 1000)}_{random.randint(0, 9999)}"
+    u = User(site_id=sid, nickname=sid, phone_number=sid[-11:], password_hash="x", invite_code="5858")
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u
+
+
+def _groups(db, ids):
+    db.expire_all()
+    return dict(db.execute(select(UserSegment.user_id, UserSegment.rfm_group).where(UserSegment.user_id.in_(ids))).all())
+
+
+def _play(db, user_id, spins, bet, at):
+    for i in range(spins):
+        db.add(UserAction(user_id=user_id, action_type="SLOT_SPIN", created_at=at - timedelta(minutes=i)))
+        db.add(Game(user_id=user_id, game_type="slot", bet_amount=bet, created_at=at - timedelta(minutes=i)))
+
+
+def _stream():
+    factory = sessionmaker(bind=SessionLocal.kw["bind"])
+    stream = rfm_stream.RFMStream(session_factory=factory, flush_interval=60)
+    stream.install(factory)
+    return stream, factory
+
+
+def test_stream_rescores_only_touched_users_and_matches_rebuild():
+    stream, factory = _stream()
+    db = factory()
+    sink = InMemoryOutboxSink()
+    set_outbox_sink(sink)
+    try:
+        whale, casual, idle = _make_user(db, "w"), _make_user(db, "c"), _make_user(db, "i")
+        _play(db, whale.id, 60, 10_000, NOW - timedelta(hours=2))
+        _play(db, casual.id, 12, 500, NOW - timedelta(days=3))
+        db.commit()
+        db.add(UserAction(user_id=idle.id, action_type="LOGIN", created_at=NOW))
+        db.flush()
+        db.rollback()  # 롤백된 이벤트는 버퍼에 들어가지 않는다
+        assert stream.pending_users() == 2
+
+        result = stream.flush(now=NOW)
+        assert result["scored"] == 2 and result["changed"] == 2 and result["statements"] > 0
+        streamed = _groups(db, [whale.id, casual.id, idle.id])
+        assert streamed == {whale.id: "Whale", casual.id: "High-Value"}
+
+        events = db.scalars(select(EventOutbox).where(EventOutbox.event_type == "segment_change")).all()
+        mine = {e.payload["user_id"]: e.payload for e in events if e.payload["user_id"] in (whale.id, casual.id)}
+        assert mine[whale.id]["previous"] is None and mine[whale.id]["current"] == "Whale"
+        # relay 미실행(OUTBOX_RELAY_ENABLED=0) → flush 후 바로 발행되어 outbox 행이 남지 않는다
+        published = [json.loads(m.value) for m in sink.messages if m.topic == settings.KAFKA_SEGMENTS_TOPIC]
+        sent = {v["payload"]["user_id"]: v for v in published if v["payload"]["user_id"] in (whale.id, casual.id)}
+        assert sent[whale.id]["event_type"] == "segment_change" and sent[whale.id]["payload"]["current"] == "Whale"
+        assert sent[casual.id]["payload"]["current"] == "High-Value"
+        assert all(e.published_at is not None for e in events if e.payload["user_id"] in (whale.id, casual.id))
+
+        # 그룹이 그대로인 추가 이벤트 → 재평가만, 세그먼트/이벤트 변경 없음
+        _play(db, whale.id, 1, 10_000, NOW)
+        db.commit()
+        assert stream.flush(now=NOW)["changed"] == 0
+
+        RFMService(db).update_all_user_segments(now=NOW)
+        assert _groups(db, [whale.id, casual.id]) == streamed
+    finally:
+        get_outbox_relay().sink = None
+        stream.uninstall()
+        db.close()
+
+
+def test_rescore_due_applies_time_based_transitions():
+    stream, factory = _stream()
+    db = factory()
+    try:
+        user = _make_user(db, "a")
+        _play(db, user.id, 60, 10_000, NOW - timedelta(days=6))
+        db.commit()
+        stream.flush(now=NOW)
+        assert _groups(db, [user.id]) == {user.id: "Whale"}
+        state = db.get(UserRFMState, user.id)
+        assert state.next_rescore_at == state.last_action_at + timedelta(days=8)
+
+        later = NOW + timedelta(days=3)  # recency 9일 → R 5→3
+        stats = rfm_stream.rescore_due(db, later)
+        assert stats["changed"] >= 1
+        assert _groups(db, [user.id]) == {user.id: "High-Value"}
+        db.expire_all()
+        assert db.get(UserRFMState, user.id).next_rescore_at > later
+
+        RFMService(db).update_all_user_segments(now=later)
+        assert _groups(db, [user.id]) == {user.id: "High-Value"}
+    finally:
+        stream.uninstall()
+        db.close()
+
+
+def test_reconcile_corrects_events_missed_by_the_hook(monkeypatch):
+    monkeypatch.setattr(rfm_stream, "_rebuilt_through", None)  # 워터마크를 이 테스트 안으로 한정
+    db = SessionLocal()
+    try:
+        user = _make_user(db, "m")
+        rfm_stream.rescore_users(db, [user.id], NOW)
+        db.commit()
+        assert _groups(db, [user.id]) == {user.id: "At-Risk"}
+        # 훅을 거치지 않는 Core INSERT → 증분 경로가 놓친 활동
+        db.execute(UserAction.__table__.insert(), [
+            {"user_id": user.id, "action_type": "SLOT_SPIN", "created_at": NOW - timedelta(hours=1)}
+            for _ in range(12)
+        ])
+        db.commit()
+
+        stats = rfm_stream.reconcile(db, NOW)
+        assert stats["drift"] >= 1 and stats["post_changed"] == 0
+        assert _groups(db, [user.id]) == {user.id: "High-Value"}
+        state = db.get(UserRFMState, user.id)
+        assert state.rfm_group == "High-Value" and state.last_action_at is not None
+        payloads = [e.payload for e in db.scalars(select(EventOutbox).where(EventOutbox.event_type == "segment_change"))]
+        assert any(p["user_id"] == user.id and p["source"] == "reconcile" for p in payloads)
+    finally:
+        db.close()
+
+
+def test_flush_after_reconcile_skips_events_already_in_the_rebuild(monkeypatch):
+    monkeypatch.setattr(rfm_stream, "_rebuilt_through", None)
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(rfm_stream, "_redis", lambda: client)
+    stream, factory = _stream()
+    db = factory()
+    try:
+        user = _make_user(db, "r")
+        now = datetime.utcnow()
+        # 다른 워커 버퍼에 남은 상황: 커밋됐지만 flush 전 (이 프로세스 스트림이 아니므로 reconcile 이 flush 하지 않음)
+        _play(db, user.id, 3, 100, now - timedelta(seconds=1))
+        db.commit()
+        assert stream.pending_users() == 1
+
+        client.set("rfm:reconcile:lock", "other-worker")
+        assert rfm_stream.reconcile(db, now) == {"skipped": "locked"}
+        client.delete("rfm:reconcile:lock")
+        assert rfm_stream.reconcile(db, now)["drift"] >= 0
+        assert client.get("rfm:reconcile:lock") is None
+
+        def actions():
+            db.expire_all()
+            return db.scalar(select(func.sum(UserRFMDaily.action_count)).where(UserRFMDaily.user_id == user.id))
+
+        assert actions() == 3
+        _play(db, user.id, 1, 100, datetime.utcnow() + timedelta(seconds=1))  # 재구성 이후 이벤트
+        db.commit()
+        assert stream.flush(now=now)["scored"] == 1
+        assert actions() == 4  # 재구성에 포함된 3건은 버려지고 이후 1건만 가산
+        assert stream.stats()["discarded"] == 6  # action 3 + spend 3
+    finally:
+        stream.uninstall()
+        db.close()
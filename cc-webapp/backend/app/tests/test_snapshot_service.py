@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import fakeredis
+
+from app.services.snapshot_service import SnapshotStore
+
+
+def _store(compute, interval=5.0, redis_client=None):
+    store = SnapshotStore(redis_client=redis_client, session_factory=lambda: _NullSession())
+    store.register("m", compute, interval)
+    return store
+
+
+class _NullSession:
+    def close(self):
+        pass
+
+
+class _Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, db):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        time.sleep(self.delay)
+        return {"n": n}
+
+
+def test_concurrent_readers_share_one_compute():
+    compute = _Counter(delay=0.05)
+    store = _store(compute)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get("m").data["n"])) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert compute.calls == 1 and set(results) == {1}
+    assert store.get("m").data == {"n": 1}  # 신선 → 재계산 없음
+
+
+def test_workers_share_snapshot_through_redis():
+    client = fakeredis.FakeRedis()
+    a_compute, b_compute = _Counter(), _Counter()
+    a, b = _store(a_compute, redis_client=client), _store(b_compute, redis_client=client)
+
+    assert a.get("m").data == {"n": 1}
+    assert b.get("m").data == {"n": 1}  # 락은 a 가 보유 → 공유 값 사용
+    assert b_compute.calls == 0
+    assert b.stats()["m"]["shared"] == 1 and a.stats()["m"]["computed"] == 1
+
+
+def test_shared_payload_keeps_decimal_and_datetime_types():
+    client = fakeredis.FakeRedis()
+    data = {"main": {"total_revenue": Decimal("1234.50"), "new_users_today": 3},
+            "since": date(2026, 10, 1), "at": datetime(2026, 10, 18, 12, 0, 1), "tags": [{"$other": "x"}]}
+    a = _store(lambda db: data, redis_client=client)
+    b = _store(lambda db: {"never": True}, redis_client=client)
+
+    assert a.get("m").data == data
+    shared = b.get("m").data
+    assert shared == data and type(shared["main"]["total_revenue"]) is Decimal
+    assert type(shared["at"]) is datetime and type(shared["since"]) is date
+
+
+def test_stale_snapshot_served_when_refresh_fails():
+    state = {"fail": False}
+
+    def compute(db):
+        if state["fail"]:
+            raise RuntimeError("db down")
+        return {"ok": True}
+
+    store = _store(compute, interval=0.5)
+    store.get("m")
+    state["fail"] = True
+    time.sleep(0.55)
+    assert store.get("m").data == {"ok": True}
+    assert store.stats()["m"]["error"] == 1
+
+
+def test_subscribers_fan_out_without_extra_computes():
+    compute = _Counter()
+    store = _store(compute, interval=0.5)
+
+    async def scenario():
+        received = [[] for _ in range(40)]
+
+        async def reader(i):
+            async for data in store.subscribe("m"):
+                received[i].append(data["n"])
+                if len(received[i]) == 3:
+                    return
+
+        readers = [asyncio.create_task(reader(i)) for i in range(40)]
+        store.start_producer()
+        await asyncio.wait_for(asyncio.gather(*readers), timeout=5)
+        await store.stop()
+        return received
+
+    received = asyncio.run(scenario())
+    assert all(r == [1, 2, 3] for r in received)
+    assert compute.calls <= 4  # 구독자 40 명과 무관하게 주기당 1회
+    assert store.subscriber_count("m") == 0
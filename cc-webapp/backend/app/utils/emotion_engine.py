@@ -4,48 +4,76 @@
 감정 감지, 분석, 피드백 생성 엔진
 """
 
+import copy
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import asyncio
 
+from .keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
+# 감정별 키워드와 가중치
+EMOTION_KEYWORDS: Dict[str, Dict[str, Any]] = {
+    "joy": {
+        "keywords": ["좋아", "기뻐", "행복", "최고", "완벽", "대박", "성공", "승리"],
+        "weight": 1.0
+    },
+    "sad": {
+        "keywords": ["슬퍼", "실망", "안타까", "아쉬워", "실패", "패배", "힘들어"],
+        "weight": 1.0
+    },
+    "angry": {
+        "keywords": ["화나", "짜증", "분노", "열받", "억울", "불공평"],
+        "weight": 1.2
+    },
+    "neutral": {
+        "keywords": ["보통", "그냥", "괜찮", "무난", "평범"],
+        "weight": 0.5
+    },
+    "excited": {
+        "keywords": ["신나", "흥미", "재미", "즐거", "놀라", "와우"],
+        "weight": 1.1
+    },
+    "calm": {
+        "keywords": ["차분", "평온", "안정", "조용", "평화"],
+        "weight": 0.8
+    }
+}
+
+# 감정별 감정 점수
+SENTIMENT_MAPPING = {
+    "joy": 0.8, "excited": 0.7, "calm": 0.3,
+    "neutral": 0.0, "sad": -0.5, "angry": -0.8
+}
+
+
+def _table_key(table: Dict[str, Dict[str, Any]]) -> Tuple:
+    return tuple((emotion, tuple(data["keywords"]), data["weight"]) for emotion, data in table.items())
+
+
+@lru_cache(maxsize=8)
+def _compiled_matcher(table_key: Tuple) -> Tuple[KeywordMatcher, Dict[str, Tuple[str, ...]]]:
+    """(전체 키워드 매처, 키워드 → 해당 감정들)"""
+    by_keyword: Dict[str, Tuple[str, ...]] = {}
+    for emotion, keywords, _ in table_key:
+        for kw in keywords:
+            by_keyword[kw] = by_keyword.get(kw, ()) + (emotion,)
+    return KeywordMatcher(by_keyword), by_keyword
+
+
 class EmotionEngine:
     """감정 분석 및 피드백 엔진"""
     
     def __init__(self, redis_client=None):
         self.redis = redis_client
         
-        # 감정별 키워드와 가중치
-        self.emotion_keywords = {
-            "joy": {
-                "keywords": ["좋아", "기뻐", "행복", "최고", "완벽", "대박", "성공", "승리"],
-                "weight": 1.0
-            },
-            "sad": {
-                "keywords": ["슬퍼", "실망", "안타까", "아쉬워", "실패", "패배", "힘들어"],
-                "weight": 1.0
-            },
-            "angry": {
-                "keywords": ["화나", "짜증", "분노", "열받", "억울", "불공평"],
-                "weight": 1.2
-            },
-            "neutral": {
-                "keywords": ["보통", "그냥", "괜찮", "무난", "평범"],
-                "weight": 0.5
-            },
-            "excited": {
-                "keywords": ["신나", "흥미", "재미", "즐거", "놀라", "와우"],
-                "weight": 1.1
-            },
-            "calm": {
-                "keywords": ["차분", "평온", "안정", "조용", "평화"],
-                "weight": 0.8
-            }
-        }
+        # 감정별 키워드와 가중치 (인스턴스별 사본, 매처는 테이블 내용별로 1회 컴파일 후 공유)
+        self.emotion_keywords = copy.deepcopy(EMOTION_KEYWORDS)
         
         # 감정별 피드백 템플릿
         self.feedback_templates = {
@@ -81,26 +109,33 @@ class EmotionEngine:
             ]
         }
     
-    async def detect_emotion_from_text(self, text: str) -> Dict[str, Any]:
-        """텍스트에서 감정 감지"""
+    @property
+    def _matcher(self) -> Tuple[KeywordMatcher, Dict[str, Tuple[str, ...]]]:
+        # 내용 기준 키 → emotion_keywords 를 수정해도 stale 매처를 쓰지 않음
+        return _compiled_matcher(_table_key(self.emotion_keywords))
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """텍스트에서 감정 감지 (동기, 단일 패스 키워드 매칭)"""
         try:
             if not text:
                 return {"emotion": "neutral", "confidence": 0.0, "sentiment_score": 0.0}
             
-            text_lower = text.lower()
+            matcher, by_keyword = self._matcher
+            found = matcher.find(text.lower())
             emotion_scores = {}
             
-            # 각 감정별 키워드 매칭
-            for emotion, data in self.emotion_keywords.items():
-                score = 0.0
-                keywords_found = []
-                
-                for keyword in data["keywords"]:
-                    if keyword in text_lower:
-                        score += data["weight"]
-                        keywords_found.append(keyword)
-                
-                if score > 0:
+            if found:
+                hit_emotions = {e for kw in found for e in by_keyword[kw]}
+                # 테이블 순서 유지 (동점 시 먼저 정의된 감정 선택)
+                for emotion, data in self.emotion_keywords.items():
+                    if emotion not in hit_emotions:
+                        continue
+                    score = 0.0
+                    keywords_found = []
+                    for keyword in data["keywords"]:
+                        if keyword in found:
+                            score += data["weight"]
+                            keywords_found.append(keyword)
                     emotion_scores[emotion] = {
                         "score": score,
                         "keywords": keywords_found
@@ -110,31 +145,39 @@ class EmotionEngine:
             if emotion_scores:
                 best_emotion = max(emotion_scores.keys(), key=lambda k: emotion_scores[k]["score"])
                 confidence = min(emotion_scores[best_emotion]["score"] / 3.0, 1.0)
-                
-                # 감정별 감정 점수 계산
-                sentiment_mapping = {
-                    "joy": 0.8, "excited": 0.7, "calm": 0.3,
-                    "neutral": 0.0, "sad": -0.5, "angry": -0.8
-                }
-                sentiment_score = sentiment_mapping.get(best_emotion, 0.0)
+                sentiment_score = SENTIMENT_MAPPING.get(best_emotion, 0.0)
             else:
                 best_emotion = "neutral"
                 confidence = 0.5
                 sentiment_score = 0.0
             
-            result = {
+            return {
                 "emotion": best_emotion,
                 "confidence": confidence,
                 "sentiment_score": sentiment_score,
                 "details": emotion_scores
             }
             
-            return result
-            
         except Exception as e:
             logger.error(f"Failed to detect emotion: {str(e)}")
             return {"emotion": "neutral", "confidence": 0.0, "sentiment_score": 0.0}
     
+    def analyze_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """여러 텍스트 일괄 감정 감지 (동일 문장은 1회만 분석, 결과 dict 는 항목별 사본)"""
+        cache: Dict[str, Dict[str, Any]] = {}
+        results = []
+        for text in texts:
+            if text in cache:
+                results.append(copy.deepcopy(cache[text]))
+            else:
+                cache[text] = self.analyze_text(text)
+                results.append(cache[text])
+        return results
+    
+    async def detect_emotion_from_text(self, text: str) -> Dict[str, Any]:
+        """텍스트에서 감정 감지"""
+        return self.analyze_text(text)
+    
     async def detect_emotion_from_actions(self, user_actions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """사용자 행동에서 감정 감지"""
         try:
@@ -0,0 +1,63 @@
+"""다중 키워드 단일 패스 매처
+
+키워드마다 `keyword in text` 를 반복하는 대신, 키워드 집합을 trie 형태의 정규식 하나로
+컴파일해 텍스트를 한 번만 스캔한다 (re 엔진이 C 레벨에서 최장 일치 탐색).
+
+정확도: 결과는 "text 에 부분 문자열로 포함된 키워드 집합" 과 동일하다.
+  - 매칭 후 다음 탐색을 매칭 끝이 아닌 시작+1 위치에서 이어가므로, 앞 키워드의 접미와
+    다음 키워드의 접두가 겹치는 경우(예: "실패" / "패배")도 놓치지 않는다.
+  - 같은 위치에서는 가장 긴 키워드만 보고되므로, 그 키워드에 포함된 다른 키워드는
+    빌드 시 계산한 포함 관계로 함께 보고한다.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(node[ch]) for ch in sorted(k for k in node if k)]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # 종료 노드의 하위 분기는 greedy optional → 같은 위치에서 가장 긴 키워드 우선
+        return "(?:" + body + ")?" if terminal else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keywords if k))
+        # 매칭 키워드 → 함께 포함된 것으로 간주할 키워드 (자기 자신 포함)
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            k: tuple(o for o in self.keywords if o in k) for k in self.keywords
+        }
+        self._pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+    def find(self, text: str) -> Set[str]:
+        """text 에 포함된 키워드 집합."""
+        if self._pattern is None or not text:
+            return set()
+        search = self._pattern.search
+        m = search(text)
+        if m is None:
+            return set()
+        found: Set[str] = set()
+        implied = self._implied
+        while m is not None:
+            found.update(implied[m.group()])
+            m = search(text, m.start() + 1)
+        return found
+
+    def find_many(self, texts: Iterable[str]) -> List[Set[str]]:
+        return [self.find(t) for t in texts]
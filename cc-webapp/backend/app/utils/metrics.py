@@ -0,0 +1,23 @@
+"""prometheus 메트릭 공통 헬퍼
+
+prometheus_client 는 선택 의존성이라 각 모듈은 메트릭 객체를 try/except 로 만들고
+미설치 시 None 으로 둔다. metric() 은 None/라벨 오류/백엔드 예외를 모두 삼켜
+계측이 호출 경로를 깨지 않게 한다.
+
+    metric(_EVENTS_TOTAL, "inc")
+    metric(_LATENCY, "observe", elapsed, stage="flush")
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+def metric(instrument: Any, op: str, *args: Any, **labels: Any) -> None:
+    """instrument.labels(**labels).<op>(*args) 를 best-effort 로 호출 (라벨 이름 "op" 는 사용 불가)."""
+    if instrument is None:
+        return
+    try:
+        target = instrument.labels(**labels) if labels else instrument
+        getattr(target, op)(*args)
+    except Exception:
+        pass
@@ -71,8 +71,9 @@ Redis 유틸리티 함수들
 - 실시간 데이터 저장
 """
 
+import asyncio
 import json
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -508,4 +509,325 @@ def get_streak_protection(user_id: str, action_type: str) -> bool:
     return get_redis_manager().get_streak_protection(user_id, action_type)
 
 def set_streak_protection(user_id: str, action_type: str, enabled: bool) -> bool:
-    return get_redis_manager().set_streak_protection(user_id, action_type, enabled)
\ No newline at end of file
+    return get_redis_manager().set_streak_protection(user_id, action_type, enabled)
+
+
+# -------------------------------
+# asyncio Redis 매니저
+# -------------------------------
+try:
+    import redis.asyncio as aioredis  # type: ignore
+except ImportError:  # pragma: no cover
+    aioredis = None  # type: ignore
+
+
+def _as_text(val: Any) -> Any:
+    return val.decode('utf-8') if isinstance(val, bytes) else val
+
+
+class AsyncRedisManager:
+    """RedisManager 의 asyncio 버전 (async 라우터 전용)
+
+    - redis.asyncio 클라이언트 1개(= 프로세스 공용 커넥션 풀)를 모든 요청이 공유
+    - 키/직렬화 규칙이 RedisManager 와 같아 동기/비동기 경로가 같은 데이터를 본다
+    - 여러 명령이 필요한 연산(INCR+EXPIRE, SADD+EXPIRE, 카운터+TTL 조회)은 파이프라인 1회 왕복
+    - 호출마다 ping 하지 않는다. 명령 실패 시 RedisManager 와 같이 로그 후 기본값 반환
+    - 비동기 클라이언트가 없으면 동기 RedisManager(get_redis_manager())에 위임:
+      메모리 폴백은 그대로 사용하고, 동기 클라이언트 호출은 스레드로 넘겨 이벤트 루프를 막지 않는다
+    """
+
+    def __init__(self, redis_client: Any = None, sync_manager: Optional[RedisManager] = None):
+        self.redis_client = redis_client
+        self._sync_manager = sync_manager
+
+    @property
+    def sync_manager(self) -> RedisManager:
+        return self._sync_manager if self._sync_manager is not None else get_redis_manager()
+
+    async def _delegate(self, fn, *args: Any) -> Any:
+        """동기 매니저 호출: 실제 Redis 연결이 있으면 스레드에서, 메모리 폴백이면 바로 실행"""
+        if self.sync_manager.redis_client is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def command(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """단일 Redis 명령 (예: command("set", key, "1", nx=True, ex=60)).
+
+        Redis 미연결(메모리 폴백) 시 None. 명령 예외는 호출측으로 전달.
+        """
+        if self.redis_client is not None:
+            return await getattr(self.redis_client, name)(*args, **kwargs)
+        client = self.sync_manager.redis_client
+        if client is None:
+            return None
+        return await asyncio.to_thread(getattr(client, name), *args, **kwargs)
+
+    async def set_nx(self, key: str, value: Any, expire_seconds: Optional[int] = None) -> Optional[bool]:
+        """SET NX (+EX). 새로 설정했으면 True, 이미 존재하면 False, Redis 미연결이면 None.
+
+        명령 예외는 호출측으로 전달 (가드 비활성 여부는 호출측 정책).
+        """
+        if self.redis_client is None and self.sync_manager.redis_client is None:
+            return None
+        return bool(await self.command("set", key, value, nx=True, ex=expire_seconds))
+
+    async def is_connected(self) -> bool:
+        """Redis 연결 상태 확인"""
+        try:
+            if self.redis_client is not None:
+                await self.redis_client.ping()
+                return True
+            return await self._delegate(self.sync_manager.is_connected)
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {str(e)}")
+        return False
+
+    async def _setex_json(self, key: str, expire_seconds: int, data: Any) -> bool:
+        return bool(await self.redis_client.setex(key, expire_seconds, json.dumps(data, default=str)))
+
+    async def _get_json(self, key: str) -> Optional[Any]:
+        cached_data = await self.redis_client.get(key)
+        return json.loads(_as_text(cached_data)) if cached_data else None
+
+    async def cache_user_data(self, user_id: str, data: Dict[str, Any], expire_seconds: int = 3600) -> bool:
+        """사용자 데이터 캐싱"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.cache_user_data, user_id, data, expire_seconds)
+        try:
+            return await self._setex_json(f"user:{user_id}:data", expire_seconds, data)
+        except Exception as e:
+            logger.error(f"Failed to cache user data: {str(e)}")
+            return False
+
+    async def get_cached_data(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """캐시된 사용자 데이터 조회"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_cached_data, user_id)
+        try:
+            return await self._get_json(f"user:{user_id}:data")
+        except Exception as e:
+            logger.error(f"Failed to get cached data: {str(e)}")
+            return None
+
+    async def update_streak_counter(self, user_id: str, action_type: str, increment: bool = True) -> int:
+        """스트릭 카운터 증가(INCR+EXPIRE 1회 왕복) 또는 리셋"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.update_streak_counter, user_id, action_type, increment)
+        try:
+            key = f"user:{user_id}:streak:{action_type}"
+            if not increment:
+                await self.redis_client.delete(key)
+                return 0
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, 86400)
+                current_count, _ = await pipe.execute()
+            return int(current_count)
+        except Exception as e:
+            logger.error(f"Failed to update streak counter: {str(e)}")
+            return 0
+
+    async def get_streak_counter(self, user_id: str, action_type: str) -> int:
+        """현재 스트릭 카운트 조회 (없으면 0)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_streak_counter, user_id, action_type)
+        try:
+            val = await self.redis_client.get(f"user:{user_id}:streak:{action_type}")
+            return int(val) if val is not None else 0
+        except Exception:
+            return 0
+
+    async def get_streak_ttl(self, user_id: str, action_type: str) -> Optional[int]:
+        """스트릭 남은 TTL(초)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_streak_ttl, user_id, action_type)
+        try:
+            ttl = await self.redis_client.ttl(f"user:{user_id}:streak:{action_type}")
+            return int(ttl) if ttl and ttl > 0 else None
+        except Exception:
+            return None
+
+    async def get_streak_state(self, user_id: str, action_type: str) -> Tuple[int, Optional[int]]:
+        """(카운트, TTL) 를 GET+TTL 파이프라인 1회 왕복으로 조회"""
+        if self.redis_client is None:
+            mgr = self.sync_manager
+            return await self._delegate(
+                lambda: (mgr.get_streak_counter(user_id, action_type), mgr.get_streak_ttl(user_id, action_type))
+            )
+        try:
+            key = f"user:{user_id}:streak:{action_type}"
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                val, ttl = await pipe.execute()
+            return (int(val) if val is not None else 0), (int(ttl) if ttl and ttl > 0 else None)
+        except Exception:
+            return 0, None
+
+    async def record_streak_tick(
+        self, user_id: str, action_type: str, day_iso: str, increment: bool = True
+    ) -> Tuple[int, Optional[int]]:
+        """스트릭 tick: 카운터 증가(또는 조회) + TTL + 출석 기록을 파이프라인 1회 왕복으로 처리.
+
+        Returns:
+            (현재 카운트, 남은 TTL)
+        """
+        if self.redis_client is None:
+            mgr = self.sync_manager
+
+            def _tick() -> Tuple[int, Optional[int]]:
+                if increment:
+                    cnt = mgr.update_streak_counter(user_id, action_type, increment=True)
+                else:
+                    cnt = mgr.get_streak_counter(user_id, action_type)
+                ttl = mgr.get_streak_ttl(user_id, action_type)
+                mgr.record_attendance_day(user_id, action_type, day_iso)
+                return cnt, ttl
+
+            return await self._delegate(_tick)
+        try:
+            key = f"user:{user_id}:streak:{action_type}"
+            month_key = f"user:{user_id}:attendance:{action_type}:{day_iso[:7].replace('-', '')}"
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                if increment:
+                    pipe.incr(key)
+                    pipe.expire(key, 86400)
+                else:
+                    pipe.get(key)
+                pipe.ttl(key)
+                pipe.sadd(month_key, day_iso)
+                pipe.expire(month_key, 60 * 60 * 24 * 120)
+                res = await pipe.execute()
+            cnt = res[0]
+            ttl = res[2] if increment else res[1]
+            return (int(cnt) if cnt is not None else 0), (int(ttl) if ttl and ttl > 0 else None)
+        except Exception as e:
+            logger.error(f"Failed to record streak tick: {str(e)}")
+            return 0, None
+
+    async def record_attendance_day(self, user_id: str, action_type: str, day_iso: str) -> bool:
+        """특정 일자 출석 기록 (SADD+EXPIRE 1회 왕복)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.record_attendance_day, user_id, action_type, day_iso)
+        try:
+            key = f"user:{user_id}:attendance:{action_type}:{day_iso[:7].replace('-', '')}"
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.sadd(key, day_iso)
+                pipe.expire(key, 60 * 60 * 24 * 120)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to record attendance: {str(e)}")
+            return False
+
+    async def get_attendance_month(self, user_id: str, action_type: str, year: int, month: int) -> List[str]:
+        """해당 연/월의 출석 날짜 목록 (YYYY-MM-DD)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_attendance_month, user_id, action_type, year, month)
+        try:
+            members = await self.redis_client.smembers(f"user:{user_id}:attendance:{action_type}:{year:04d}{month:02d}")
+            return sorted(str(_as_text(m)) for m in members or [])
+        except Exception as e:
+            logger.error(f"Failed to get attendance month: {str(e)}")
+            return []
+
+    async def get_streak_protection(self, user_id: str, action_type: str) -> bool:
+        """스트릭 보호 토글 상태 조회"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_streak_protection, user_id, action_type)
+        try:
+            val = _as_text(await self.redis_client.get(f"user:{user_id}:streak_protection:{action_type}"))
+            if val is None:
+                return False
+            return val == '1' or str(val).lower() == 'true'
+        except Exception as e:
+            logger.error(f"Failed to get streak protection: {str(e)}")
+            return False
+
+    async def set_streak_protection(self, user_id: str, action_type: str, enabled: bool) -> bool:
+        """스트릭 보호 토글 상태 설정"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.set_streak_protection, user_id, action_type, enabled)
+        try:
+            await self.redis_client.set(f"user:{user_id}:streak_protection:{action_type}", '1' if enabled else '0')
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set streak protection: {str(e)}")
+            return False
+
+    async def manage_session_data(self, session_id: str, data: Optional[Dict[str, Any]] = None,
+                                  delete: bool = False) -> Optional[Dict[str, Any]]:
+        """세션 데이터 관리 (생성/조회/삭제)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.manage_session_data, session_id, data, delete)
+        try:
+            key = f"session:{session_id}"
+            if delete:
+                await self.redis_client.delete(key)
+                return None
+            if data is not None:
+                await self._setex_json(key, 3600, data)
+                return data
+            return await self._get_json(key)
+        except Exception as e:
+            logger.error(f"Failed to manage session data: {str(e)}")
+            return None
+
+    async def store_temp_data(self, key: str, data: Any, expire_seconds: int = 300) -> bool:
+        """임시 데이터 저장 (기본 5분 만료)"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.store_temp_data, key, data, expire_seconds)
+        try:
+            return await self._setex_json(key, expire_seconds, data)
+        except Exception as e:
+            logger.error(f"Failed to store temp data: {str(e)}")
+            return False
+
+    async def get_temp_data(self, key: str) -> Optional[Any]:
+        """임시 데이터 조회"""
+        if self.redis_client is None:
+            return await self._delegate(self.sync_manager.get_temp_data, key)
+        try:
+            return await self._get_json(key)
+        except Exception as e:
+            logger.error(f"Failed to get temp data: {str(e)}")
+            return None
+
+    async def close(self) -> None:
+        """커넥션 풀 정리 (lifespan 종료 시)"""
+        client, self.redis_client = self.redis_client, None
+        if client is not None:
+            try:
+                await client.aclose()
+            except AttributeError:  # redis<5
+                await client.close()
+
+
+# 전역 비동기 Redis 매니저 인스턴스
+async_redis_manager: Optional[AsyncRedisManager] = None
+
+
+def build_async_redis_client(host: str, port: int, password: Optional[str] = None, max_connections: Optional[int] = None):
+    """공용 커넥션 풀을 가진 redis.asyncio 클라이언트 생성 (redis-py 미설치 시 None)"""
+    if aioredis is None:  # pragma: no cover
+        return None
+    if max_connections is None:
+        max_connections = int(os.getenv("REDIS_ASYNC_MAX_CONNECTIONS", "64"))
+    pool = aioredis.ConnectionPool(
+        host=host, port=port, password=password, decode_responses=False, max_connections=max_connections
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+def init_async_redis_manager(redis_client: Any = None):
+    """비동기 Redis 매니저 초기화"""
+    global async_redis_manager
+    async_redis_manager = AsyncRedisManager(redis_client)
+
+
+def get_async_redis_manager() -> AsyncRedisManager:
+    """비동기 Redis 매니저 인스턴스 반환 (미초기화 시 동기 매니저 위임 모드)"""
+    global async_redis_manager
+    if async_redis_manager is None:
+        async_redis_manager = AsyncRedisManager()
+    return async_redis_manager
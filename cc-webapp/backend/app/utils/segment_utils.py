@@ -299,9 +299,9 @@ def compute_rfm_and_update_segments(db: Session):
         start_ts = datetime.utcnow()
         logger.info("Starting RFM segment update job…")
         svc = RFMService(db=db)
-        svc.update_all_user_segments()
+        stats = svc.update_all_user_segments() or {}
         dur_ms = int((datetime.utcnow() - start_ts).total_seconds() * 1000)
-        logger.info("RFM segment update job finished in %d ms", dur_ms)
+        logger.info("RFM segment update job finished in %d ms (users=%s)", dur_ms, stats.get("users"))
     except Exception as e:
         logger.error(f"An error occurred during the RFM update job: {e}", exc_info=True)
         pass
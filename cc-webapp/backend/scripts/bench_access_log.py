@@ -0,0 +1,226 @@
+"""액세스 로그 오버헤드 부하 테스트: 레거시 2단 미들웨어 vs 단일 ASGI 단계
+
+용도:
+  - none    : 로깅 미들웨어 없음 (기준선)
+  - legacy  : SimpleLoggingMiddleware(BaseHTTPMiddleware, 2줄) + LoggingContextMiddleware(1줄),
+              동기 StreamHandler + 레거시 JSONLogFormatter (이전 main.py 구성 재현)
+  - access  : AccessLogMiddleware (1줄) + QueueHandler/QueueListener 비동기 출력
+  - sampled : access + 기본 샘플링 비율 --sample-rate (기본 0.1)
+
+ASGI 앱을 HTTP 서버 없이 직접 호출해 요청 처리 경로만 측정한다 (로그 출력은 /dev/null).
+
+사용:
+  python -m scripts.bench_access_log [--requests 5000] [--concurrency 50] [--sample-rate 0.1] [--output result.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core import logging as core_logging
+from app.middleware.access_log import API_TITLES, AccessLogMiddleware
+
+
+# ---------------- legacy (이전 구현 재현) ---------------- #
+class LegacyJSONLogFormatter(logging.Formatter):
+    def format(self, record):
+        base = {
+            "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": core_logging.request_id_ctx.get(),
+            "path": core_logging.path_ctx.get(),
+            "method": core_logging.method_ctx.get(),
+            "user_id": core_logging.user_id_ctx.get(),
+            "client_ip": core_logging.client_ip_ctx.get(),
+            "status_code": core_logging.status_code_ctx.get() or None,
+            "latency_ms": round(core_logging.latency_ms_ctx.get(), 2) or None,
+        }
+        for k, v in record.__dict__.items():
+            if k.startswith('_'):
+                continue
+            if k in base or k in ('msg', 'args', 'levelname', 'levelno', 'pathname', 'filename', 'module', 'exc_info',
+                                  'exc_text', 'stack_info', 'lineno', 'funcName', 'created', 'msecs',
+                                  'relativeCreated', 'thread', 'threadName', 'processName', 'process'):
+                continue
+            base[k] = v
+        return json.dumps(base, ensure_ascii=False, default=str)
+
+
+class LegacySimpleLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        endpoint_key = f"{request.method} {request.url.path}"
+        title = API_TITLES.get(endpoint_key, f"🔧 {request.method} {request.url.path}")
+        logger = logging.getLogger("api")
+        logger.info(f"🚀 {title} - 시도")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        if response.status_code < 400:
+            logger.info(f"✅ {title} - 성공 ({response.status_code}) ({process_time:.2f}s)")
+        else:
+            logger.warning(f"⚠️ {title} - 실패 ({response.status_code}) ({process_time:.2f}s)")
+        return response
+
+
+class LegacyLoggingContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
+        start = time.time()
+        core_logging.request_id_ctx.set(uuid.uuid4().hex[:12])
+        core_logging.path_ctx.set(scope.get("path") or "-")
+        core_logging.method_ctx.set(scope.get("method") or "-")
+        client = scope.get("client")
+        core_logging.client_ip_ctx.set(f"{client[0]}:{client[1]}" if client else "-")
+
+        async def send_wrapper(message):
+            if message.get('type') == 'http.response.start':
+                core_logging.status_code_ctx.set(message.get('status'))
+            return await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            core_logging.latency_ms_ctx.set((time.time() - start) * 1000.0)
+            logging.getLogger("access").info("request complete", extra={"event": "request_end"})
+
+
+# ---------------- harness ---------------- #
+def build_app(mode: str, sample_rate: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/users/{user_id}/profile")
+    async def profile(user_id: int):
+        return {"id": user_id, "nickname": f"user{user_id}"}
+
+    if mode == "legacy":
+        app.add_middleware(LegacySimpleLoggingMiddleware)
+        app.add_middleware(LegacyLoggingContextMiddleware)
+    elif mode in ("access", "sampled"):
+        app.add_middleware(AccessLogMiddleware, sample_rate=1.0 if mode == "access" else sample_rate,
+                           route_sample_rates={})
+    return app
+
+
+def configure_logging(mode: str, sink) -> None:
+    for name in ("access", "api"):
+        logging.getLogger(name).disabled = False
+    if mode == "legacy":
+        root = logging.getLogger()
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.setLevel(logging.INFO)
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(LegacyJSONLogFormatter())
+        root.addHandler(handler)
+    elif mode == "none":
+        logging.getLogger().handlers.clear()
+    else:
+        core_logging.setup_logging(queued=True)
+        listener = core_logging._listener
+        if listener is not None:
+            for h in listener.handlers:
+                h.setStream(sink)
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 5000), "server": ("bench", 80),
+    }
+    status = 0
+    sent_body = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()  # uvicorn 과 같이 응답 완료 후 disconnect 전달
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_load(app, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            t0 = time.perf_counter()
+            assert await call(app, f"/api/users/{i % 1000}/profile") == 200
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies), 4),
+        "p50_ms": round(latencies[len(latencies) // 2], 4),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    result: Dict[str, Any] = {"requests": args.requests, "concurrency": args.concurrency}
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        for mode in ("none", "legacy", "access", "sampled"):
+            configure_logging(mode, sink)
+            app = build_app(mode, args.sample_rate)
+            asyncio.run(run_load(app, min(200, args.requests), args.concurrency))  # warm-up
+            result[mode] = asyncio.run(run_load(app, args.requests, args.concurrency))
+        core_logging._stop_listener()
+    base = result["none"]["mean_ms"]
+    for mode in ("legacy", "access", "sampled"):
+        result[mode]["overhead_ms"] = round(result[mode]["mean_ms"] - base, 4)
+
+    print("=== Access log overhead benchmark ===")
+    for mode in ("none", "legacy", "access", "sampled"):
+        r = result[mode]
+        print(f"{mode:8s} rps={r['rps']:>9} mean={r['mean_ms']}ms p95={r['p95_ms']}ms "
+              f"overhead={r.get('overhead_ms', 0.0)}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
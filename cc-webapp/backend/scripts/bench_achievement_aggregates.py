@@ -0,0 +1,173 @@
+"""업적 평가 비용 벤치마크: game_history 전체 스캔 vs 증분 집계
+
+용도:
+  - 기존 평가기(SUM(delta_coin) 전체 스캔 + 최근 100행 연승 스캔)와
+    history_aggregate_service 기반 O(1) 조회의 평가 1회당 지연 비교
+  - 헤비 유저 1명에게 --rows 건(기본 1,000,000)의 GameHistory 를 시드
+
+사용:
+  python -m scripts.bench_achievement_aggregates [--rows 1000000] [--iterations 50] [--db-url sqlite:///./bench_ach.db]
+
+주의:
+  - 기본은 임시 SQLite 파일 DB. Postgres 비교 시 --db-url 지정 (테이블이 생성/삭제됨 → 전용 DB 사용)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any
+
+from sqlalchemy import create_engine, select, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, GameHistory, GameHistoryAggregate, UserWinStreak
+from app.services import history_aggregate_service as aggregates
+
+GAMES = ("slot", "rps", "gacha", "crash")
+ACTIONS = ("BET", "WIN", "LOSE")
+
+
+def legacy_cumulative(db, user_id: int, action: str, game_type: str | None) -> int:
+    stmt = select(func.sum(GameHistory.delta_coin)).where(
+        GameHistory.user_id == user_id, GameHistory.action_type == action
+    )
+    if game_type:
+        stmt = stmt.where(GameHistory.game_type == game_type)
+    return int(db.execute(stmt).scalar() or 0)
+
+
+def legacy_streak(db, user_id: int, game_type: str | None) -> int:
+    rows = db.execute(
+        select(GameHistory.action_type, GameHistory.game_type)
+        .where(GameHistory.user_id == user_id)
+        .order_by(GameHistory.created_at.desc())
+        .limit(100)
+    ).all()
+    streak = 0
+    for action_type, gtype in rows:
+        if action_type != "WIN" or (game_type and gtype != game_type):
+            break
+        streak += 1
+    return streak
+
+
+def seed(db, user_id: int, rows: int, rng: random.Random, batch: int = 50_000) -> None:
+    start = datetime.utcnow() - timedelta(seconds=rows)
+    done = 0
+    while done < rows:
+        n = min(batch, rows - done)
+        db.execute(insert(GameHistory), [
+            {
+                "user_id": user_id,
+                "game_type": rng.choice(GAMES),
+                "action_type": rng.choice(ACTIONS),
+                "delta_coin": rng.randint(1, 500),
+                "delta_gem": 0,
+                "created_at": start + timedelta(seconds=done + i),
+            }
+            for i in range(n)
+        ])
+        db.commit()
+        done += n
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=int(os.getenv("BENCH_ROWS", 1_000_000)))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="bench_ach_")
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(url)
+    tables = [User.__table__, GameHistory.__table__, GameHistoryAggregate.__table__, UserWinStreak.__table__]
+    Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+    Base.metadata.create_all(engine, tables=tables)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    user = User(site_id="bench_heavy", nickname="bench_heavy", phone_number="00000000000", password_hash="x", invite_code="5858")
+    db.add(user)
+    db.commit()
+    rng = random.Random(args.seed)
+
+    t0 = time.perf_counter()
+    seed(db, user.id, args.rows, rng)
+    seed_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    aggregates.rebuild(db, user_ids=[user.id])
+    rebuild_sec = time.perf_counter() - t0
+
+    # 평가 1회 = CUMULATIVE_BET + TOTAL_WIN_AMOUNT + WIN_STREAK (game_type 지정/미지정)
+    def legacy_eval():
+        for g in (None, "slot"):
+            legacy_cumulative(db, user.id, "BET", g)
+            legacy_cumulative(db, user.id, "WIN", g)
+            legacy_streak(db, user.id, g)
+
+    def aggregate_eval():
+        for g in (None, "slot"):
+            aggregates.amount_total(db, user_id=user.id, action_type="BET", game_type=g)
+            aggregates.amount_total(db, user_id=user.id, action_type="WIN", game_type=g)
+            aggregates.win_streak(db, user_id=user.id, game_type=g)
+        db.expire_all()  # identity map 캐시 배제
+
+    # 정합성 확인
+    for g in (None, "slot"):
+        assert legacy_cumulative(db, user.id, "WIN", g) == aggregates.amount_total(db, user_id=user.id, action_type="WIN", game_type=g)
+
+    result = {
+        "db": engine.url.get_backend_name(),
+        "rows": args.rows,
+        "seed_sec": round(seed_sec, 2),
+        "rebuild_sec": round(rebuild_sec, 2),
+        "legacy_full_scan": timed(legacy_eval, args.iterations),
+        "incremental_aggregate": timed(aggregate_eval, args.iterations),
+    }
+    result["speedup_mean"] = round(result["legacy_full_scan"]["mean_ms"] / max(result["incremental_aggregate"]["mean_ms"], 1e-9), 1)
+    db.close()
+    engine.dispose()
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("=== Achievement evaluation benchmark ===")
+    print(f"rows={args.rows} legacy_mean={result['legacy_full_scan']['mean_ms']}ms "
+          f"aggregate_mean={result['incremental_aggregate']['mean_ms']}ms speedup={result['speedup_mean']}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
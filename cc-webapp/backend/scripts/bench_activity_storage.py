@@ -0,0 +1,179 @@
+"""활동 테이블 저장 레이아웃 벤치마크: 단일 테이블 원본 스캔(legacy) vs 복합 인덱스 + 롤업 + 범위 보존
+
+용도:
+  - --days 일 동안 --users 명의 user_actions --rows 건을 생성 (SQLite 임시 파일 DB)
+  - legacy: 기존 스키마 (PK + id 인덱스만) 에서 대시보드/메트릭 질의를 원본 스캔으로 실행
+      spins_last_hour / gacha_today / DAU / 30일 SLOT_SPIN 건수 / 보존 삭제 (단일 DELETE)
+  - new: 복합 인덱스 생성 + refresh_rollups 비용 측정 후 같은 질의를 activity_storage_service 로 실행
+      (롤업 + 원본 tail, 결과가 legacy 와 같은지 검증)
+  - 보존 삭제: 같은 인덱스 구성에서 단일 DELETE (쓰기 잠금 1회 장기 보유) vs purge_expired (id chunk, chunk 당 짧은 잠금)
+  - 질의별 평균 지연(ms)과 배수 출력
+
+사용:
+  python -m scripts.bench_activity_storage [--rows 2000000] [--days 60] [--users 50000] [--repeat 5] [--output result.json]
+  (운영 규모 재현: --rows 20000000, 디스크 약 2GB)
+
+Postgres 월 파티션 DROP 은 메타데이터 연산이라 여기서는 측정하지 않는다 (SQLite 는 chunk 삭제 경로).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import UserAction
+from app.services import activity_storage_service as storage
+
+NOW = datetime(2026, 10, 18, 12, 34, 56)
+ACTIONS = ["SLOT_SPIN"] * 6 + ["GACHA_PULL"] * 2 + ["LOGIN", "BUY_PACKAGE", "CRASH_BET", "RPS_PLAY"]
+NEW_INDEXES = ("ix_user_actions_user_created", "ix_user_actions_type_created", "ix_user_actions_created_brin")
+
+
+def _populate(path: str, args) -> None:
+    """created_at 순으로 append (운영 테이블과 같은 물리 순서)"""
+    conn = sqlite3.connect(path)
+    rnd = random.Random(42)
+    start = NOW - timedelta(days=args.days)
+    span = (NOW - start).total_seconds()
+    step = span / args.rows
+    batch = []
+    for i in range(args.rows):
+        ts = start + timedelta(seconds=i * step)
+        # 활동의 80% 는 상위 20% 사용자
+        uid = rnd.randint(1, args.users // 5) if rnd.random() < 0.8 else rnd.randint(1, args.users)
+        batch.append((uid, rnd.choice(ACTIONS), None, ts.strftime("%Y-%m-%d %H:%M:%S.%f")))
+        if len(batch) >= 50_000:
+            conn.executemany("INSERT INTO user_actions (user_id, action_type, action_data, created_at) VALUES (?,?,?,?)", batch)
+            batch.clear()
+    if batch:
+        conn.executemany("INSERT INTO user_actions (user_id, action_type, action_data, created_at) VALUES (?,?,?,?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def _timed(fn: Callable[[], Any], repeat: int):
+    value = fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return value, round((time.perf_counter() - t0) / repeat * 1e3, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_activity_"), "activity.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:  # legacy 스키마 재현
+        for name in NEW_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    t0 = time.perf_counter()
+    _populate(path, args)
+    load_sec = round(time.perf_counter() - t0, 2)
+    db = sessionmaker(bind=engine)()
+
+    hour_ago = NOW - timedelta(hours=1)
+    today = NOW.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_ago = NOW - timedelta(days=30)
+
+    def raw_count(action, since):
+        return lambda: db.execute(select(func.count()).select_from(UserAction).where(
+            UserAction.action_type == action, UserAction.created_at >= since, UserAction.created_at < NOW)).scalar()
+
+    legacy_queries = {
+        "spins_last_hour": raw_count("SLOT_SPIN", hour_ago),
+        "gacha_today": raw_count("GACHA_PULL", today),
+        "dau": lambda: db.execute(select(func.count(func.distinct(UserAction.user_id)))
+                                  .where(UserAction.created_at >= today)).scalar(),
+        "slot_spins_30d": raw_count("SLOT_SPIN", month_ago),
+    }
+    new_queries = {
+        "spins_last_hour": lambda: storage.count_actions(db, "SLOT_SPIN", hour_ago, NOW),
+        "gacha_today": lambda: storage.count_actions(db, "GACHA_PULL", today, NOW),
+        "dau": lambda: storage.active_users(db, today),
+        "slot_spins_30d": lambda: storage.count_actions(db, "SLOT_SPIN", month_ago, NOW),
+    }
+
+    result: Dict[str, Any] = {"rows": args.rows, "days": args.days, "users": args.users, "load_sec": load_sec,
+                              "legacy": {}, "new": {}, "speedup": {}}
+    expected = {}
+    for name, fn in legacy_queries.items():
+        expected[name], result["legacy"][name] = _timed(fn, args.repeat)
+
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE INDEX ix_user_actions_user_created ON user_actions (user_id, created_at)")
+        conn.exec_driver_sql("CREATE INDEX ix_user_actions_type_created ON user_actions (action_type, created_at)")
+        conn.exec_driver_sql("CREATE INDEX ix_user_actions_created_brin ON user_actions (created_at)")
+    result["index_build_sec"] = round(time.perf_counter() - t0, 2)
+    os.environ.setdefault("ACTIVITY_ROLLUP_BACKFILL_DAYS", str(args.days + 1))
+    t0 = time.perf_counter()
+    storage.refresh_rollups(db, now=NOW)
+    result["rollup_backfill_sec"] = round(time.perf_counter() - t0, 2)
+    t0 = time.perf_counter()
+    storage.refresh_rollups(db, now=NOW + timedelta(minutes=5))
+    result["rollup_incremental_refresh_ms"] = round((time.perf_counter() - t0) * 1e3, 2)
+
+    mismatches = {}
+    for name, fn in new_queries.items():
+        value, result["new"][name] = _timed(fn, args.repeat)
+        if value != expected[name]:
+            mismatches[name] = {"legacy": expected[name], "new": value}
+        result["speedup"][name] = round(result["legacy"][name] / max(result["new"][name], 1e-3), 1)
+    result["mismatches"] = mismatches
+
+    # 보존: 최근 한 달 + 이번 달만 유지 (months=1)
+    cutoff = storage.add_months(storage.month_start(NOW), -1)
+    legacy_db = os.path.join(os.path.dirname(path), "legacy_purge.db")
+    with sqlite3.connect(path) as src, sqlite3.connect(legacy_db) as dst:
+        src.backup(dst)  # 같은 스키마/인덱스에서 단일 DELETE vs chunk 비교
+        t0 = time.perf_counter()
+        legacy_deleted = dst.execute("DELETE FROM user_actions WHERE created_at < ?",
+                                     (cutoff.strftime("%Y-%m-%d %H:%M:%S.%f"),)).rowcount
+        dst.commit()
+        result["legacy"]["purge_sec"] = round(time.perf_counter() - t0, 2)
+    t0 = time.perf_counter()
+    report = storage.purge_expired(db, months=1, chunk_size=20_000, now=NOW)
+    result["new"]["purge_sec"] = round(time.perf_counter() - t0, 2)
+    result["purge_rows"] = {"legacy": legacy_deleted, "new": report["user_actions"]["deleted_rows"]}
+    chunks = max(1, -(-legacy_deleted // 20_000))
+    result["new"]["purge_avg_chunk_ms"] = round(result["new"]["purge_sec"] / chunks * 1e3, 1)
+    db.close()
+    engine.dispose()
+
+    print(f"=== Activity storage benchmark ({args.rows} rows, {args.days} days, {args.users} users) ===")
+    for name in legacy_queries:
+        print(f"{name:<16} legacy {result['legacy'][name]:>10} ms   new {result['new'][name]:>8} ms   "
+              f"x{result['speedup'][name]}")
+    print(f"index build {result['index_build_sec']}s  rollup backfill {result['rollup_backfill_sec']}s  "
+          f"incremental refresh {result['rollup_incremental_refresh_ms']}ms")
+    print(f"purge legacy {result['legacy']['purge_sec']}s (single DELETE, write lock held)  "
+          f"new {result['new']['purge_sec']}s ({chunks} chunks, ~{result['new']['purge_avg_chunk_ms']}ms lock each)  rows={result['purge_rows']}")
+    if mismatches:
+        print(f"MISMATCH {mismatches}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,144 @@
+"""연속 활동일(streak) 계산 벤치마크: 일자별 probe 루프(legacy) vs DISTINCT 날짜 단일 쿼리
+
+용도:
+  - 사용자 1명에게 --days 일(기본 400) 동안 하루 --per-day 건의 user_actions 시드 (+ 노이즈 사용자)
+  - legacy: 하루마다 func.date(created_at) == d 조회 (최대 30회)
+  - single: activity_streak() 1회 조회 (lookback 30 / 365 / 무제한)
+
+사용:
+  python -m scripts.bench_activity_streak [--days 400] [--per-day 20] [--noise-users 200] [--iterations 50] [--db-url ...]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from sqlalchemy import Index, create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, UserAction
+from app.services.activity_streak_service import activity_streak
+
+
+def legacy_streak(db, user_id: int) -> int:
+    today = datetime.utcnow().date()
+    streak = 0
+    for i in range(30):
+        check_date = today - timedelta(days=i)
+        activity = db.query(UserAction).filter(
+            UserAction.user_id == user_id,
+            func.date(UserAction.created_at) == check_date,
+        ).first()
+        if not activity:
+            break
+        streak += 1
+    return streak
+
+
+def seed(db, days: int, per_day: int, noise_users: int, rng: random.Random) -> int:
+    db.execute(insert(User), [
+        {"site_id": f"streak_{i}", "nickname": f"streak_{i}", "phone_number": f"010{i:08d}",
+         "password_hash": "x", "invite_code": "5858"}
+        for i in range(noise_users + 1)
+    ])
+    db.commit()
+    ids = list(db.scalars(select(User.id).order_by(User.id)))
+    target, noise = ids[0], ids[1:]
+    now = datetime.utcnow().replace(hour=12)
+    rows = []
+    for d in range(days):
+        day = now - timedelta(days=d)
+        for _ in range(per_day):
+            rows.append({"user_id": target, "action_type": "SLOT_SPIN", "created_at": day - timedelta(minutes=rng.randint(0, 600))})
+            if noise:
+                rows.append({"user_id": rng.choice(noise), "action_type": "SLOT_SPIN", "created_at": day})
+        if len(rows) >= 20_000:
+            db.execute(insert(UserAction), rows)
+            db.commit()
+            rows.clear()
+    if rows:
+        db.execute(insert(UserAction), rows)
+        db.commit()
+    return target
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--noise-users", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="bench_streak_")
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(url)
+    tables = [User.__table__, UserAction.__table__]
+    Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+    Base.metadata.create_all(engine, tables=tables)
+    # 운영 스키마와 동일한 (user_id, created_at) 인덱스 (alembic 20250811_core_indexes_constraints)
+    Index("ix_user_actions_user_created", UserAction.user_id, UserAction.created_at).create(engine, checkfirst=True)
+    db = sessionmaker(bind=engine)()
+
+    user_id = seed(db, args.days, args.per_day, args.noise_users, random.Random(args.seed))
+    expected = legacy_streak(db, user_id)
+    assert activity_streak(db, user_id, lookback_days=30) == expected
+
+    result = {
+        "db": engine.url.get_backend_name(),
+        "days": args.days,
+        "rows": int(db.scalar(select(func.count(UserAction.id)))),
+        "streak_30": expected,
+        "legacy_loop_30": timed(lambda: legacy_streak(db, user_id), args.iterations),
+        "single_query_30": timed(lambda: activity_streak(db, user_id, lookback_days=30), args.iterations),
+        "single_query_365": timed(lambda: activity_streak(db, user_id, lookback_days=365), args.iterations),
+        "single_query_unbounded": timed(lambda: activity_streak(db, user_id, lookback_days=None), args.iterations),
+        "streak_unbounded": activity_streak(db, user_id, lookback_days=None),
+    }
+    result["speedup_30"] = round(result["legacy_loop_30"]["mean_ms"] / max(result["single_query_30"]["mean_ms"], 1e-9), 1)
+    db.close()
+    engine.dispose()
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("=== Activity streak benchmark ===")
+    print(f"legacy_30={result['legacy_loop_30']['mean_ms']}ms single_30={result['single_query_30']['mean_ms']}ms "
+          f"speedup={result['speedup_30']}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
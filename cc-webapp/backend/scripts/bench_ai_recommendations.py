@@ -0,0 +1,175 @@
+"""AI 추천 생성 벤치마크: 요청마다 조회/생성/INSERT(legacy) vs 캐시 + 중복 제거 + 배치
+
+용도:
+  - --users 명(기본 2,000) 사용자 + 세그먼트/선호도 + 사용자당 --actions 건 최근 액션 시드
+  - legacy: 요청마다 사용자/세그먼트/선호도/최근 50 액션 조회 → 추천 구성 → 전부 INSERT
+    (이전 generate_recommendations 재현, 존재하지 않는 컬럼 참조는 실제 컬럼으로 보정)
+  - cached: AIRecommendationService.generate_recommendations (워터마크 캐시 + pending 재사용)
+  - 사용자마다 --repeat 회 요청 (사이에 1회 새 액션 기록) → ms/request, INSERT 행 수 비교
+  - batch: generate_batch (청크당 고정 쿼리) vs 사용자별 단건 생성 루프
+
+사용:
+  python -m scripts.bench_ai_recommendations [--users 2000] [--repeat 5] [--chunk-size 500] [--output result.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Index, create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, UserAction, UserSegment
+from app.models.ai_models import UserPreference, UserRecommendation
+from app.services import ai_recommendation_service as svc_mod
+from app.services.ai_recommendation_service import AIRecommendationService, normalize_segment
+from app.utils.redis import RedisManager
+
+SEGMENTS = ["Whale", "High Engaged", "Medium", "Low/At-risk"]
+
+
+def seed(db, users: int, actions: int) -> None:
+    db.execute(insert(User), [
+        {"site_id": f"rec_{i}", "nickname": f"rec_{i}", "phone_number": f"010{i:08d}",
+         "password_hash": "x", "invite_code": "5858", "is_active": True}
+        for i in range(users)
+    ])
+    ids = [uid for (uid,) in db.query(User.id).order_by(User.id).all()]
+    db.execute(insert(UserSegment), [{"user_id": uid, "rfm_group": SEGMENTS[uid % 4]} for uid in ids])
+    db.execute(insert(UserPreference), [
+        {"user_id": uid, "preferred_games": {"slot": 0.9, "rps": 0.4}, "learning_rate": 0.1} for uid in ids
+    ])
+    now = datetime.utcnow()
+    payload = json.dumps({"v": 1, "data": {"game_type": "slot"}})
+    db.execute(insert(UserAction), [
+        {"user_id": uid, "action_type": "GAME_SPIN", "action_data": payload,
+         "created_at": now - timedelta(minutes=k)}
+        for uid in ids for k in range(actions)
+    ])
+    db.commit()
+
+
+def legacy_generate(db, service: AIRecommendationService, user_id: int, max_recommendations: int = 5):
+    since = datetime.utcnow() - timedelta(days=7)
+    if not db.query(User).filter(User.id == user_id).first():
+        return []
+    segment = db.query(UserSegment).filter(UserSegment.user_id == user_id).first()
+    preference = db.query(UserPreference).filter(UserPreference.user_id == user_id).first()
+    recent = db.query(UserAction).filter(
+        UserAction.user_id == user_id, UserAction.created_at >= since
+    ).limit(50).all()
+    seg = normalize_segment(segment)
+    recs = []
+    recs += service._generate_game_recommendations(user_id, seg, preference, recent)
+    recs += service._generate_reward_recommendations(user_id, seg, preference, recent)
+    recs += service._generate_mission_recommendations(user_id, seg, preference, recent)
+    recs += service._generate_content_recommendations(user_id, seg, preference, recent, "neutral")
+    for spec in svc_mod._segment_candidates(db, seg):
+        recs.append(UserRecommendation(user_id=user_id, source="ai_engine", algorithm_version="v1.0", **spec))
+    recs.sort(key=lambda x: x.priority_score, reverse=True)
+    recs = recs[:max_recommendations]
+    for rec in recs:
+        db.add(rec)
+    db.commit()
+    return recs
+
+
+def reset(db) -> None:
+    db.execute(delete(UserRecommendation))
+    db.commit()
+
+
+def run_requests(db, ids, repeat, fn) -> float:
+    t0 = time.perf_counter()
+    for r in range(repeat):
+        for uid in ids:
+            fn(uid)
+        if r == repeat // 2:  # 중간에 새 액션 1건 → 캐시 무효화 경로 포함
+            db.execute(insert(UserAction), [{"user_id": uid, "action_type": "LOGIN", "action_data": "{}"} for uid in ids])
+            db.commit()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--actions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--db-url", help="기본: 임시 SQLite 파일")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="bench_recs_")
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # 운영 마이그레이션(20250811_core_indexes_constraints)의 user_actions 인덱스 재현
+    Index("ix_user_actions_user_created", UserAction.user_id, UserAction.created_at).create(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        seed(db, args.users, args.actions)
+        ids = [uid for (uid,) in db.query(User.id).order_by(User.id).all()]
+        requests = len(ids) * args.repeat
+        result = {"users": len(ids), "requests": requests}
+
+        # RedisManager() 미연결 → 프로세스 메모리 폴백 캐시 (Redis 연결 시 동일 경로)
+        legacy_service = AIRecommendationService(db)
+        legacy_sec = run_requests(db, ids, args.repeat, lambda uid: legacy_generate(db, legacy_service, uid))
+        result["legacy"] = {"sec": round(legacy_sec, 3), "ms_per_request": round(legacy_sec / requests * 1e3, 3),
+                            "rows_inserted": db.query(UserRecommendation).count()}
+        reset(db)
+
+        service = AIRecommendationService(db, RedisManager())
+        loop = asyncio.new_event_loop()
+        cached_sec = run_requests(
+            db, ids, args.repeat, lambda uid: loop.run_until_complete(service.generate_recommendations(uid))
+        )
+        result["cached"] = {"sec": round(cached_sec, 3), "ms_per_request": round(cached_sec / requests * 1e3, 3),
+                            "rows_inserted": db.query(UserRecommendation).count()}
+        reset(db)
+
+        t0 = time.perf_counter()
+        for uid in ids:
+            loop.run_until_complete(AIRecommendationService(db).generate_recommendations(uid))
+        single_sec = time.perf_counter() - t0
+        reset(db)
+        t0 = time.perf_counter()
+        stats = AIRecommendationService(db, RedisManager()).generate_batch(chunk_size=args.chunk_size)
+        batch_sec = time.perf_counter() - t0
+        result["batch"] = {"per_user_loop_sec": round(single_sec, 3), "batch_sec": round(batch_sec, 3),
+                           "users_per_sec": round(stats["users"] / batch_sec, 1), **stats}
+        result["request_speedup"] = round(legacy_sec / cached_sec, 1)
+        result["batch_speedup"] = round(single_sec / batch_sec, 1)
+
+        print("=== AI recommendation benchmark ===")
+        for key in ("legacy", "cached"):
+            print(f"{key:8s} {result[key]['ms_per_request']:>8} ms/request  rows={result[key]['rows_inserted']}")
+        print(f"batch    {result['batch']['batch_sec']}s vs per-user {result['batch']['per_user_loop_sec']}s "
+              f"({result['batch_speedup']}x), request speedup {result['request_speedup']}x")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        else:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        loop.close()
+    finally:
+        db.close()
+        engine.dispose()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
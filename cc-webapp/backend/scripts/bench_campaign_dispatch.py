@@ -0,0 +1,116 @@
+"""캠페인 발송 벤치마크: 사용자별 ORM add + 단일 커밋(legacy) vs 청크 스트리밍 bulk INSERT
+
+용도:
+  - --users 명(기본 50,000) 활성 사용자를 시드하고 targeting_type='all' 캠페인 1건 발송
+  - legacy: 대상 전체 set 로드 → Notification ORM 객체 add → 1회 커밋 (이전 dispatch_due_campaigns 재현)
+  - chunked: dispatch_campaign (키셋 페이지 + 청크별 bulk INSERT/커밋 + cursor 체크포인트)
+  - notifications/sec, 생성 건수 일치 확인
+
+사용:
+  python -m scripts.bench_campaign_dispatch [--users 50000] [--chunk-size 1000] [--db-url sqlite:///./bench_camp.db]
+
+주의:
+  - 기본은 임시 SQLite 파일 DB. Postgres 비교 시 --db-url 지정 (테이블이 생성/삭제됨 → 전용 DB 사용)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, delete, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Notification, NotificationCampaign, User, UserSegment
+from app.services.campaign_dispatcher import dispatch_campaign
+
+
+def seed(db, users: int, batch: int = 20_000) -> None:
+    for start in range(0, users, batch):
+        db.execute(insert(User), [
+            {"site_id": f"camp_{i}", "nickname": f"camp_{i}", "phone_number": f"010{i:08d}",
+             "password_hash": "x", "invite_code": "5858", "is_active": True}
+            for i in range(start, min(users, start + batch))
+        ])
+        db.commit()
+
+
+def legacy_dispatch(db, camp: NotificationCampaign, now: datetime) -> None:
+    user_ids = {uid for (uid,) in db.query(User.id).filter(User.is_active == True).all()}  # noqa: E712
+    for uid in user_ids:
+        db.add(Notification(user_id=uid, title=camp.title, message=camp.message, is_sent=False))
+    camp.status = "sent"
+    camp.sent_at = now
+    db.add(camp)
+    db.commit()
+
+
+def new_campaign(db, title: str) -> NotificationCampaign:
+    camp = NotificationCampaign(title=title, message="bench", targeting_type="all")
+    db.add(camp)
+    db.commit()
+    return camp
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=int(os.getenv("BENCH_USERS", 50_000)))
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="bench_camp_")
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(url)
+    tables = [User.__table__, UserSegment.__table__, Notification.__table__, NotificationCampaign.__table__]
+    Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+    Base.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow().replace(tzinfo=timezone.utc)
+
+    t0 = time.perf_counter()
+    seed(db, args.users)
+    result = {"db": engine.url.get_backend_name(), "users": args.users, "chunk_size": args.chunk_size,
+              "seed_sec": round(time.perf_counter() - t0, 2)}
+
+    camp = new_campaign(db, "legacy")
+    t0 = time.perf_counter()
+    legacy_dispatch(db, camp, now)
+    legacy_sec = time.perf_counter() - t0
+    legacy_count = db.scalar(select(func.count()).select_from(Notification))
+    result["legacy"] = {"seconds": round(legacy_sec, 3), "per_sec": round(legacy_count / legacy_sec, 1)}
+    db.execute(delete(Notification))
+    db.commit()
+
+    camp = new_campaign(db, "chunked")
+    stats = dispatch_campaign(db, camp, now, chunk_size=args.chunk_size, push=False)
+    result["chunked"] = stats.as_dict()
+    result["counts_match"] = legacy_count == stats.notifications
+    result["speedup"] = round(stats.per_sec / max(result["legacy"]["per_sec"], 1e-9), 1)
+
+    db.close()
+    engine.dispose()
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("=== Campaign dispatch benchmark ===")
+    print(f"users={args.users} legacy={result['legacy']['per_sec']}/s chunked={result['chunked']['per_sec']}/s "
+          f"speedup={result['speedup']}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
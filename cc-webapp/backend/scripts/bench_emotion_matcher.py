@@ -0,0 +1,152 @@
+"""채팅 감정 분석 벤치마크: 키워드별 `in` 루프(legacy) vs 단일 패스 컴파일 매처
+
+용도:
+  - 채팅 문장 코퍼스(기본: 한/영 혼합 합성 --lines 줄, 또는 --corpus 파일 한 줄 1문장)
+  - EmotionEngine: legacy detect_emotion_from_text 루프 vs analyze_text / analyze_many
+  - sentiment: legacy get_emotion_analysis(호출마다 SentimentAnalyzer 생성) vs 공유 분석기 / analyze_many
+  - 두 방식의 결과 일치 확인
+
+사용:
+  python -m scripts.bench_emotion_matcher [--lines 20000] [--corpus chat.txt] [--output result.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from app.utils import sentiment_analyzer as sa
+from app.utils.emotion_engine import EMOTION_KEYWORDS, SENTIMENT_MAPPING, EmotionEngine
+
+FILLER_KO = "오늘 게임 잘 됐다 ㅋㅋ 다음엔 더 해볼게 슬롯 돌리는 중 잭팟 언제 나오냐 친구랑 같이 이벤트 보상 받았어".split()
+FILLER_EN = "today slot spin again jackpot soon friends event reward lol gg one more round".split()
+
+
+# ---------------- legacy (이전 구현 재현) ---------------- #
+def legacy_detect(text: str) -> Dict[str, Any]:
+    if not text:
+        return {"emotion": "neutral", "confidence": 0.0, "sentiment_score": 0.0}
+    text_lower = text.lower()
+    emotion_scores = {}
+    for emotion, data in EMOTION_KEYWORDS.items():
+        score = 0.0
+        keywords_found = []
+        for keyword in data["keywords"]:
+            if keyword in text_lower:
+                score += data["weight"]
+                keywords_found.append(keyword)
+        if score > 0:
+            emotion_scores[emotion] = {"score": score, "keywords": keywords_found}
+    if emotion_scores:
+        best = max(emotion_scores.keys(), key=lambda k: emotion_scores[k]["score"])
+        confidence = min(emotion_scores[best]["score"] / 3.0, 1.0)
+        sentiment_score = SENTIMENT_MAPPING.get(best, 0.0)
+    else:
+        best, confidence, sentiment_score = "neutral", 0.5, 0.0
+    return {"emotion": best, "confidence": confidence, "sentiment_score": sentiment_score, "details": emotion_scores}
+
+
+def legacy_basic(text: str) -> sa.EmotionResult:
+    language = sa.detect_language(text)
+    text_lower = text.lower()
+    lang_key = 'korean' if language == sa.SupportedLanguage.KOREAN else 'english'
+    scores = {}
+    for emotion, keywords in sa.EMOTION_KEYWORDS.items():
+        lang_keywords = keywords.get(lang_key, [])
+        score = sum(1 for k in lang_keywords if k in text_lower)
+        if score > 0 and lang_keywords:
+            scores[emotion] = score / len(lang_keywords)
+    if scores:
+        best = max(scores, key=lambda k: scores[k])
+        return sa.EmotionResult(emotion=best, confidence=min(scores[best] * 2, 1.0), scores=scores, language=language)
+    return sa.EmotionResult(emotion=sa.SupportedEmotion.NEUTRAL, confidence=0.6, scores={}, language=language)
+
+
+def legacy_get_emotion_analysis(text: str) -> sa.EmotionResult:
+    # 호출마다 분석기 생성 (load_local_model + 환경변수 읽기) 후 분석
+    sa.SentimentAnalyzer()
+    if not text or not text.strip():
+        return sa.EmotionResult(emotion=sa.SupportedEmotion.NEUTRAL, confidence=1.0, scores={},
+                                language=sa.SupportedLanguage.KOREAN)
+    return legacy_basic(sa.preprocess_text(text))
+
+
+# ---------------- harness ---------------- #
+def synth_corpus(lines: int, rng: random.Random) -> List[str]:
+    ko_keywords = [k for d in EMOTION_KEYWORDS.values() for k in d["keywords"]]
+    ko_keywords += [k for d in sa.EMOTION_KEYWORDS.values() for k in d["korean"]]
+    en_keywords = [k for d in sa.EMOTION_KEYWORDS.values() for k in d["english"]]
+    corpus = []
+    for _ in range(lines):
+        english = rng.random() < 0.3
+        words = [rng.choice(FILLER_EN if english else FILLER_KO) for _ in range(rng.randint(3, 14))]
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            words.insert(rng.randint(0, len(words)), rng.choice(en_keywords if english else ko_keywords))
+        corpus.append(" ".join(words) + rng.choice(("", "!", "?", " ㅠㅠ", "!!")))
+    return corpus
+
+
+def timed(fn: Callable[[], Any], lines: int, repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    best = min(samples)
+    return {"best_sec": round(best, 4), "us_per_line": round(best / lines * 1e6, 3),
+            "lines_per_sec": round(lines / best, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=20_000)
+    parser.add_argument("--corpus", help="한 줄 1문장 텍스트 파일 (미지정 시 합성)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+    logging.getLogger("app.utils.sentiment_analyzer").setLevel(logging.WARNING)
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        corpus = synth_corpus(args.lines, random.Random(args.seed))
+    n = len(corpus)
+    engine = EmotionEngine()
+    analyzer = sa.get_sentiment_analyzer()
+
+    result: Dict[str, Any] = {"lines": n}
+    result["engine_legacy"] = timed(lambda: [legacy_detect(t) for t in corpus], n, args.repeat)
+    result["engine_compiled"] = timed(lambda: [engine.analyze_text(t) for t in corpus], n, args.repeat)
+    result["engine_analyze_many"] = timed(lambda: engine.analyze_many(corpus), n, args.repeat)
+    result["sentiment_legacy"] = timed(lambda: [legacy_get_emotion_analysis(t) for t in corpus], n, args.repeat)
+    result["sentiment_shared"] = timed(lambda: [sa.get_emotion_analysis(t) for t in corpus], n, args.repeat)
+    result["sentiment_analyze_many"] = timed(lambda: analyzer.analyze_many(corpus), n, args.repeat)
+    result["engine_results_match"] = [legacy_detect(t) for t in corpus] == [engine.analyze_text(t) for t in corpus]
+    result["sentiment_results_match"] = (
+        [legacy_get_emotion_analysis(t) for t in corpus] == [sa.get_emotion_analysis(t) for t in corpus]
+    )
+    result["engine_speedup"] = round(result["engine_legacy"]["best_sec"] / result["engine_compiled"]["best_sec"], 1)
+    result["sentiment_speedup"] = round(
+        result["sentiment_legacy"]["best_sec"] / result["sentiment_shared"]["best_sec"], 1
+    )
+
+    print("=== Emotion matcher benchmark ===")
+    for key in ("engine_legacy", "engine_compiled", "engine_analyze_many",
+                "sentiment_legacy", "sentiment_shared", "sentiment_analyze_many"):
+        print(f"{key:24s} {result[key]['us_per_line']:>8} us/line  {result[key]['lines_per_sec']:>12} lines/s")
+    print(f"match: engine={result['engine_results_match']} sentiment={result['sentiment_results_match']} "
+          f"speedup: engine={result['engine_speedup']}x sentiment={result['sentiment_speedup']}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
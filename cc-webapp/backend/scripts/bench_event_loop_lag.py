@@ -0,0 +1,225 @@
+"""이벤트 루프 지연 벤치마크: async 라우트의 동기 Redis 호출(legacy) vs AsyncRedisManager
+
+용도:
+  - /api/streak/tick 의 Redis 구간을 --requests 건(--concurrency 동시) 실행
+    - legacy: 동기 RedisManager (호출마다 ping) + get_redis() SET NX 가드 → 이전 tick 재현
+    - async : AsyncRedisManager.set_nx + record_streak_tick (파이프라인 1회)
+  - 모니터 코루틴이 --tick-ms 간격으로 깨어나며 예정 대비 지연(loop lag)을 측정 → p50/p99/max
+  - 요청 처리량(req/s), 요청당 Redis 왕복 수
+
+사용:
+  python -m scripts.bench_event_loop_lag [--redis-url redis://localhost:6379/15] [--requests 2000] [--output result.json]
+
+주의: --redis-url 의 DB 를 FLUSHDB 한다 (전용 DB 사용).
+Redis 에 연결할 수 없으면 fakeredis 에 왕복 지연(--rtt-ms, 기본 0.5ms)을 주입해 측정한다
+(동기: time.sleep, 비동기: asyncio.sleep — 실제 네트워크 대기와 같은 블로킹 특성). 결과에 backend 로 표시.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.utils.redis import AsyncRedisManager, RedisManager
+
+
+class _RoundTrips:
+    count = 0
+
+
+class _SyncRTT:
+    """동기 클라이언트 래퍼: 명령마다 RTT 만큼 블로킹 (RedisManager 는 파이프라인 미사용)"""
+
+    def __init__(self, client, rtt: float):
+        self._client, self._rtt = client, rtt
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+
+        def call(*args, **kwargs):
+            _RoundTrips.count += 1
+            time.sleep(self._rtt)
+            return attr(*args, **kwargs)
+        return call
+
+
+class _AsyncPipeRTT:
+    def __init__(self, pipe, rtt: float):
+        self._pipe, self._rtt = pipe, rtt
+
+    async def __aenter__(self):
+        await self._pipe.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._pipe.__aexit__(*exc)
+
+    async def execute(self):
+        _RoundTrips.count += 1
+        await asyncio.sleep(self._rtt)
+        return await self._pipe.execute()
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+
+class _AsyncRTT:
+    """비동기 클라이언트 래퍼: 명령/파이프라인 execute 마다 RTT 만큼 await (루프 양보)"""
+
+    def __init__(self, client, rtt: float):
+        self._client, self._rtt = client, rtt
+
+    def pipeline(self, *args, **kwargs):
+        return _AsyncPipeRTT(self._client.pipeline(*args, **kwargs), self._rtt)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            _RoundTrips.count += 1
+            await asyncio.sleep(self._rtt)
+            return await attr(*args, **kwargs)
+        return call
+
+
+class _CountingSync:
+    """실 Redis 동기 클라이언트 왕복 수 집계"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+
+        def call(*args, **kwargs):
+            _RoundTrips.count += 1
+            return attr(*args, **kwargs)
+        return call
+
+
+async def legacy_tick(sync: RedisManager, guard_client, uid: str, day: str) -> int:
+    """이전 /api/streak/tick Redis 구간 (async 함수 안에서 동기 호출)"""
+    allow = True
+    try:
+        if not guard_client.set(f"user:{uid}:streak_daily_lock:SLOT_SPIN:{day}", "1", nx=True, ex=172800):
+            allow = False
+    except Exception:
+        pass
+    cnt = sync.update_streak_counter(uid, "SLOT_SPIN") if allow else sync.get_streak_counter(uid, "SLOT_SPIN")
+    sync.get_streak_ttl(uid, "SLOT_SPIN")
+    sync.record_attendance_day(uid, "SLOT_SPIN", day)
+    return cnt
+
+
+async def async_tick(manager: AsyncRedisManager, uid: str, day: str) -> int:
+    allow = await manager.set_nx(f"user:{uid}:streak_daily_lock:SLOT_SPIN:{day}", "1", 172800) is not False
+    cnt, _ = await manager.record_streak_tick(uid, "SLOT_SPIN", day, increment=allow)
+    return cnt
+
+
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3, 3)
+
+
+async def measure(tick, requests: int, concurrency: int, tick_ms: float) -> Dict[str, Any]:
+    lags: List[float] = []
+    done = asyncio.Event()
+    interval = tick_ms / 1000
+
+    async def monitor():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - t0 - interval))
+
+    sem = asyncio.Semaphore(concurrency)
+    day = datetime.utcnow().date().isoformat()
+
+    async def one(i: int):
+        async with sem:
+            await tick(str(i % 5000), day)
+
+    mon = asyncio.create_task(monitor())
+    await asyncio.sleep(interval * 2)
+    _RoundTrips.count = 0
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - t0
+    round_trips = _RoundTrips.count
+    done.set()
+    await mon
+    return {
+        "elapsed_sec": round(elapsed, 3),
+        "req_per_sec": round(requests / elapsed, 1),
+        "round_trips_per_request": round(round_trips / requests, 2),
+        "loop_lag_p50_ms": _pct(lags, 0.5),
+        "loop_lag_p99_ms": _pct(lags, 0.99),
+        "loop_lag_max_ms": round(max(lags) * 1e3, 3) if lags else 0.0,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    import redis as redis_sync
+    import redis.asyncio as redis_async
+
+    backend = "redis"
+    try:
+        raw_sync = redis_sync.Redis.from_url(args.redis_url)
+        raw_sync.ping()
+        raw_sync.flushdb()
+        sync_client = _CountingSync(raw_sync)
+        async_client = redis_async.Redis.from_url(args.redis_url, max_connections=args.concurrency)
+        await async_client.ping()
+    except Exception:
+        import fakeredis
+        from fakeredis import aioredis as fake_aioredis
+        backend = f"fakeredis+simulated_rtt({args.rtt_ms}ms)"
+        server = fakeredis.FakeServer()
+        raw = fakeredis.FakeRedis(server=server)
+        rtt = args.rtt_ms / 1000
+        sync_client = _SyncRTT(raw, rtt)
+        async_client = _AsyncRTT(fake_aioredis.FakeRedis(server=server), rtt)
+
+    sync = RedisManager(sync_client)
+    legacy = await measure(lambda uid, day: legacy_tick(sync, sync_client, uid, day),
+                           args.requests, args.concurrency, args.tick_ms)
+    manager = AsyncRedisManager(async_client, sync_manager=sync)
+    new = await measure(lambda uid, day: async_tick(manager, uid, day),
+                        args.requests, args.concurrency, args.tick_ms)
+    if backend == "redis":
+        await async_client.aclose()
+    return {"backend": backend, "requests": args.requests, "concurrency": args.concurrency,
+            "legacy_sync": legacy, "async": new}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="fakeredis 대체 시 주입할 왕복 지연")
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="루프 지연 모니터 간격")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(f"=== Event loop lag benchmark ({result['backend']}, {args.requests} requests) ===")
+    for key in ("legacy_sync", "async"):
+        r = result[key]
+        print(f"{key:12s} {r['req_per_sec']:>9} req/s  rt/req={r['round_trips_per_request']:<5} "
+              f"lag p50={r['loop_lag_p50_ms']}ms p99={r['loop_lag_p99_ms']}ms max={r['loop_lag_max_ms']}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,186 @@
+"""게임 라운드 처리량 벤치마크: 단계별 commit(legacy) vs GameRound 단일 트랜잭션
+
+용도:
+  - --threads 개 스레드가 --users 명에게 슬롯 스핀을 총 --spins 회 실행 (동일 사용자 동시 요청 포함)
+    - legacy: 잔액 차감 commit → 당첨 가산 commit → user_action commit + Kafka 동기 발행
+              → game_history commit + 리더보드 동기 갱신 (이전 slot 라우트 재현)
+    - round : GameRound (조건부 원자 UPDATE ... RETURNING + 단일 commit, Kafka 는 outbox 행, 나머지 부수효과는 워커 풀)
+  - 부수효과(Kafka/리더보드) 지연은 --effect-ms 로 주입 (네트워크 왕복 대체)
+  - 처리량(spins/s), 스핀당 commit 수, 지연 p50/p95, 잔액 정합성(기대 잔액 - 실제 잔액)
+
+사용:
+  python -m scripts.bench_game_round [--spins 2000] [--threads 8] [--effect-ms 1.0] [--output result.json]
+
+임시 디렉터리의 SQLite 파일 DB 를 사용한다 (운영 DB 미접촉).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, UserAction
+from app.models.history_models import GameHistory
+from app.services import game_round as game_round_mod
+from app.services import history_aggregate_service
+from app.services.game_round import EffectDispatcher, GameRound, user_action_envelope
+
+
+class _Commits:
+    count = 0
+    lock = threading.Lock()
+
+
+def _effect(effect_ms: float) -> Callable[..., None]:
+    def run(*_args: Any) -> None:
+        time.sleep(effect_ms / 1000)
+    return run
+
+
+# ---------------- legacy (이전 구현 재현) ---------------- #
+def legacy_spin(db, user_id: int, bet: int, win: int, effect: Callable[..., None]) -> None:
+    user = db.query(User).filter(User.id == user_id).first()  # update_user_tokens(-bet)
+    user.gold_balance = max(0, user.gold_balance - bet)
+    db.commit()
+    if win > 0:  # update_user_tokens(win)
+        user = db.query(User).filter(User.id == user_id).first()
+        user.gold_balance += win
+        db.commit()
+    envelope = user_action_envelope("SLOT_SPIN", {"bet_amount": bet, "win_amount": win})
+    db.add(UserAction(user_id=user_id, action_type="SLOT_SPIN", action_data=json.dumps(envelope)))
+    db.commit()
+    effect(envelope)  # Kafka produce (동기)
+    action = "WIN" if win > 0 else "BET"
+    record = GameHistory(user_id=user_id, game_type="slot", action_type=action, delta_coin=win - bet,
+                         result_meta={"bet": bet, "win": win}, created_at=datetime.utcnow())
+    db.add(record)
+    history_aggregate_service.apply_history(db, user_id=user_id, game_type="slot", action_type=action,
+                                            delta_coin=win - bet, delta_gem=0)
+    db.commit()
+    effect(record)  # 리더보드 갱신 (동기)
+
+
+def round_spin(db, user_id: int, bet: int, win: int, dispatcher: EffectDispatcher) -> None:
+    rnd = GameRound(db, user_id, "slot", dispatcher=dispatcher)
+    try:
+        rnd.apply_balance(win - bet, require=bet)
+        rnd.log_action("SLOT_SPIN", {"bet_amount": bet, "win_amount": win})
+        rnd.log_history("WIN" if win > 0 else "BET", delta_coin=win - bet, result_meta={"bet": bet, "win": win})
+        rnd.commit()
+    except Exception:
+        rnd.rollback()
+        raise
+
+
+# ---------------- harness ---------------- #
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3, 3)
+
+
+def run(name: str, spin, args) -> Dict[str, Any]:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_round_"), f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60},
+                           pool_size=args.threads, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    event.listen(engine, "commit", lambda conn: _bump())
+    Session = sessionmaker(bind=engine)
+    start_balance = 10**9
+    with Session() as db:
+        db.add_all([User(site_id=f"b{i}", nickname=f"b{i}", phone_number=f"0107{i:07d}", password_hash="x",
+                         invite_code="5858", gold_balance=start_balance) for i in range(args.users)])
+        db.commit()
+        ids = [u.id for u in db.execute(select(User)).scalars()]
+
+    rng = random.Random(args.seed)
+    plan = [(rng.choice(ids), 10, rng.choice([0, 0, 0, 20, 50])) for _ in range(args.spins)]
+    expected = {uid: start_balance for uid in ids}
+    for uid, bet, win in plan:
+        expected[uid] += win - bet
+    lat: List[float] = []
+    lat_lock = threading.Lock()
+    local = threading.local()
+
+    def one(item):
+        db = getattr(local, "db", None)
+        if db is None:
+            db = local.db = Session()
+        uid, bet, win = item
+        t0 = time.perf_counter()
+        spin(db, uid, bet, win)
+        with lat_lock:
+            lat.append(time.perf_counter() - t0)
+
+    _Commits.count = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(one, plan))
+    elapsed = time.perf_counter() - t0
+    commits = _Commits.count
+    with Session() as db:
+        actual = {u.id: u.gold_balance for u in db.execute(select(User)).scalars()}
+    engine.dispose()
+    return {
+        "spins_per_sec": round(args.spins / elapsed, 1),
+        "elapsed_sec": round(elapsed, 3),
+        "commits_per_spin": round(commits / args.spins, 2),
+        "latency_p50_ms": _pct(lat, 0.5),
+        "latency_p95_ms": _pct(lat, 0.95),
+        "balance_drift": sum(abs(expected[u] - actual[u]) for u in ids),
+    }
+
+
+def _bump() -> None:
+    with _Commits.lock:
+        _Commits.count += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spins", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--effect-ms", type=float, default=1.0, help="Kafka/리더보드 부수효과 1회 지연")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    effect = _effect(args.effect_ms)
+    # commit 이후 부수효과를 같은 지연으로 대체 (외부 Redis 미접촉, Kafka 는 outbox 행으로 적재)
+    game_round_mod.get_leaderboard_service = lambda: type("LB", (), {"record_history": staticmethod(effect)})()
+    game_round_mod.get_achievement_pipeline = lambda: type("AP", (), {"submit": staticmethod(lambda *a: None)})()
+    dispatcher = EffectDispatcher()
+
+    result: Dict[str, Any] = {"spins": args.spins, "threads": args.threads, "users": args.users,
+                              "effect_ms": args.effect_ms}
+    result["legacy"] = run("legacy", lambda db, u, b, w: legacy_spin(db, u, b, w, effect), args)
+    result["round"] = run("round", lambda db, u, b, w: round_spin(db, u, b, w, dispatcher), args)
+    dispatcher.close()
+
+    print(f"=== Game round benchmark (sqlite, {args.spins} spins, {args.threads} threads) ===")
+    for key in ("legacy", "round"):
+        r = result[key]
+        print(f"{key:7s} {r['spins_per_sec']:>9} spins/s  commits/spin={r['commits_per_spin']:<5} "
+              f"p50={r['latency_p50_ms']}ms p95={r['latency_p95_ms']}ms drift={r['balance_drift']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
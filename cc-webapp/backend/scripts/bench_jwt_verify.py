@@ -0,0 +1,98 @@
+"""JWT 검증 비용 벤치마크: 레거시 후보 키 순회 vs kid 키 링
+
+용도:
+  - legacy: 호출마다 JWT_SECRET_KEY_FALLBACKS 파싱 + 후보 키 순서대로 jwt.decode (이전 verify_token)
+  - keyring: KeyRing.decode (kid 헤더로 키 조회, decode 1회)
+  - 토큰: primary 키 서명 / 마지막 fallback 키 서명 두 종류
+
+사용:
+  python -m scripts.bench_jwt_verify [--iterations 2000] [--fallbacks 6] [--output result.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.jwt_keyring import ALGORITHM, KeyRing
+
+
+def legacy_candidates(primary: str, fallbacks_env: str) -> List[Tuple[str, str]]:
+    cands = [("primary", primary)]
+    for i, s in enumerate([x.strip() for x in fallbacks_env.split(",") if x.strip()]):
+        cands.append((f"env_fallback_{i}", s))
+    return cands
+
+
+def legacy_verify(token: str, primary: str, fallbacks_env: str) -> Dict[str, Any]:
+    last_err = None
+    for _, key in legacy_candidates(primary, fallbacks_env):
+        try:
+            return jwt.decode(token, key, algorithms=[ALGORITHM])
+        except JWTError as e:
+            last_err = e
+    raise last_err
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--fallbacks", type=int, default=6, help="fallback 키 수")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    primary = "bench-primary-secret"
+    fallbacks = [f"bench-fallback-secret-{i}" for i in range(args.fallbacks)]
+    fallbacks_env = ",".join(fallbacks)
+    keys = {"v1": primary}
+    keys.update({f"fb{i}": s for i, s in enumerate(fallbacks)})
+    ring = KeyRing(keys=keys, active="v1", path="")
+
+    claims = {"sub": "bench", "user_id": 1, "exp": int(time.time()) + 3600}
+    primary_token = jwt.encode(claims, primary, algorithm=ALGORITHM, headers={"kid": "v1"})
+    last_kid = f"fb{args.fallbacks - 1}" if fallbacks else "v1"
+    fallback_token = jwt.encode(claims, keys[last_kid], algorithm=ALGORITHM, headers={"kid": last_kid})
+
+    result = {
+        "fallback_keys": args.fallbacks,
+        "iterations": args.iterations,
+        "legacy_primary": timed(lambda: legacy_verify(primary_token, primary, fallbacks_env), args.iterations),
+        "keyring_primary": timed(lambda: ring.decode(primary_token), args.iterations),
+        "legacy_fallback": timed(lambda: legacy_verify(fallback_token, primary, fallbacks_env), args.iterations),
+        "keyring_fallback": timed(lambda: ring.decode(fallback_token), args.iterations),
+    }
+    result["speedup_fallback"] = round(
+        result["legacy_fallback"]["mean_ms"] / max(result["keyring_fallback"]["mean_ms"], 1e-9), 1
+    )
+
+    print("=== JWT verify benchmark ===")
+    print(f"primary: legacy={result['legacy_primary']['mean_ms']}ms keyring={result['keyring_primary']['mean_ms']}ms")
+    print(f"fallback: legacy={result['legacy_fallback']['mean_ms']}ms keyring={result['keyring_fallback']['mean_ms']}ms "
+          f"speedup={result['speedup_fallback']}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,206 @@
+"""한정 패키지 재고 예약 경합 벤치마크: WATCH/MULTI + ZRANGE 스캔(legacy) vs Lua 스크립트
+
+용도:
+  - --buyers 명(기본 500)이 동시에 1개씩 구매: 예약(+hold) → 결제 지연(--pay-ms) → 80% 확정 / 20% 취소
+  - 시나리오 1 (stock >= buyers): 실패는 전부 "재고가 남았는데 품절" (spurious)
+  - 시나리오 2 (stock < buyers): 판매 수 == stock, 초과 판매 없음 확인
+  - 기존 hold --holds 건을 미리 적재해 hold 제거(legacy: 전체 스캔) 비용 비교
+  - reserve / finalize 지연 p50/p95, 최종 재고 정합성
+
+사용:
+  python -m scripts.bench_limited_reserve [--redis-url redis://localhost:6379/15] [--buyers 500] [--output result.json]
+
+주의:
+  - --redis-url 의 DB 에서 limited:BENCH_* 키를 생성/삭제한다 (전용 DB 사용)
+  - Redis 에 연결할 수 없으면 fakeredis(프로세스 내, 네트워크 지연 없음)로 대체하고 결과에 표시
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from app.services import limited_package_service as lps_mod
+from app.services.limited_package_service import LimitedPackage, LimitedPackageService
+from app.utils.redis import RedisManager
+
+
+# ---------------- legacy (이전 구현 재현) ---------------- #
+def legacy_try_reserve(client, key: str, initial: int, quantity: int) -> bool:
+    pipe = client.pipeline()
+    while True:
+        try:
+            pipe.watch(key)
+            current = pipe.get(key)
+            current = int(current) if current is not None else initial
+            if current < quantity:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.decrby(key, quantity)
+            pipe.execute()
+            return True
+        except Exception:
+            try:
+                pipe.reset()
+            except Exception:
+                pass
+            return False
+
+
+def legacy_add_hold(client, holds_key: str, quantity: int, ttl: int) -> str:
+    hold_id = uuid.uuid4().hex[:16]
+    client.zadd(holds_key, {f"{hold_id}:{quantity}": int(time.time()) + ttl})
+    return hold_id
+
+
+def legacy_remove_hold(client, holds_key: str, hold_id: str) -> None:
+    for m in client.zrange(holds_key, 0, -1) or []:
+        if isinstance(m, bytes):
+            m = m.decode("utf-8")
+        if m.startswith(f"{hold_id}:"):
+            client.zrem(holds_key, m)
+            break
+
+
+def legacy_buy(client, code: str, initial: int, pay_ms: float, rng: random.Random, lat: Dict[str, List[float]]):
+    stock_key, holds_key = f"limited:{code}:stock", f"limited:{code}:holds"
+    t0 = time.perf_counter()
+    ok = legacy_try_reserve(client, stock_key, initial, 1)
+    hold_id = legacy_add_hold(client, holds_key, 1, 120) if ok else None
+    lat["reserve"].append(time.perf_counter() - t0)
+    if not ok:
+        return False
+    time.sleep(rng.random() * pay_ms / 1000)
+    t0 = time.perf_counter()
+    if rng.random() < 0.8:
+        client.incrby(f"limited:{code}:user:{rng.randint(1, 10**6)}:purchased", 1)
+        legacy_remove_hold(client, holds_key, hold_id)
+        lat["finalize"].append(time.perf_counter() - t0)
+        return True
+    legacy_remove_hold(client, holds_key, hold_id)
+    client.incrby(stock_key, 1)
+    lat["release"].append(time.perf_counter() - t0)
+    return None
+
+
+def scripted_buy(client, code: str, initial: int, pay_ms: float, rng: random.Random, lat: Dict[str, List[float]]):
+    t0 = time.perf_counter()
+    ok, hold_id = LimitedPackageService.reserve(code, 1, ttl_seconds=120)
+    lat["reserve"].append(time.perf_counter() - t0)
+    if not ok:
+        return False
+    time.sleep(rng.random() * pay_ms / 1000)
+    t0 = time.perf_counter()
+    if rng.random() < 0.8:
+        LimitedPackageService.finalize_hold(code, hold_id, rng.randint(1, 10**6), 1)
+        lat["finalize"].append(time.perf_counter() - t0)
+        return True
+    LimitedPackageService.release_hold(code, hold_id)
+    lat["release"].append(time.perf_counter() - t0)
+    return None
+
+
+# ---------------- harness ---------------- #
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3, 3)
+
+
+def run(client, buy, code: str, stock: int, buyers: int, holds: int, pay_ms: float, seed: int) -> Dict[str, Any]:
+    for key in client.scan_iter(f"limited:{code}:*"):
+        client.delete(key)
+    client.set(f"limited:{code}:stock", stock)
+    if holds:  # 다른 구매자의 진행 중 hold (만료 전)
+        far = int(time.time()) + 3600
+        client.zadd(f"limited:{code}:holds", {f"pre{i:06d}:1": far for i in range(holds)})
+    lat: Dict[str, List[float]] = {"reserve": [], "finalize": [], "release": []}
+    barrier = threading.Barrier(buyers)
+
+    def worker(i: int):
+        rng = random.Random(seed * 100_003 + i)
+        barrier.wait()
+        return buy(client, code, stock, pay_ms, rng, lat)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=buyers) as pool:
+        outcomes = list(pool.map(worker, range(buyers)))
+    elapsed = time.perf_counter() - t0
+    sold = outcomes.count(True)
+    released = outcomes.count(None)
+    rejected = outcomes.count(False)
+    final_stock = int(client.get(f"limited:{code}:stock"))
+    return {
+        "stock": stock, "buyers": buyers, "sold": sold, "released": released, "rejected": rejected,
+        # 예약 성공 수 + 거절 수 = buyers. 재고가 충분했는데 거절된 수 = spurious
+        "spurious_sold_out": max(0, min(rejected, stock - sold - released)),
+        "final_stock": final_stock, "stock_consistent": final_stock == stock - sold,
+        "elapsed_sec": round(elapsed, 3),
+        "reserve_p50_ms": _pct(lat["reserve"], 0.5), "reserve_p95_ms": _pct(lat["reserve"], 0.95),
+        "finalize_p50_ms": _pct(lat["finalize"], 0.5), "finalize_p95_ms": _pct(lat["finalize"], 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--buyers", type=int, default=500)
+    parser.add_argument("--holds", type=int, default=5_000, help="미리 적재할 진행 중 hold 수")
+    parser.add_argument("--pay-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    backend = "redis"
+    try:
+        import redis
+        client = redis.Redis.from_url(args.redis_url, max_connections=args.buyers + 10)
+        client.ping()
+    except Exception:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+        backend = "fakeredis"
+
+    mgr = RedisManager(client)
+    lps_mod.get_redis_manager = lambda: mgr  # 벤치 전용 클라이언트 주입
+    result: Dict[str, Any] = {"backend": backend, "buyers": args.buyers, "holds_preloaded": args.holds}
+    scenarios = {"ample_stock": args.buyers * 2, "scarce_stock": max(1, args.buyers * 2 // 5)}
+    for name, stock in scenarios.items():
+        code = f"BENCH_{name.upper()}"
+        LimitedPackageService._seed_catalog()
+        ts = datetime.now(timezone.utc)
+        LimitedPackageService._catalog[code] = LimitedPackage(
+            code=code, name=code, description="bench", price_cents=100, gold=1,
+            start_at=ts - timedelta(hours=1), end_at=ts + timedelta(hours=1), initial_stock=stock,
+        )
+        result[name] = {
+            "legacy": run(client, legacy_buy, code, stock, args.buyers, args.holds, args.pay_ms, args.seed),
+            "scripted": run(client, scripted_buy, code, stock, args.buyers, args.holds, args.pay_ms, args.seed),
+        }
+        for key in client.scan_iter(f"limited:{code}:*"):
+            client.delete(key)
+
+    print(f"=== Limited reserve contention benchmark ({backend}, {args.buyers} buyers) ===")
+    for name in scenarios:
+        for impl in ("legacy", "scripted"):
+            r = result[name][impl]
+            print(f"{name:13s} {impl:8s} sold={r['sold']:>4} rejected={r['rejected']:>4} "
+                  f"spurious={r['spurious_sold_out']:>4} consistent={r['stock_consistent']} "
+                  f"reserve p95={r['reserve_p95_ms']}ms finalize p95={r['finalize_p95_ms']}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,188 @@
+"""Outbox relay 벤치마크: 요청 경로 인라인 Kafka 발행(legacy) vs event_outbox + 배치 relay
+
+용도:
+  - --events 건의 BUY_PACKAGE/user_action 이벤트를 --producers 스레드에서 생성
+    - 양쪽 모두 요청마다 도메인 행(user_actions) 1건 commit
+    - legacy: commit 후 send_kafka_message 재현 (send → future.get → flush = 왕복 1회, 요청 스레드 블로킹)
+    - outbox: 같은 commit 에 outbox 행 포함 → OutboxRelay 워커가 배치 claim/발행/일괄 마킹
+  - 브로커 왕복은 --rtt-ms 로 주입 (legacy: 이벤트당 1회, relay: 배치당 1회)
+  - 요청 경로 처리량(events/s), relay 발행 처리량, 적재→발행 지연 p50/p99, 배치 gzip 압축률
+
+사용:
+  python -m scripts.bench_outbox_relay [--events 5000] [--producers 8] [--batch-size 500] [--rtt-ms 2] [--output result.json]
+
+임시 디렉터리의 SQLite 파일 DB(WAL) 를 사용한다 (Kafka/운영 DB 미접촉).
+SQLite 는 단일 writer 라 relay 의 일괄 UPDATE 도 요청 commit 과 직렬화된다 (Postgres 에서는 행 잠금만 경합).
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import UserAction
+from app.services.outbox_producer import enqueue_outbox
+from app.services.outbox_relay import InMemoryOutboxSink, OutboxMessage, OutboxRelay
+
+
+def _event(i: int) -> Dict[str, Any]:
+    return {
+        "type": "BUY_PACKAGE", "user_id": i % 500, "code": "STARTER_PACK", "quantity": 1,
+        "total_price_cents": 990, "gold_granted": 1000, "charge_id": f"ch_{i:08d}",
+        "server_ts": datetime.utcnow().isoformat(),
+    }
+
+
+class _RTTSink(InMemoryOutboxSink):
+    """배치당 왕복 1회 + 발행 시각 기록"""
+
+    def __init__(self, rtt: float) -> None:
+        super().__init__()
+        self.rtt = rtt
+        self.published_at: Dict[int, float] = {}
+        self.raw_bytes = 0
+        self.gzip_bytes = 0
+
+    def publish(self, messages: Sequence[OutboxMessage]) -> List[int]:
+        time.sleep(self.rtt)
+        blob = b"\n".join(m.value for m in messages)
+        self.raw_bytes += len(blob)
+        self.gzip_bytes += len(gzip.compress(blob))
+        now = time.perf_counter()
+        for m in messages:
+            self.published_at[m.id] = now
+        return super().publish(messages)
+
+
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3, 3)
+
+
+def _sessionmaker(name: str, args):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_outbox_"), f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60},
+                           pool_size=args.producers + 2, max_overflow=0)
+    # WAL: 읽기(claim/lag 조회)가 쓰기를 막지 않도록 (서버 DB 의 MVCC 에 근접)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA journal_mode=WAL"))
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def _domain_write(db, i: int) -> None:
+    db.add(UserAction(user_id=i % 500, action_type="BUY_PACKAGE", action_data=f"ch_{i:08d}"))
+
+
+def run_legacy(args) -> Dict[str, Any]:
+    rtt = args.rtt_ms / 1000
+    engine, Session = _sessionmaker("legacy", args)
+    local = threading.local()
+
+    def request(i: int) -> None:
+        db = getattr(local, "db", None)
+        if db is None:
+            db = local.db = Session()
+        _domain_write(db, i)
+        db.commit()
+        json.dumps(_event(i)).encode("utf-8")
+        time.sleep(rtt)  # producer.send → fut.get → flush
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.producers) as pool:
+        list(pool.map(request, range(args.events)))
+    elapsed = time.perf_counter() - t0
+    engine.dispose()
+    return {
+        "request_path_events_per_sec": round(args.events / elapsed, 1),
+        "broker_round_trips": args.events,
+    }
+
+
+def run_outbox(args) -> Dict[str, Any]:
+    engine, Session = _sessionmaker("outbox", args)
+    sink = _RTTSink(args.rtt_ms / 1000)
+    relay = OutboxRelay(sink=sink, session_factory=Session, workers=1, batch_size=args.batch_size,
+                        poll_interval=0.01)
+    enqueued_at: Dict[int, float] = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def request(i: int) -> None:
+        db = getattr(local, "db", None)
+        if db is None:
+            db = local.db = Session()
+        _domain_write(db, i)
+        outbox_id = enqueue_outbox(db, "purchase", _event(i), dedupe_key=f"buy_package:ch_{i:08d}")
+        db.commit()
+        with lock:
+            enqueued_at[outbox_id] = time.perf_counter()
+        relay.notify()
+
+    relay.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.producers) as pool:
+        list(pool.map(request, range(args.events)))
+    produce_elapsed = time.perf_counter() - t0
+    deadline = time.time() + 120
+    while len(sink.published_at) < args.events and time.time() < deadline:
+        time.sleep(0.01)
+    total_elapsed = time.perf_counter() - t0
+    relay.shutdown(wait=True)
+    stats = relay.stats()
+    lags = [sink.published_at[i] - enqueued_at[i] for i in enqueued_at if i in sink.published_at]
+    engine.dispose()
+    return {
+        "request_path_events_per_sec": round(args.events / produce_elapsed, 1),
+        "end_to_end_events_per_sec": round(len(sink.published_at) / total_elapsed, 1),
+        "published": len(sink.published_at),
+        "batches": stats["batches"],
+        "broker_round_trips": stats["batches"],
+        "lag_p50_ms": _pct(lags, 0.5),
+        "lag_p99_ms": _pct(lags, 0.99),
+        "gzip_ratio": round(sink.gzip_bytes / sink.raw_bytes, 3) if sink.raw_bytes else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="브로커 왕복 지연 (acks=all)")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    result: Dict[str, Any] = {"events": args.events, "producers": args.producers, "rtt_ms": args.rtt_ms,
+                              "batch_size": args.batch_size}
+    result["legacy_inline"] = run_legacy(args)
+    result["outbox_relay"] = run_outbox(args)
+
+    legacy, outbox = result["legacy_inline"], result["outbox_relay"]
+    print(f"=== Outbox relay benchmark ({args.events} events, {args.producers} producers, rtt={args.rtt_ms}ms) ===")
+    print(f"legacy_inline  request path {legacy['request_path_events_per_sec']:>9} ev/s  "
+          f"round trips={legacy['broker_round_trips']}")
+    print(f"outbox_relay   request path {outbox['request_path_events_per_sec']:>9} ev/s  "
+          f"end-to-end {outbox['end_to_end_events_per_sec']} ev/s  round trips={outbox['broker_round_trips']}  "
+          f"lag p50={outbox['lag_p50_ms']}ms p99={outbox['lag_p99_ms']}ms  gzip={outbox['gzip_ratio']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,127 @@
+"""RFM 세그먼트 배치 벤치마크: 사용자별 루프(legacy) vs set-based bulk
+
+용도:
+  - --users 명(기본 20,000)과 사용자당 평균 --actions 건의 user_actions / games 를 시드
+  - RFMService.update_all_user_segments(bulk=False) 와 bulk=True 의 전체 처리 시간 비교
+  - 두 방식의 결과 세그먼트(rfm_group) 일치 확인
+
+사용:
+  python -m scripts.bench_rfm_segments [--users 20000] [--actions 20] [--chunk-size 5000] [--db-url sqlite:///./bench_rfm.db]
+
+주의:
+  - 기본은 임시 SQLite 파일 DB. Postgres 비교 시 --db-url 지정 (테이블이 생성/삭제됨 → 전용 DB 사용)
+  - legacy 는 사용자 수에 선형으로 느려지므로 --skip-legacy 로 bulk 만 측정 가능
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, UserAction, Game, UserSegment
+from app.services.rfm_service import RFMService
+
+
+def seed(db, users: int, actions: int, rng: random.Random, batch: int = 20_000) -> None:
+    now = datetime.utcnow()
+    db.execute(insert(User), [
+        {"site_id": f"rfm_{i}", "nickname": f"rfm_{i}", "phone_number": f"010{i:08d}",
+         "password_hash": "x", "invite_code": "5858"}
+        for i in range(users)
+    ])
+    db.commit()
+    ids = list(db.scalars(select(User.id).order_by(User.id)))
+    action_rows, game_rows = [], []
+
+    def flush():
+        if action_rows:
+            db.execute(insert(UserAction), action_rows)
+            action_rows.clear()
+        if game_rows:
+            db.execute(insert(Game), game_rows)
+            game_rows.clear()
+        db.commit()
+
+    for uid in ids:
+        # 활동량 분포: 일부 헤비 유저 + 다수 라이트/휴면 유저
+        n = int(rng.expovariate(1 / max(1, actions)))
+        for _ in range(n):
+            ts = now - timedelta(days=rng.uniform(0, 45))
+            action_rows.append({"user_id": uid, "action_type": "SLOT_SPIN", "created_at": ts})
+            game_rows.append({"user_id": uid, "game_type": "slot", "bet_amount": rng.randint(100, 20_000), "created_at": ts})
+        if len(action_rows) >= batch:
+            flush()
+    flush()
+
+
+def snapshot(db):
+    return dict(db.execute(select(UserSegment.user_id, UserSegment.rfm_group)).all())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=int(os.getenv("BENCH_USERS", 20_000)))
+    parser.add_argument("--actions", type=int, default=20, help="사용자당 평균 액션 수")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.db_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="bench_rfm_")
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    engine = create_engine(url)
+    tables = [User.__table__, UserAction.__table__, Game.__table__, UserSegment.__table__]
+    Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+    Base.metadata.create_all(engine, tables=tables)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    t0 = time.perf_counter()
+    seed(db, args.users, args.actions, random.Random(args.seed))
+    result = {"db": engine.url.get_backend_name(), "users": args.users, "seed_sec": round(time.perf_counter() - t0, 2)}
+
+    legacy_groups = None
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        RFMService(db).update_all_user_segments(bulk=False)
+        result["legacy_sec"] = round(time.perf_counter() - t0, 3)
+        legacy_groups = snapshot(db)
+
+    bulk_stats = RFMService(db).update_all_user_segments(bulk=True, chunk_size=args.chunk_size)
+    result["bulk_sec"] = bulk_stats["elapsed_sec"]
+    result["bulk_users_per_sec"] = bulk_stats["users_per_sec"]
+    result["bulk_chunks"] = bulk_stats["chunks"]
+    if legacy_groups is not None:
+        result["groups_match"] = legacy_groups == snapshot(db)
+        result["speedup"] = round(result["legacy_sec"] / max(result["bulk_sec"], 1e-9), 1)
+
+    db.close()
+    engine.dispose()
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("=== RFM segmentation benchmark ===")
+    print(f"users={args.users} legacy={result.get('legacy_sec')}s bulk={result['bulk_sec']}s speedup={result.get('speedup')}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
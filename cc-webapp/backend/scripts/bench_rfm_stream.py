@@ -0,0 +1,191 @@
+"""RFM 세그먼트 벤치마크: 주기적 전체 재계산(legacy) vs 증분 스트림(rfm_stream)
+
+용도:
+  - SQLite 임시 파일 DB 에 --users 명, 30일치 user_actions --history 건 / games (1/3) 시드 후 같은 사본 2개 준비
+  - 같은 트래픽(--rate 이벤트/초, UserAction + 절반은 Game, ORM 세션 커밋)을 --periods 개 legacy 주기만큼 재생
+    - legacy: 기존 스케줄러 경로 재현 — 주기(--legacy-interval) 마다 RFMService.update_all_user_segments (전체 재계산)
+    - stream: flush 주기(--flush-interval) 마다 커밋 훅으로 수집된 증분만 RFMStream.flush (이벤트 사용자만 재평가)
+  - 주기당 실행 SQL 문 수 / DB 시간, 시간당 DB 시간·SQL 문 수, 세그먼트 반영 지연(staleness: 주기/2 + 처리 시간)
+  - stream 쪽: 최초 bootstrap(reconcile) 비용, 1일 경과 rescore_due 비용, 종료 후 reconcile drift
+    (전체 재계산 결과와 다른 세그먼트 수, 0 이어야 함)
+
+사용:
+  python -m scripts.bench_rfm_stream [--users 20000] [--history 400000] [--rate 20] [--periods 3]
+                                     [--legacy-interval 300] [--flush-interval 5] [--output result.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import EventOutbox, Game, UserAction, UserSegment
+from app.services import rfm_stream
+from app.services.rfm_service import RFMService
+
+
+def _seed(path: str, args, now: datetime) -> None:
+    rnd = random.Random(11)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (id, site_id, nickname, phone_number, password_hash, invite_code, gold_balance, vip_points) "
+        "VALUES (?,?,?,?,?,?,?,?)",
+        [(i, f"site{i}", f"nick{i}", f"010{i:08d}", "x", "5858", 1000, 0) for i in range(1, args.users + 1)],
+    )
+
+    def ts():
+        return (now - timedelta(seconds=rnd.randint(0, 86400 * 30))).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    def uid():  # 활동의 80% 는 상위 20% 사용자
+        return rnd.randint(1, args.users // 5) if rnd.random() < 0.8 else rnd.randint(1, args.users)
+
+    conn.executemany("INSERT INTO user_actions (user_id, action_type, created_at) VALUES (?,?,?)",
+                     [(uid(), "SLOT_SPIN", ts()) for _ in range(args.history)])
+    conn.executemany("INSERT INTO games (user_id, game_type, bet_amount, payout, created_at) VALUES (?,?,?,?,?)",
+                     [(uid(), "slot", rnd.randint(100, 50_000), 0, ts()) for _ in range(args.history // 3)])
+    conn.commit()
+    conn.close()
+
+
+def _engine(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+    return engine, statements
+
+
+def _play_tick(Session, args, rnd: random.Random, events: int) -> None:
+    with Session() as db:
+        now = datetime.utcnow()
+        for _ in range(events):
+            user_id = rnd.randint(1, args.users // 5) if rnd.random() < 0.8 else rnd.randint(1, args.users)
+            db.add(UserAction(user_id=user_id, action_type="SLOT_SPIN", created_at=now))
+            if rnd.random() < 0.5:
+                db.add(Game(user_id=user_id, game_type="slot", bet_amount=rnd.randint(100, 50_000), created_at=now))
+        db.commit()
+
+
+def _measure(statements, fn):
+    before = statements[0]
+    t0 = time.perf_counter()
+    value = fn()
+    return value, statements[0] - before, time.perf_counter() - t0
+
+
+def _summary(samples: List[Dict[str, float]], interval: float) -> Dict[str, Any]:
+    n = max(1, len(samples))
+    avg_sec = sum(s["seconds"] for s in samples) / n
+    return {
+        "ticks": len(samples),
+        "statements_per_tick": round(sum(s["statements"] for s in samples) / n, 1),
+        "db_ms_per_tick": round(avg_sec * 1e3, 2),
+        "users_rescored_per_tick": round(sum(s["users"] for s in samples) / n, 1),
+        "interval_sec": interval,
+        "statements_per_hour": round(sum(s["statements"] for s in samples) / n * 3600 / interval),
+        # 이벤트는 주기 내 균등 도착 → 평균 대기 interval/2, 최악 interval, 여기에 처리 시간 가산
+        "staleness_avg_sec": round(interval / 2 + avg_sec, 3),
+        "staleness_max_sec": round(interval + max((s["seconds"] for s in samples), default=0.0), 3),
+        "db_seconds_per_hour": round(avg_sec * 3600 / interval, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--history", type=int, default=400_000)
+    parser.add_argument("--rate", type=float, default=20.0, help="초당 커밋 이벤트 수")
+    parser.add_argument("--periods", type=int, default=3, help="재생할 legacy 주기 수")
+    parser.add_argument("--legacy-interval", type=float, default=300.0, help="기존 전체 재계산 주기 (초)")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="스트림 flush 주기 (초)")
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    workdir = tempfile.mkdtemp(prefix="bench_rfm_")
+    legacy_path, stream_path = os.path.join(workdir, "legacy.db"), os.path.join(workdir, "stream.db")
+    seed_engine = create_engine(f"sqlite:///{legacy_path}")
+    Base.metadata.create_all(bind=seed_engine)
+    seed_engine.dispose()
+    _seed(legacy_path, args, now)
+    with sqlite3.connect(legacy_path) as src, sqlite3.connect(stream_path) as dst:
+        src.backup(dst)
+
+    result: Dict[str, Any] = {"users": args.users, "history": args.history, "rate": args.rate, "periods": args.periods}
+    legacy_events = int(args.rate * args.legacy_interval)
+    stream_events = max(1, int(args.rate * args.flush_interval))
+    stream_ticks = int(args.periods * args.legacy_interval / args.flush_interval)
+
+    # legacy: tick 마다 전체 재계산
+    engine, statements = _engine(legacy_path)
+    Session = sessionmaker(bind=engine)
+    rnd = random.Random(5)
+    samples = []
+    for _ in range(args.periods):
+        _play_tick(Session, args, rnd, legacy_events)
+        with Session() as db:
+            stats, n, sec = _measure(statements, lambda: RFMService(db).update_all_user_segments())
+        samples.append({"statements": n, "seconds": sec, "users": stats["users"]})
+    result["legacy"] = _summary(samples, args.legacy_interval)
+    with Session() as db:
+        legacy_segments = dict(db.execute(select(UserSegment.user_id, UserSegment.rfm_group)).all())
+    engine.dispose()
+
+    # stream: bootstrap 1회 → tick 마다 증분 flush
+    engine, statements = _engine(stream_path)
+    Session = sessionmaker(bind=engine)
+    stream = rfm_stream.RFMStream(session_factory=Session, flush_interval=args.flush_interval)
+    stream.install(Session)
+    with Session() as db:
+        _, n, sec = _measure(statements, lambda: rfm_stream.reconcile(db))
+    result["stream_bootstrap"] = {"statements": n, "seconds": round(sec, 3)}
+    rnd = random.Random(5)
+    samples = []
+    for _ in range(stream_ticks):
+        _play_tick(Session, args, rnd, stream_events)
+        stats, n, sec = _measure(statements, stream.flush)
+        samples.append({"statements": n, "seconds": sec, "users": stats["scored"]})
+    result["stream"] = _summary(samples, args.flush_interval)
+    stream.uninstall()
+    with Session() as db:
+        stream_segments = dict(db.execute(select(UserSegment.user_id, UserSegment.rfm_group)).all())
+        due, n, sec = _measure(statements, lambda: rfm_stream.rescore_due(db, datetime.utcnow() + timedelta(days=1)))
+        result["stream_aging_next_day"] = {"users": due["scored"], "changed": due["changed"], "statements": n,
+                                           "seconds": round(sec, 3)}
+        recon, n, sec = _measure(statements, lambda: rfm_stream.reconcile(db, datetime.utcnow() + timedelta(days=1)))
+        result["stream_reconcile"] = {"drift": recon["drift"], "post_changed": recon["post_changed"],
+                                      "statements": n, "seconds": round(sec, 3)}
+        result["segment_events"] = int(db.scalar(select(func.count()).select_from(
+            EventOutbox.__table__).where(EventOutbox.event_type == "segment_change")) or 0)
+    engine.dispose()
+    result["segment_mismatches_vs_legacy"] = sum(
+        1 for uid, group in legacy_segments.items() if stream_segments.get(uid) != group)
+
+    legacy, stream_r = result["legacy"], result["stream"]
+    print(f"=== RFM segmentation benchmark ({args.users} users, {args.history} history rows, "
+          f"{args.rate} events/s over {args.periods} x {args.legacy_interval}s) ===")
+    for name, r in (("legacy", legacy), ("stream", stream_r)):
+        print(f"{name:<7} stmts/tick {r['statements_per_tick']:>9}  db {r['db_ms_per_tick']:>9} ms/tick  "
+              f"users/tick {r['users_rescored_per_tick']:>8}  staleness avg {r['staleness_avg_sec']}s "
+              f"max {r['staleness_max_sec']}s  db {r['db_seconds_per_hour']}s/h  stmts {r['statements_per_hour']}/h")
+    print(f"bootstrap {result['stream_bootstrap']}  aging {result['stream_aging_next_day']}  "
+          f"reconcile {result['stream_reconcile']}  segment_change events {result['segment_events']}  "
+          f"mismatches vs legacy {result['segment_mismatches_vs_legacy']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,221 @@
+"""공유 집계 스냅샷 벤치마크: 독자별 재계산(legacy) vs background producer + 팬아웃
+
+용도:
+  - SQLite 임시 파일 DB(WAL) 에 user_actions / games / user_sessions / user_rewards 시드
+  - --subscribers 개 SSE 구독자 + --pollers 스레드(/api/metrics/global, /api/dashboard 교대 폴링)를 --seconds 동안 실행
+    - legacy: 기존 경로 재현
+        SSE 구독자마다 interval 마다 이벤트 루프 위에서 동기 get_global_metrics (연결별 세션),
+        RedisManager.set_cached_data 부재로 폴링도 매 요청 재계산, 대시보드 게임별 SUM 4회
+    - snapshot: SnapshotStore producer (interval 당 1회 계산) + subscribe 팬아웃 + get() 캐시 읽기
+  - 실행된 SQL 문 수, 폴링 지연 p50/p99, 이벤트 루프 지연 p99(구독자 전달 지연), SSE 전달 건수
+
+사용:
+  python -m scripts.bench_snapshot_service [--subscribers 200] [--pollers 8] [--seconds 6] [--interval 1.0] [--output result.json]
+
+interval 은 운영 기본(5s)보다 짧게 두어 짧은 실행에서도 여러 주기를 관측한다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.services import activity_storage_service
+from app.services.dashboard_service import DashboardService
+from app.services.snapshot_service import SnapshotStore, compute_dashboard, compute_global_metrics
+
+
+def _seed(path: str, actions: int) -> None:
+    now = datetime.utcnow()
+    rnd = random.Random(3)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (id, site_id, nickname, phone_number, password_hash, invite_code, gold_balance, vip_points) "
+        "VALUES (?,?,?,?,?,?,?,?)",
+        [(i, f"site{i}", f"nick{i}", f"010{i:08d}", "x", "5858", 1000, 0) for i in range(1, 2001)],
+    )
+    conn.executemany(
+        "INSERT INTO user_actions (user_id, action_type, created_at) VALUES (?,?,?)",
+        [(rnd.randint(1, 2000), rnd.choice(["SLOT_SPIN", "SLOT_SPIN", "GACHA_PULL", "LOGIN"]),
+          (now - timedelta(seconds=rnd.randint(0, 86400 * 3))).strftime("%Y-%m-%d %H:%M:%S.%f"))
+         for _ in range(actions)],
+    )
+    conn.executemany(
+        "INSERT INTO games (user_id, game_type, bet_amount, payout, created_at) VALUES (?,?,?,?,?)",
+        [(rnd.randint(1, 2000), rnd.choice(["slot", "roulette", "rps", "gacha", "crash"]), rnd.randint(10, 5000),
+          rnd.randint(0, 200000), now.strftime("%Y-%m-%d %H:%M:%S.%f")) for _ in range(actions // 5)],
+    )
+    conn.executemany(
+        "INSERT INTO user_sessions (user_id, session_token, expires_at, last_used_at, is_active) VALUES (?,?,?,?,1)",
+        [(i, f"tok{i}", (now + timedelta(days=1)).isoformat(" "),
+          (now - timedelta(seconds=rnd.randint(0, 900))).isoformat(" ")) for i in range(1, 2001)],
+    )
+    conn.executemany(
+        "INSERT INTO user_rewards (user_id, claimed_at, gold_amount) VALUES (?,?,?)",
+        [(rnd.randint(1, 2000), (now - timedelta(seconds=rnd.randint(0, 7200))).isoformat(" "),
+          rnd.randint(0, 5000)) for _ in range(5000)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _legacy_game_stats(db) -> Dict[str, Any]:
+    """변경 전 get_game_dashboard_stats: 게임별 SUM 1회씩"""
+    out = {}
+    for game_name in ["slot", "roulette", "rps", "gacha"]:
+        stats = db.query(func.sum(models.Game.bet_amount).label("total_bet"),
+                         func.sum(models.Game.payout).label("total_payout")
+                         ).filter(models.Game.game_type == game_name).first()
+        out[game_name] = {"total_bet": stats.total_bet or 0, "total_payout": stats.total_payout or 0}
+    return out
+
+
+def _legacy_dashboard(db) -> Dict[str, Any]:
+    service = DashboardService(db)
+    return {"main": service.get_main_dashboard_stats(), "games": _legacy_game_stats(db),
+            "social_proof": service.get_social_proof_stats()}
+
+
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3, 3)
+
+
+async def _run(args, Session, mode: str) -> Dict[str, Any]:
+    stop = threading.Event()
+    poll_latency: List[float] = []
+    delivered = [0]
+    loop_lag: List[float] = []
+    lock = threading.Lock()
+    store = None
+    if mode == "snapshot":
+        store = SnapshotStore(session_factory=Session)
+        store.register("global_metrics", compute_global_metrics, args.interval)
+        store.register("dashboard", compute_dashboard, args.interval * 6)
+
+    def poller(i: int) -> None:
+        n = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            if mode == "legacy":
+                with Session() as db:
+                    compute_global_metrics(db) if n % 2 == 0 else _legacy_dashboard(db)
+            else:
+                store.get("global_metrics" if n % 2 == 0 else "dashboard")
+            with lock:
+                poll_latency.append(time.perf_counter() - t0)
+            n += 1
+            time.sleep(0.005)
+
+    async def legacy_subscriber() -> None:
+        db = Session()  # 연결별 세션 유지 (Depends(get_read_db))
+        try:
+            while True:
+                compute_global_metrics(db)  # 이벤트 루프 위 동기 실행
+                delivered[0] += 1
+                await asyncio.sleep(args.interval)
+        finally:
+            db.close()
+
+    async def snapshot_subscriber() -> None:
+        async for _ in store.subscribe("global_metrics", min_interval=args.interval):
+            delivered[0] += 1
+
+    async def ticker() -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            loop_lag.append(time.perf_counter() - t0 - 0.01)
+
+    tasks = [asyncio.create_task(ticker())]
+    if store is not None:
+        store.start_producer()
+    for _ in range(args.subscribers):
+        tasks.append(asyncio.create_task(legacy_subscriber() if mode == "legacy" else snapshot_subscriber()))
+    threads = [threading.Thread(target=poller, args=(i,), daemon=True) for i in range(args.pollers)]
+    for t in threads:
+        t.start()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if store is not None:
+        await store.stop()
+    for t in threads:
+        t.join()
+    return {
+        "polls": len(poll_latency),
+        "poll_p50_ms": _pct(poll_latency, 0.5),
+        "poll_p99_ms": _pct(poll_latency, 0.99),
+        "sse_messages": delivered[0],
+        "loop_lag_p99_ms": _pct(loop_lag, 0.99),
+        "snapshot_stats": store.stats() if store is not None else None,
+    }
+
+
+def run(args, mode: str) -> Dict[str, Any]:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_snapshot_"), f"{mode}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30},
+                           pool_size=args.subscribers + args.pollers + 4, max_overflow=0)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA journal_mode=WAL"))
+    Base.metadata.create_all(bind=engine)
+    _seed(path, args.actions)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        activity_storage_service.refresh_rollups(db)
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+    result = asyncio.run(_run(args, Session, mode))
+    result["sql_statements"] = statements[0]
+    result["sql_statements_per_sec"] = round(statements[0] / args.seconds, 1)
+    engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="SSE/스냅샷 주기 (초)")
+    parser.add_argument("--actions", type=int, default=200_000)
+    parser.add_argument("--output", help="JSON 결과 저장 경로")
+    args = parser.parse_args()
+
+    result: Dict[str, Any] = {"subscribers": args.subscribers, "pollers": args.pollers, "seconds": args.seconds,
+                              "interval": args.interval, "actions": args.actions}
+    result["legacy"] = run(args, "legacy")
+    result["snapshot"] = run(args, "snapshot")
+
+    print(f"=== Snapshot benchmark ({args.subscribers} SSE subscribers, {args.pollers} pollers, "
+          f"{args.seconds}s, interval={args.interval}s) ===")
+    for mode in ("legacy", "snapshot"):
+        r = result[mode]
+        print(f"{mode:<9} sql/s {r['sql_statements_per_sec']:>9}  polls {r['polls']:>7}  "
+              f"poll p50 {r['poll_p50_ms']}ms p99 {r['poll_p99_ms']}ms  "
+              f"sse msgs {r['sse_messages']}  loop lag p99 {r['loop_lag_p99_ms']}ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
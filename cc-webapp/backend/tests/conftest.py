@@ -33,6 +33,8 @@ import os
 
 # Set test environment variables
 os.environ["TESTING"] = "true"
+os.environ.setdefault("RFM_STREAM_ENABLED", "0")  # 증분 RFM 백그라운드 flush 비활성 (app/tests/conftest 동일)
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "0")  # outbox 행은 테스트가 직접 relay/검사
 
 # CI 최소 모드에서 ci_core 마커 아닌 테스트 스킵
 def pytest_collection_modifyitems(config, items):
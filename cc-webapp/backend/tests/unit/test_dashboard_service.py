@@ -21,15 +21,15 @@ def test_get_main_dashboard_stats(dashboard_service, mock_db_session):
     # Arrange
     mock_query = mock_db_session.query.return_value
 
-    # Mock DAU count
-    mock_query.filter.return_value.distinct.return_value.count.return_value = 5
     # Mock New Users count
     mock_query.filter.return_value.count.return_value = 2
     # Mock Total Revenue
     mock_query.scalar.return_value = 500000
 
-    # Act
-    result = dashboard_service.get_main_dashboard_stats()
+    # Act (DAU: activity rollup + raw tail)
+    with patch("app.services.dashboard_service.activity_storage_service.active_users", return_value=5) as dau:
+        result = dashboard_service.get_main_dashboard_stats()
+    dau.assert_called_once()
 
     # Assert
     assert result["daily_active_users"] == 5
@@ -43,23 +43,10 @@ def test_get_game_dashboard_stats(dashboard_service, mock_db_session):
     # Arrange
     mock_query = mock_db_session.query.return_value
 
-    # Mock stats for 'slot' game
-    mock_slot_stats = MagicMock()
-    mock_slot_stats.total_bet = 100000
-    mock_slot_stats.total_payout = 15000
-
-    # Mock stats for 'roulette' game
-    mock_roulette_stats = MagicMock()
-    mock_roulette_stats.total_bet = 50000
-    mock_roulette_stats.total_payout = 45000
-
-    # The filter().first() chain will be called for each game.
-    # We can use side_effect to return different values for each call.
-    mock_query.filter.return_value.first.side_effect = [
-        mock_slot_stats,
-        mock_roulette_stats,
-        MagicMock(total_bet=0, total_payout=0), # rps
-        MagicMock(total_bet=0, total_payout=0)  # gacha
+    # Single GROUP BY row per game that has data (rps/gacha absent -> zeros)
+    mock_query.filter.return_value.group_by.return_value.all.return_value = [
+        MagicMock(game_type="slot", total_bet=100000, total_payout=15000),
+        MagicMock(game_type="roulette", total_bet=50000, total_payout=45000),
     ]
 
     # Act
@@ -78,6 +65,8 @@ def test_get_game_dashboard_stats(dashboard_service, mock_db_session):
 
     assert "rps" in result
     assert result["rps"]["total_bet"] == 0
+    assert result["gacha"]["rtp"] == 0
+    mock_db_session.query.assert_called_once()
 
 def test_get_social_proof_stats(dashboard_service, mock_db_session):
     """
@@ -86,9 +75,6 @@ def test_get_social_proof_stats(dashboard_service, mock_db_session):
     # Arrange
     mock_query = mock_db_session.query.return_value
 
-    # Mock gacha spins count
-    mock_query.filter.return_value.count.return_value = 123
-
     # Mock big winners
     mock_winners = [
         (MagicMock(payout=200000), MagicMock(nickname="Winner1")),
@@ -96,8 +82,10 @@ def test_get_social_proof_stats(dashboard_service, mock_db_session):
     ]
     mock_query.join.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = mock_winners
 
-    # Act
-    result = dashboard_service.get_social_proof_stats()
+    # Act (gacha spins: activity rollup + raw tail)
+    with patch("app.services.dashboard_service.activity_storage_service.count_actions", return_value=123) as spins:
+        result = dashboard_service.get_social_proof_stats()
+    assert spins.call_args.args[1] == "GACHA_PULL"
 
     # Assert
     assert result["gacha_spins_today"] == 123